@@ -25,6 +25,7 @@ fileConfig(config.config_file_name)
 
 # for 'autogenerate' support
 from hera_mc import mc  # noqa
+from hera_mc.partitioning import include_object  # noqa
 target_metadata = mc.MCDeclarativeBase.metadata
 
 
@@ -48,7 +49,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=target_metadata, literal_binds=True)
+        url=url, target_metadata=target_metadata, literal_binds=True,
+        include_object=include_object)
 
     with context.begin_transaction():
         context.run_migrations()
@@ -69,7 +71,8 @@ def run_migrations_online():
     with connectable.connect() as connection:
         context.configure(
             connection=connection,
-            target_metadata=target_metadata
+            target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,34 @@
+"""add daemon_task_status table
+
+Revision ID: 3f8c5a1d9e62
+Revises: e6a2d9b41f07
+Create Date: 2026-10-19 01:26:53.804115+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '3f8c5a1d9e62'
+down_revision = 'e6a2d9b41f07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daemon_task_status',
+                    sa.Column('name', sa.String(length=32), nullable=False),
+                    sa.Column('task_name', sa.String(length=64), nullable=False),
+                    sa.Column('hostname', sa.String(length=32), nullable=False),
+                    sa.Column('time', sa.BigInteger(), nullable=False),
+                    sa.Column('status', sa.String(length=32), nullable=False),
+                    sa.Column('latency', sa.Float(), nullable=False),
+                    sa.PrimaryKeyConstraint('name', 'task_name', 'hostname', 'time')
+                    )
+    op.create_index('ix_daemon_task_status_name_time', 'daemon_task_status',
+                    ['name', 'time'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_daemon_task_status_name_time', table_name='daemon_task_status')
+    op.drop_table('daemon_task_status')
@@ -0,0 +1,200 @@
+"""partition telemetry tables and add hourly rollup tables
+
+Revision ID: 5b2f0c1d8e47
+Revises: 7463268309ab
+Create Date: 2026-10-18 16:20:11.472913+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from astropy.time import Time, TimeDelta
+
+# revision identifiers, used by Alembic.
+revision = '5b2f0c1d8e47'
+down_revision = '7463268309ab'
+branch_labels = None
+depends_on = None
+
+# table name: (partition time column, primary key columns)
+partitioned_tables = {
+    'hera_autos': ('time', ['time', 'antenna_number', 'antenna_feed_pol']),
+    'antenna_status': ('time', ['time', 'antenna_number', 'antenna_feed_pol']),
+    'snap_status': ('time', ['time', 'hostname']),
+    'node_sensor': ('time', ['time', 'node']),
+    'node_white_rabbit_status': ('node_time', ['node_time', 'node']),
+}
+
+
+def _month_start_gps(year, month):
+    year += (month - 1) // 12
+    month = (month - 1) % 12 + 1
+    return int(round(Time('{y:04d}-{m:02d}-01'.format(y=year, m=month),
+                          scale='utc').gps))
+
+
+def _partition_table(table, time_column, pkey):
+    fmt = {'t': table, 'col': time_column, 'pkey': ', '.join(pkey)}
+    op.execute('ALTER TABLE {t} RENAME TO {t}_unpartitioned'.format(**fmt))
+    op.execute('ALTER INDEX {t}_pkey RENAME TO {t}_unpartitioned_pkey'
+               .format(**fmt))
+    op.execute('CREATE TABLE {t} (LIKE {t}_unpartitioned INCLUDING DEFAULTS '
+               'INCLUDING CONSTRAINTS) PARTITION BY RANGE ({col})'.format(**fmt))
+    op.execute('ALTER TABLE {t} ADD PRIMARY KEY ({pkey})'.format(**fmt))
+    op.execute('CREATE TABLE {t}_default PARTITION OF {t} DEFAULT'.format(**fmt))
+
+    # monthly partitions from the oldest row through next month, later ones
+    # are made by mc_manage_partitions.py
+    min_time = op.get_bind().execute(
+        'SELECT min({col}) FROM {t}_unpartitioned'.format(**fmt)).scalar()
+    stop_dt = (Time.now() + TimeDelta(31, format='jd')).datetime
+    if min_time is None:
+        start_dt = Time.now().datetime
+    else:
+        start_dt = Time(min_time, format='gps').datetime
+    year, month = start_dt.year, start_dt.month
+    while (year, month) <= (stop_dt.year, stop_dt.month):
+        op.execute('CREATE TABLE {t}_y{y:04d}m{m:02d} PARTITION OF {t} FOR '
+                   'VALUES FROM ({lower}) TO ({upper})'.format(
+                       y=year, m=month, lower=_month_start_gps(year, month),
+                       upper=_month_start_gps(year, month + 1), **fmt))
+        year, month = year + month // 12, month % 12 + 1
+
+    op.execute('INSERT INTO {t} SELECT * FROM {t}_unpartitioned'.format(**fmt))
+    op.execute('DROP TABLE {t}_unpartitioned'.format(**fmt))
+
+
+def _unpartition_table(table, time_column, pkey):
+    fmt = {'t': table, 'pkey': ', '.join(pkey)}
+    op.execute('ALTER TABLE {t} RENAME TO {t}_partitioned'.format(**fmt))
+    op.execute('ALTER INDEX {t}_pkey RENAME TO {t}_partitioned_pkey'
+               .format(**fmt))
+    op.execute('CREATE TABLE {t} (LIKE {t}_partitioned INCLUDING DEFAULTS '
+               'INCLUDING CONSTRAINTS)'.format(**fmt))
+    op.execute('ALTER TABLE {t} ADD PRIMARY KEY ({pkey})'.format(**fmt))
+    op.execute('INSERT INTO {t} SELECT * FROM {t}_partitioned'.format(**fmt))
+    # this also drops all the partitions
+    op.execute('DROP TABLE {t}_partitioned'.format(**fmt))
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql' and bind.dialect.server_version_info < (11,):
+        raise RuntimeError('Partitioning the telemetry tables requires PostgreSQL 11 '
+                           'or later (for default partitions and primary keys on '
+                           'partitioned tables).')
+    op.create_table('hera_autos_hourly',
+                    sa.Column('time', sa.BigInteger(), nullable=False),
+                    sa.Column('antenna_number', sa.Integer(), nullable=False),
+                    sa.Column('antenna_feed_pol', sa.String(), nullable=False),
+                    sa.Column('measurement_type', sa.String(), nullable=False),
+                    sa.Column('n_samples', sa.Integer(), nullable=False),
+                    sa.Column('value_mean', sa.Float(), nullable=True),
+                    sa.Column('value_min', sa.Float(), nullable=True),
+                    sa.Column('value_max', sa.Float(), nullable=True),
+                    sa.PrimaryKeyConstraint('time', 'antenna_number',
+                                            'antenna_feed_pol',
+                                            'measurement_type')
+                    )
+    op.create_table('antenna_status_hourly',
+                    sa.Column('time', sa.BigInteger(), nullable=False),
+                    sa.Column('antenna_number', sa.Integer(), nullable=False),
+                    sa.Column('antenna_feed_pol', sa.String(), nullable=False),
+                    sa.Column('n_samples', sa.Integer(), nullable=False),
+                    sa.Column('adc_mean_mean', sa.Float(), nullable=True),
+                    sa.Column('adc_mean_min', sa.Float(), nullable=True),
+                    sa.Column('adc_mean_max', sa.Float(), nullable=True),
+                    sa.Column('adc_rms_mean', sa.Float(), nullable=True),
+                    sa.Column('adc_rms_min', sa.Float(), nullable=True),
+                    sa.Column('adc_rms_max', sa.Float(), nullable=True),
+                    sa.Column('adc_power_mean', sa.Float(), nullable=True),
+                    sa.Column('adc_power_min', sa.Float(), nullable=True),
+                    sa.Column('adc_power_max', sa.Float(), nullable=True),
+                    sa.Column('pam_power_mean', sa.Float(), nullable=True),
+                    sa.Column('pam_power_min', sa.Float(), nullable=True),
+                    sa.Column('pam_power_max', sa.Float(), nullable=True),
+                    sa.Column('pam_voltage_mean', sa.Float(), nullable=True),
+                    sa.Column('pam_voltage_min', sa.Float(), nullable=True),
+                    sa.Column('pam_voltage_max', sa.Float(), nullable=True),
+                    sa.Column('pam_current_mean', sa.Float(), nullable=True),
+                    sa.Column('pam_current_min', sa.Float(), nullable=True),
+                    sa.Column('pam_current_max', sa.Float(), nullable=True),
+                    sa.Column('fem_voltage_mean', sa.Float(), nullable=True),
+                    sa.Column('fem_voltage_min', sa.Float(), nullable=True),
+                    sa.Column('fem_voltage_max', sa.Float(), nullable=True),
+                    sa.Column('fem_current_mean', sa.Float(), nullable=True),
+                    sa.Column('fem_current_min', sa.Float(), nullable=True),
+                    sa.Column('fem_current_max', sa.Float(), nullable=True),
+                    sa.Column('fem_temp_mean', sa.Float(), nullable=True),
+                    sa.Column('fem_temp_min', sa.Float(), nullable=True),
+                    sa.Column('fem_temp_max', sa.Float(), nullable=True),
+                    sa.PrimaryKeyConstraint('time', 'antenna_number',
+                                            'antenna_feed_pol')
+                    )
+    op.create_table('snap_status_hourly',
+                    sa.Column('time', sa.BigInteger(), nullable=False),
+                    sa.Column('hostname', sa.String(), nullable=False),
+                    sa.Column('n_samples', sa.Integer(), nullable=False),
+                    sa.Column('fpga_temp_mean', sa.Float(), nullable=True),
+                    sa.Column('fpga_temp_min', sa.Float(), nullable=True),
+                    sa.Column('fpga_temp_max', sa.Float(), nullable=True),
+                    sa.PrimaryKeyConstraint('time', 'hostname')
+                    )
+    op.create_table('node_sensor_hourly',
+                    sa.Column('time', sa.BigInteger(), nullable=False),
+                    sa.Column('node', sa.Integer(), nullable=False),
+                    sa.Column('n_samples', sa.Integer(), nullable=False),
+                    sa.Column('top_sensor_temp_mean', sa.Float(), nullable=True),
+                    sa.Column('top_sensor_temp_min', sa.Float(), nullable=True),
+                    sa.Column('top_sensor_temp_max', sa.Float(), nullable=True),
+                    sa.Column('middle_sensor_temp_mean', sa.Float(), nullable=True),
+                    sa.Column('middle_sensor_temp_min', sa.Float(), nullable=True),
+                    sa.Column('middle_sensor_temp_max', sa.Float(), nullable=True),
+                    sa.Column('bottom_sensor_temp_mean', sa.Float(), nullable=True),
+                    sa.Column('bottom_sensor_temp_min', sa.Float(), nullable=True),
+                    sa.Column('bottom_sensor_temp_max', sa.Float(), nullable=True),
+                    sa.Column('humidity_sensor_temp_mean', sa.Float(), nullable=True),
+                    sa.Column('humidity_sensor_temp_min', sa.Float(), nullable=True),
+                    sa.Column('humidity_sensor_temp_max', sa.Float(), nullable=True),
+                    sa.Column('humidity_mean', sa.Float(), nullable=True),
+                    sa.Column('humidity_min', sa.Float(), nullable=True),
+                    sa.Column('humidity_max', sa.Float(), nullable=True),
+                    sa.PrimaryKeyConstraint('time', 'node')
+                    )
+    op.create_table('node_white_rabbit_status_hourly',
+                    sa.Column('time', sa.BigInteger(), nullable=False),
+                    sa.Column('node', sa.Integer(), nullable=False),
+                    sa.Column('n_samples', sa.Integer(), nullable=False),
+                    sa.Column('temperature_mean', sa.Float(), nullable=True),
+                    sa.Column('temperature_min', sa.Float(), nullable=True),
+                    sa.Column('temperature_max', sa.Float(), nullable=True),
+                    sa.Column('port0_clock_offset_ps_mean', sa.Float(), nullable=True),
+                    sa.Column('port0_clock_offset_ps_min', sa.Float(), nullable=True),
+                    sa.Column('port0_clock_offset_ps_max', sa.Float(), nullable=True),
+                    sa.Column('port0_cable_rt_delay_ps_mean', sa.Float(), nullable=True),
+                    sa.Column('port0_cable_rt_delay_ps_min', sa.Float(), nullable=True),
+                    sa.Column('port0_cable_rt_delay_ps_max', sa.Float(), nullable=True),
+                    sa.Column('port1_clock_offset_ps_mean', sa.Float(), nullable=True),
+                    sa.Column('port1_clock_offset_ps_min', sa.Float(), nullable=True),
+                    sa.Column('port1_clock_offset_ps_max', sa.Float(), nullable=True),
+                    sa.Column('port1_cable_rt_delay_ps_mean', sa.Float(), nullable=True),
+                    sa.Column('port1_cable_rt_delay_ps_min', sa.Float(), nullable=True),
+                    sa.Column('port1_cable_rt_delay_ps_max', sa.Float(), nullable=True),
+                    sa.PrimaryKeyConstraint('time', 'node')
+                    )
+
+    # declarative partitioning is PostgreSQL only
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, (time_column, pkey) in partitioned_tables.items():
+            _partition_table(table, time_column, pkey)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'postgresql':
+        for table, (time_column, pkey) in partitioned_tables.items():
+            _unpartition_table(table, time_column, pkey)
+
+    op.drop_table('node_white_rabbit_status_hourly')
+    op.drop_table('node_sensor_hourly')
+    op.drop_table('snap_status_hourly')
+    op.drop_table('antenna_status_hourly')
+    op.drop_table('hera_autos_hourly')
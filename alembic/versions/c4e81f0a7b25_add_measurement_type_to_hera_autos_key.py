@@ -0,0 +1,31 @@
+"""add measurement_type to the hera_autos primary key
+
+Revision ID: c4e81f0a7b25
+Revises: 9d41e7a6c3f2
+Create Date: 2026-10-18 21:47:05.318246+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c4e81f0a7b25'
+down_revision = '9d41e7a6c3f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.drop_constraint('hera_autos_pkey', 'hera_autos', type_='primary')
+    op.create_primary_key('hera_autos_pkey', 'hera_autos',
+                          ['time', 'antenna_number', 'antenna_feed_pol',
+                           'measurement_type'])
+
+
+def downgrade():
+    # only one measurement type per antenna and time fits the old key
+    hera_autos = sa.table('hera_autos', sa.column('measurement_type', sa.String))
+    op.execute(hera_autos.delete().where(hera_autos.c.measurement_type != 'median'))
+    op.drop_constraint('hera_autos_pkey', 'hera_autos', type_='primary')
+    op.create_primary_key('hera_autos_pkey', 'hera_autos',
+                          ['time', 'antenna_number', 'antenna_feed_pol'])
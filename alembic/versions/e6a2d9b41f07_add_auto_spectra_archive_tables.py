@@ -0,0 +1,50 @@
+"""add the auto spectra archive tables
+
+Revision ID: e6a2d9b41f07
+Revises: c4e81f0a7b25
+Create Date: 2026-10-18 23:12:41.507316+00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e6a2d9b41f07'
+down_revision = 'c4e81f0a7b25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('hera_auto_spectra_chunks',
+                    sa.Column('name', sa.String(), nullable=False),
+                    sa.Column('start_time', sa.BigInteger(), nullable=False),
+                    sa.Column('stop_time', sa.BigInteger(), nullable=False),
+                    sa.Column('n_times', sa.Integer(), nullable=False),
+                    sa.Column('capacity', sa.Integer(), nullable=False),
+                    sa.Column('n_channels', sa.Integer(), nullable=False),
+                    sa.Column('dtype', sa.String(), nullable=False),
+                    sa.Column('compressed', sa.Boolean(), nullable=False),
+                    sa.Column('antpols', sa.Text(), nullable=False),
+                    sa.PrimaryKeyConstraint('name')
+                    )
+    op.create_index('ix_hera_auto_spectra_chunks_stop_time',
+                    'hera_auto_spectra_chunks', ['stop_time'], unique=False)
+    op.create_table('hera_auto_spectra',
+                    sa.Column('time', sa.BigInteger(), nullable=False),
+                    sa.Column('chunk_name', sa.String(), nullable=False),
+                    sa.Column('time_index', sa.Integer(), nullable=False),
+                    sa.ForeignKeyConstraint(['chunk_name'],
+                                            ['hera_auto_spectra_chunks.name'], ),
+                    sa.PrimaryKeyConstraint('time')
+                    )
+    op.create_index('ix_hera_auto_spectra_chunk_name', 'hera_auto_spectra',
+                    ['chunk_name'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_hera_auto_spectra_chunk_name', table_name='hera_auto_spectra')
+    op.drop_table('hera_auto_spectra')
+    op.drop_index('ix_hera_auto_spectra_chunks_stop_time',
+                  table_name='hera_auto_spectra_chunks')
+    op.drop_table('hera_auto_spectra_chunks')
@@ -0,0 +1,183 @@
+#! /usr/bin/env python
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2021 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""Benchmark the standard getter workloads with and without the time+key indexes.
+
+Fills the monitoring tables with synthetic rows inside a transaction that is
+rolled back at the end, so it can be run against the testing database without
+leaving anything behind. The getters are timed once with the secondary
+(time+key and BRIN) indexes dropped and once with them in place, and the
+median latency of each workload is reported for both.
+
+"""
+
+import time
+
+import numpy as np
+from astropy.time import Time, TimeDelta
+from sqlalchemy import text
+
+from hera_mc import mc, autocorrelations, correlator, node, rtp, weather
+
+INDEXED_TABLES = [autocorrelations.HeraAuto, correlator.AntennaStatus,
+                  correlator.SNAPStatus, node.NodeSensor, weather.WeatherData,
+                  rtp.RTPServerStatus]
+
+
+def populate(session, starttime, nminutes):
+    """Add one reading per minute for the array's antennas, SNAPs and nodes."""
+    t0 = int(np.floor(starttime.gps))
+    rng = np.random.default_rng(0)
+    for minute in range(nminutes):
+        gps = t0 + 60 * minute
+        autos = []
+        statuses = []
+        for ant in range(350):
+            for pol in ['e', 'n']:
+                autos.append(autocorrelations.HeraAuto(
+                    time=gps, antenna_number=ant, antenna_feed_pol=pol,
+                    measurement_type='median', value=rng.normal(10, 1)))
+                statuses.append(correlator.AntennaStatus(
+                    time=gps, antenna_number=ant, antenna_feed_pol=pol,
+                    snap_hostname='heraNode{}Snap{}'.format(ant // 12, ant % 4),
+                    snap_channel_number=ant % 6, adc_mean=rng.normal(),
+                    adc_rms=rng.normal(3, 0.1), adc_power=rng.normal(9, 1),
+                    fem_temp=rng.normal(26, 1)))
+        snaps = [correlator.SNAPStatus(
+            time=gps, hostname='heraNode{}Snap{}'.format(snap // 4, snap % 4),
+            node=snap // 4, snap_loc_num=snap % 4, fpga_temp=rng.normal(60, 2))
+            for snap in range(200)]
+        sensors = [node.NodeSensor(time=gps, node=node_num,
+                                   top_sensor_temp=rng.normal(30, 2),
+                                   humidity=rng.normal(40, 5))
+                   for node_num in range(30)]
+        wx = [weather.WeatherData(time=gps, variable=variable,
+                                  value=rng.normal())
+              for variable in weather.weather_sensor_dict]
+        servers = [rtp.RTPServerStatus(
+            hostname='still{}'.format(host), mc_time=gps,
+            ip_address='10.0.1.{}'.format(host), mc_system_timediff=0.1,
+            num_cores=16, cpu_load_pct=rng.uniform(0, 100), uptime_days=10.,
+            memory_used_pct=50., memory_size_gb=64., disk_space_pct=50.,
+            disk_size_gb=1000.) for host in range(10)]
+        for table_class, obj_list in [
+                (autocorrelations.HeraAuto, autos),
+                (correlator.AntennaStatus, statuses),
+                (correlator.SNAPStatus, snaps), (node.NodeSensor, sensors),
+                (weather.WeatherData, wx), (rtp.RTPServerStatus, servers)]:
+            session._insert_ignoring_duplicates(table_class, obj_list)
+
+
+def workloads(starttime, nminutes):
+    """Get the getter calls to time, keyed on a short description."""
+    hour = TimeDelta(3600, format='sec')
+    stoptime = starttime + TimeDelta(60 * nminutes, format='sec')
+    mid = starttime + TimeDelta(30 * nminutes, format='sec')
+    return {
+        'antenna_status, 1 antenna, 1 hour':
+            lambda s: s.get_antenna_status(starttime=mid, stoptime=mid + hour,
+                                           antenna_number=42),
+        'antenna_status, 1 antenna, all':
+            lambda s: s.get_antenna_status(starttime=starttime,
+                                           stoptime=stoptime,
+                                           antenna_number=42),
+        'antenna_status, all antennas, 10 min':
+            lambda s: s.get_antenna_status(
+                starttime=mid, stoptime=mid + TimeDelta(600, format='sec')),
+        'autocorrelation, 1 antenna, all':
+            lambda s: s.get_autocorrelation(starttime=starttime,
+                                            stoptime=stoptime,
+                                            antenna_number=42),
+        'autocorrelation, 1 antenna, most recent':
+            lambda s: s.get_autocorrelation(most_recent=True,
+                                            antenna_number=42),
+        'snap_status, 1 node, all':
+            lambda s: s.get_snap_status(starttime=starttime, stoptime=stoptime,
+                                        nodeID=7),
+        'node_sensor, 1 node, all':
+            lambda s: s.get_node_sensor_readings(starttime=starttime,
+                                                 stoptime=stoptime, nodeID=7),
+        'weather_data, 1 variable, all':
+            lambda s: s.get_weather_data(starttime=starttime,
+                                         stoptime=stoptime,
+                                         variable='wind_speed'),
+        'rtp server status, all hosts, 1 hour':
+            lambda s: s.get_server_status('rtp', starttime=mid,
+                                          stoptime=mid + hour),
+    }
+
+
+def time_workloads(session, calls, repeats):
+    """Get the median latency in ms of each workload."""
+    latencies = {}
+    for name, call in calls.items():
+        call(session)  # warm up
+        times = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            call(session)
+            times.append(time.perf_counter() - t0)
+            session.expunge_all()
+        latencies[name] = 1e3 * np.median(times)
+    return latencies
+
+
+def analyze(session):
+    """Update the planner statistics on the benchmarked tables."""
+    if session.bind.dialect.name == 'postgresql':
+        for table_class in INDEXED_TABLES:
+            session.execute(text('ANALYZE ' + table_class.__tablename__))
+    else:
+        session.execute(text('ANALYZE'))
+
+
+if __name__ == '__main__':
+    parser = mc.get_mc_argument_parser()
+    parser.add_argument('--minutes', type=int, default=240,
+                        help='Number of minutes of synthetic data to add.')
+    parser.add_argument('-r', '--repeats', type=int, default=5,
+                        help='Number of times to run each workload.')
+    args = parser.parse_args()
+    if args.mc_db_name is None:
+        args.mc_db_name = 'testing'
+
+    db = mc.connect_to_mc_db(args)
+    db.create_tables()
+
+    starttime = Time('2021-01-01 00:00:00', scale='utc')
+    calls = workloads(starttime, args.minutes)
+
+    conn = db.engine.connect()
+    trans = conn.begin()
+    session = mc.MCSession(bind=conn)
+    try:
+        t0 = time.perf_counter()
+        populate(session, starttime, args.minutes)
+        session.flush()
+        print('Added {} minutes of synthetic data to {} ({}) in {:.1f} s'.format(
+            args.minutes, args.mc_db_name, db.engine.dialect.name,
+            time.perf_counter() - t0))
+
+        indexes = [index for table_class in INDEXED_TABLES
+                   for index in table_class.__table__.indexes]
+        for index in indexes:
+            index.drop(conn)
+        analyze(session)
+        before = time_workloads(session, calls, args.repeats)
+
+        for index in indexes:
+            index.create(conn)
+        analyze(session)
+        after = time_workloads(session, calls, args.repeats)
+    finally:
+        session.close()
+        trans.rollback()
+        conn.close()
+
+    print('{:40s} {:>12s} {:>12s} {:>8s}'.format(
+        'workload', 'before (ms)', 'after (ms)', 'speedup'))
+    for name in calls:
+        print('{:40s} {:12.2f} {:12.2f} {:8.1f}'.format(
+            name, before[name], after[name], before[name] / after[name]))
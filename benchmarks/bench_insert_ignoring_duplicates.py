@@ -0,0 +1,100 @@
+#! /usr/bin/env python
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2021 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""Benchmark MCSession._insert_ignoring_duplicates against the per-row insert.
+
+Inserts synthetic AntennaStatus rows inside a transaction that is rolled back
+at the end, so it can be run against the testing database without leaving
+anything behind. Reports rows per second for the legacy one-statement-per-row
+path and the batched path.
+
+"""
+
+import time
+
+import numpy as np
+from astropy.time import Time, TimeDelta
+from sqlalchemy import inspect
+from sqlalchemy.dialects.postgresql import insert
+
+from hera_mc import mc
+from hera_mc.correlator import AntennaStatus
+
+
+def legacy_insert_ignoring_duplicates(session, table_class, obj_list):
+    """Insert one row per statement, as MCSession used to do."""
+    ies = [c.name for c in inspect(table_class).primary_key]
+    conn = session.connection()
+    for obj in obj_list:
+        values = {}
+        for col in inspect(obj).mapper.column_attrs:
+            values[col.expression.name] = getattr(obj, col.key)
+        if session.bind.dialect.name == 'postgresql':
+            stmt = insert(table_class).values(**values).on_conflict_do_nothing(
+                index_elements=ies)
+        else:
+            stmt = table_class.__table__.insert().prefix_with(
+                'OR IGNORE').values(**values)
+        conn.execute(stmt)
+
+
+def make_antenna_status(nrows, starttime):
+    """Make a list of AntennaStatus objects, 350 antennas x 2 pols per time."""
+    obj_list = []
+    eq_coeffs = (np.zeros(5) + 56.921875).tolist()
+    histogram_bins = list(range(-4, 4))
+    histogram = [0, 3, 6, 10, 12, 8, 4, 0]
+    for ind in range(nrows):
+        time_ind, antpol = divmod(ind, 700)
+        ant, pol_ind = divmod(antpol, 2)
+        obj_list.append(AntennaStatus.create(
+            starttime + TimeDelta(60 * time_ind, format='sec'), ant,
+            ['e', 'n'][pol_ind], 'heraNode0Snap0', pol_ind, -0.53, 3.01, 9.08,
+            0, -13.3, 10.2, 0.65, 'pam', 6.5, 0.56, 'fem', 'antenna', True,
+            1.36, 30.76, 26.3, False, eq_coeffs, histogram_bins, histogram))
+    return obj_list
+
+
+def run(db, method, obj_list, batch_size):
+    """Time one insert method inside a rolled-back transaction."""
+    conn = db.engine.connect()
+    trans = conn.begin()
+    session = mc.MCSession(bind=conn)
+    try:
+        t0 = time.perf_counter()
+        if method == 'legacy':
+            legacy_insert_ignoring_duplicates(session, AntennaStatus, obj_list)
+        else:
+            session._insert_ignoring_duplicates(AntennaStatus, obj_list,
+                                                batch_size=batch_size)
+        elapsed = time.perf_counter() - t0
+    finally:
+        session.close()
+        trans.rollback()
+        conn.close()
+    return elapsed
+
+
+if __name__ == '__main__':
+    parser = mc.get_mc_argument_parser()
+    parser.add_argument('-n', '--nrows', type=int, default=10000,
+                        help='Number of AntennaStatus rows to insert.')
+    parser.add_argument('--batch-size', dest='batch_size', type=int, default=1000,
+                        help='Batch size for the bulk insert path.')
+    args = parser.parse_args()
+    if args.mc_db_name is None:
+        args.mc_db_name = 'testing'
+
+    db = mc.connect_to_mc_db(args)
+    db.create_tables()
+
+    obj_list = make_antenna_status(args.nrows, Time('2021-01-01 00:00:00'))
+
+    print('Inserting {} AntennaStatus rows into {} ({})'.format(
+        args.nrows, args.mc_db_name, db.engine.dialect.name))
+    for method in ['legacy', 'bulk']:
+        elapsed = run(db, method, obj_list, args.batch_size)
+        print('{:>8s}: {:8.3f} s  {:10.0f} rows/s'.format(
+            method, elapsed, args.nrows / elapsed))
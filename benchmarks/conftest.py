@@ -0,0 +1,78 @@
+# -*- mode: python; coding: utf-8 -*
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD License
+
+"""Benchmark suite setup for pytest, using the test suite's database fixtures."""
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from hera_mc.tests.conftest import (  # noqa: E402,F401
+    setup_and_teardown_package, mcsession)
+
+
+ANTS_PER_NODE = 12
+
+
+def add_full_array(session, nants=350, first=1000):
+    """
+    Add parts and connections for a production sized array to the CM tables.
+
+    Each antenna gets the full parts_hera signal path (station to node), with
+    12 antennas per node and 3 per SNAP. The parts are numbered from `first`
+    so they don't clash with the CM test data.
+    """
+    from astropy.time import Time
+    from hera_mc import cm_partconnect
+
+    start = int(Time('2019-01-01', scale='utc').gps)
+    parts = []
+    connections = []
+
+    def add_part(hpn, hptype):
+        parts.append(cm_partconnect.Parts(hpn=hpn, hpn_rev='A', hptype=hptype,
+                                          manufacturer_number=hpn,
+                                          start_gpstime=start))
+
+    def connect(up, up_port, down, down_port):
+        connections.append(cm_partconnect.Connections(
+            upstream_part=up, up_part_rev='A', upstream_output_port=up_port,
+            downstream_part=down, down_part_rev='A', downstream_input_port=down_port,
+            start_gpstime=start))
+
+    for ind in range(nants):
+        num = first + ind
+        node_ind, slot = divmod(ind, ANTS_PER_NODE)
+        snap_loc, chan = divmod(slot, 3)
+        node = 'N{}'.format(first + node_ind)
+        nbp = 'NBP{}'.format(first + node_ind)
+        snap = 'SNPB{:06d}'.format(4 * node_ind + snap_loc)
+        if slot == 0:
+            add_part(node, 'node')
+            add_part(nbp, 'node-bulkhead')
+        if chan == 0:
+            add_part(snap, 'snap')
+            connect(snap, 'rack', node, 'loc{}'.format(snap_loc))
+        for hpn, hptype in [('HH', 'station'), ('A', 'antenna'), ('FDV', 'feed'),
+                            ('FEM', 'front-end'), ('PAM', 'post-amp')]:
+            add_part('{}{}'.format(hpn, num), hptype)
+        connect('HH{}'.format(num), 'ground', 'A{}'.format(num), 'ground')
+        connect('A{}'.format(num), 'focus', 'FDV{}'.format(num), 'input')
+        connect('FDV{}'.format(num), 'terminals', 'FEM{}'.format(num), 'input')
+        for pol, snap_ports in [('e', [2, 6, 10]), ('n', [0, 4, 8])]:
+            nbp_port = '{}{}'.format(pol, slot + 1)
+            connect('FEM{}'.format(num), pol, nbp, nbp_port)
+            connect(nbp, nbp_port, 'PAM{}'.format(num), pol)
+            connect('PAM{}'.format(num), pol, snap,
+                    '{}{}'.format(pol, snap_ports[chan]))
+    session.add_all(parts)
+    session.flush()
+    session.add_all(connections)
+    session.flush()
+
+
+@pytest.fixture(scope='function')
+def full_array_session(mcsession):  # noqa: F811
+    """Session with a production sized array added to the CM test data."""
+    add_full_array(mcsession)
+    yield mcsession
@@ -0,0 +1,53 @@
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""Benchmarks for the configuration management hot paths (on the CM test data)."""
+from hera_mc import cm_handling, cm_hookup, cm_sysdef, cm_sysutils, cm_transfer, mc
+from hera_mc.cm_transfer import CMVersion
+
+
+def test_get_hookup_from_db(benchmark, mcsession):
+    hookup = cm_hookup.Hookup(mcsession)
+    result = benchmark(hookup.get_hookup_from_db, cm_sysdef.hera_zone_prefixes,
+                       pol='all', at_date='now', hookup_type='parts_hera')
+    assert len(result) > 0
+
+
+def test_get_hookup_full_array(benchmark, full_array_session):
+    hookup = cm_hookup.Hookup(full_array_session)
+    result = benchmark(hookup.get_hookup, 'default', pol='all', at_date='now')
+    assert len(result) > 350
+
+
+def test_hookup_diff_full_array(benchmark, full_array_session):
+    hookup = cm_hookup.Hookup(full_array_session)
+    result = benchmark(hookup.diff, '2019-06-01', 'now')
+    assert list(result.keys()) == ['HH703:A']
+
+
+def test_get_dossier(benchmark, mcsession):
+    handling = cm_handling.Handling(mcsession)
+    result = benchmark(handling.get_dossier, hpn=['HH', 'SNP', 'N7'],
+                       exact_match=False)
+    assert len(result) > 0
+
+
+def test_get_cminfo_correlator(benchmark, mcsession):
+    handling = cm_sysutils.Handling(mcsession)
+    result = benchmark(handling.get_cminfo_correlator)
+    assert len(result['antenna_numbers']) > 0
+
+
+def test_node_info_full_array(benchmark, full_array_session):
+    result = benchmark(cm_sysutils.node_info, 'all', full_array_session)
+    assert 'N700' not in result['nodes']
+    assert len(result['nodes']) > 0
+
+
+def test_cm_initialization(benchmark, mcsession):
+    def setup():
+        # the cm_version rows are keyed on the second they were added
+        mcsession.query(CMVersion).delete()
+        return (), {'session': mcsession, 'cm_csv_path': mc.test_data_path}
+    benchmark.pedantic(cm_transfer._initialization, setup=setup, rounds=3)
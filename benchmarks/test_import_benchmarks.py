@@ -0,0 +1,27 @@
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""Benchmarks for the import time of the package (as paid by every script).
+
+Each round imports the module in a fresh interpreter, so the times include the
+interpreter start up (measured separately by `test_import_baseline`).
+"""
+import subprocess
+import sys
+
+import pytest
+
+
+def _run_import(statement):
+    subprocess.run([sys.executable, '-c', statement], check=True)
+
+
+def test_import_baseline(benchmark):
+    benchmark.pedantic(_run_import, args=('pass',), rounds=5)
+
+
+@pytest.mark.parametrize('module', ['hera_mc', 'hera_mc.mc',
+                                    'hera_mc.cm_sysutils'])
+def test_import(benchmark, module):
+    benchmark.pedantic(_run_import, args=('import ' + module,), rounds=5)
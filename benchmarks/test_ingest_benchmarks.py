@@ -0,0 +1,140 @@
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""Benchmarks for the correlator and node ingest paths.
+
+The ingest methods are fed recorded dicts like the ones in the test suite,
+scaled up to the full array. Each round gets new timestamps so the inserts are
+not skipped as duplicates.
+"""
+import copy
+import datetime
+import itertools
+
+import numpy as np
+from astropy.time import Time
+
+nants = 350
+nchans = 1536
+nnodes = 30
+base_time = datetime.datetime(2021, 1, 1, 0, 0, 0)
+
+ant_status_record = {
+    'f_host': 'heraNode700Snap0',
+    'host_ant_id': 3,
+    'adc_mean': -0.5308380126953125,
+    'adc_rms': 3.0134560488579285,
+    'adc_power': 9.080917358398438,
+    'pam_atten': 0,
+    'pam_power': -13.349140985640002,
+    'pam_voltage': 10.248,
+    'pam_current': 0.6541,
+    'pam_id': [112, 217, 32, 59, 1, 0, 0, 14],
+    'fem_voltage': 6.496,
+    'fem_current': 0.5627000000000001,
+    'fem_id': [0, 168, 19, 212, 51, 51, 255, 255],
+    'fem_switch': 'antenna',
+    'fem_e_lna_power': True,
+    'fem_n_lna_power': True,
+    'fem_imu_theta': 1.3621702512711602,
+    'fem_imu_phi': 30.762719534238915,
+    'fem_temp': 26.327341308593752,
+    'fft_of': False,
+    'eq_coeffs': (np.zeros((1024)) + 56.921875).tolist(),
+    'histogram': [np.arange(-128, 182, dtype=int).tolist(),
+                  (np.zeros((256)) + 10).tolist()]}
+
+# serials in the CM test data
+snap_serials = {'heraNode700Snap0': 'SNPA000700',
+                'heraNode700Snap1': 'SNPB000701',
+                'heraNode700Snap2': 'SNPC000702',
+                'heraNode701Snap3': 'SNPD000703'}
+
+
+def _rounds(make_dict):
+    """Get a pedantic setup function giving each round a new timestamp."""
+    counter = itertools.count()
+
+    def setup():
+        timestamp = base_time + datetime.timedelta(minutes=next(counter))
+        return (make_dict(timestamp),), {}
+    return setup
+
+
+def _ant_status_dict(timestamp):
+    ant_status = {}
+    for ant in range(nants):
+        for pol in ['e', 'n']:
+            record = copy.copy(ant_status_record)
+            record['timestamp'] = timestamp
+            ant_status['{}:{}'.format(ant, pol)] = record
+    return ant_status
+
+
+def _snap_status_dict(timestamp):
+    return {hostname: {'last_programmed': datetime.datetime(2020, 12, 1),
+                       'pmb_alert': False,
+                       'pps_count': 595687,
+                       'serial': serial,
+                       'temp': 57.984954833984375,
+                       'timestamp': timestamp,
+                       'uptime': 595686}
+            for hostname, serial in snap_serials.items()}
+
+
+def _sensor_dict(timestamp):
+    return {str(node): {'temp_top': 30., 'temp_mid': 31.98, 'temp_bot': 41,
+                        'temp_humid': 33.89, 'humid': 32.5,
+                        'timestamp': timestamp}
+            for node in range(nnodes)}
+
+
+def _power_dict(timestamp):
+    return {str(node): {'power_snap_relay': True, 'power_snap_0': False,
+                        'power_snap_1': True, 'power_snap_2': False,
+                        'power_snap_3': False, 'power_pam': True,
+                        'power_fem': True, 'timestamp': timestamp}
+            for node in range(nnodes)}
+
+
+def _autos_dict(timestamp):
+    autos = {'timestamp': Time(timestamp).jd}
+    spectra = np.random.default_rng(0).random((nants * 2, nchans), dtype=np.float32)
+    for ind, (ant, pol) in enumerate(itertools.product(range(nants), 'en')):
+        autos['{}:{}'.format(ant, pol)] = spectra[ind]
+    return autos
+
+
+def test_add_antenna_status_from_corrcm(benchmark, mcsession):
+    benchmark.pedantic(
+        lambda ant_status: mcsession.add_antenna_status_from_corrcm(
+            ant_status_dict=ant_status),
+        setup=_rounds(_ant_status_dict), rounds=10)
+
+
+def test_add_snap_status_from_corrcm(benchmark, mcsession):
+    benchmark.pedantic(
+        lambda snap_status: mcsession.add_snap_status_from_corrcm(
+            snap_status_dict=snap_status),
+        setup=_rounds(_snap_status_dict), rounds=20)
+
+
+def test_add_autocorrelations_from_redis(benchmark, mcsession):
+    benchmark.pedantic(
+        lambda autos: mcsession.add_autocorrelations_from_redis(hera_autos_dict=autos),
+        setup=_rounds(_autos_dict), rounds=10)
+
+
+def test_add_node_sensor_readings_from_nodecontrol(benchmark, mcsession):
+    benchmark.pedantic(
+        lambda sensor: mcsession.add_node_sensor_readings_from_nodecontrol(
+            node_list=list(range(nnodes)), sensor_dict=sensor),
+        setup=_rounds(_sensor_dict), rounds=20)
+
+
+def test_add_node_power_status_from_nodecontrol(benchmark, mcsession):
+    benchmark.pedantic(
+        lambda power: mcsession.add_node_power_status_from_nodecontrol(
+            node_list=list(range(nnodes)), power_dict=power),
+        setup=_rounds(_power_dict), rounds=20)
@@ -0,0 +1,78 @@
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""Benchmarks for the time filtered getters (`MCSession._time_filter`)."""
+import pytest
+from astropy.time import Time, TimeDelta
+
+from hera_mc import synthetic
+
+synthetic_start = Time('2021-01-01 00:00:00', scale='utc')
+synthetic_minutes = 60
+stoptime = synthetic_start + TimeDelta(60 * synthetic_minutes, format='sec')
+midtime = synthetic_start + TimeDelta(30 * synthetic_minutes, format='sec')
+ten_minutes = TimeDelta(600, format='sec')
+
+
+@pytest.fixture(scope='function')
+def synthetic_session(mcsession):
+    """Session with an hour of synthetic data for a 350 antenna array."""
+    array = synthetic.SyntheticArray(mcsession, nants=350)
+    array.load(mcsession, synthetic_start, 60 * synthetic_minutes,
+               steps_per_commit=synthetic_minutes)
+    mcsession.execute('ANALYZE')
+    yield mcsession
+
+
+def _query(benchmark, session, method, **kwargs):
+    def call():
+        result = getattr(session, method)(**kwargs)
+        session.expunge_all()
+        return result
+    return benchmark(call)
+
+
+def test_antenna_status_range_one_antenna(benchmark, synthetic_session):
+    result = _query(benchmark, synthetic_session, 'get_antenna_status',
+                    starttime=synthetic_start, stoptime=stoptime,
+                    antenna_number=702)
+    assert len(result) == 2 * synthetic_minutes
+
+
+def test_antenna_status_range_all_antennas(benchmark, synthetic_session):
+    result = _query(benchmark, synthetic_session, 'get_antenna_status',
+                    starttime=midtime, stoptime=midtime + ten_minutes)
+    assert len(result) == 11 * 2 * 350
+
+
+def test_antenna_status_most_recent(benchmark, synthetic_session):
+    result = _query(benchmark, synthetic_session, 'get_antenna_status',
+                    most_recent=True)
+    assert len(result) == 2 * 350
+
+
+def test_autocorrelation_most_recent_one_antenna(benchmark, synthetic_session):
+    result = _query(benchmark, synthetic_session, 'get_autocorrelation',
+                    most_recent=True, antenna_number=702)
+    assert len(result) == 2
+
+
+def test_node_sensor_range_one_node(benchmark, synthetic_session):
+    result = _query(benchmark, synthetic_session, 'get_node_sensor_readings',
+                    starttime=synthetic_start, stoptime=stoptime, nodeID=700)
+    assert len(result) == synthetic_minutes
+
+
+def test_weather_range_one_variable(benchmark, synthetic_session):
+    result = _query(benchmark, synthetic_session, 'get_weather_data',
+                    starttime=synthetic_start, stoptime=stoptime,
+                    variable='temperature')
+    assert len(result) > synthetic_minutes
+
+
+def test_server_status_range_all_hosts(benchmark, synthetic_session):
+    result = _query(benchmark, synthetic_session, 'get_server_status',
+                    subsystem='rtp', starttime=synthetic_start,
+                    stoptime=stoptime)
+    assert len(result) > 0
@@ -4,30 +4,11 @@
 
 """Define package structure."""
 
-import numpy as np
-from setuptools_scm import get_version
-from pathlib import Path
-from pkg_resources import get_distribution, DistributionNotFound
-
-from .branch_scheme import branch_scheme
-
-try:  # pragma: nocover
-    # get accurate version for developer installs
-    version_str = get_version(Path(__file__).parent.parent, local_scheme=branch_scheme)
-
-    __version__ = version_str
-
-except (LookupError, ImportError):
-    try:
-        # Set the version automatically from the package details.
-        __version__ = get_distribution(__name__).version
-    except DistributionNotFound:  # pragma: nocover
-        # package is not installed
-        pass
-
 # Before we can do anything else, we need to initialize some core, shared
 # variables.
 
+import sys
+
 from sqlalchemy.ext.declarative import declarative_base
 
 
@@ -53,6 +34,8 @@ class MCDeclarativeBase(object):
 
     def isclose(self, other):
         """Test if two objects are nearly equal."""
+        import numpy as np
+
         if not isinstance(other, self.__class__):
             print('not the same class')
             return False
@@ -112,18 +95,19 @@ def NotNull(kind, **kwargs):
     return Column(kind, nullable=False, **kwargs)
 
 
+# The modules defining tables are imported here so that the table metadata is
+# complete (for creating and checking the database). The rest of the modules
+# (including all the CM handling ones, which pull in pyuvdata) are only
+# imported when they are first used, see __getattr__ below.
 from . import autocorrelations  # noqa
+from . import auto_spectra  # noqa
 from . import cm_transfer  # noqa
-from . import cm_dossier  # noqa
-from . import cm_active  # noqa
-from . import cm_sysdef  # noqa
-from . import cm_utils  # noqa
-from . import cm_sysutils  # noqa
 from . import cm_partconnect  # noqa
 from . import correlator  # noqa
 from . import daemon_status  # noqa
 from . import geo_location  # noqa
 from . import observations  # noqa
+from . import partitioning  # noqa
 from . import subsystem_error  # noqa
 from . import server_status  # noqa
 from . import librarian  # noqa
@@ -132,3 +116,66 @@ from . import rtp  # noqa
 from . import qm  # noqa
 from . import weather  # noqa
 from . import mc    # noqa keep this last.
+
+_lazy_submodules = [
+    'cm_active', 'cm_dossier', 'cm_handling', 'cm_hookup', 'cm_intervals',
+    'cm_redis_corr', 'cm_revisions', 'cm_sysdef', 'cm_sysutils', 'cm_table_info',
+    'cm_utils', 'daemon_runtime', 'db_check', 'geo_handling', 'geo_sysdef', 'mc_session',
+    'synthetic', 'utils', 'watch_dog']
+
+
+def _get_version():
+    """
+    Get the package version, None if it cannot be found.
+
+    A git checkout (e.g. a developer install) gets an accurate version from
+    setuptools_scm, otherwise the static version file written by setuptools_scm
+    when the package was built or installed is used.
+    """
+    from pathlib import Path
+
+    repo_path = Path(__file__).parent.parent
+    if (repo_path / '.git').exists():
+        try:
+            from setuptools_scm import get_version
+            from .branch_scheme import branch_scheme
+
+            return get_version(repo_path, local_scheme=branch_scheme)
+        except (LookupError, ImportError):  # pragma: nocover
+            pass
+    try:
+        from ._version import version
+    except ImportError:  # pragma: nocover
+        # package is not installed
+        return None
+    return version
+
+
+def __getattr__(name):
+    """Get the version and import the lazily loaded submodules on first access."""
+    if name == '__version__':
+        # worked out on first access since setuptools_scm is slow to import and run
+        version = _get_version()
+        if version is not None:
+            globals()['__version__'] = version
+            return version
+    if name in _lazy_submodules:
+        import importlib
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module {mod!r} has no attribute {name!r}'
+                         .format(mod=__name__, name=name))
+
+
+if sys.version_info < (3, 7):  # pragma: nocover
+    # module __getattr__ (PEP 562) needs python 3.7, so on older versions the
+    # version is worked out and the lazily loaded submodules imported up front.
+    def _load_eagerly():
+        import importlib
+
+        version = _get_version()
+        if version is not None:
+            globals()['__version__'] = version
+        for name in _lazy_submodules:
+            importlib.import_module('.' + name, __name__)
+
+    _load_eagerly()
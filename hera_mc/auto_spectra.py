@@ -0,0 +1,411 @@
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""
+Archive of the full autocorrelation spectra.
+
+Only a scalar per antenna-pol goes into the hera_autos table. To have a
+spectral history for debugging, the full spectra can also be appended to an
+on-disk archive of numpy files, one per chunk of times, each laid out as
+(time, antpol, channel). The chunks and the location of each time in them are
+indexed in M&C, so a reader can memory-map just the chunks it needs and copy
+out only the time and antenna slices it asks for.
+
+The columns in this module are documented in docs/mc_definition.tex,
+the documentation needs to be kept up to date with any changes.
+"""
+
+import json
+import os
+import warnings
+from math import floor
+
+import numpy as np
+from astropy.time import Time
+from sqlalchemy import (BigInteger, Boolean, Column, ForeignKey, Index, Integer,
+                        String, Text)
+
+from . import MCDeclarativeBase
+
+allowed_dtypes = ["float32", "float16"]
+
+
+class HeraAutoSpectraChunk(MCDeclarativeBase):
+    """
+    Definition of the table of autocorrelation spectra archive chunks.
+
+    Each chunk is a numpy file in the archive directory holding an array of
+    shape (capacity, number of antpols, n_channels), filled in time order.
+
+    Attributes
+    ----------
+    name : String Column
+        Name of the chunk, the file name without the extension (.npy, or .npz
+        if it is compressed). Primary key.
+    start_time : BigInteger Column
+        GPS second (floored) of the first spectra in the chunk.
+    stop_time : BigInteger Column
+        GPS second (floored) of the last spectra in the chunk.
+    n_times : Integer Column
+        Number of times written to the chunk.
+    capacity : Integer Column
+        Number of times the chunk can hold.
+    n_channels : Integer Column
+        Number of frequency channels in each spectrum.
+    dtype : String Column
+        Numpy dtype the spectra are stored as, one of `allowed_dtypes`.
+    compressed : Boolean Column
+        Whether the chunk has been compressed (into an .npz file).
+    antpols : Text Column
+        Comma separated list of the 'ant:pol' of each row of spectra.
+
+    """
+
+    __tablename__ = "hera_auto_spectra_chunks"
+    __table_args__ = (Index('ix_hera_auto_spectra_chunks_stop_time', 'stop_time'),)
+
+    name = Column(String, primary_key=True)
+    start_time = Column(BigInteger, nullable=False)
+    stop_time = Column(BigInteger, nullable=False)
+    n_times = Column(Integer, nullable=False)
+    capacity = Column(Integer, nullable=False)
+    n_channels = Column(Integer, nullable=False)
+    dtype = Column(String, nullable=False)
+    compressed = Column(Boolean, nullable=False)
+    antpols = Column(Text, nullable=False)
+
+
+class HeraAutoSpectra(MCDeclarativeBase):
+    """
+    Definition of the index of archived autocorrelation spectra.
+
+    Attributes
+    ----------
+    time : BigInteger Column
+        The time in GPS seconds of the spectra, floored as an int. Primary key.
+    chunk_name : String Column
+        Name of the chunk holding the spectra, foreign key into
+        hera_auto_spectra_chunks.
+    time_index : Integer Column
+        Index of the spectra along the time axis of the chunk.
+
+    """
+
+    __tablename__ = "hera_auto_spectra"
+    __table_args__ = (Index('ix_hera_auto_spectra_chunk_name', 'chunk_name'),)
+
+    time = Column(BigInteger, primary_key=True)
+    chunk_name = Column(String, ForeignKey('hera_auto_spectra_chunks.name'),
+                        nullable=False)
+    time_index = Column(Integer, nullable=False)
+
+
+class AutoSpectraArchive(object):
+    """
+    Append-only, chunked archive of full autocorrelation spectra.
+
+    A new chunk is started when the current one is full or the spectra no
+    longer fit its layout (a different set of antpols or number of channels).
+    The database rows are added to the session but not committed, that is up
+    to the caller (as for the other M&C add methods).
+
+    Parameters
+    ----------
+    path : str
+        Directory to keep the chunk files in, created if it does not exist.
+    dtype : str
+        Numpy dtype to store the spectra as, one of `allowed_dtypes`.
+        float16 halves the size, at the cost of ~3 significant digits.
+    compress : bool
+        Option to compress each chunk (into an .npz file) once it is
+        finished. Compressed chunks are loaded whole when read, rather than
+        memory-mapped.
+    chunk_size : int
+        Number of times to put in each chunk.
+    retention_days : float or None
+        Chunks with no spectra in this many days are deleted (from disk and
+        M&C) whenever a new chunk is started. None keeps everything.
+
+    """
+
+    def __init__(self, path, dtype="float32", compress=False, chunk_size=60,
+                 retention_days=None):
+        if dtype not in allowed_dtypes:
+            raise ValueError("dtype must be one of {}".format(allowed_dtypes))
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be a positive integer.")
+        if retention_days is not None and retention_days <= 0:
+            raise ValueError("retention_days must be positive or None.")
+        self.path = path
+        self.dtype = dtype
+        self.compress = compress
+        self.chunk_size = int(chunk_size)
+        self.retention_days = retention_days
+        os.makedirs(path, exist_ok=True)
+
+    @classmethod
+    def from_config(cls, mc_config_file=None):
+        """
+        Create the archive from the "auto_spectra_archive" mc config entry.
+
+        The entry is a dict with the `AutoSpectraArchive` parameters, e.g.
+        {"path": "/data/auto_spectra", "dtype": "float16", "compress": true,
+        "retention_days": 30}.
+
+        Parameters
+        ----------
+        mc_config_file : str
+            Pass a different config file if desired.  None goes to default.
+
+        Returns
+        -------
+        AutoSpectraArchive or None
+            None if there is no "auto_spectra_archive" entry in the config.
+
+        """
+        if mc_config_file is None:
+            from .mc import default_config_file
+            mc_config_file = default_config_file
+
+        with open(mc_config_file) as f:
+            config_data = json.load(f)
+
+        settings = config_data.get("auto_spectra_archive")
+        if settings is None:
+            return None
+        return cls(**settings)
+
+    def _filename(self, chunk, compressed=None):
+        if compressed is None:
+            compressed = chunk.compressed
+        return os.path.join(self.path,
+                            chunk.name + ('.npz' if compressed else '.npy'))
+
+    def _load(self, chunk):
+        """
+        Get the spectra array of a chunk, memory-mapped if it is not compressed.
+
+        A chunk compressed in a transaction that was rolled back only has its
+        .npz file, so that is used if the .npy file is gone. Returns None if
+        the chunk has no file (e.g. it was pruned in a rolled back transaction).
+        """
+        npy_file = self._filename(chunk, compressed=False)
+        npz_file = self._filename(chunk, compressed=True)
+        if not chunk.compressed and os.path.exists(npy_file):
+            return np.load(npy_file, mmap_mode='r')
+        if os.path.exists(npz_file):
+            with np.load(npz_file) as data:
+                return data['spectra']
+        return None
+
+    def _fits(self, chunk, time, antpols, n_channels):
+        return (not chunk.compressed
+                and chunk.n_times < chunk.capacity
+                and chunk.dtype == self.dtype
+                and chunk.n_channels == n_channels
+                and chunk.antpols == antpols
+                and time > chunk.stop_time
+                and os.path.exists(self._filename(chunk)))
+
+    def _compress(self, chunk):
+        spectra = np.load(self._filename(chunk, compressed=False))[:chunk.n_times]
+        np.savez_compressed(self._filename(chunk, compressed=True), spectra=spectra)
+        os.remove(self._filename(chunk, compressed=False))
+        chunk.compressed = True
+
+    def append(self, session, timestamp_jd, antpols, spectra):
+        """
+        Append the spectra for one time to the archive.
+
+        Parameters
+        ----------
+        session : MCSession object
+            Session to index the spectra in.
+        timestamp_jd : float
+            Julian date of the spectra.
+        antpols : list of str
+            The 'ant:pol' of each spectrum.
+        spectra : ndarray or list of ndarray
+            The spectra, one per antpol, all the same length.
+
+        Returns
+        -------
+        bool
+            False if spectra for this time (floored to a GPS second) are
+            already archived, in which case nothing is written.
+
+        """
+        time = floor(Time(timestamp_jd, format='jd').gps)
+        if session.query(HeraAutoSpectra).get(time) is not None:
+            return False
+
+        if len(set(np.shape(spec) for spec in spectra)) > 1:
+            raise ValueError("The spectra must all be the same length to be archived.")
+        spectra = np.asarray(spectra)
+        if spectra.ndim != 2 or spectra.shape[0] != len(antpols):
+            raise ValueError("spectra must have one spectrum per antpol.")
+        antpol_str = ','.join(antpols)
+        n_channels = spectra.shape[1]
+
+        chunk = (session.query(HeraAutoSpectraChunk)
+                 .order_by(HeraAutoSpectraChunk.stop_time.desc()).first())
+        if chunk is None or not self._fits(chunk, time, antpol_str, n_channels):
+            if (chunk is not None and self.compress and not chunk.compressed
+                    and os.path.exists(self._filename(chunk))):
+                self._compress(chunk)
+            if self.retention_days is not None:
+                self.prune(session, now=Time(timestamp_jd, format='jd'))
+            chunk = HeraAutoSpectraChunk(
+                name='auto_spectra_{:d}'.format(time), start_time=time,
+                stop_time=time, n_times=0, capacity=self.chunk_size,
+                n_channels=n_channels, dtype=self.dtype, compressed=False,
+                antpols=antpol_str)
+            archive = np.lib.format.open_memmap(
+                self._filename(chunk), mode='w+', dtype=self.dtype,
+                shape=(self.chunk_size, len(antpols), n_channels))
+            del archive
+            session.add(chunk)
+            session.flush()
+
+        # n_times comes from the database, so a row written in a rolled back
+        # transaction just gets overwritten.
+        archive = np.load(self._filename(chunk), mmap_mode='r+')
+        archive[chunk.n_times] = spectra
+        archive.flush()
+        del archive
+
+        session.add(HeraAutoSpectra(time=time, chunk_name=chunk.name,
+                                    time_index=chunk.n_times))
+        chunk.n_times += 1
+        chunk.stop_time = time
+        if self.compress and chunk.n_times == chunk.capacity:
+            self._compress(chunk)
+        return True
+
+    def read(self, session, starttime, stoptime, antpols=None, channels=None):
+        """
+        Read archived spectra between two times.
+
+        Only the chunks overlapping the times are opened, and only the
+        requested times, antpols and channels are copied out of them.
+
+        Parameters
+        ----------
+        session : MCSession object
+            Session to look up the spectra in.
+        starttime : astropy Time object
+            Time to get spectra from.
+        stoptime : astropy Time object
+            Last time to get spectra for.
+        antpols : list of str, optional
+            The 'ant:pol's to get, e.g. ['12:e', '12:n']. Defaults to all the
+            antpols in the chunks read, in the order they were first archived.
+        channels : slice, optional
+            The channels to get, e.g. slice(100, 200). Defaults to all.
+
+        Returns
+        -------
+        times : ndarray of int
+            GPS seconds (floored) of the spectra.
+        antpols : list of str
+            The 'ant:pol' of each spectrum.
+        spectra : ndarray of float32
+            Array of shape (times, antpols, channels). Antpols or channels
+            missing from a chunk (or chunks missing from disk) are NaN.
+
+        """
+        from .mc_session import _column_gps
+
+        if channels is None:
+            channels = slice(None)
+        elif not isinstance(channels, slice):
+            raise ValueError("channels must be a slice or None.")
+
+        rows = (session.query(HeraAutoSpectra, HeraAutoSpectraChunk)
+                .join(HeraAutoSpectraChunk,
+                      HeraAutoSpectra.chunk_name == HeraAutoSpectraChunk.name)
+                .filter(HeraAutoSpectra.time
+                        >= _column_gps(HeraAutoSpectra.time, starttime, upper=False))
+                .filter(HeraAutoSpectra.time
+                        <= _column_gps(HeraAutoSpectra.time, stoptime, upper=True))
+                .order_by(HeraAutoSpectra.time).all())
+
+        times = np.array([spec.time for spec, _ in rows], dtype=np.int64)
+        chunks = {}
+        for out_index, (spec, chunk) in enumerate(rows):
+            chunks.setdefault(chunk.name, (chunk, [], []))
+            chunks[chunk.name][1].append(out_index)
+            chunks[chunk.name][2].append(spec.time_index)
+
+        if antpols is None:
+            antpols = list(dict.fromkeys(
+                antpol for chunk, _, _ in chunks.values()
+                for antpol in chunk.antpols.split(',')))
+        else:
+            antpols = list(antpols)
+        n_channels = max([len(range(*channels.indices(chunk.n_channels)))
+                          for chunk, _, _ in chunks.values()], default=0)
+
+        spectra = np.full((len(times), len(antpols), n_channels), np.nan,
+                          dtype=np.float32)
+        for chunk, out_inds, time_inds in chunks.values():
+            archive = self._load(chunk)
+            if archive is None:
+                warnings.warn("Auto spectra chunk {} is missing from {}.".format(
+                    chunk.name, self.path))
+                continue
+            chunk_antpols = {antpol: ind for ind, antpol
+                             in enumerate(chunk.antpols.split(','))}
+            out_cols = [ind for ind, antpol in enumerate(antpols)
+                        if antpol in chunk_antpols]
+            if not out_cols:
+                continue
+            chunk_cols = [chunk_antpols[antpols[ind]] for ind in out_cols]
+            chans = np.arange(chunk.n_channels)[channels]
+            spectra[np.ix_(out_inds, out_cols, np.arange(chans.size))] = \
+                archive[np.ix_(time_inds, chunk_cols, chans)]
+            del archive
+
+        return times, antpols, spectra
+
+    def prune(self, session, now=None):
+        """
+        Delete the chunks older than the retention time.
+
+        Parameters
+        ----------
+        session : MCSession object
+            Session the chunks are indexed in.
+        now : astropy Time object, optional
+            Time to measure the retention from. Defaults to now.
+
+        Returns
+        -------
+        list of str
+            Names of the chunks deleted.
+
+        """
+        if self.retention_days is None:
+            return []
+        if now is None:
+            now = Time.now()
+        cutoff = floor(now.gps - self.retention_days * 86400)
+
+        old_chunks = (session.query(HeraAutoSpectraChunk)
+                      .filter(HeraAutoSpectraChunk.stop_time < cutoff).all())
+        names = [chunk.name for chunk in old_chunks]
+        if not names:
+            return names
+        (session.query(HeraAutoSpectra)
+         .filter(HeraAutoSpectra.chunk_name.in_(names))
+         .delete(synchronize_session=False))
+        for chunk in old_chunks:
+            session.delete(chunk)
+        session.flush()
+        for chunk in old_chunks:
+            for compressed in [False, True]:
+                filename = self._filename(chunk, compressed=compressed)
+                if os.path.exists(filename):
+                    os.remove(filename)
+        return names
@@ -12,56 +12,228 @@ These are key data for tracking antenna performance and failures.
 from math import floor
 from astropy.time import Time
 import numpy as np
-from sqlalchemy import BigInteger, Column, Float, Integer, String
+from sqlalchemy import BigInteger, Column, Float, Index, Integer, String
 import re
-import redis
 
 from . import MCDeclarativeBase
 from .correlator import DEFAULT_REDIS_ADDRESS
 
 
-allowed_measurement_types = ["median"]
-measurement_func_dict = {"median": np.median}
+def _rms(spectra, axis=None):
+    return np.sqrt(np.mean(np.square(spectra), axis=axis))
 
 
-def _get_autos_from_redis(redishost=DEFAULT_REDIS_ADDRESS):
+allowed_measurement_types = ["median", "mean", "rms"]
+measurement_func_dict = {"median": np.median, "mean": np.mean, "rms": _rms}
+
+# a statistic or a percentile (e.g. "p90"), optionally over a channel range
+# (e.g. "mean[100:200]", python slice style)
+_measurement_type_re = re.compile(
+    r"(?P<stat>[a-z]+|p(?P<q>\d+(\.\d+)?))(\[(?P<start>\d+):(?P<stop>\d+)\])?")
+
+_auto_key_re = re.compile(r"auto:(?P<ant>\d+)(?P<pol>e|n)")
+
+# redis connection pools keyed on host, kept between monitoring cycles
+_redis_pools = {}
+
+
+def _get_redis_session(redishost):
+    """Get a redis client on the (persistent) connection pool for the host."""
+    import redis
+
+    pool = _redis_pools.get(redishost)
+    if pool is None:
+        pool = _redis_pools.setdefault(redishost, redis.ConnectionPool(host=redishost))
+    return redis.Redis(connection_pool=pool)
+
+
+def _get_auto_spectra_from_redis(redishost=DEFAULT_REDIS_ADDRESS):
+    """
+    Get the current autocorrelation spectra from redis.
+
+    The auto keys are found with SCAN and read along with the timestamp in
+    one MGET, so they are all from the same moment.  The spectra are copied
+    once, into one array.
+
+    Parameters
+    ----------
+    redishost : str
+        The hostname of the redis server.
+
+    Returns
+    -------
+    timestamp : float or None
+        Julian date of the autocorrelations, None if it is not in redis.
+    antpols : list of str
+        The 'ant:pol' of each spectrum, sorted by antenna and polarization.
+    spectra : ndarray or list of ndarray
+        The float32 spectra, as the rows of a 2D array if they all have the
+        same length, otherwise as a list of 1D arrays.
+
+    """
     # This is retained so that explicitly providing redishost=None has the desired behavior
     if redishost is None:
         redishost = DEFAULT_REDIS_ADDRESS
-    redis_pool = redis.ConnectionPool(host=redishost)
-    rsession = redis.Redis(connection_pool=redis_pool)
-
-    auto_time = Time(
-        np.frombuffer(rsession.get("auto:timestamp"), dtype=np.float64).item(),
-        format="jd",
-    )
-    autos_dict = {"timestamp": auto_time.jd}
-
-    keys = [
-        k.decode("utf-8")
-        for k in rsession.keys()
-        if k.startswith(b"auto") and not k.endswith(b"timestamp")
-    ]
-
-    for key in keys:
-        match = re.search(r"auto:(?P<ant>\d+)(?P<pol>e|n)", key)
+    rsession = _get_redis_session(redishost)
+
+    antpol_keys = []
+    for key in rsession.scan_iter(match="auto:*", count=1000):
+        match = _auto_key_re.fullmatch(key.decode("utf-8"))
         if match is not None:
-            ant, pol = int(match.group("ant")), match.group("pol")
+            antpol_keys.append(((int(match.group("ant")), match.group("pol")), key))
+    antpol_keys.sort()
+
+    values = rsession.mget(["auto:timestamp"] + [key for _, key in antpol_keys])
+    timestamp = values[0]
+    if timestamp is not None:
+        timestamp = np.frombuffer(timestamp, dtype=np.float64).item()
+
+    antpols = []
+    autos = []
+    for ((ant, pol), _), auto in zip(antpol_keys, values[1:]):
+        # keys can expire between the SCAN and the MGET
+        if auto is not None:
+            antpols.append("{ant:d}:{pol:s}".format(ant=ant, pol=pol))
+            autos.append(np.frombuffer(auto, dtype=np.float32))
+    lengths = np.array([len(auto) for auto in autos], dtype=int)
+    buffer = np.empty(lengths.sum(), dtype=np.float32)
+    spectra = np.split(buffer, np.cumsum(lengths)[:-1]) if len(autos) else []
+    for spectrum, auto in zip(spectra, autos):
+        spectrum[:] = auto
+    if len(autos) and np.all(lengths == lengths[0]):
+        spectra = buffer.reshape(len(autos), lengths[0])
+
+    return timestamp, antpols, spectra
 
-            antpol = "{ant:d}:{pol:s}".format(ant=ant, pol=pol)
-            auto = rsession.get("auto:{ant:d}{pol:s}".format(ant=ant, pol=pol))
-            if auto is not None:
-                # copy the value because frombuffer returns immutable type
-                auto = np.frombuffer(auto, dtype=np.float32).copy()
 
-            autos_dict[antpol] = auto
+def _get_autos_from_redis(redishost=DEFAULT_REDIS_ADDRESS):
+    timestamp, antpols, spectra = _get_auto_spectra_from_redis(redishost=redishost)
+    autos_dict = {"timestamp": timestamp}
+    for antpol, spectrum in zip(antpols, spectra):
+        autos_dict[antpol] = spectrum
 
     return autos_dict
 
 
+def _parse_measurement_type(measurement_type):
+    """
+    Parse a measurement type into its statistic and channel range.
+
+    Measurement types are one of allowed_measurement_types or a percentile
+    given as "p<q>" (e.g. "p90"), optionally followed by a range of frequency
+    channels to compute it over, as "[start:stop]" (e.g. "mean[100:200]").
+
+    Parameters
+    ----------
+    measurement_type : str
+        The measurement type.
+
+    Returns
+    -------
+    stat : str
+        The statistic, a key into measurement_func_dict or "percentile".
+    q : float or None
+        The percentile, None if stat is not "percentile".
+    channels : tuple of int or None
+        The start and stop channels, None for the whole spectrum.
+
+    Raises
+    ------
+    ValueError
+        If the measurement type is not supported.
+
+    """
+    match = None
+    if isinstance(measurement_type, str):
+        match = _measurement_type_re.fullmatch(measurement_type)
+    if match is None or (match.group("q") is None
+                         and match.group("stat") not in allowed_measurement_types):
+        raise ValueError(
+            "Autocorrelation type {0} not supported. "
+            "Only the following types are supported: {1}, percentiles as 'p<q>' "
+            "(e.g. 'p90'), each optionally over a channel range as '[start:stop]'."
+            .format(measurement_type, allowed_measurement_types)
+        )
+    channels = None
+    if match.group("start") is not None:
+        channels = (int(match.group("start")), int(match.group("stop")))
+        if channels[1] <= channels[0]:
+            raise ValueError(
+                "The channel range of autocorrelation type {0} is empty."
+                .format(measurement_type))
+    if match.group("q") is not None:
+        q = float(match.group("q"))
+        if q > 100:
+            raise ValueError(
+                "The percentile of autocorrelation type {0} is over 100."
+                .format(measurement_type))
+        return "percentile", q, channels
+    return match.group("stat"), None, channels
+
+
+def _measure_stacked(spectra, parsed_types):
+    """Compute measurements (as parsed) of the rows of a 2D array of spectra."""
+    measurements = {}
+    bands = {}
+    for measurement_type, (stat, q, channels) in parsed_types.items():
+        bands.setdefault(channels, {}).setdefault(stat, []).append((measurement_type, q))
+    for channels, stats in bands.items():
+        band = spectra
+        if channels is not None:
+            band = spectra[:, channels[0]:channels[1]]
+            if band.shape[1] < channels[1] - channels[0]:
+                raise ValueError(
+                    "The channel range {0}:{1} is outside the {2} channels of the "
+                    "spectra.".format(channels[0], channels[1], spectra.shape[1]))
+        for stat, types in stats.items():
+            if stat == "percentile":
+                # all the percentiles of a band in one call
+                values = np.percentile(band, [q for _, q in types], axis=1)
+            else:
+                values = [measurement_func_dict[stat](band, axis=1)] * len(types)
+            for (measurement_type, _), value in zip(types, values):
+                measurements[measurement_type] = value
+    return measurements
+
+
+def _reduce_spectra(spectra, measurement_types):
+    """
+    Reduce each spectrum to one value for each of several measurement types.
+
+    Spectra of the same length are stacked and each statistic is computed
+    with one call along the channel axis per channel range, all percentiles
+    of a channel range in the same call.
+
+    Parameters
+    ----------
+    spectra : ndarray or list of array_like
+        The spectra, as the rows of a 2D array or as a list.
+    measurement_types : list of str
+        Measurement types, see `_parse_measurement_type`.
+
+    Returns
+    -------
+    dict
+        List of the measurement of each spectrum, keyed on measurement type.
+
+    """
+    parsed_types = {mtype: _parse_measurement_type(mtype) for mtype in measurement_types}
+    if not len(spectra):
+        return {mtype: [] for mtype in parsed_types}
+    if not isinstance(spectra, np.ndarray):
+        if len(set(np.shape(spectrum) for spectrum in spectra)) > 1:
+            measurements = [_measure_stacked(np.reshape(spectrum, (1, -1)), parsed_types)
+                            for spectrum in spectra]
+            return {mtype: [float(meas[mtype][0]) for meas in measurements]
+                    for mtype in parsed_types}
+        spectra = np.asarray(spectra)
+    measurements = _measure_stacked(spectra.reshape(len(spectra), -1), parsed_types)
+    return {mtype: measurements[mtype].tolist() for mtype in parsed_types}
+
+
 class HeraAuto(MCDeclarativeBase):
     """
-    Definition of median antenna autocorrelation table of hera antennas.
+    Definition of antenna autocorrelation measurement table of hera antennas.
 
     Attributes
     ----------
@@ -72,19 +244,19 @@ class HeraAuto(MCDeclarativeBase):
     antenna_feed_pol : String Column
         Feed polarization, either 'e' or 'n'. Part of primary_key.
     measurement_type : String Column
-        The type of measurement.
-        Currently available types: median
-        Cannot be None.
+        The type of measurement, see `HeraAuto.create`. Part of primary_key.
     value : Float Columnn
         Cannot be None
     """
 
     __tablename__ = "hera_autos"
+    __table_args__ = (Index('ix_hera_autos_antenna_number_time', 'antenna_number', 'time'),
+                      {'postgresql_partition_by': 'RANGE (time)'})
 
     time = Column(BigInteger, primary_key=True)
     antenna_number = Column(Integer, primary_key=True)
     antenna_feed_pol = Column(String, primary_key=True)
-    measurement_type = Column(String, nullable=False)
+    measurement_type = Column(String, primary_key=True)
     value = Column(Float, nullable=False)
 
     @classmethod
@@ -102,9 +274,11 @@ class HeraAuto(MCDeclarativeBase):
             Feed polarization, either 'e' or 'n'.
         measurement_type : str
             The measurment type of the autocorrelation.
-            Currently supports: 'median'.
+            Currently supports: 'median', 'mean', 'rms' and percentiles as
+            'p<q>' (e.g. 'p90'), each optionally over a range of frequency
+            channels given as '[start:stop]' (e.g. 'mean[100:200]').
         value : float
-            The median autocorrelation value as a float.
+            The autocorrelation measurement value as a float.
 
         """
         if not isinstance(time, Time):
@@ -117,12 +291,7 @@ class HeraAuto(MCDeclarativeBase):
         if not isinstance(measurement_type, str):
             raise ValueError("measurement_type must be a string")
 
-        if measurement_type not in allowed_measurement_types:
-            raise ValueError(
-                "Autocorrelation type {0} not supported. "
-                "Only the following types are supported: {1}"
-                .format(measurement_type, allowed_measurement_types)
-            )
+        _parse_measurement_type(measurement_type)
 
         return cls(
             time=auto_time,
@@ -149,7 +318,8 @@ def plot_HERA_autocorrelations_for_plotly(session, offline_testing=False):
     from chart_studio import plotly as py
 
     data = []
-    all_autos = session.get_autocorrelation(most_recent=True)
+    all_autos = [item for item in session.get_autocorrelation(most_recent=True)
+                 if item.measurement_type == 'median']
 
     antennas = set(['{ant}{pol}'.format(ant=item.antenna_number, pol=item.antenna_feed_pol)
                     for item in all_autos])
@@ -5,8 +5,199 @@
 
 """Methods to load all active data for a given date."""
 
+import threading
+import weakref
+
+from astropy.time import Time
+from sqlalchemy import event, func
+from sqlalchemy.engine import Connection
+from sqlalchemy.orm import Session
+
 from . import cm_utils
 from . import cm_partconnect as partconn
+from .cm_intervals import IntervalIndex, interval_columns
+
+# CM tables held in the snapshots (and whose changes invalidate them)
+snapshot_tables = ['parts', 'connections', 'part_info', 'part_rosetta',
+                   'apriori_antenna', 'geo_location', 'station_type',
+                   'cm_version']
+
+# process-wide CM snapshots, keyed on the database engine
+_snapshots = weakref.WeakKeyDictionary()
+_snapshot_lock = threading.Lock()
+
+
+class CMSnapshot:
+    """
+    In-memory copy of the CM tables needed by ActiveData.
+
+    The rows are detached from any session so they can be shared between
+    sessions. Use `get_snapshot` to get the current snapshot for a session.
+    Interval indexes on the rows are built the first time they are needed.
+
+    Parameters
+    ----------
+    session : session object
+        Session to load the tables with.
+    version : int or None
+        Latest cm_version update_time when the snapshot was loaded.
+
+    """
+
+    def __init__(self, session, version):
+        from . import geo_location
+
+        self.version = version
+        load_session = Session(bind=session.connection())
+        try:
+            self.rows = {}
+            for table_class in [partconn.Parts, partconn.Connections,
+                                partconn.PartInfo, partconn.PartRosetta,
+                                partconn.AprioriAntenna, geo_location.GeoLocation]:
+                self.rows[table_class.__tablename__] = load_session.query(table_class).all()
+        finally:
+            load_session.close()
+        self._indexes = {}
+        self._index_lock = threading.Lock()
+        self._cache = {}
+        # reentrant, builds can use other cached objects
+        self._cache_lock = threading.RLock()
+
+    def index(self, table_class):
+        """
+        Get the interval index of the rows of a table.
+
+        Parameters
+        ----------
+        table_class : class
+            CM table class held in the snapshot.
+
+        Returns
+        -------
+        IntervalIndex
+
+        """
+        table = table_class.__tablename__
+        with self._index_lock:
+            if table not in self._indexes:
+                start_col, stop_col = interval_columns[table]
+                self._indexes[table] = IntervalIndex(self.rows[table], start_col,
+                                                     stop_col)
+            return self._indexes[table]
+
+    def cached(self, key, build):
+        """
+        Get something derived from the snapshot, building it the first time.
+
+        Parameters
+        ----------
+        key : hashable
+            Key for the derived object, it must identify everything the object
+            depends on besides the snapshot (e.g. the `ActiveData.epochs`).
+        build : callable
+            Function with no arguments that builds the object.
+
+        Returns
+        -------
+        object
+            The object returned by build for this key.
+
+        """
+        with self._cache_lock:
+            if key not in self._cache:
+                self._cache[key] = build()
+            return self._cache[key]
+
+
+def _get_engine(session):
+    bind = session.get_bind()
+    return bind.engine
+
+
+def _cm_version(session):
+    from .cm_transfer import CMVersion
+    return session.query(func.max(CMVersion.update_time)).scalar()
+
+
+def get_snapshot(session):
+    """
+    Get the snapshot of the CM tables for a session, loading it if needed.
+
+    Snapshots are shared by all sessions on the same engine in the process and
+    are reloaded when the latest cm_version update_time changes (or when CM
+    rows are changed through a session in this process). Sessions bound to a
+    connection rather than an engine (e.g. inside an external transaction that
+    may be rolled back, as in the test suite) and sessions with uncommitted CM
+    changes do not use snapshots.
+
+    Parameters
+    ----------
+    session : session object
+        Session on the database.
+
+    Returns
+    -------
+    CMSnapshot or None
+        The snapshot, or None if this session should read from the database.
+
+    """
+    if session.info.get('cm_changed', False):
+        return None
+    bind = session.get_bind()
+    if isinstance(bind, Connection):
+        return None
+    engine = bind.engine
+    version = _cm_version(session)
+    with _snapshot_lock:
+        snapshot = _snapshots.get(engine)
+        if snapshot is None or snapshot.version != version:
+            snapshot = CMSnapshot(session, version)
+            _snapshots[engine] = snapshot
+    return snapshot
+
+
+def clear_snapshot_cache(engine=None):
+    """
+    Drop the CM snapshots so they are reloaded from the database.
+
+    This is only needed if the CM tables are changed by another process
+    without adding a cm_version row.
+
+    Parameters
+    ----------
+    engine : Engine object or None
+        Engine to drop the snapshot for, defaults to all of them.
+
+    """
+    with _snapshot_lock:
+        if engine is None:
+            _snapshots.clear()
+        else:
+            _snapshots.pop(engine, None)
+
+
+def _is_cm_object(obj):
+    return getattr(obj, '__tablename__', None) in snapshot_tables
+
+
+@event.listens_for(Session, 'after_flush')
+def _flag_cm_changes(session, flush_context):
+    if any(_is_cm_object(obj) for obj in
+           list(session.new) + list(session.dirty) + list(session.deleted)):
+        session.info['cm_changed'] = True
+
+
+@event.listens_for(Session, 'after_bulk_update')
+@event.listens_for(Session, 'after_bulk_delete')
+def _flag_cm_bulk_changes(update_context):
+    if _is_cm_object(update_context.mapper.class_):
+        update_context.session.info['cm_changed'] = True
+
+
+@event.listens_for(Session, 'after_transaction_end')
+def _drop_changed_snapshot(session, transaction):
+    if transaction.parent is None and session.info.pop('cm_changed', False):
+        clear_snapshot_cache(_get_engine(session))
 
 
 class ActiveData:
@@ -19,7 +210,7 @@ class ActiveData:
 
     """
 
-    def __init__(self, session=None, at_date='now'):
+    def __init__(self, session=None, at_date='now', use_snapshot=True):
         """
         Initialize ActiveData class attributes for at_date.
 
@@ -34,6 +225,9 @@ class ActiveData:
             If None, it will start a new session on the database.
         at_date : anything interpretable by cm_utils.get_astropytime
             Date at which to initialize.
+        use_snapshot : bool
+            Serve the loads from the process-wide snapshot of the CM tables
+            (see `get_snapshot`) rather than querying the database every time.
         """
         if session is None:  # pragma: no cover
             from . import mc
@@ -43,11 +237,15 @@ class ActiveData:
         self.at_date = cm_utils.get_astropytime(at_date)
         self.parts = None
         self.rosetta = None
+        self.syspn = None
         self.connections = None
         self.info = None
         self.apriori = None
         self.geo = None
         self.pytest_param = False
+        self.use_snapshot = use_snapshot
+        self.snapshot = None
+        self.epochs = {}
 
     def set_times(self, at_date):
         """
@@ -68,6 +266,98 @@ class ActiveData:
             self.at_date = at_date
         return self.at_date.gps
 
+    def _index(self, table_class):
+        """Get the interval index for a table, None if it should be queried."""
+        snapshot = get_snapshot(self.session) if self.use_snapshot else None
+        if snapshot is not self.snapshot:
+            self.epochs.clear()
+            self.snapshot = snapshot
+        if self.snapshot is None:
+            return None
+        return self.snapshot.index(table_class)
+
+    def _active_rows(self, table_class, gps_time):
+        """
+        Get the rows of a CM table active at gps_time.
+
+        Rows are active if start <= gps_time < stop (or stop is null), with the
+        start and stop columns for each table given in `interval_columns`.
+
+        If the rows come from the snapshot, the epoch of gps_time (see
+        `IntervalIndex.epoch`) is recorded in self.epochs for the table so that
+        things derived from the loaded data can be cached on the snapshot.
+
+        """
+        table = table_class.__tablename__
+        index = self._index(table_class)
+        if index is not None:
+            self.epochs[table] = index.epoch(gps_time)
+            return index.active_at(gps_time)
+        start_col, stop_col = interval_columns[table]
+        query_filter = getattr(table_class, start_col) <= gps_time
+        if stop_col is not None:
+            stop = getattr(table_class, stop_col)
+            query_filter = query_filter & ((stop > gps_time) | (stop == None))  # noqa
+        return self.session.query(table_class).filter(query_filter)
+
+    def active_at_dates(self, table_class, at_dates):
+        """
+        Get the rows of a CM table active at each of several dates.
+
+        This walks an interval index of the table (see `interval_index`) once
+        for all the dates, so it is much faster than loading each date
+        separately for many dates.
+
+        Parameters
+        ----------
+        table_class : class
+            CM table class, one of Parts, Connections, PartInfo, PartRosetta,
+            AprioriAntenna or GeoLocation.
+        at_dates : list or Time
+            Dates to get the active rows for, each anything comprehensible to
+            get_astropytime (or an array-valued Time).
+
+        Returns
+        -------
+        list of list
+            Active table objects at each date.
+
+        """
+        if table_class.__tablename__ not in interval_columns:
+            raise ValueError('{} is not a CM table with active intervals, must be '
+                             'one of {}'.format(table_class.__tablename__,
+                                                list(interval_columns)))
+        if isinstance(at_dates, Time) and not at_dates.isscalar:
+            gps_times = at_dates.gps
+        else:
+            if not isinstance(at_dates, (list, tuple)):
+                at_dates = [at_dates]
+            gps_times = [cm_utils.get_astropytime(at_date).gps for at_date in at_dates]
+        return self.interval_index(table_class).active_at_times(gps_times)
+
+    def interval_index(self, table_class):
+        """
+        Get the interval index of a CM table.
+
+        The index comes from the CM snapshot if possible, otherwise it is built
+        from the full table.
+
+        Parameters
+        ----------
+        table_class : class
+            CM table class, one of Parts, Connections, PartInfo, PartRosetta,
+            AprioriAntenna or GeoLocation.
+
+        Returns
+        -------
+        IntervalIndex
+
+        """
+        index = self._index(table_class)
+        if index is None:
+            index = IntervalIndex.from_table(self.session, table_class)
+        return index
+
     def load_parts(self, at_date=None):
         """
         Retrieve all active parts for a given at_date.
@@ -88,14 +378,9 @@ class ActiveData:
         at_date = cm_utils.get_astropytime(at_date)
         gps_time = self.set_times(at_date)
         self.parts = {}
-        for prt in self.session.query(partconn.Parts).filter(
-            (partconn.Parts.start_gpstime <= gps_time)
-            & ((partconn.Parts.stop_gpstime > gps_time)
-               | (partconn.Parts.stop_gpstime == None))  # noqa
-        ):
+        for prt in self._active_rows(partconn.Parts, gps_time):
             key = cm_utils.make_part_key(prt.hpn, prt.hpn_rev)
             self.parts[key] = prt
-            self.parts[key].logical_pn = None
 
     def load_connections(self, at_date=None):
         """
@@ -124,24 +409,22 @@ class ActiveData:
         at_date = cm_utils.get_astropytime(at_date)
         gps_time = self.set_times(at_date)
         self.connections = {'up': {}, 'down': {}}
-        check_keys = {'up': [], 'down': []}
-        for cnn in self.session.query(partconn.Connections).filter(
-            (partconn.Connections.start_gpstime <= gps_time)
-            & ((partconn.Connections.stop_gpstime > gps_time)
-               | (partconn.Connections.stop_gpstime == None))  # noqa
-        ):
+        check_keys = {'up': set(), 'down': set()}
+        for cnn in self._active_rows(partconn.Connections, gps_time):
             chk = cm_utils.make_part_key(cnn.upstream_part, cnn.up_part_rev,
                                          cnn.upstream_output_port)
-            if self.pytest_param:
-                check_keys[self.pytest_param].append(chk)
+            if self.pytest_param == 'up':
+                check_keys['up'].add(chk)
             if chk in check_keys['up']:
                 raise ValueError("Duplicate active port {}".format(chk))
-            check_keys['up'].append(chk)
+            check_keys['up'].add(chk)
             chk = cm_utils.make_part_key(cnn.downstream_part, cnn.down_part_rev,
                                          cnn.downstream_input_port)
+            if self.pytest_param == 'down':
+                check_keys['down'].add(chk)
             if chk in check_keys['down']:
                 raise ValueError("Duplicate active port {}".format(chk))
-            check_keys['down'].append(chk)
+            check_keys['down'].add(chk)
             key = cm_utils.make_part_key(cnn.upstream_part, cnn.up_part_rev)
             self.connections['up'].setdefault(key, {})
             self.connections['up'][key][cnn.upstream_output_port.upper()] = cnn
@@ -169,9 +452,7 @@ class ActiveData:
         at_date = cm_utils.get_astropytime(at_date)
         gps_time = self.set_times(at_date)
         self.info = {}
-        for info in self.session.query(partconn.PartInfo).filter(
-                (partconn.PartInfo.posting_gpstime <= gps_time)
-        ):
+        for info in self._active_rows(partconn.PartInfo, gps_time):
             key = cm_utils.make_part_key(info.hpn, info.hpn_rev)
             self.info.setdefault(key, [])
             self.info[key].append(info)
@@ -181,11 +462,13 @@ class ActiveData:
         Retrieve the current 'part rosetta' mappings.
 
         Note that the dictionary keys don't include revision numbers, which differs from others
-        (if this is needed later, it can be added later).  If current parts are loaded, it adds the
-        'syspn' to the part object (which does use the full hpn:rev key).
+        (if this is needed later, it can be added later).  If current parts are loaded, the
+        'syspn' of each of them is also written keyed on the full hpn:rev key.  The part objects
+        themselves are not annotated since they may be the shared snapshot rows.
 
-        Writes class dictionary:
+        Writes class dictionaries:
             self.rosetta - keyed on part
+            self.syspn - keyed on part:rev (only if parts are loaded)
 
         Parameters
         ----------
@@ -201,21 +484,18 @@ class ActiveData:
         at_date = cm_utils.get_astropytime(at_date)
         gps_time = self.set_times(at_date)
         self.rosetta = {}
-        fnd_syspn = []
-        for rose in self.session.query(partconn.PartRosetta).filter(
-            (partconn.PartRosetta.start_gpstime <= gps_time)
-            & ((partconn.PartRosetta.stop_gpstime > gps_time)
-               | (partconn.PartRosetta.stop_gpstime == None))  # noqa
-        ):
+        fnd_syspn = set()
+        for rose in self._active_rows(partconn.PartRosetta, gps_time):
             if rose.syspn in fnd_syspn:
                 raise ValueError("System part number {} already found."
                                  .format(rose.syspn))
-            fnd_syspn.append(rose.syspn)
+            fnd_syspn.add(rose.syspn)
             self.rosetta[rose.hpn] = rose
         if self.parts is not None:
+            self.syspn = {}
             for key, part in self.parts.items():
                 try:
-                    self.parts[key].syspn = self.rosetta[part.hpn].syspn
+                    self.syspn[key] = self.rosetta[part.hpn].syspn
                 except KeyError:
                     continue
 
@@ -241,16 +521,12 @@ class ActiveData:
         at_date = cm_utils.get_astropytime(at_date)
         gps_time = self.set_times(at_date)
         self.apriori = {}
-        apriori_keys = []
-        for astat in self.session.query(partconn.AprioriAntenna).filter(
-            (partconn.AprioriAntenna.start_gpstime <= gps_time)
-            & ((partconn.AprioriAntenna.stop_gpstime > gps_time)
-               | (partconn.AprioriAntenna.stop_gpstime == None))  # noqa
-        ):
+        apriori_keys = set()
+        for astat in self._active_rows(partconn.AprioriAntenna, gps_time):
             key = cm_utils.make_part_key(astat.antenna, rev)
             if key in apriori_keys:
                 raise ValueError("{} already has an active apriori state.".format(key))
-            apriori_keys.append(key)
+            apriori_keys.add(key)
             self.apriori[key] = astat
 
     def load_geo(self, at_date=None):
@@ -274,9 +550,7 @@ class ActiveData:
         at_date = cm_utils.get_astropytime(at_date)
         gps_time = self.set_times(at_date)
         self.geo = {}
-        for ageo in self.session.query(geo_location.GeoLocation).filter(
-                geo_location.GeoLocation.created_gpstime <= gps_time
-        ):
+        for ageo in self._active_rows(geo_location.GeoLocation, gps_time):
             key = cm_utils.make_part_key(ageo.station_name, None)
             self.geo[key] = ageo
 
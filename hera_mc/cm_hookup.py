@@ -7,11 +7,64 @@
 
 import os
 import copy
-import json
-from argparse import Namespace
+import numpy as np
 from astropy.time import Time
+from sqlalchemy import func
 
-from . import mc, cm_utils, cm_transfer, cm_sysdef, cm_dossier, cm_active
+from . import mc, cm_utils, cm_transfer, cm_sysdef, cm_dossier, cm_active, cm_hookup_cache
+from . import cm_partconnect as partconn
+
+
+def _connection_route(conn):
+    """Get the parts and ports a connection goes between."""
+    return (cm_utils.make_part_key(conn.upstream_part, conn.up_part_rev,
+                                   conn.upstream_output_port).upper(),
+            cm_utils.make_part_key(conn.downstream_part, conn.down_part_rev,
+                                   conn.downstream_input_port).upper())
+
+
+def _diff_paths(old_paths, new_paths):
+    """
+    Diff the connection paths of a station, keyed on polarization<port.
+
+    Connections are compared by the parts and ports they go between (so a
+    connection that is restarted is unchanged).  A removed and an added
+    connection from the same upstream or to the same downstream part and port
+    are paired as rerouted.
+
+    Parameters
+    ----------
+    old_paths : dict
+        Lists of connections keyed on polarization<port.
+    new_paths : dict
+        Lists of connections keyed on polarization<port.
+
+    Returns
+    -------
+    dict
+        Dicts with 'added', 'removed' and 'rerouted' keyed on the
+        polarization<port of the paths that changed.
+
+    """
+    changes = {}
+    for port_pol in list(old_paths) + [x for x in new_paths if x not in old_paths]:
+        old = {_connection_route(conn): conn for conn in old_paths.get(port_pol, [])}
+        new = {_connection_route(conn): conn for conn in new_paths.get(port_pol, [])}
+        removed = [conn for route, conn in old.items() if route not in new]
+        added = [conn for route, conn in new.items() if route not in old]
+        rerouted = []
+        for old_conn in list(removed):
+            old_route = _connection_route(old_conn)
+            for new_conn in added:
+                new_route = _connection_route(new_conn)
+                if old_route[0] == new_route[0] or old_route[1] == new_route[1]:
+                    rerouted.append((old_conn, new_conn))
+                    removed.remove(old_conn)
+                    added.remove(new_conn)
+                    break
+        if len(added) or len(removed) or len(rerouted):
+            changes[port_pol] = {'added': added, 'removed': removed, 'rerouted': rerouted}
+    return changes
 
 
 class Hookup(object):
@@ -29,7 +82,7 @@ class Hookup(object):
     """
 
     hookup_list_to_cache = cm_sysdef.hera_zone_prefixes
-    hookup_cache_file = os.path.expanduser('~/.hera_mc/hookup_cache_3.json')
+    hookup_cache_file = os.path.expanduser('~/.hera_mc/hookup_cache_4.bin')
 
     def __init__(self, session=None):
         if session is None:  # pragma: no cover
@@ -39,8 +92,12 @@ class Hookup(object):
             self.session = session
         self.part_type_cache = {}
         self.cached_hookup_dict = None
+        self.cache_is_current = False
+        self.hookup_type = None
         self.sysdef = cm_sysdef.Sysdef()
         self.active = None
+        # graphs of self.active used by follow_part, as (active, {hookup_type: graph})
+        self._active_graphs = (None, {})
 
     def get_hookup_from_db(self, hpn, pol, at_date, exact_match=False, hookup_type=None):
         """
@@ -87,6 +144,7 @@ class Hookup(object):
         self.active.load_connections(at_date=None)
         hpn, exact_match = self._proc_hpnlist(hpn, exact_match)
         parts = self._cull_dict(hpn, self.active.parts, exact_match)
+        graphs = {}
         hookup_dict = {}
         for k, part in parts.items():
             self.hookup_type = self.sysdef.find_hookup_type(
@@ -100,10 +158,12 @@ class Hookup(object):
                     hookup_dict[rhdk] = vhd
                 redirect_hookup_dict = None
                 continue
+            if self.hookup_type not in graphs:
+                graphs[self.hookup_type] = self._get_graph(self.hookup_type)
             self.sysdef.setup(part=part, pol=pol, hookup_type=self.hookup_type)
             hookup_dict[k] = cm_dossier.HookupEntry(entry_key=k, sysdef=self.sysdef)
             for port_pol in self.sysdef.ppkeys:
-                hookup_dict[k].hookup[port_pol] = self._follow_hookup_stream(
+                hookup_dict[k].hookup[port_pol] = graphs[self.hookup_type].follow(
                     part=part.hpn, rev=part.hpn_rev, port_pol=port_pol)
                 part_types_found = self._get_part_types_found(hookup_dict[k].hookup[port_pol])
                 hookup_dict[k].get_hookup_type_and_column_headers(port_pol, part_types_found)
@@ -139,8 +199,8 @@ class Hookup(object):
             would allow 'HH1', 'HH10', 'HH123', etc.
         use_cache : bool
             Flag to force the cache to be read, if present and keys agree.
-            This is largely deprecated, but kept for archival possibilities
-            for the future.
+            If the cache is not current, the hookups of the stations with
+            parts or connections that changed are redone from the database.
         hookup_type : str or None
             Type of hookup to use.  Default is 'parts_hera'.
             If 'None' it will determine which system it thinks it is based on
@@ -165,11 +225,171 @@ class Hookup(object):
             hpn, exact_match = self._proc_hpnlist(hpn, exact_match)
             if self._requested_list_OK_for_cache(hpn):
                 self.read_hookup_cache_from_file()
+                if not self.cache_is_current:
+                    self.update_cached_hookup()
                 return self._cull_dict(hpn, self.cached_hookup_dict, exact_match)
 
         return self.get_hookup_from_db(hpn=hpn, pol=pol, at_date=at_date,
                                        exact_match=exact_match, hookup_type=hookup_type)
 
+    def diff(self, at_date_a, at_date_b, hpn='default', pol='all', exact_match=False,
+             hookup_type='parts_hera'):
+        """
+        Find what changed in the hookups between two dates.
+
+        The connection paths of the stations are followed at at_date_a, then
+        only the stations through the parts and connections that started or
+        stopped between the two dates are followed again at at_date_b.  No
+        HookupEntry objects are made for either date.
+
+        Parameters
+        ----------
+        at_date_a : str, int
+            Date to diff from.  Anything intelligible to cm_utils.get_astropytime
+        at_date_b : str, int
+            Date to diff to.  Anything intelligible to cm_utils.get_astropytime
+        hpn : str, list
+            List/string of input hera part number(s) (whole or 'startswith'),
+            as for get_hookup.  Default is 'default'.
+        pol : str
+            A port polarization to follow, or 'all',  ('e', 'n', 'all') Default is 'all'.
+        exact_match : bool
+            If False, will only check the first characters in each hpn entry.  E.g. 'HH1'
+            would allow 'HH1', 'HH10', 'HH123', etc.
+        hookup_type : str or None
+            Type of hookup to use.  Default is 'parts_hera'.
+
+        Returns
+        -------
+        dict
+            Changes keyed on the station part key and then polarization<port,
+            with only the ones that changed.  Each is a dict with keys:
+                'added' : list of connections only in the hookup at at_date_b
+                'removed' : list of connections only in the hookup at at_date_a
+                'rerouted' : list of (at_date_a, at_date_b) connection pairs
+                             that share the upstream or downstream part and port
+
+        """
+        gps_times = [cm_utils.get_astropytime(at_date_a).gps,
+                     cm_utils.get_astropytime(at_date_b).gps]
+        for gps, changes in self._hookup_path_changes(gps_times, hpn, pol, exact_match,
+                                                      hookup_type):
+            return changes
+
+    def hookup_changes(self, start, stop, hpn='default', pol='all', exact_match=False,
+                       hookup_type='parts_hera'):
+        """
+        Generate the changes in the hookups over a range of dates.
+
+        The dates are those in (start, stop] at which any part or connection
+        started or stopped, found from their start and stop times.  Only the
+        stations through those parts and connections are followed again at
+        each date (see `diff`).
+
+        Parameters
+        ----------
+        start : str, int
+            Start date.  Anything intelligible to cm_utils.get_astropytime
+        stop : str, int
+            Stop date.  Anything intelligible to cm_utils.get_astropytime
+        hpn : str, list
+            List/string of input hera part number(s) (whole or 'startswith'),
+            as for get_hookup.  Default is 'default'.
+        pol : str
+            A port polarization to follow, or 'all',  ('e', 'n', 'all') Default is 'all'.
+        exact_match : bool
+            If False, will only check the first characters in each hpn entry.  E.g. 'HH1'
+            would allow 'HH1', 'HH10', 'HH123', etc.
+        hookup_type : str or None
+            Type of hookup to use.  Default is 'parts_hera'.
+
+        Yields
+        ------
+        Time
+            Date the hookups changed.
+        dict
+            Changes from just before that date, as returned by `diff`.
+
+        Raises
+        ------
+        ValueError
+            If stop is before start.
+
+        """
+        start = cm_utils.get_astropytime(start)
+        stop = cm_utils.get_astropytime(stop)
+        if stop < start:
+            raise ValueError("stop {} is before start {}".format(stop.isot, start.isot))
+        active = cm_active.ActiveData(self.session)
+        boundaries = [active.interval_index(table).boundaries
+                      for table in [partconn.Parts, partconn.Connections]]
+        gps_times = sorted(set(gps for gps in np.concatenate(boundaries)
+                               if start.gps < gps <= stop.gps))
+        for gps, changes in self._hookup_path_changes([start.gps] + gps_times, hpn, pol,
+                                                      exact_match, hookup_type):
+            if len(changes):
+                yield Time(gps, format='gps'), changes
+
+    def follow_part(self, key, hookup_type, pol='all', graphs=None):
+        """
+        Follow the connection paths from an active part on a hookup type's graph.
+
+        The part and connections are those of the active data of the last
+        hookup (self.active, e.g. loaded by get_hookup from the database).
+        No HookupEntry is made.
+
+        Parameters
+        ----------
+        key : str
+            Part key (hpn:rev) of an active part to follow from.
+        hookup_type : str
+            Type of hookup to follow (e.g. 'parts_hera', 'wr_hera').
+        pol : str
+            A port polarization to follow, or 'all',  ('e', 'n', 'all') Default is 'all'.
+        graphs : dict or None
+            HookupGraph objects keyed on hookup type, the missing ones are built
+            from self.active and added to it.  If None, the graphs shared by all
+            hookups of the same active data are used (these must not be changed).
+
+        Returns
+        -------
+        dict
+            Connection paths keyed on polarization<port.
+        set
+            Part keys of the part and of the parts on the paths.
+
+        Raises
+        ------
+        ValueError
+            If no active data is loaded.
+
+        """
+        if self.active is None or self.active.parts is None \
+                or self.active.connections is None:
+            raise ValueError("No active data is loaded, run get_hookup first.")
+        if graphs is None:
+            if self._active_graphs[0] is not self.active:
+                self._active_graphs = (self.active, {})
+            graphs = self._active_graphs[1]
+            if hookup_type not in graphs:
+                graphs[hookup_type] = self._get_graph(hookup_type)
+            graph = graphs[hookup_type]
+        else:
+            if hookup_type not in graphs:
+                graphs[hookup_type] = HookupGraph(self.active, hookup_type)
+            graph = graphs[hookup_type]
+        part = self.active.parts[key]
+        self.sysdef.setup(part=part, pol=pol, hookup_type=hookup_type)
+        paths = {}
+        path_parts = {key}
+        for port_pol in self.sysdef.ppkeys:
+            paths[port_pol] = graph.follow(part=part.hpn, rev=part.hpn_rev, port_pol=port_pol)
+            for conn in paths[port_pol]:
+                path_parts.add(cm_utils.make_part_key(conn.upstream_part, conn.up_part_rev))
+                path_parts.add(cm_utils.make_part_key(conn.downstream_part,
+                                                      conn.down_part_rev))
+        return paths, path_parts
+
     def show_hookup(self, hookup_dict, cols_to_show='all', state='full', ports=False, revs=False,
                     sortby=None, filename=None, output_format='table'):
         """
@@ -422,120 +642,154 @@ class Hookup(object):
         self.part_type_cache[c.downstream_part] = part_type
         return list(part_types_found)
 
-    def _follow_hookup_stream(self, part, rev, port_pol):
+    def _get_graph(self, hookup_type):
         """
-        Follow a list of connections upstream and downstream.
-
-        Parameters
-        ----------
-        part : str
-            HERA part number
-        rev : str
-            HERA part revision
-        port_pol : str
-            Port polarization to follow.  Should be 'E<port' or 'N<port'.
+        Get the HookupGraph of the active parts and connections for a hookup_type.
 
-        Returns
-        -------
-        list
-            List of connections for that hookup.
+        Graphs are shared through the CM snapshot (see cm_active.get_snapshot)
+        by all hookups of the same active parts and connections.
 
         """
-        key = cm_utils.make_part_key(part, rev)
-        part_type = self.active.parts[key].hptype
-        pol, port = port_pol.split('<')
-        port_list = cm_utils.to_upper(self.sysdef.get_ports(pol, part_type))
-        self.upstream = []
-        self.downstream = []
-        current = Namespace(direction='up', part=part.upper(), rev=rev.upper(),
-                            key=key, pol=pol.upper(),
-                            hptype=part_type, port=port.upper(), allowed_ports=port_list)
-        self._recursive_connect(current)
-        current = Namespace(direction='down', part=part.upper(), rev=rev.upper(),
-                            key=key, pol=pol.upper(),
-                            hptype=part_type, port=port.upper(), allowed_ports=port_list)
-        self._recursive_connect(current)
-        hu = []
-        for pn in reversed(self.upstream):
-            hu.append(pn)
-        for pn in self.downstream:
-            hu.append(pn)
-        return hu
-
-    def _recursive_connect(self, current):
-        """
-        Find the next connection up the signal chain.
+        def build():
+            return HookupGraph(self.active, hookup_type)
+        snapshot = self.active.snapshot
+        if snapshot is None or not {'parts', 'connections'} <= set(self.active.epochs):
+            return build()
+        return snapshot.cached(('hookup_graph', hookup_type, self.active.epochs['parts'],
+                                self.active.epochs['connections']), build)
+
+    def _hookup_path_changes(self, gps_times, hpn, pol, exact_match, hookup_type):
+        """
+        Generate the changes in the connection paths of the stations over gps times.
 
-        Parameters
-        ----------
-        current : Namespace object
-            Namespace containing current information.
+        The paths are followed at the first time.  For each later time, the
+        parts and connections that started or stopped since the time before
+        are applied to self.active and the signal path graphs, and only the
+        stations with one of their parts in a path are followed again.
 
-        """
-        conn = self._get_connection(current)
-        if conn is None:
-            return None
-        if current.direction == 'up':
-            self.upstream.append(conn)
-        elif current.direction == 'down':
-            self.downstream.append(conn)
-        self._recursive_connect(current)
+        Yields
+        ------
+        float
+            gps time
+        dict
+            Changes from the time before, as returned by `diff`.
 
-    def _get_connection(self, current):
         """
-        Get next connected part going the given direction.
+        hpn, exact_match = self._proc_hpnlist(hpn, exact_match)
+        self.at_date = Time(gps_times[0], format='gps')
+        self.active = cm_active.ActiveData(self.session, at_date=self.at_date)
+        self.active.load_parts(at_date=None)
+        self.active.load_connections(at_date=None)
+        indices = {table: self.active.interval_index(table)
+                   for table in [partconn.Parts, partconn.Connections]}
+        graphs = {}
+        matches = {}
+        stations = self._get_stations(hpn, exact_match, hookup_type, matches)
+        paths = {}
+        path_parts = {}
+        for key, station_type in stations.items():
+            paths[key], path_parts[key] = self.follow_part(key, station_type, pol,
+                                                           graphs=graphs)
+        for gps_prev, gps in zip(gps_times[:-1], gps_times[1:]):
+            self.at_date = Time(gps, format='gps')
+            self.active.at_date = self.at_date
+            changed = self._apply_cm_changes(graphs, indices, gps_prev, gps)
+            new_stations = self._get_stations(hpn, exact_match, hookup_type, matches)
+            changes = {}
+            for key in set(stations) - set(new_stations):
+                changes[key] = _diff_paths(paths.pop(key), {})
+                del path_parts[key]
+            for key, station_type in new_stations.items():
+                if (key in stations and stations[key] == station_type
+                        and not path_parts[key] & changed):
+                    continue
+                new_paths, path_parts[key] = self.follow_part(key, station_type, pol,
+                                                              graphs=graphs)
+                changes[key] = _diff_paths(paths.get(key, {}), new_paths)
+                paths[key] = new_paths
+            stations = new_stations
+            yield gps, {key: changes[key] for key in sorted(changes) if len(changes[key])}
+
+    def _get_stations(self, hpn, exact_match, hookup_type, matches):
+        """
+        Get the active parts to follow hookups from for hpn, with their hookup types.
 
-        Parameters
-        ----------
-        current : Namespace object
-            Namespace containing current information.
+        Redirect part types (e.g. nodes) are replaced by their redirected parts,
+        as in get_hookup_from_db.  Whether each part key matches hpn is
+        memoized in matches.
 
         """
-        odir = self.sysdef.opposite_direction[current.direction]
-        try:
-            options = list(self.active.connections[odir][current.key].keys())
-        except KeyError:
-            return None
-        this_port = self._get_port(current, options)
-        if this_port is None:
-            return None
-        this_conn = self.active.connections[odir][current.key][this_port]
-        if current.direction == 'up':
-            current.part = this_conn.upstream_part.upper()
-            current.rev = this_conn.up_part_rev.upper()
-            current.port = this_conn.upstream_output_port.upper()
-        elif current.direction == 'down':
-            current.part = this_conn.downstream_part.upper()
-            current.rev = this_conn.down_part_rev.upper()
-            current.port = this_conn.downstream_input_port.upper()
-        current.key = cm_utils.make_part_key(current.part, current.rev)
-        options = list(self.active.connections[current.direction][current.key].keys())
-        try:
-            current.type = self.active.parts[current.key].hptype
-        except KeyError:  # pragma: no cover
-            return None
-        current.allowed_ports = cm_utils.to_upper(self.sysdef.get_ports(current.pol, current.type))
-        current.port = self._get_port(current, options)
-        return this_conn
+        hpn_upper = [x.upper() for x in hpn]
+        stations = {}
+        redirects = {}
+        for key, part in self.active.parts.items():
+            if key not in matches:
+                this_hpn = cm_utils.split_part_key(key.upper())[0]
+                if exact_match:
+                    matches[key] = this_hpn in hpn_upper
+                else:
+                    matches[key] = any(this_hpn.startswith(x) for x in hpn_upper)
+            if not matches[key]:
+                continue
+            this_type = self.sysdef.find_hookup_type(part_type=part.hptype,
+                                                     hookup_type=hookup_type)
+            if part.hptype in self.sysdef.redirect_part_types[this_type]:
+                for redirect_hpn in self.sysdef.handle_redirect_part_types(part, self.active):
+                    redirects[redirect_hpn.upper()] = this_type
+            else:
+                stations[key] = this_type
+        if len(redirects):
+            for key, part in self.active.parts.items():
+                if part.hpn.upper() in redirects:
+                    stations[key] = self.sysdef.find_hookup_type(
+                        part_type=part.hptype, hookup_type=redirects[part.hpn.upper()])
+        return stations
+
+    def _apply_cm_changes(self, graphs, indices, gps_from, gps_to):
+        """
+        Apply the parts and connections that started or stopped between two gps times.
 
-    def _get_port(self, current, options):
-        if current.port is None:
-            return None
-        sysdef_options = []
-        for p in options:
-            if p in current.allowed_ports:
-                sysdef_options.append(p)
-        if current.hptype in self.sysdef.single_pol_labeled_parts[self.hookup_type]:
-            if current.part[-1].upper() == current.pol[0]:
-                return sysdef_options[0]
-        if len(sysdef_options) == 1:
-            return sysdef_options[0]
-        for p in sysdef_options:
-            if p == current.port:
-                return p
-        for p in sysdef_options:
-            if p[0] == current.pol[0]:
-                return p
+        self.active and the graphs are updated, and the keys of the parts that
+        changed or are on either end of a connection that changed are returned.
+
+        """
+        changed = set()
+        updates = {}
+        for table, index in indices.items():
+            active = index.active_mask([gps_from, gps_to])
+            updates[table] = ([index.rows[ind] for ind in np.nonzero(active[0] & ~active[1])[0]],
+                              [index.rows[ind] for ind in np.nonzero(~active[0] & active[1])[0]])
+        removed, added = updates[partconn.Parts]
+        for part, this_part in [(prt, None) for prt in removed] + [(prt, prt) for prt in added]:
+            key = cm_utils.make_part_key(part.hpn, part.hpn_rev)
+            changed.add(key)
+            if this_part is None:
+                self.active.parts.pop(key, None)
+            else:
+                self.active.parts[key] = this_part
+            for graph in graphs.values():
+                graph.set_part_type(key, None if this_part is None else this_part.hptype)
+        removed, added = updates[partconn.Connections]
+        for conn, is_added in [(cnn, False) for cnn in removed] + [(cnn, True) for cnn in added]:
+            ends = {'up': (cm_utils.make_part_key(conn.upstream_part, conn.up_part_rev),
+                           conn.upstream_output_port.upper()),
+                    'down': (cm_utils.make_part_key(conn.downstream_part, conn.down_part_rev),
+                             conn.downstream_input_port.upper())}
+            for direction, (key, port) in ends.items():
+                changed.add(key)
+                ports = self.active.connections[direction].setdefault(key, {})
+                if is_added:
+                    ports[port] = conn
+                else:
+                    ports.pop(port, None)
+                    if not len(ports):
+                        del self.active.connections[direction][key]
+            for graph in graphs.values():
+                if is_added:
+                    graph.add_connection(conn)
+                else:
+                    graph.remove_connection(conn)
+        return changed
 
     def _sort_hookup_display(self, sortby, hookup_dict, def_sort_order='NRP'):
         if sortby is None:
@@ -605,6 +859,10 @@ class Hookup(object):
         """
         Write the current hookup to the cache file.
 
+        If there already is a cache file for the same hookup type and list, only
+        the hookups of the stations that contain parts or connections that
+        changed since it was written are redone (see update_cached_hookup).
+
         Parameters
         ----------
         log_msg : str
@@ -615,62 +873,134 @@ class Hookup(object):
         """
         self.at_date = cm_utils.get_astropytime('now')
         self.hookup_type = 'parts_hera'
-        self.cached_hookup_dict = self.get_hookup_from_db(
-            self.hookup_list_to_cache, pol='all', at_date=self.at_date,
-            exact_match=False, hookup_type=self.hookup_type)
-        hookup_dict_for_json = copy.deepcopy(self.cached_hookup_dict)
-        for key, value in self.cached_hookup_dict.items():
-            if isinstance(value, cm_dossier.HookupEntry):
-                hookup_dict_for_json[key] = value._to_dict()
-
-        save_dict = {'at_date_gps': self.at_date.gps,
-                     'hookup_type': self.hookup_type,
-                     'hookup_list': self.hookup_list_to_cache,
-                     'hookup_dict': hookup_dict_for_json,
-                     'part_type_cache': self.part_type_cache}
-        with open(self.hookup_cache_file, 'w') as outfile:
-            json.dump(save_dict, outfile)
+        cache = self._read_cache_to_update()
+        if cache is None:
+            self.cached_hookup_dict = self.get_hookup_from_db(
+                self.hookup_list_to_cache, pol='all', at_date=self.at_date,
+                exact_match=False, hookup_type=self.hookup_type)
+        else:
+            self.cached_hookup_dict = cache
+            self.part_type_cache = cache.header['part_type_cache']
+            self.update_cached_hookup()
+
+        header = {'at_date_gps': self.at_date.gps,
+                  'hookup_type': self.hookup_type,
+                  'hookup_list': self.hookup_list_to_cache,
+                  'cm_version': self._cm_version(),
+                  'part_type_cache': self.part_type_cache}
+        cm_hookup_cache.write_hookup_cache(self.hookup_cache_file, header,
+                                           self.cached_hookup_dict, self.active)
 
         cf_info = self.hookup_cache_file_info()
         log_dict = {'hu-list': cm_utils.stringify(self.hookup_list_to_cache),
                     'log_msg': log_msg, 'cache_file_info': cf_info}
         cm_utils.log('update_cache', log_dict=log_dict)
 
+    def _read_cache_to_update(self):
+        """Get the existing cache file contents if they can be updated, else None."""
+        if not os.path.exists(self.hookup_cache_file):
+            return None
+        try:
+            cache = cm_hookup_cache.HookupCache(self.hookup_cache_file)
+        except (ValueError, KeyError, OSError):  # pragma: no cover
+            return None
+        if (cache.header['hookup_type'] != self.hookup_type
+                or cache.header['hookup_list'] != self.hookup_list_to_cache):
+            return None
+        return cache
+
     def read_hookup_cache_from_file(self):
-        """Read the current cache file into memory."""
-        with open(self.hookup_cache_file, 'r') as outfile:
-            cache_dict = json.load(outfile)
-        if self.hookup_cache_file_OK(cache_dict):
+        """
+        Read the current cache file.
+
+        The hookup entries are only built from the file when they are used.
+        Sets self.cache_is_current to whether the cache is current with the
+        database for self.at_date (see hookup_cache_file_OK).
+
+        """
+        cache = cm_hookup_cache.HookupCache(self.hookup_cache_file)
+        self.cache_is_current = self.hookup_cache_file_OK(cache.header)
+        if self.cache_is_current:
             print("<<<Cache IS current with database>>>")
         else:
             print("<<<Cache is NOT current with database>>>")
-        self.cached_at_date = Time(cache_dict['at_date_gps'], format='gps')
-        self.cached_hookup_type = cache_dict['hookup_type']
-        self.cached_hookup_list = cache_dict['hookup_list']
-        hookup_dict = {}
-        for key, value in cache_dict['hookup_dict'].items():
-            # this should only contain dicts made from HookupEntry
-            # add asserts to make sure
-            assert(isinstance(value, dict))
-            assert(sorted(value.keys()) == sorted(['entry_key', 'hookup', 'fully_connected',
-                                                   'hookup_type', 'columns', 'timing', 'sysdef']))
-            hookup_dict[key] = cm_dossier.HookupEntry(input_dict=value)
-
-        self.cached_hookup_dict = hookup_dict
-        self.part_type_cache = cache_dict['part_type_cache']
+        self.cached_at_date = Time(cache.header['at_date_gps'], format='gps')
+        self.cached_hookup_type = cache.header['hookup_type']
+        self.cached_hookup_list = cache.header['hookup_list']
+        self.cached_hookup_dict = cache
+        self.part_type_cache = cache.header['part_type_cache']
         self.hookup_type = self.cached_hookup_type
 
+    def update_cached_hookup(self):
+        """
+        Bring the cached hookup read from the cache file up to date for self.at_date.
+
+        The parts and connections active at self.at_date are compared to those
+        stored in the cache file, and only the hookups of the stations that
+        contain a part or connection that was added, removed or changed are
+        redone (as are those of new stations).  The cache file is not changed.
+
+        Returns
+        -------
+        list
+            Part numbers of the stations whose hookups were redone.
+
+        """
+        cache = self.cached_hookup_dict
+        self.active = cm_active.ActiveData(self.session, at_date=self.at_date)
+        self.active.load_parts(at_date=None)
+        self.active.load_connections(at_date=None)
+        part_entries = cache.part_entries()
+        prefixes = [x.upper() for x in cache.header['hookup_list']]
+        redo = set()
+        for part_key in cache.changed_parts(self.active):
+            for entry_key in part_entries.get(part_key, []):
+                redo.add(cm_utils.split_part_key(entry_key)[0])
+            hpn = cm_utils.split_part_key(part_key)[0]
+            if any(hpn.startswith(prefix) for prefix in prefixes):
+                redo.add(hpn)
+        if not len(redo):
+            return []
+        redone = self.get_hookup_from_db(hpn=sorted(redo), pol='all', at_date=self.at_date,
+                                         exact_match=True,
+                                         hookup_type=cache.header['hookup_type'])
+        for key in list(cache.keys()):
+            if cm_utils.split_part_key(key)[0] in redo:
+                del cache[key]
+        for key, entry in redone.items():
+            cache[key] = entry
+        return sorted(redo)
+
+    def _cm_version(self):
+        """Get the latest cm_version update_time."""
+        return self.session.query(func.max(cm_transfer.CMVersion.update_time)).scalar()
+
+    def _cm_changed_between(self, time1, time2):
+        """Check if any parts or connections started or stopped between two times."""
+        low, high = sorted([time1.gps, time2.gps])
+        for table in [partconn.Parts, partconn.Connections]:
+            query = self.session.query(table).filter(
+                ((table.start_gpstime > low) & (table.start_gpstime <= high))
+                | ((table.stop_gpstime > low) & (table.stop_gpstime <= high)))
+            if self.session.query(query.exists()).scalar():
+                return True
+        return False
+
     def hookup_cache_file_OK(self, cache_dict=None):
         """
         Determine if the cache file is up-to-date with the cm db and if hookup_type is correct.
 
-        There are 4 relevant dates:
-            cm_hash_time:  last time the database was updated per CMVersion
-            file_mod_time:  when the cache file was last changed (ie written)
-            at_date:  the date of the get hookup request (self.at_date)
-            cached_at_date:  the date in the cache file for which it was written.
-        If the cache_file was written before the latest cm_version, it fails because
-        anything could have changed within the database.
+        The cache is current if:
+            the latest cm_version is the same as when it was written (otherwise
+            anything could have changed within the database),
+            the hookup_type agrees with self.hookup_type (if set), and
+            no parts or connections started or stopped between the date the cache
+            was written for and the date of the get hookup request (self.at_date).
+
+        Parameters
+        ----------
+        cache_dict : dict or None
+            Header of the cache file.
 
         Returns
         -------
@@ -678,18 +1008,12 @@ class Hookup(object):
             True if the cache file is current.
 
         """
-        # Get the relevant dates (checking the cache_file/cm_version up front)
         if cache_dict is None:
             return False
-        stats = os.stat(self.hookup_cache_file)
-        result = self.session.query(cm_transfer.CMVersion).order_by(
-            cm_transfer.CMVersion.update_time).all()
-        cm_hash_time = Time(result[-1].update_time, format='gps')
-        file_mod_time = Time(stats.st_mtime, format='unix')
-        # If CMVersion changed since file was written, don't know so fail...
-        if file_mod_time < cm_hash_time:  # pragma: no cover
-            log_dict = {'file_mod_time': cm_utils.get_time_for_display(file_mod_time),
-                        'cm_hash_time': cm_utils.get_time_for_display(cm_hash_time)}
+        cm_version = self._cm_version()
+        if cache_dict.get('cm_version') != cm_version:
+            log_dict = {'cached_cm_version': cache_dict.get('cm_version'),
+                        'cm_version': cm_version}
             cm_utils.log('__hookup_cache_file_date_OK:  out of date.', log_dict=log_dict)
             return False
         cached_at_date = Time(cache_dict['at_date_gps'], format='gps')
@@ -697,15 +1021,10 @@ class Hookup(object):
 
         if self.hookup_type is None:
             self.hookup_type = cached_hookup_type
-        if self.hookup_type != cached_hookup_type:  # pragma: no cover
+        if self.hookup_type != cached_hookup_type:
             return False
 
-        # If the cached and query dates are after the last hash time it's ok
-        if cached_at_date > cm_hash_time and self.at_date > cm_hash_time:
-            return True
-
-        # If not returned above, return False to regenerate
-        return False
+        return not self._cm_changed_between(cached_at_date, self.at_date)
 
     def hookup_cache_file_info(self):
         """
@@ -769,3 +1088,167 @@ class Hookup(object):
             else:
                 return False
         return True
+
+
+class HookupGraph(object):
+    """
+    Signal path graph of the active parts and connections for one hookup_type.
+
+    The active connections are compiled into an adjacency dict keyed on the
+    direction, part key and port. Hookups are then followed iteratively from
+    each starting part and port, and the rest of the path from every state
+    visited is memoized so that the parts shared by many hookups (e.g. the
+    SNAPs and nodes) are only followed once.
+
+    Parameters
+    ----------
+    active : ActiveData object
+        Contains the active parts and connections (both must be loaded).
+    hookup_type : str
+        Type of hookup to follow (e.g. 'parts_hera').
+
+    """
+
+    def __init__(self, active, hookup_type):
+        self.hookup_type = hookup_type
+        self.sysdef = cm_sysdef.Sysdef(hookup_type=hookup_type)
+        self.single_pol_labeled_parts = self.sysdef.single_pol_labeled_parts[hookup_type]
+        self.part_types = {key: part.hptype for key, part in active.parts.items()}
+        # adjacency[direction][key][port] = (connection, next key, port on next part)
+        self.adjacency = {'up': {}, 'down': {}}
+        for key, ports in active.connections['down'].items():
+            self.adjacency['up'][key] = {
+                port: (conn, cm_utils.make_part_key(conn.upstream_part, conn.up_part_rev),
+                       conn.upstream_output_port.upper())
+                for port, conn in ports.items()}
+        for key, ports in active.connections['up'].items():
+            self.adjacency['down'][key] = {
+                port: (conn, cm_utils.make_part_key(conn.downstream_part, conn.down_part_rev),
+                       conn.downstream_input_port.upper())
+                for port, conn in ports.items()}
+        self._allowed_ports = {}
+        self._segments = {}
+
+    def add_connection(self, conn):
+        """Add a connection that became active, clearing the memoized paths."""
+        up_key = cm_utils.make_part_key(conn.upstream_part, conn.up_part_rev)
+        down_key = cm_utils.make_part_key(conn.downstream_part, conn.down_part_rev)
+        up_port = conn.upstream_output_port.upper()
+        down_port = conn.downstream_input_port.upper()
+        self.adjacency['up'].setdefault(down_key, {})[down_port] = (conn, up_key, up_port)
+        self.adjacency['down'].setdefault(up_key, {})[up_port] = (conn, down_key, down_port)
+        self._segments.clear()
+
+    def remove_connection(self, conn):
+        """Remove a connection that stopped being active, clearing the memoized paths."""
+        up_key = cm_utils.make_part_key(conn.upstream_part, conn.up_part_rev)
+        down_key = cm_utils.make_part_key(conn.downstream_part, conn.down_part_rev)
+        for direction, key, port in [('up', down_key, conn.downstream_input_port.upper()),
+                                     ('down', up_key, conn.upstream_output_port.upper())]:
+            ports = self.adjacency[direction].get(key, {})
+            ports.pop(port, None)
+            if not len(ports):
+                self.adjacency[direction].pop(key, None)
+        self._segments.clear()
+
+    def set_part_type(self, key, hptype):
+        """Set the part type of a part key (None if it stopped), clearing the memoized paths."""
+        if hptype is None:
+            self.part_types.pop(key, None)
+        else:
+            self.part_types[key] = hptype
+        self._segments.clear()
+
+    def follow(self, part, rev, port_pol):
+        """
+        Follow the connections upstream and downstream from a part.
+
+        Parameters
+        ----------
+        part : str
+            HERA part number
+        rev : str
+            HERA part revision
+        port_pol : str
+            Port polarization to follow.  Should be 'E<port' or 'N<port'.
+
+        Returns
+        -------
+        list
+            List of connections for that hookup, from upstream to downstream.
+
+        """
+        key = cm_utils.make_part_key(part, rev)
+        hptype = self.part_types[key]
+        pol, port = [x.upper() for x in port_pol.split('<')]
+        upstream = self._follow(('up', key, port, pol, hptype))
+        downstream = self._follow(('down', key, port, pol, hptype))
+        return list(reversed(upstream)) + list(downstream)
+
+    def _follow(self, state):
+        """
+        Get the connections from a state to the end of the signal path.
+
+        A state is (direction, part key, port, pol, hptype), where hptype is
+        the part type of the part the hookup started from.
+
+        """
+        states = []
+        path = []
+        segment = ()
+        while state not in self._segments:
+            if state in states:  # pragma: no cover
+                # connections loop back on themselves, stop at the loop
+                break
+            states.append(state)
+            step = self._step(state)
+            if step is None:
+                break
+            conn, state = step
+            path.append(conn)
+        else:
+            segment = self._segments[state]
+        for ind in range(len(states) - 1, -1, -1):
+            if ind < len(path):
+                segment = (path[ind],) + segment
+            self._segments[states[ind]] = segment
+        return segment
+
+    def _step(self, state):
+        """Get the next connection and state, None at the end of the path."""
+        direction, key, port, pol, hptype = state
+        try:
+            ports = self.adjacency[direction][key]
+        except KeyError:
+            return None
+        this_port = self._get_port(key, port, pol, hptype, ports)
+        if this_port is None:
+            return None
+        conn, next_key, next_port = ports[this_port]
+        if next_key not in self.part_types:  # pragma: no cover
+            return None
+        back_ports = self.adjacency[cm_sysdef.Sysdef.opposite_direction[direction]][next_key]
+        next_port = self._get_port(next_key, next_port, pol, hptype, back_ports)
+        return conn, (direction, next_key, next_port, pol, hptype)
+
+    def _get_port(self, key, port, pol, hptype, options):
+        """Pick the port to follow out of a part from the connected ones."""
+        if port is None:
+            return None
+        part_type = self.part_types[key]
+        try:
+            allowed_ports = self._allowed_ports[(pol, part_type)]
+        except KeyError:
+            allowed_ports = cm_utils.to_upper(self.sysdef.get_ports(pol, part_type))
+            self._allowed_ports[(pol, part_type)] = allowed_ports
+        sysdef_options = [p for p in options if p in allowed_ports]
+        if hptype in self.single_pol_labeled_parts:
+            if key.split(':')[0][-1] == pol[0]:
+                return sysdef_options[0]
+        if len(sysdef_options) == 1:
+            return sysdef_options[0]
+        if port in sysdef_options:
+            return port
+        for p in sysdef_options:
+            if p[0] == pol[0]:
+                return p
@@ -0,0 +1,375 @@
+#! /usr/bin/env python
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""
+Binary hookup cache file.
+
+The file starts with a magic string, the length of a json header and the
+header itself. The header holds the cache metadata (hookup type, dates, cm
+version, sysdef, part_type_cache) and the dtype, length and offset of the
+numpy structured arrays that follow it:
+
+    entries : one row per hookup entry and port-pol, pointing into hookup
+    hookup : indices into connections of the connections in each hookup
+    connections : all connections active at the cache at_date
+    parts : all parts active at the cache at_date
+
+The arrays are memory-mapped and the HookupEntry objects are only built for
+the stations that are looked up. The active parts and connections are kept
+so that the cache can be brought up to date by only redoing the hookups of
+the stations that contain a part or connection that changed.
+"""
+
+from collections.abc import MutableMapping
+import json
+import os
+import struct
+
+import numpy as np
+
+from . import cm_dossier, cm_sysdef, cm_utils
+from . import cm_partconnect as partconn
+
+MAGIC = b'HMCHUC04'
+ALIGNMENT = 64
+# stands in for null stop times in the arrays
+NO_STOP = -1
+
+connection_fields = ['upstream_part', 'up_part_rev', 'upstream_output_port',
+                     'downstream_part', 'down_part_rev', 'downstream_input_port']
+part_fields = ['hpn', 'hpn_rev', 'hptype']
+
+
+def _align(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _string_array(values):
+    """Make a fixed width bytes array of utf-8 encoded strings."""
+    encoded = [value.encode('utf-8') for value in values]
+    return np.array(encoded, dtype='S{}'.format(max([len(x) for x in encoded] + [1])))
+
+
+def _stop_value(stop):
+    return NO_STOP if stop is None else stop
+
+
+def _structured_array(columns, ints=()):
+    """Make a structured array from a dict of string columns and int columns."""
+    arrays = {name: _string_array(values) for name, values in columns.items()}
+    arrays.update({name: np.asarray(values, dtype=np.int64) for name, values in ints})
+    length = len(next(iter(arrays.values())))
+    array = np.zeros(length, dtype=[(name, arr.dtype) for name, arr in arrays.items()])
+    for name, arr in arrays.items():
+        array[name] = arr
+    return array
+
+
+def connection_tuple(conn):
+    """Get the tuple identifying a connection (including its active interval)."""
+    return (tuple(getattr(conn, field) for field in connection_fields)
+            + (conn.start_gpstime, _stop_value(conn.stop_gpstime)))
+
+
+def part_tuple(part):
+    """Get the tuple identifying a part (including its active interval)."""
+    return (tuple(getattr(part, field) for field in part_fields)
+            + (part.start_gpstime, _stop_value(part.stop_gpstime)))
+
+
+def write_hookup_cache(filename, header, hookup_dict, active):
+    """
+    Write a hookup cache file.
+
+    The file is written to a temporary file and moved into place, so readers
+    that have the old file memory-mapped are not affected.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the cache file.
+    header : dict
+        Cache metadata, must be json serializable. The 'sysdef', 'hookup_types',
+        'columns' and 'arrays' keys are added here.
+    hookup_dict : dict
+        Hookup dossier dictionary (as returned by Hookup.get_hookup) to cache.
+    active : ActiveData object
+        Active data with the parts and connections loaded at the cache date.
+
+    """
+    conn_list = [conn for ports in active.connections['up'].values()
+                 for conn in ports.values()]
+    conn_index = {connection_tuple(conn): ind for ind, conn in enumerate(conn_list)}
+    hookup_types = []
+    columns = []
+    entry_rows = []
+    hookup_rows = []
+    sysdef = None
+    for entry_key, entry in hookup_dict.items():
+        sysdef = entry.sysdef
+        if not len(entry.hookup):
+            # keep the entry, even though it has no ports to show
+            entry_rows.append((entry_key, '', len(hookup_rows), -1, False, -1, -1,
+                               0, NO_STOP))
+            continue
+        for port_pol, conns in entry.hookup.items():
+            first = len(hookup_rows)
+            for conn in conns:
+                key = connection_tuple(conn)
+                if key not in conn_index:  # pragma: no cover
+                    conn_index[key] = len(conn_list)
+                    conn_list.append(conn)
+                hookup_rows.append(conn_index[key])
+            hookup_type = entry.hookup_type.get(port_pol)
+            if hookup_type is not None and hookup_type not in hookup_types:
+                hookup_types.append(hookup_type)
+            if entry.columns[port_pol] not in columns:
+                columns.append(entry.columns[port_pol])
+            latest_start, earliest_stop = entry.timing[port_pol]
+            entry_rows.append((entry_key, port_pol, first, len(conns),
+                               entry.fully_connected[port_pol],
+                               -1 if hookup_type is None else hookup_types.index(hookup_type),
+                               columns.index(entry.columns[port_pol]),
+                               latest_start, _stop_value(earliest_stop)))
+
+    entries = np.zeros(len(entry_rows), dtype=[
+        ('entry_key', _string_array([row[0] for row in entry_rows]).dtype),
+        ('port_pol', _string_array([row[1] for row in entry_rows]).dtype),
+        ('first', np.int64), ('count', np.int64), ('fully_connected', np.bool_),
+        ('hookup_type', np.int64), ('columns', np.int64),
+        ('latest_start', np.int64), ('earliest_stop', np.int64)])
+    for ind, name in enumerate(entries.dtype.names):
+        values = [row[ind] for row in entry_rows]
+        entries[name] = _string_array(values) if ind < 2 else values
+    arrays = {
+        'entries': entries,
+        'hookup': np.asarray(hookup_rows, dtype=np.int64),
+        'connections': _structured_array(
+            {field: [getattr(conn, field) for conn in conn_list]
+             for field in connection_fields},
+            ints=[('start_gpstime', [conn.start_gpstime for conn in conn_list]),
+                  ('stop_gpstime', [_stop_value(conn.stop_gpstime) for conn in conn_list])]),
+        'parts': _structured_array(
+            {field: [getattr(part, field) for part in active.parts.values()]
+             for field in part_fields},
+            ints=[('start_gpstime', [part.start_gpstime for part in active.parts.values()]),
+                  ('stop_gpstime', [_stop_value(part.stop_gpstime)
+                                    for part in active.parts.values()])]),
+    }
+
+    header = dict(header)
+    header['sysdef'] = None if sysdef is None else sysdef._to_dict()
+    header['hookup_types'] = hookup_types
+    header['columns'] = columns
+    header['arrays'] = {}
+    offset = 0
+    for name, array in arrays.items():
+        header['arrays'][name] = {'descr': np.lib.format.dtype_to_descr(array.dtype),
+                                  'length': len(array), 'offset': offset}
+        offset = _align(offset + array.nbytes)
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+    tmp_filename = '{}.{}.tmp'.format(filename, os.getpid())
+    with open(tmp_filename, 'wb') as fp:
+        fp.write(MAGIC)
+        fp.write(struct.pack('<Q', len(header_bytes)))
+        fp.write(header_bytes)
+        for name, array in arrays.items():
+            fp.seek(data_start + header['arrays'][name]['offset'])
+            fp.write(array.tobytes())
+    os.replace(tmp_filename, filename)
+
+
+class HookupCache(MutableMapping):
+    """
+    Hookup dossier dictionary read from a hookup cache file.
+
+    It behaves like the dictionary returned by Hookup.get_hookup, but the
+    HookupEntry objects are only built when they are accessed. Entries can be
+    replaced or deleted (e.g. to bring it up to date) without changing the file.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the cache file.
+
+    Attributes
+    ----------
+    header : dict
+        Cache metadata.
+    arrays : dict
+        Memory-mapped structured arrays, see the module docstring.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a hookup cache file.
+
+    """
+
+    def __init__(self, filename):
+        with open(filename, 'rb') as fp:
+            if fp.read(len(MAGIC)) != MAGIC:
+                raise ValueError('{} is not a hookup cache file.'.format(filename))
+            header_length = struct.unpack('<Q', fp.read(8))[0]
+            self.header = json.loads(fp.read(header_length).decode('utf-8'))
+        data_start = _align(len(MAGIC) + 8 + header_length)
+        self.arrays = {}
+        for name, info in self.header['arrays'].items():
+            dtype = np.lib.format.descr_to_dtype(info['descr'])
+            if info['length'] == 0:
+                self.arrays[name] = np.zeros(0, dtype=dtype)
+            else:
+                self.arrays[name] = np.memmap(filename, dtype=dtype, mode='r',
+                                              offset=data_start + info['offset'],
+                                              shape=(info['length'],))
+        self.sysdef = None
+        if self.header['sysdef'] is not None:
+            self.sysdef = cm_sysdef.Sysdef(input_dict=self.header['sysdef'])
+        self._rows = {}
+        for ind, key in enumerate(self.arrays['entries']['entry_key']):
+            self._rows.setdefault(key.decode('utf-8'), []).append(ind)
+        self._entries = {}
+        self._connections = {}
+        self._part_entries = None
+
+    def __getitem__(self, key):
+        """Get an entry, building it from the arrays the first time."""
+        if key not in self._entries:
+            self._entries[key] = self._build_entry(key, self._rows[key])
+        return self._entries[key]
+
+    def __setitem__(self, key, entry):
+        """Replace or add an entry."""
+        self._rows.setdefault(key, None)
+        self._entries[key] = entry
+        self._part_entries = None
+
+    def __delitem__(self, key):
+        """Remove an entry."""
+        del self._rows[key]
+        self._entries.pop(key, None)
+        self._part_entries = None
+
+    def __iter__(self):
+        """Iterate over the entry keys."""
+        return iter(self._rows)
+
+    def __len__(self):
+        """Get the number of entries."""
+        return len(self._rows)
+
+    def _connection(self, ind):
+        """Get (and keep) the Connections object for a row of the connections array."""
+        if ind not in self._connections:
+            row = self.arrays['connections'][ind]
+            kwargs = {field: row[field].decode('utf-8') for field in connection_fields}
+            stop = int(row['stop_gpstime'])
+            self._connections[ind] = partconn.Connections(
+                start_gpstime=int(row['start_gpstime']),
+                stop_gpstime=None if stop == NO_STOP else stop, **kwargs)
+        return self._connections[ind]
+
+    def _build_entry(self, key, rows):
+        entry = cm_dossier.HookupEntry(entry_key=key, sysdef=self.sysdef)
+        entries = self.arrays['entries']
+        hookup = self.arrays['hookup']
+        for ind in rows:
+            row = entries[ind]
+            count = int(row['count'])
+            if count < 0:
+                continue
+            port_pol = row['port_pol'].decode('utf-8')
+            first = int(row['first'])
+            entry.hookup[port_pol] = [self._connection(int(conn_ind))
+                                      for conn_ind in hookup[first:first + count]]
+            entry.fully_connected[port_pol] = bool(row['fully_connected'])
+            hookup_type = int(row['hookup_type'])
+            entry.hookup_type[port_pol] = (None if hookup_type < 0
+                                           else self.header['hookup_types'][hookup_type])
+            entry.columns[port_pol] = list(self.header['columns'][int(row['columns'])])
+            stop = int(row['earliest_stop'])
+            entry.timing[port_pol] = [int(row['latest_start']),
+                                      None if stop == NO_STOP else stop]
+        return entry
+
+    def part_entries(self):
+        """
+        Get the entries each part is in.
+
+        Returns
+        -------
+        dict
+            Keyed on part key (hpn:rev), values are sets of entry keys for the
+            entry's own part and all the parts in its hookups.
+
+        """
+        if self._part_entries is not None:
+            return self._part_entries
+        part_entries = {}
+        conns = self.arrays['connections']
+        up_keys = [cm_utils.make_part_key(hpn.decode('utf-8'), rev.decode('utf-8'))
+                   for hpn, rev in zip(conns['upstream_part'], conns['up_part_rev'])]
+        down_keys = [cm_utils.make_part_key(hpn.decode('utf-8'), rev.decode('utf-8'))
+                     for hpn, rev in zip(conns['downstream_part'], conns['down_part_rev'])]
+        entries = self.arrays['entries']
+        hookup = self.arrays['hookup']
+        for key, rows in self._rows.items():
+            part_entries.setdefault(key, set()).add(key)
+            if key in self._entries:
+                for conns in self._entries[key].hookup.values():
+                    for conn in conns:
+                        for part_key in [
+                                cm_utils.make_part_key(conn.upstream_part, conn.up_part_rev),
+                                cm_utils.make_part_key(conn.downstream_part,
+                                                       conn.down_part_rev)]:
+                            part_entries.setdefault(part_key, set()).add(key)
+                continue
+            for ind in rows:
+                first = int(entries['first'][ind])
+                for conn_ind in hookup[first:first + max(int(entries['count'][ind]), 0)]:
+                    part_entries.setdefault(up_keys[conn_ind], set()).add(key)
+                    part_entries.setdefault(down_keys[conn_ind], set()).add(key)
+        self._part_entries = part_entries
+        return part_entries
+
+    def changed_parts(self, active):
+        """
+        Find the parts that changed between the cache and the active data.
+
+        Parameters
+        ----------
+        active : ActiveData object
+            Active data with the parts and connections loaded.
+
+        Returns
+        -------
+        set
+            Part keys (hpn:rev) of the parts that were added, removed or
+            changed, and of the parts at either end of the connections that
+            were added, removed or changed.
+
+        """
+        parts = self.arrays['parts']
+        cached_parts = set(zip(*[[x.decode('utf-8') for x in parts[field]]
+                                 for field in part_fields],
+                               parts['start_gpstime'].tolist(),
+                               parts['stop_gpstime'].tolist()))
+        current_parts = set(part_tuple(part) for part in active.parts.values())
+        changed = set(cm_utils.make_part_key(part[0], part[1])
+                      for part in cached_parts ^ current_parts)
+        conns = self.arrays['connections']
+        cached_conns = set(zip(*[[x.decode('utf-8') for x in conns[field]]
+                                 for field in connection_fields],
+                               conns['start_gpstime'].tolist(),
+                               conns['stop_gpstime'].tolist()))
+        current_conns = set(connection_tuple(conn)
+                            for ports in active.connections['up'].values()
+                            for conn in ports.values())
+        for conn in cached_conns ^ current_conns:
+            changed.add(cm_utils.make_part_key(conn[0], conn[1]))
+            changed.add(cm_utils.make_part_key(conn[3], conn[4]))
+        return changed
@@ -0,0 +1,268 @@
+#! /usr/bin/env python
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""Interval index to find the CM rows active at any number of dates."""
+
+import numpy as np
+
+# table name: (start column, stop column) of the interval each row is active
+# over. Rows are active for start <= gps < stop, a null stop means the row is
+# still active. Tables without a stop column are active from their start on.
+interval_columns = {
+    'parts': ('start_gpstime', 'stop_gpstime'),
+    'connections': ('start_gpstime', 'stop_gpstime'),
+    'apriori_antenna': ('start_gpstime', 'stop_gpstime'),
+    'part_rosetta': ('start_gpstime', 'stop_gpstime'),
+    'part_info': ('posting_gpstime', None),
+    'geo_location': ('created_gpstime', None),
+}
+
+
+class _Node:
+    """Node of a centered interval tree."""
+
+    def __init__(self, center, inds, starts, stops):
+        self.center = center
+        by_start = np.argsort(starts[inds], kind='stable')
+        self.start_inds = inds[by_start]
+        self.start_vals = starts[self.start_inds]
+        by_stop = np.argsort(-stops[inds], kind='stable')
+        self.stop_inds = inds[by_stop]
+        self.neg_stop_vals = -stops[self.stop_inds]
+        self.left = None
+        self.right = None
+
+
+class IntervalIndex:
+    """
+    Centered interval tree over the rows of a CM table.
+
+    Finding the rows active at one time takes O(log(n) + k) for n rows and k
+    active ones, the tree is built in O(n log(n)).
+
+    Parameters
+    ----------
+    rows : list
+        Table objects to index.
+    start_col : str
+        Name of the attribute with the gps second the row becomes active.
+    stop_col : str or None
+        Name of the attribute with the gps second the row stops being active
+        (None values mean it is still active). If None, rows stay active
+        forever.
+
+    """
+
+    def __init__(self, rows, start_col='start_gpstime', stop_col='stop_gpstime'):
+        self.rows = list(rows)
+        self.starts = np.array([getattr(row, start_col) for row in self.rows],
+                               dtype=float)
+        if stop_col is None:
+            self.stops = np.full(len(self.rows), np.inf)
+        else:
+            self.stops = np.array(
+                [np.inf if getattr(row, stop_col) is None else getattr(row, stop_col)
+                 for row in self.rows], dtype=float)
+        # rows that are never active can't be put in the tree
+        inds = np.nonzero(self.starts < self.stops)[0]
+        self._root = self._build(inds)
+        # the active rows only change at these times
+        stops = self.stops[inds]
+        self.boundaries = np.unique(np.concatenate((self.starts[inds],
+                                                    stops[np.isfinite(stops)])))
+
+    @classmethod
+    def from_table(cls, session, table_class):
+        """
+        Build the index for all rows of a CM table.
+
+        Parameters
+        ----------
+        session : session object
+            Session to query the table with.
+        table_class : class
+            CM table class, its table must be in `interval_columns`.
+
+        Returns
+        -------
+        IntervalIndex
+
+        """
+        if table_class.__tablename__ not in interval_columns:
+            raise ValueError('{} is not a CM table with active intervals, must be '
+                             'one of {}'.format(table_class.__tablename__,
+                                                list(interval_columns)))
+        start_col, stop_col = interval_columns[table_class.__tablename__]
+        return cls(session.query(table_class).all(), start_col, stop_col)
+
+    def _build(self, inds):
+        # Iteratively so that deep trees (e.g. lots of nested intervals) don't
+        # hit the recursion limit. Using the median start as the center puts at
+        # least that row in the node and splits the rest roughly in half.
+        if len(inds) == 0:
+            return None
+        root = None
+        todo = [(inds, None, None)]
+        while todo:
+            node_inds, parent, side = todo.pop()
+            starts = self.starts[node_inds]
+            stops = self.stops[node_inds]
+            center = np.sort(starts)[len(starts) // 2]
+            overlap = (starts <= center) & (stops > center)
+            node = _Node(center, node_inds[overlap], self.starts, self.stops)
+            if parent is None:
+                root = node
+            else:
+                setattr(parent, side, node)
+            left = node_inds[stops <= center]
+            right = node_inds[starts > center]
+            if len(left):
+                todo.append((left, node, 'left'))
+            if len(right):
+                todo.append((right, node, 'right'))
+        return root
+
+    def epoch(self, gps):
+        """
+        Get the number of times the active rows changed up to a time.
+
+        The same rows are active at all times with the same epoch, so it can be
+        used to key things derived from the active rows.
+
+        Parameters
+        ----------
+        gps : float
+            Time in gps seconds.
+
+        Returns
+        -------
+        int
+            Number of interval boundaries at or before gps.
+
+        """
+        return int(np.searchsorted(self.boundaries, gps, side='right'))
+
+    def active_inds(self, gps):
+        """
+        Get the indices (into `rows`) of the rows active at a time.
+
+        Parameters
+        ----------
+        gps : float
+            Time in gps seconds.
+
+        Returns
+        -------
+        array of int
+            Sorted indices of the active rows.
+
+        """
+        found = []
+        node = self._root
+        while node is not None:
+            if gps < node.center:
+                # all rows in this node stop after the center
+                count = np.searchsorted(node.start_vals, gps, side='right')
+                found.append(node.start_inds[:count])
+                node = node.left
+            else:
+                # all rows in this node start before the center
+                count = np.searchsorted(node.neg_stop_vals, -gps, side='left')
+                found.append(node.stop_inds[:count])
+                node = node.right
+        if len(found) == 0:
+            return np.zeros(0, dtype=int)
+        return np.sort(np.concatenate(found))
+
+    def active_at(self, gps):
+        """
+        Get the rows active at a time.
+
+        Parameters
+        ----------
+        gps : float
+            Time in gps seconds.
+
+        Returns
+        -------
+        list
+            Active table objects, in the order they were given.
+
+        """
+        return [self.rows[ind] for ind in self.active_inds(gps)]
+
+    def active_inds_at_times(self, gps_times):
+        """
+        Get the indices of the rows active at each of several times.
+
+        The tree is walked once for all the times, with the searches at each
+        node vectorized over the times that reach it.
+
+        Parameters
+        ----------
+        gps_times : array_like of float
+            Times in gps seconds.
+
+        Returns
+        -------
+        list of array of int
+            Sorted indices of the active rows for each time.
+
+        """
+        gps_times = np.atleast_1d(np.asarray(gps_times, dtype=float))
+        found = [[] for _ in range(len(gps_times))]
+        todo = [(self._root, np.arange(len(gps_times)))]
+        while todo:
+            node, time_inds = todo.pop()
+            if node is None or len(time_inds) == 0:
+                continue
+            times = gps_times[time_inds]
+            below = times < node.center
+            counts = np.searchsorted(node.start_vals, times[below], side='right')
+            for time_ind, count in zip(time_inds[below], counts):
+                found[time_ind].append(node.start_inds[:count])
+            counts = np.searchsorted(node.neg_stop_vals, -times[~below], side='left')
+            for time_ind, count in zip(time_inds[~below], counts):
+                found[time_ind].append(node.stop_inds[:count])
+            todo.append((node.left, time_inds[below]))
+            todo.append((node.right, time_inds[~below]))
+        return [np.sort(np.concatenate(inds)) if len(inds) else np.zeros(0, dtype=int)
+                for inds in found]
+
+    def active_at_times(self, gps_times):
+        """
+        Get the rows active at each of several times.
+
+        Parameters
+        ----------
+        gps_times : array_like of float
+            Times in gps seconds.
+
+        Returns
+        -------
+        list of list
+            Active table objects for each time, in the order they were given.
+
+        """
+        return [[self.rows[ind] for ind in inds]
+                for inds in self.active_inds_at_times(gps_times)]
+
+    def active_mask(self, gps_times):
+        """
+        Get a mask of which rows are active at each of several times.
+
+        Parameters
+        ----------
+        gps_times : array_like of float
+            Times in gps seconds.
+
+        Returns
+        -------
+        array of bool
+            Shape (number of times, number of rows), True where active.
+
+        """
+        gps_times = np.atleast_1d(np.asarray(gps_times, dtype=float))[:, np.newaxis]
+        return (self.starts <= gps_times) & (self.stops > gps_times)
@@ -4,6 +4,7 @@
 
 """Methods for handling locating correlator and various system aspects."""
 
+import hashlib
 import json
 import redis
 import time
@@ -94,10 +95,41 @@ def cminfo_redis_snap(cminfo, redis_info=None):
     return snap_to_ant, ant_to_snap, all_snap_inputs
 
 
-def set_redis_cminfo(redishost=DEFAULT_REDIS_ADDRESS, session=None, testing=False):
+def cminfo_hash(cminfo, redis_info=None):
+    """
+    Get a hash of the content published to redis by set_redis_cminfo.
+
+    Parameters
+    ----------
+    cminfo : dict
+        Dictionary as returned from get_cminfo_correlator()
+    redis_info : None or str
+        The snap hostnames the correlator mappings are made with.
+
+    Returns
+    -------
+    str
+        Hex digest of the sha256 hash of the content.
+
+    """
+    if isinstance(redis_info, bytes):
+        redis_info = redis_info.decode('utf-8')
+    content = json.dumps([cminfo, redis_info], sort_keys=True)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def set_redis_cminfo(redishost=DEFAULT_REDIS_ADDRESS, session=None, testing=False,
+                     force=False):
     """
     Write config info to redis database for the correlator.
 
+    Both hashes are only written when something changed: the key of the cminfo
+    (see cm_sysutils.Handling.get_cminfo_key) and a hash of the content (see
+    `cminfo_hash`) are stored in the cminfo hash as 'cminfo_key' and
+    'cminfo_hash'.  If the key is unchanged nothing is done, otherwise the
+    cminfo is made and both hashes are written in one transaction if its
+    content changed.
+
     Parameters
     ----------
     redishost : None or str
@@ -106,38 +138,60 @@ def set_redis_cminfo(redishost=DEFAULT_REDIS_ADDRESS, session=None, testing=Fals
         Session for hera_mc instance.  None uses default
     testing : bool
         If True, will use the testing_ hash in redis
+    force : bool
+        If True, write the hashes even if nothing changed.
+
+    Returns
+    -------
+    bool
+        True if the hashes were written.
+
     """
     # This is retained so that explicitly providing redishost=None has the desired behavior
     if redishost is None:  # pragma: no cover
         redishost = DEFAULT_REDIS_ADDRESS
     redis_pool = redis.ConnectionPool(host=redishost)
     rsession = redis.Redis(connection_pool=redis_pool)
+    cminfo_hash_name = REDIS_CMINFO_HASH
+    corr_hash_name = REDIS_CORR_HASH
+    if testing:
+        cminfo_hash_name = 'testing_' + REDIS_CMINFO_HASH
+        corr_hash_name = 'testing_' + REDIS_CORR_HASH
 
-    # Write cminfo content into redis (cminfo)
     h = cm_sysutils.Handling(session=session)
+    redis_info = rsession.hget(corr_hash_name, 'snap_host')
+    update_key = json.dumps([h.get_cminfo_key(), cminfo_hash({}, redis_info)])
+    stored_key, stored_hash = rsession.hmget(cminfo_hash_name, ['cminfo_key', 'cminfo_hash'])
+    if not force and stored_key is not None and stored_key.decode('utf-8') == update_key:
+        return False
+
     cminfo = h.get_cminfo_correlator()
+    content_hash = cminfo_hash(cminfo, redis_info)
+    if not force and stored_hash is not None and stored_hash.decode('utf-8') == content_hash:
+        rsession.hset(cminfo_hash_name, 'cminfo_key', update_key)
+        return False
+
+    # cminfo content (cminfo)
     redhkey = {}
     for key, value in cminfo.items():
         redhkey[key] = json.dumps(value)
-    redis_hash = REDIS_CMINFO_HASH
-    if testing:
-        redis_hash = 'testing_' + REDIS_CMINFO_HASH
-    rsession.hmset(redis_hash, redhkey)
-    if testing:
-        rsession.expire(redis_hash, 300)
+    redhkey['cminfo_key'] = update_key
+    redhkey['cminfo_hash'] = content_hash
 
-    # Write correlator mappings to redis (corr:map)
-    redis_hash = REDIS_CORR_HASH
-    if testing:
-        redis_hash = 'testing_' + REDIS_CORR_HASH
-    redis_info = rsession.hget(redis_hash, 'snap_host')
+    # correlator mappings (corr:map)
     snap_to_ant, ant_to_snap, all_snap_inputs = cminfo_redis_snap(cminfo, redis_info=redis_info)
-    redhkey = {}
-    redhkey['snap_to_ant'] = json.dumps(snap_to_ant)
-    redhkey['ant_to_snap'] = json.dumps(ant_to_snap)
-    redhkey['all_snap_inputs'] = json.dumps(all_snap_inputs)
-    redhkey['update_time'] = time.time()
-    redhkey['update_time_str'] = time.ctime(redhkey['update_time'])
-    rsession.hmset(redis_hash, redhkey)
-    if testing:
-        rsession.expire(redis_hash, 300)
+    corrhkey = {}
+    corrhkey['snap_to_ant'] = json.dumps(snap_to_ant)
+    corrhkey['ant_to_snap'] = json.dumps(ant_to_snap)
+    corrhkey['all_snap_inputs'] = json.dumps(all_snap_inputs)
+    corrhkey['update_time'] = time.time()
+    corrhkey['update_time_str'] = time.ctime(corrhkey['update_time'])
+
+    with rsession.pipeline(transaction=True) as pipe:
+        pipe.hmset(cminfo_hash_name, redhkey)
+        pipe.hmset(corr_hash_name, corrhkey)
+        if testing:
+            pipe.expire(cminfo_hash_name, 300)
+            pipe.expire(corr_hash_name, 300)
+        pipe.execute()
+    return True
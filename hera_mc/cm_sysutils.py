@@ -4,10 +4,11 @@
 
 """Methods for handling locating correlator and various system aspects."""
 
+import copy
 from sqlalchemy import func, and_, or_
 import numpy as np
 
-from . import mc, cm_partconnect, cm_utils, cm_sysdef, cm_hookup
+from . import mc, cm_active, cm_partconnect, cm_utils, cm_sysdef, cm_hookup
 from . import geo_handling
 
 
@@ -169,10 +170,50 @@ class Handling:
             station_conn.append(station_info)
         return station_conn
 
+    def get_cminfo_key(self, hookup_type=None):
+        """
+        Get a key that changes whenever the result of get_cminfo_correlator can.
+
+        The cminfo depends on the parts, connections and geo_locations active
+        now.  Within one cm_version those only change when one of their start
+        or stop times is passed, so the key is made of the hookup_type, the
+        latest cm_version update_time and the number of start and stop times
+        up to now in each table.  It only takes a few count queries.
+
+        Parameters
+        ----------
+        hookup_type : str or None
+            Type of hookup used for the cminfo.
+
+        Returns
+        -------
+        str
+            Key for the cminfo.
+
+        """
+        from .cm_transfer import CMVersion
+        from .cm_intervals import interval_columns
+        from . import geo_location
+
+        gps = cm_utils.get_astropytime('now').gps
+        key = [hookup_type, self.session.query(func.max(CMVersion.update_time)).scalar()]
+        for table_class in [cm_partconnect.Parts, cm_partconnect.Connections,
+                            geo_location.GeoLocation]:
+            for col in interval_columns[table_class.__tablename__]:
+                if col is not None:
+                    column = getattr(table_class, col)
+                    key.append(self.session.query(func.count(column))
+                               .filter(column <= gps).scalar())
+        return ':'.join(str(x) for x in key)
+
     def get_cminfo_correlator(self, hookup_type=None):
         """
         Return a dict with info needed by the correlator.
 
+        The cminfo is memoized on the CM snapshot (see cm_active.get_snapshot)
+        keyed on `get_cminfo_key`, so it is only rebuilt when the connected
+        stations or their positions can have changed.  A copy is returned.
+
         Note: This method requires pyuvdata
 
         Parameters
@@ -201,6 +242,15 @@ class Handling:
                 'cofa_lon': longitude of the center-of-array in degrees
                 'cofa_alt': altitude of center-of-array in meters
         """
+        snapshot = cm_active.get_snapshot(self.session)
+        if snapshot is None:
+            return self._get_cminfo_correlator(hookup_type)
+        cminfo = snapshot.cached(('cminfo', self.get_cminfo_key(hookup_type)),
+                                 lambda: self._get_cminfo_correlator(hookup_type))
+        return copy.deepcopy(cminfo)
+
+    def _get_cminfo_correlator(self, hookup_type):
+        """Build the cminfo dict for get_cminfo_correlator."""
         from pyuvdata import utils as uvutils
         from . import cm_handling
 
@@ -410,6 +460,60 @@ class Handling:
         return ','.join(self.get_apriori_antennas_with_status(status=status, at_date=at_date))
 
 
+def snap_serial_index(session, at_date='now'):
+    """
+    Get the node and location of the active SNAPs, keyed on serial number.
+
+    The serial number of a SNAP is its part number.  The index is made from
+    the parts and connections active at_date in one pass and is memoized on
+    the CM snapshot (see cm_active.get_snapshot), so it is only rebuilt when
+    the cm_version changes or a start or stop time of a part or connection is
+    passed.
+
+    Parameters
+    ----------
+    session : session object
+        Session on the database.
+    at_date : str, int, float, Time, datetime
+        Date for the index, anything intelligible to cm_utils.get_astropytime.
+
+    Returns
+    -------
+    dict
+        List of (nodeID, snap_loc_num) for each active revision of the part,
+        both None if it is not connected to a node, keyed on upper case
+        serial number.
+
+    """
+    at_date = cm_utils.get_astropytime(at_date)
+
+    def build():
+        active = cm_active.ActiveData(session, at_date=at_date)
+        active.load_parts()
+        active.load_connections()
+        index = {}
+        for key, part in active.parts.items():
+            if part.hptype.lower() != 'snap':
+                continue
+            location = (None, None)
+            try:
+                rack = active.connections['up'][key]['RACK']
+            except KeyError:
+                pass
+            else:
+                location = (int(rack.downstream_part[1:]),
+                            int(rack.downstream_input_port[3:]))
+            index.setdefault(part.hpn.upper(), []).append(location)
+        return index
+
+    snapshot = cm_active.get_snapshot(session)
+    if snapshot is None:
+        return build()
+    epochs = tuple(snapshot.index(table_class).epoch(at_date.gps)
+                   for table_class in [cm_partconnect.Parts, cm_partconnect.Connections])
+    return snapshot.cached(('snap_serial_index',) + epochs, build)
+
+
 def node_antennas(source='file', session=None):
     """
     Get the antennas associated with nodes.
@@ -447,26 +551,38 @@ def node_antennas(source='file', session=None):
         if isinstance(source, str) and source.lower().startswith('h'):
             source = cm_hookup.Hookup(session=session)
         hu_dict = source.get_hookup(cm_sysdef.hera_zone_prefixes, hookup_type='parts_hera')
-        for this_ant, vna in hu_dict.items():
-            key = vna.hookup['E<ground'][-1].downstream_part
-            if key[0] != 'N':
-                continue
-            ants_per_node.setdefault(key, [])
-            ants_per_node[key].append(cm_utils.split_part_key(this_ant)[0])
+        ants_per_node = _hookup_node_antennas(hu_dict)
+    return ants_per_node
+
+
+def _hookup_node_antennas(hu_dict):
+    """Return the antennas per node of a full array parts_hera hookup dict."""
+    ants_per_node = {}
+    for this_ant, vna in hu_dict.items():
+        key = vna.hookup['E<ground'][-1].downstream_part
+        if key[0] != 'N':
+            continue
+        ants_per_node.setdefault(key, [])
+        ants_per_node[key].append(cm_utils.split_part_key(this_ant)[0])
     return ants_per_node
 
 
 def _get_dict_elements(npk, hu, ele_a, ele_b):
     """Return the appropriate hookup elements for node_info."""
+    try:
+        e_hookup = hu[npk].hookup['@<middle']
+    except KeyError:
+        e_hookup = []
+    return _get_path_elements(e_hookup, ele_a, ele_b)
+
+
+def _get_path_elements(e_hookup, ele_a, ele_b):
+    """Return the parts of the ele_a and ele_b types on a connection path."""
     a = ele_a.lower()
     b = ele_b.lower()
     A = ele_a.upper()
     B = ele_b.upper()
     e_ret = {a: '', b: ''}
-    try:
-        e_hookup = hu[npk].hookup['@<middle']
-    except KeyError:
-        return e_ret
     for element in e_hookup:
         if element.upstream_part.startswith(A):
             e_ret[a] = element.upstream_part
@@ -559,16 +675,23 @@ def formatted__which_node__string(ant_node):
     return print_str
 
 
-def node_info(node_num='active', session=None):
+def node_info(node_num='active', session=None, at_date='now'):
     """
     Generate information per node.
 
+    All nodes are done in one pass over the active parts, connections and
+    notes at_date: the full array hookup gives the antennas, and the SNAPs,
+    white rabbit, arduino and node control module are followed from the
+    node parts on the signal path graphs of the same active data.
+
     Parameters
     ----------
     node_num : list of int or str (can be mixed), or str
         Node numbers, as int or hera part number.
         If 'active', use list of active nodes.
         if 'all', use list of all.
+    at_date : str, int
+        Date for query.  Anything intelligible to cm_utils.get_astropytime.
 
     Returns
     -------
@@ -577,16 +700,35 @@ def node_info(node_num='active', session=None):
     """
     hu = cm_hookup.Hookup(session)
     na_from_file = node_antennas('file', session=session)
-    na_from_hookup = node_antennas(hu, session=session)
+    na_from_hookup = _hookup_node_antennas(hu.get_hookup(
+        cm_sysdef.hera_zone_prefixes, at_date=at_date, hookup_type='parts_hera'))
     if node_num == 'active':
         node_num = sorted(list(na_from_hookup))
     elif node_num == 'all':
         node_num = sorted(list(na_from_file))
+    active = hu.active
+    active.load_info(hu.at_date)
+    keys_by_hpn = {}
+    for key, part in active.parts.items():
+        keys_by_hpn.setdefault(part.hpn.upper(), []).append(key)
+    nodes = ['N{:02d}'.format(x) if isinstance(x, int) else x for x in node_num]
+    # Find snaps (the node parts redirect to them), before following any paths
+    # since that changes the sysdef hookup_type the redirects depend on
+    hu.sysdef.find_hookup_type(part_type=None, hookup_type='parts_hera')
+    snap_keys_by_node = {}
+    for node in nodes:
+        snap_keys = []
+        for key in keys_by_hpn.get(node.upper(), []):
+            part = active.parts[key]
+            if part.hptype in hu.sysdef.redirect_part_types['parts_hera']:
+                for snp in hu.sysdef.handle_redirect_part_types(part, active):
+                    snap_keys.extend(keys_by_hpn.get(snp.upper(), []))
+            else:
+                snap_keys.append(key)
+        snap_keys_by_node[node] = snap_keys
     info = {'nodes': []}
-    for node in node_num:
+    for node in nodes:
         # Set up
-        if isinstance(node, int):
-            node = 'N{:02d}'.format(node)
         npk = cm_utils.make_part_key(node, 'A')
         info['nodes'].append(node)
         info[node] = {}
@@ -599,16 +741,16 @@ def node_info(node_num='active', session=None):
             info[node]['ants-hookup'] = na_from_hookup[node]
         except KeyError:
             info[node]['ants-hookup'] = []
-        # Get hookup info
-        snaps = hu.get_hookup(node, hookup_type='parts_hera')
-        wr = hu.get_hookup(node, hookup_type='wr_hera')
-        rd = hu.get_hookup(node, hookup_type='arduino_hera')
-        # Find snaps
-        info[node]['snaps'] = [cm_utils.split_part_key(x)[0] for x in snaps.keys()]
+        snap_keys = snap_keys_by_node[node]
+        info[node]['snaps'] = [cm_utils.split_part_key(x)[0] for x in snap_keys]
         # Find white rabbit, arduino and node control module
-        wr_ret = _get_dict_elements(npk, wr, 'wr', 'ncm')
+        paths = {'wr_hera': ({}, set()), 'arduino_hera': ({}, set())}
+        if npk in active.parts:
+            for hookup_type in paths:
+                paths[hookup_type] = hu.follow_part(npk, hookup_type)
+        wr_ret = _get_path_elements(paths['wr_hera'][0].get('@<middle', []), 'wr', 'ncm')
         info[node]['wr'] = wr_ret['wr']
-        rd_ret = _get_dict_elements(npk, rd, 'rd', 'ncm')
+        rd_ret = _get_path_elements(paths['arduino_hera'][0].get('@<middle', []), 'rd', 'ncm')
         info[node]['arduino'] = rd_ret['rd']
         info[node]['ncm'] = ''
         if len(wr_ret['ncm']) and len(rd_ret['ncm']) \
@@ -620,31 +762,30 @@ def node_info(node_num='active', session=None):
         elif len(rd_ret['ncm']):  # pragma: no cover
             info[node]['ncm'] = rd_ret['ncm']
 
-        # Get notes
-        notes = hu.get_notes(snaps, state='all', return_dict=True)
-        for snp in info[node]['snaps']:
-            spk = cm_utils.make_part_key(snp, 'A')
-            try:
-                info[snp] = [x['note'] for x in notes[spk][spk].values()]
-            except KeyError:
-                info[snp] = []
-        notes = hu.get_notes(wr, state='all', return_dict=True)
-        wpk = cm_utils.make_part_key(info[node]['wr'], 'A')
-        try:
-            info[info[node]['wr']] = [x['note'] for x in notes[npk][wpk].values()]
-        except KeyError:
-            info[info[node]['wr']] = []
-        notes = hu.get_notes(rd, state='all', return_dict=True)
-        apk = cm_utils.make_part_key(info[node]['arduino'], 'A')
-        try:
-            info[info[node]['arduino']] = [x['note'] for x in notes[npk][apk].values()]
-        except KeyError:
-            info[info[node]['arduino']] = []
+        # Get notes, for the parts on the connection paths of their hookups
+        for snp, key in zip(info[node]['snaps'], snap_keys):
+            snap_paths = hu.follow_part(key, 'parts_hera')[0]
+            info[snp] = []
+            if key == cm_utils.make_part_key(snp, 'A') \
+                    and any(len(x) for x in snap_paths.values()):
+                info[snp] = _notes(active, key)
+        for this_part, hookup_type in [(info[node]['wr'], 'wr_hera'),
+                                       (info[node]['arduino'], 'arduino_hera')]:
+            key = cm_utils.make_part_key(this_part, 'A')
+            info[this_part] = _notes(active, key) if key in paths[hookup_type][1] else []
         if '' in info.keys():
             del info['']
     return info
 
 
+def _notes(active, key):
+    """Return the notes of a part key in the loaded active info, as in get_notes."""
+    notes = {}
+    for entry in active.info.get(key, []):
+        notes[entry.posting_gpstime] = entry.comment.replace('\\n', '\n')
+    return list(notes.values())
+
+
 def _get_macip(info):
     data = []
     for this_note in info:
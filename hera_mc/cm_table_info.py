@@ -15,6 +15,8 @@ cm_tables = {'part_info': [cm_partconnect.PartInfo, 0],
              'geo_location': [geo_location.GeoLocation, 5],
              'station_type': [geo_location.StationType, 6]}
 data_prefix = 'initialization_data_'
+# sha256 checksums of the csv files, written by cm_transfer.package_db_to_csv
+checksum_manifest = data_prefix + 'checksums.sha256'
 
 
 def order_the_tables(unordered_tables=None):
@@ -14,6 +14,8 @@ from math import floor
 import subprocess
 from astropy.time import Time
 import csv
+import io
+import numpy as np
 from sqlalchemy import Column, BigInteger, String
 
 from . import MCDeclarativeBase, mc, cm_table_info, cm_utils, utils
@@ -70,11 +72,24 @@ class CMVersion(MCDeclarativeBase):
         return cls(update_time=time, git_hash=git_hash)
 
 
-def package_db_to_csv(session=None, tables='all'):
+def package_db_to_csv(session=None, tables='all', output_path=None, max_workers=4):
     """
     Get the configuration management tables and package them to csv files.
 
-    The csv files are read by initialize_db_from_csv.
+    The csv files are read by initialize_db_from_csv.  Each table is streamed
+    to its file in primary key order (with COPY TO STDOUT on PostgreSQL, with
+    a chunked cursor otherwise) so the files for the same table contents are
+    byte-identical.  Tables are written concurrently on separate connections
+    if the session is bound to an engine of a server database.  The sha256 of
+    the files are written to the checksum manifest (see `write_checksum_manifest`)
+    which pack_n_go uses to skip unchanged tables.
+
+    The format differs from that of the files previously written with pandas
+    (rows in primary key order, all the table columns in table order, newline
+    line endings and whole numbers without a trailing `.0`, which pandas
+    added to floats and to integers in columns with nulls), so the first
+    packaging rewrites every file once.
+    The files still load with initialize_db_from_csv, which reads both formats.
 
     Parameters
     ----------
@@ -83,6 +98,10 @@ def package_db_to_csv(session=None, tables='all'):
         on the default database is created and used.
     tables: string
         comma-separated list of names of tables to initialize or 'all'.
+    output_path : str or None
+        Directory to write the files to, None for the current directory.
+    max_workers : int
+        Maximum number of tables written at once.
 
     Returns
     -------
@@ -90,52 +109,285 @@ def package_db_to_csv(session=None, tables='all'):
         list of filenames written
 
     """
-    import pandas
+    from concurrent.futures import ThreadPoolExecutor
+    from sqlalchemy.engine import Engine
+
     if session is None:  # pragma: no cover
         db = mc.connect_to_mc_db(None)
         session = db.sessionmaker()
+    if output_path is None:
+        output_path = '.'
 
     data_prefix = cm_table_info.data_prefix
     cm_tables = cm_table_info.cm_tables
 
     if tables == 'all':
-        tables_to_write = cm_tables.keys()
+        tables_to_write = list(cm_tables.keys())
     else:
         tables_to_write = tables.split(',')
 
-    print("Writing packaged files to current directory.")
+    print("Writing packaged files to {}.".format(
+        'current directory' if output_path == '.' else output_path))
     print("--> If packing from qmaster, be sure to use 'cm_pack.py --go' to "
           "copy, commit and log the change.")
     print("    Note:  this works via the hera_cm_db_updates repo.")
     files_written = []
     for table in tables_to_write:
-        data_filename = data_prefix + table + '.csv'
-        table_data = pandas.read_sql_table(table, session.get_bind())
+        data_filename = os.path.join(output_path, data_prefix + table + '.csv')
         print("\tPackaging:  " + data_filename)
-        table_data.to_csv(data_filename, index=False)
         files_written.append(data_filename)
+
+    bind = session.get_bind()
+    if isinstance(bind, Engine) and bind.dialect.name != 'sqlite' and max_workers > 1:
+        def _package(table, data_filename):
+            with bind.connect() as connection:
+                write_table_csv(connection, cm_tables[table][0], data_filename)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_package, table, data_filename)
+                       for table, data_filename in zip(tables_to_write, files_written)]
+            for future in futures:
+                future.result()
+    else:
+        connection = session.connection()
+        for table, data_filename in zip(tables_to_write, files_written):
+            write_table_csv(connection, cm_tables[table][0], data_filename)
+
+    write_checksum_manifest(files_written,
+                            os.path.join(output_path, cm_table_info.checksum_manifest))
     return files_written
 
 
-def pack_n_go(session, cm_csv_path):  # pragma: no cover
+def write_table_csv(connection, table_class, data_filename, chunk_size=10000):
+    """
+    Stream a table to a csv file, ordered on the primary key.
+
+    PostgreSQL writes the file with COPY TO STDOUT, other databases (e.g. SQLite)
+    are read with a cursor in chunks of chunk_size rows and written in the
+    same format: a header, nulls as empty fields, minimal quoting, newline
+    line endings and floats in shortest form (e.g. 2.0 as 2). This is not the
+    format of the files written with pandas before (see `package_db_to_csv`).
+
+    Parameters
+    ----------
+    connection : sqlalchemy Connection
+        Connection to read the table with.
+    table_class : class
+        CM table class to write.
+    data_filename : str
+        Name of the csv file to write.
+    chunk_size : int
+        Number of rows fetched at a time from non PostgreSQL databases.
+
+    """
+    from sqlalchemy import select
+
+    table = table_class.__table__
+    order_by = list(table.primary_key.columns)
+    with open(data_filename, 'wt', newline='') as csvfile:
+        if connection.dialect.name == 'postgresql':
+            quote = connection.dialect.identifier_preparer.quote
+            query = 'SELECT {} FROM {} ORDER BY {}'.format(
+                ', '.join(quote(col.name) for col in table.columns),
+                quote(table.name), ', '.join(quote(col.name) for col in order_by))
+            cursor = connection.connection.cursor()
+            try:
+                cursor.copy_expert('COPY ({}) TO STDOUT WITH (FORMAT csv, HEADER)'.format(
+                    query), csvfile)
+            finally:
+                cursor.close()
+            return
+        writer = csv.writer(csvfile, lineterminator='\n')
+        writer.writerow([col.name for col in table.columns])
+        result = connection.execution_options(stream_results=True).execute(
+            select(list(table.columns)).order_by(*order_by))
+        while True:
+            rows = result.fetchmany(chunk_size)
+            if not rows:
+                break
+            writer.writerows([[_float_text(x) if isinstance(x, float) else x for x in row]
+                              for row in rows])
+
+
+def _float_text(value):
+    """Format a float the way PostgreSQL writes double precision values (below 1e16)."""
+    if np.isnan(value):
+        return 'NaN'
+    if np.isinf(value):
+        return 'Infinity' if value > 0 else '-Infinity'
+    text = repr(value)
+    if text.endswith('.0'):
+        text = text[:-2]
+    if abs(value) >= 1e15 and 'e' not in text:
+        # PostgreSQL switches to exponents one digit earlier than python
+        sign, digits = ('-', text[1:]) if value < 0 else ('', text)
+        whole, _, fraction = digits.partition('.')
+        mantissa = (whole[0] + '.' + whole[1:] + fraction).rstrip('0').rstrip('.')
+        text = '{}{}e+{}'.format(sign, mantissa, len(whole) - 1)
+    return text
+
+
+def file_checksum(filename, blocksize=1 << 20):
+    """
+    Get the sha256 hex digest of a file.
+
+    Parameters
+    ----------
+    filename : str
+        Name of the file.
+    blocksize : int
+        Number of bytes read at a time.
+
+    Returns
+    -------
+    str
+        Hex digest of the sha256 hash of the file contents.
+
+    """
+    import hashlib
+
+    sha = hashlib.sha256()
+    with open(filename, 'rb') as fp:
+        for block in iter(lambda: fp.read(blocksize), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def write_checksum_manifest(filenames, manifest_filename, checksums=None):
+    """
+    Write the checksums of csv files to a manifest in `sha256sum` format.
+
+    The manifest lists the files by their basename, so it can be checked with
+    `sha256sum -c` in its directory.
+
+    Parameters
+    ----------
+    filenames : list of str
+        Files to add to the manifest.
+    manifest_filename : str
+        Name of the manifest file.
+    checksums : dict or None
+        Checksums of other files to list, keyed on basename (e.g. as returned
+        by read_checksum_manifest). Those of `filenames` replace them.
+
+    Returns
+    -------
+    dict
+        The checksums written, keyed on basename.
+
+    """
+    checksums = dict(checksums or {})
+    for filename in filenames:
+        checksums[os.path.basename(filename)] = file_checksum(filename)
+    with open(manifest_filename, 'wt') as fp:
+        for name in sorted(checksums):
+            fp.write('{}  {}\n'.format(checksums[name], name))
+    return checksums
+
+
+def read_checksum_manifest(manifest_filename):
+    """
+    Read a checksum manifest written by write_checksum_manifest.
+
+    Parameters
+    ----------
+    manifest_filename : str
+        Name of the manifest file.
+
+    Returns
+    -------
+    dict
+        The checksums keyed on basename, empty if there is no manifest.
+
+    """
+    checksums = {}
+    if not os.path.exists(manifest_filename):
+        return checksums
+    with open(manifest_filename, 'rt') as fp:
+        for line in fp:
+            if line.strip():
+                checksum, name = line.rstrip('\n').split('  ', 1)
+                checksums[name] = checksum
+    return checksums
+
+
+def changed_csv_files(package_path, cm_csv_path):
+    """
+    Find the packaged csv files that differ from those in the distribution directory.
+
+    The checksums of the packaged files are read from the manifest written by
+    package_db_to_csv, those of the distribution directory from its manifest,
+    or from the file itself if it is not in the manifest.
+
+    Parameters
+    ----------
+    package_path : str
+        Directory package_db_to_csv wrote the files to.
+    cm_csv_path : str
+        Path to csv distribution directory
+
+    Returns
+    -------
+    list of str
+        Basenames of the changed (or new) csv files.
+
+    """
+    manifest = cm_table_info.checksum_manifest
+    packaged = read_checksum_manifest(os.path.join(package_path, manifest))
+    distributed = read_checksum_manifest(os.path.join(cm_csv_path, manifest))
+    changed = []
+    for name, checksum in sorted(packaged.items()):
+        dist_filename = os.path.join(cm_csv_path, name)
+        if name not in distributed and os.path.exists(dist_filename):
+            distributed[name] = file_checksum(dist_filename)
+        if distributed.get(name) != checksum:
+            changed.append(name)
+    return changed
+
+
+def pack_n_go(session, cm_csv_path, package_path='.'):  # pragma: no cover
     """
     Move the csv files to the distribution directory, commit them and update the hash.
 
+    Only the tables whose checksums changed are moved, the others are removed
+    from package_path.  If none changed nothing is committed.
     Puts the new commit hash into the M&C database
 
     Parameters
     ----------
     cm_csv_path : str
         Path to csv distribution directory
+    package_path : str
+        Directory package_db_to_csv wrote the files to.
 
     """
-    # move files over to dist dir
-    cmd = "mv -f *.csv {}".format(cm_csv_path)
-    subprocess.call(cmd, shell=True)
+    import shutil
+
+    manifest = cm_table_info.checksum_manifest
+    package_manifest = os.path.join(package_path, manifest)
+    packaged = read_checksum_manifest(package_manifest)
+    changed = changed_csv_files(package_path, cm_csv_path)
+    for name in packaged:
+        if name not in changed:
+            print("\tUnchanged:  " + name)
+            os.remove(os.path.join(package_path, name))
+    if not len(changed):
+        os.remove(package_manifest)
+        print("No cm tables changed, nothing to commit.")
+        return
+
+    # move files over to dist dir and update its manifest
+    for name in changed:
+        print("\tUpdating:  " + name)
+        shutil.move(os.path.join(package_path, name), os.path.join(cm_csv_path, name))
+    dist_manifest = os.path.join(cm_csv_path, manifest)
+    checksums = read_checksum_manifest(dist_manifest)
+    checksums.update(packaged)
+    write_checksum_manifest([], dist_manifest, checksums=checksums)
+    os.remove(package_manifest)
 
     # commit new csv files
-    cmd = "git -C {} commit -am 'updating csv to repo.'".format(cm_csv_path)
-    subprocess.call(cmd, shell=True)
+    subprocess.call(['git', '-C', cm_csv_path, 'add'] + changed + [manifest])
+    subprocess.call(['git', '-C', cm_csv_path, 'commit', '-m', 'updating csv to repo.'])
 
     # get hash of this commit
     cm_git_hash = cm_utils.get_cm_repo_git_hash(cm_csv_path=cm_csv_path)
@@ -338,22 +590,89 @@ def _initialization(session=None, cm_csv_path=None, tables='all', maindb=False,
     # Initialize tables in reversed order
     for table, data_filename in reversed(use_table):
         cm_utils.log('cm_initialization: ' + data_filename)
-        field_row = True  # This is the first row
-        with open(data_filename, 'rt') as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                table_inst = cm_tables[table][0]()
-                if field_row:
-                    field_name = row
-                    field_row = False
-                else:
-                    for i, r in enumerate(row):
-                        if r == '':
-                            r = None
-                        elif 'gpstime' in field_name[i]:
-                            # Needed since pandas does not have an integer representation
-                            #  of NaN, so it outputs a float, which the database won't allow
-                            r = int(float(r))
-                        setattr(table_inst, field_name[i], r)
-                    session.add(table_inst)
-                    session.commit()
+        table_class = cm_tables[table][0]
+        columns = read_cm_csv(table_class, data_filename)
+        _bulk_insert(session, table_class, columns)
+        session.commit()
+
+    return True
+
+
+def read_cm_csv(table_class, data_filename):
+    """
+    Read a cm csv file into typed columns.
+
+    Empty fields (including missing ones at the end of a row) are None, the
+    numeric columns are converted as whole arrays.  Integer columns are read
+    through floats since pandas writes integer columns with nulls as floats,
+    which the database won't allow.  Fields that are not columns of the table
+    are ignored.
+
+    Parameters
+    ----------
+    table_class : class
+        CM table class the csv file is for.
+    data_filename : str
+        Name of the csv file, as written by package_db_to_csv.
+
+    Returns
+    -------
+    dict
+        Lists of the column values, keyed on column name.
+
+    """
+    with open(data_filename, 'rt') as csvfile:
+        reader = csv.reader(csvfile)
+        field_name = next(reader)
+        rows = [row for row in reader if len(row)]
+    table_columns = table_class.__table__.columns
+    columns = {}
+    for i, name in enumerate(field_name):
+        if name not in table_columns:
+            continue
+        values = [row[i] if i < len(row) else '' for row in rows]
+        try:
+            python_type = table_columns[name].type.python_type
+        except NotImplementedError:  # pragma: no cover
+            python_type = str
+        if python_type not in [int, float]:
+            columns[name] = [None if x == '' else x for x in values]
+            continue
+        array = np.array([x if x != '' else 'nan' for x in values], dtype=float)
+        is_null = np.isnan(array)
+        if python_type is int:
+            array = np.where(is_null, 0, array).astype(np.int64)
+        columns[name] = [None if null else x for x, null in zip(array.tolist(), is_null)]
+    return columns
+
+
+def _bulk_insert(session, table_class, columns, batch_size=10000):
+    """
+    Insert columns of values into a table within the session transaction.
+
+    PostgreSQL loads them with COPY FROM STDIN, other databases (e.g. SQLite)
+    with executemany in batches of batch_size rows.
+
+    """
+    names = list(columns)
+    rows = list(zip(*[columns[name] for name in names]))
+    if not len(rows):
+        return
+    connection = session.connection()
+    if connection.dialect.name == 'postgresql':
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        cursor = connection.connection.cursor()
+        try:
+            quote = connection.dialect.identifier_preparer.quote
+            cursor.copy_expert('COPY {} ({}) FROM STDIN WITH (FORMAT csv)'.format(
+                quote(table_class.__tablename__), ', '.join(quote(x) for x in names)),
+                buffer)
+        finally:
+            cursor.close()
+        return
+    insert = table_class.__table__.insert()
+    for start in range(0, len(rows), batch_size):
+        connection.execute(insert, [dict(zip(names, row))
+                                    for row in rows[start:start + batch_size]])
@@ -14,7 +14,7 @@ import warnings
 import numpy as np
 from astropy.time import Time
 from sqlalchemy import (Column, BigInteger, Integer, Float, Boolean, String,
-                        ForeignKey, ForeignKeyConstraint)
+                        ForeignKey, ForeignKeyConstraint, Index)
 
 from . import MCDeclarativeBase
 # default acclen -- corresponds to a bit under 10 seconds (~9.66 seconds)
@@ -103,6 +103,7 @@ class CorrelatorControlState(MCDeclarativeBase):
     """
 
     __tablename__ = 'correlator_control_state'
+    __table_args__ = (Index('ix_correlator_control_state_state_type_time', 'state_type', 'time'),)
     time = Column(BigInteger, primary_key=True)
     state_type = Column(String, primary_key=True)
     state = Column(Boolean, nullable=False)
@@ -215,6 +216,7 @@ class CorrelatorConfigStatus(MCDeclarativeBase):
     """
 
     __tablename__ = 'correlator_config_status'
+    __table_args__ = (Index('ix_correlator_config_status_config_hash_time', 'config_hash', 'time'),)
     time = Column(BigInteger, primary_key=True)
     config_hash = Column(String,
                          ForeignKey("correlator_config_file.config_hash"),
@@ -282,6 +284,7 @@ class CorrelatorControlCommand(MCDeclarativeBase):
     """
 
     __tablename__ = 'correlator_control_command'
+    __table_args__ = (Index('ix_correlator_control_command_command_time', 'command', 'time'),)
     time = Column(BigInteger, primary_key=True)
     command = Column(String, primary_key=True)
 
@@ -487,7 +490,9 @@ class CorrelatorConfigCommand(MCDeclarativeBase):
     # 'update_config'), but it's required for the Foreign key to work properly
     __table_args__ = (ForeignKeyConstraint(
         ['time', 'command'], ['correlator_control_command.time',
-                              'correlator_control_command.command']), {})
+                              'correlator_control_command.command']),
+        Index('ix_correlator_config_command_config_hash_time', 'config_hash',
+              'time'), {})
 
     @classmethod
     def create(cls, time, config_hash):
@@ -529,6 +534,7 @@ class CorrelatorSoftwareVersions(MCDeclarativeBase):
     """
 
     __tablename__ = 'correlator_software_versions'
+    __table_args__ = (Index('ix_correlator_software_versions_package_time', 'package', 'time'),)
     time = Column(BigInteger, primary_key=True)
     package = Column(String, primary_key=True)
     version = Column(String, nullable=False)
@@ -691,6 +697,8 @@ class SNAPStatus(MCDeclarativeBase):
     """
 
     __tablename__ = 'snap_status'
+    __table_args__ = (Index('ix_snap_status_node_time', 'node', 'time'),
+                      {'postgresql_partition_by': 'RANGE (time)'})
     time = Column(BigInteger, primary_key=True)
     hostname = Column(String, primary_key=True)
     node = Column(Integer)
@@ -859,6 +867,8 @@ class AntennaStatus(MCDeclarativeBase):
     """
 
     __tablename__ = 'antenna_status'
+    __table_args__ = (Index('ix_antenna_status_antenna_number_time', 'antenna_number', 'time'),
+                      {'postgresql_partition_by': 'RANGE (time)'})
     time = Column(BigInteger, primary_key=True)
     antenna_number = Column(Integer, primary_key=True)
     antenna_feed_pol = Column(String, primary_key=True)
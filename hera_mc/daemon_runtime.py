@@ -0,0 +1,263 @@
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""
+Shared runtime for the M&C monitoring daemons.
+
+A daemon is a set of collector tasks, each with its own cadence. The tasks are
+scheduled on a drift-free clock: the n-th run of a task is due at the start
+time plus n intervals, however long the earlier runs took. Due tasks run
+concurrently in a thread pool, each in its own session, so a slow or failing
+task does not delay or roll back the others. The status and latency of every
+run is logged to the daemon_task_status table, along with the daemon_status
+table and (for errors) the subsystem_error table.
+
+"""
+
+import socket
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from math import floor
+
+from astropy.time import Time
+
+
+class DaemonTask(object):
+    """
+    A task run periodically by a `DaemonRuntime`.
+
+    Parameters
+    ----------
+    command : str or callable
+        Name of the MCSession method to call, or a function to call with the
+        session as its first argument.
+    interval : float
+        Seconds between the starts of consecutive runs.
+    timeout : float, optional
+        Seconds after which a run is reported as timed out. Threads cannot be
+        killed, so the run is left to finish, but the task is not started again
+        until it has. Defaults to the interval.
+    name : str, optional
+        Name of the task, defaults to the command (or function) name.
+    kwargs : dict, optional
+        Keyword arguments to call the command with.
+
+    """
+
+    def __init__(self, command, interval=60, timeout=None, name=None, kwargs=None):
+        if interval <= 0:
+            raise ValueError("interval must be positive.")
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be positive or None.")
+        if name is None:
+            name = command if isinstance(command, str) else command.__name__
+        self.command = command
+        self.interval = interval
+        self.timeout = interval if timeout is None else timeout
+        self.name = name
+        self.kwargs = {} if kwargs is None else dict(kwargs)
+
+    def __call__(self, session):
+        """Run the task in the session."""
+        if isinstance(self.command, str):
+            return getattr(session, self.command)(**self.kwargs)
+        return self.command(session, **self.kwargs)
+
+    def next_due(self, due, now):
+        """
+        Get the time of the next run after the one due at `due`.
+
+        This is the next tick of the task's cadence after `now`, so runs that
+        could not be started on time are skipped rather than bunched up.
+
+        Parameters
+        ----------
+        due : float
+            Time the last run was due (on the `time.monotonic` clock).
+        now : float
+            Current time (on the `time.monotonic` clock).
+
+        Returns
+        -------
+        float
+            Time the next run is due.
+
+        """
+        missed = max(floor((now - due) / self.interval), 0)
+        return due + (missed + 1) * self.interval
+
+
+class DaemonRuntime(object):
+    """
+    Run the tasks of a monitoring daemon concurrently on their cadences.
+
+    Parameters
+    ----------
+    db : DB object
+        The M&C database to run the tasks against, as returned by
+        `mc.connect_to_mc_db`.
+    name : str
+        Name of the daemon for the daemon_status and daemon_task_status tables.
+    tasks : list of DaemonTask
+        The tasks to run, their names must be unique.
+    subsystem : str, optional
+        Subsystem name to log errors under in the subsystem_error table,
+        defaults to the daemon name.
+    hostname : str, optional
+        Hostname to log the status under, defaults to this host's name.
+    max_workers : int, optional
+        Maximum number of tasks to run at once, defaults to the number of tasks.
+        Each running task uses a database connection.
+
+    """
+
+    def __init__(self, db, name, tasks, subsystem=None, hostname=None,
+                 max_workers=None):
+        task_names = [task.name for task in tasks]
+        if len(set(task_names)) != len(task_names):
+            raise ValueError("The task names must be unique.")
+        self.db = db
+        self.name = name
+        self.tasks = list(tasks)
+        self.tasks_by_name = dict(zip(task_names, self.tasks))
+        self.subsystem = name if subsystem is None else subsystem
+        self.hostname = socket.gethostname() if hostname is None else hostname
+        self.max_workers = len(self.tasks) if max_workers is None else max_workers
+
+    def _log_status(self, session, task, status, latency, error=None):
+        """Log the status of a run of a task, any failure is printed."""
+        now = Time.now()
+        try:
+            session.add_daemon_status(self.name, self.hostname, now, status)
+            session.add_daemon_task_status(self.name, task.name, self.hostname,
+                                           now, status, latency)
+            if error is not None:
+                session.add_subsystem_error(now, self.subsystem, 2, error)
+            session.commit()
+        except Exception:
+            print('{t} -- error logging status of task {c}'.format(
+                t=time.asctime(), c=task.name), file=sys.stderr)
+            traceback.print_exc(file=sys.stderr)
+            session.rollback()
+
+    def run_task(self, task):
+        """
+        Run a task once in a new session and log its status and latency.
+
+        Parameters
+        ----------
+        task : DaemonTask
+            The task to run.
+
+        Returns
+        -------
+        status : str
+            'good' if the task succeeded, 'errored' if it raised an error.
+        latency : float
+            How long the task took in seconds.
+
+        """
+        start = time.monotonic()
+        with self.db.sessionmaker() as session:
+            status = 'good'
+            traceback_str = None
+            try:
+                task(session)
+                session.commit()
+            except Exception:
+                print('{t} -- error calling command {c}'.format(
+                    t=time.asctime(), c=task.name), file=sys.stderr)
+                traceback.print_exc(file=sys.stderr)
+                traceback_str = traceback.format_exc()
+                session.rollback()
+                status = 'errored'
+            latency = time.monotonic() - start
+            self._log_status(session, task, status, latency, traceback_str)
+        return status, latency
+
+    def _report_timeout(self, task, elapsed):
+        """Log that a task is past its timeout, any failure is printed."""
+        message = 'Task {c} has been running for {e:.1f} s, longer than its timeout of {t} s.'
+        message = message.format(c=task.name, e=elapsed, t=task.timeout)
+        print('{t} -- {m}'.format(t=time.asctime(), m=message), file=sys.stderr)
+        try:
+            with self.db.sessionmaker() as session:
+                self._log_status(session, task, 'errored', elapsed, message)
+        except Exception:
+            print('{t} -- error logging timeout of task {c}'.format(
+                t=time.asctime(), c=task.name), file=sys.stderr)
+            traceback.print_exc(file=sys.stderr)
+
+    def _reap(self, task, future):
+        """Print any error raised by a finished run outside of the task itself."""
+        exc = future.exception()
+        if exc is not None:
+            print('{t} -- error running task {c}'.format(
+                t=time.asctime(), c=task.name), file=sys.stderr)
+            traceback.print_exception(type(exc), exc, exc.__traceback__, file=sys.stderr)
+
+    def run(self, stop_event=None):
+        """
+        Run the tasks on their cadences until stopped.
+
+        All tasks are first run right away. Runs still going when the daemon
+        is stopped are waited for. Errors (e.g. failing to connect to the
+        database) are printed, they do not stop the daemon.
+
+        Parameters
+        ----------
+        stop_event : threading.Event, optional
+            Event to set to stop the daemon. Defaults to running forever.
+
+        """
+        if stop_event is None:
+            stop_event = threading.Event()
+
+        start = time.monotonic()
+        due = {task.name: start for task in self.tasks}
+        # task name: (future, start time, whether the timeout was reported)
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers,
+                                thread_name_prefix=self.name) as executor:
+            while not stop_event.is_set():
+                now = time.monotonic()
+                for task in self.tasks:
+                    try:
+                        if task.name in running:
+                            future, started, reported = running[task.name]
+                            if future.done():
+                                del running[task.name]
+                                self._reap(task, future)
+                            elif not reported and now - started > task.timeout:
+                                self._report_timeout(task, now - started)
+                                running[task.name] = (future, started, True)
+
+                        if now >= due[task.name]:
+                            if task.name in running:
+                                print('{t} -- skipping run of {c}, the last one is still '
+                                      'running'.format(t=time.asctime(), c=task.name),
+                                      file=sys.stderr)
+                            else:
+                                running[task.name] = (
+                                    executor.submit(self.run_task, task), now, False)
+                            due[task.name] = task.next_due(due[task.name], now)
+                    except Exception:
+                        print('{t} -- error scheduling task {c}'.format(
+                            t=time.asctime(), c=task.name), file=sys.stderr)
+                        traceback.print_exc(file=sys.stderr)
+                        # don't retry it until its next tick
+                        if now >= due[task.name]:
+                            due[task.name] = task.next_due(due[task.name], now)
+
+                wakeups = list(due.values()) + [
+                    started + self.tasks_by_name[name].timeout
+                    for name, (_, started, reported) in running.items() if not reported]
+                stop_event.wait(max(min(wakeups) - time.monotonic(), 0))
+
+        # the executor has waited for the runs still going when stopped
+        for name, (future, _, _) in running.items():
+            self._reap(self.tasks_by_name[name], future)
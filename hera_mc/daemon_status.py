@@ -3,7 +3,7 @@
 # Licensed under the 2-clause BSD license.
 
 """
-M&C daemon_status table.
+M&C daemon_status and daemon_task_status tables.
 
 The columns in this module are documented in docs/mc_definition.tex,
 the documentation needs to be kept up to date with any changes.
@@ -11,7 +11,7 @@ the documentation needs to be kept up to date with any changes.
 
 from math import floor
 from astropy.time import Time
-from sqlalchemy import Column, String, BigInteger
+from sqlalchemy import Column, String, BigInteger, Float, Index
 
 from . import MCDeclarativeBase
 
@@ -39,6 +39,7 @@ class DaemonStatus(MCDeclarativeBase):
     """
 
     __tablename__ = 'daemon_status'
+    __table_args__ = (Index('ix_daemon_status_name_time', 'name', 'time'),)
     name = Column(String(32), primary_key=True)
     hostname = Column(String(32), primary_key=True)
     jd = Column(BigInteger, primary_key=True)
@@ -73,3 +74,69 @@ class DaemonStatus(MCDeclarativeBase):
 
         return cls(name=name, hostname=hostname, jd=jd, time=time,
                    status=status)
+
+
+class DaemonTaskStatus(MCDeclarativeBase):
+    """
+    Definition of daemon_task_status table.
+
+    Records the status and latency of each run of the tasks of daemons run
+    with `daemon_runtime.DaemonRuntime`.
+
+    Attributes
+    ----------
+    name : String Column
+        Name of daemon. Part of the primary key.
+    task_name : String Column
+        Name of the task. Part of the primary key.
+    hostname : String Column
+        Hostname where daemon is running. Part of the primary key.
+    time : BigInteger Column
+        GPS time of the end of the run, floored. Part of the primary key.
+    status : String Column
+        Status, one of the values in status_list.
+    latency : Float Column
+        How long the run took in seconds (or had been running, if it timed out).
+
+    """
+
+    __tablename__ = 'daemon_task_status'
+    __table_args__ = (Index('ix_daemon_task_status_name_time', 'name', 'time'),)
+    name = Column(String(32), primary_key=True)
+    task_name = Column(String(64), primary_key=True)
+    hostname = Column(String(32), primary_key=True)
+    time = Column(BigInteger, primary_key=True)
+    status = Column(String(32), nullable=False)
+    latency = Column(Float, nullable=False)
+
+    @classmethod
+    def create(cls, name, task_name, hostname, time, status, latency):
+        """
+        Create a new daemon_task_status object.
+
+        Parameters
+        ----------
+        name : str
+            Name of the daemon
+        task_name : str
+            Name of the task
+        hostname : str
+            Name of server where daemon is running
+        time : astropy time object
+            Time the run ended
+        status : str
+            Status, one of the values in status_list.
+        latency : float
+            How long the run took in seconds.
+
+        """
+        if not isinstance(time, Time):
+            raise ValueError('time must be an astropy Time object')
+        time = floor(time.gps)
+
+        if status not in status_list:
+            raise ValueError('Status must be one of: [{statlist}]'.format(
+                statlist=', '.join(status_list)))
+
+        return cls(name=name, task_name=task_name, hostname=hostname, time=time,
+                   status=status, latency=latency)
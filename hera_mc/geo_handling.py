@@ -11,11 +11,10 @@ Bottom part is the class that does the work.
 
 import copy
 import warnings
-from sqlalchemy import func
-from pyuvdata import utils as uvutils
-from numpy import radians
+from sqlalchemy import func, inspect
+import numpy as np
 
-from . import mc, cm_partconnect, cm_utils, geo_location, cm_sysdef
+from . import mc, cm_active, cm_partconnect, cm_utils, geo_location, cm_sysdef
 
 
 def cofa(session=None):
@@ -294,6 +293,9 @@ class Handling:
         """
         Get GeoLocation objects for a list of station_names.
 
+        The stations are found and their positions converted for all of them
+        at once (see `get_station_positions`).
+
         Parameters
         ----------
         to_find_list :  list of str
@@ -307,26 +309,111 @@ class Handling:
             GeoLocation objects corresponding to station names.
 
         """
-        import cartopy.crs as ccrs
-        latlon_p = ccrs.Geodetic()
-        utm_p = ccrs.UTM(self.hera_zone[0])
-        lat_corr = self.lat_corr[self.hera_zone[1]]
-        locations = []
         self.query_date = cm_utils.get_astropytime(query_date)
+        positions = self.get_station_positions(to_find_list)
+        locations = []
         for station_name in to_find_list:
-            for a in self.session.query(geo_location.GeoLocation).filter(
-                    (func.upper(geo_location.GeoLocation.station_name) == station_name.upper())
-                    & (geo_location.GeoLocation.created_gpstime < self.query_date.gps)):
-                a.gps2Time()
-                a.desc = self.station_types[a.station_type_name]['Description']
-                a.lon, a.lat = latlon_p.transform_point(a.easting, a.northing - lat_corr, utm_p)
-                a.X, a.Y, a.Z = uvutils.XYZ_from_LatLonAlt(radians(a.lat), radians(a.lon),
-                                                           a.elevation)
-                locations.append(copy.copy(a))
-                if self.fp_out is not None and not self.testing:  # pragma: no cover
-                    self.fp_out.write('{}\n'.format(self._loc_line(a)))
+            try:
+                a, position = positions[station_name.upper()]
+            except KeyError:
+                continue
+            if a.created_gpstime >= self.query_date.gps:
+                continue
+            locations.append(self._located(a, position))
         return locations
 
+    def get_station_positions(self, to_find_list=None):
+        """
+        Get the geo_location rows and converted positions of stations.
+
+        The UTM coordinates of all the stations are converted to lon/lat and
+        ECEF X/Y/Z in one vectorized call (see `utm_to_positions`).  If the
+        session can use the CM snapshot (see cm_active.get_snapshot), all the
+        stations in it are converted once and the positions are cached on the
+        snapshot, otherwise the requested stations are loaded in one query.
+
+        Parameters
+        ----------
+        to_find_list : list of str or None
+            Station names to get (case insensitive), or None for all stations.
+
+        Returns
+        -------
+        dict
+            (GeoLocation object, (lon, lat, X, Y, Z)) keyed on the upper case
+            station name.
+
+        """
+        snapshot = cm_active.get_snapshot(self.session)
+        if snapshot is not None:
+            return snapshot.cached(
+                ('geo_positions', tuple(self.hera_zone)),
+                lambda: self._station_positions(snapshot.rows['geo_location']))
+        query = self.session.query(geo_location.GeoLocation)
+        if to_find_list is not None:
+            query = query.filter(func.upper(geo_location.GeoLocation.station_name).in_(
+                [x.upper() for x in to_find_list]))
+        return self._station_positions(query.all())
+
+    def _station_positions(self, rows):
+        """Convert the positions of geo_location rows, keyed on upper case station name."""
+        positions = self.utm_to_positions([a.easting for a in rows],
+                                          [a.northing for a in rows],
+                                          [a.elevation for a in rows])
+        return {a.station_name.upper(): (a, tuple(float(x) for x in position))
+                for a, position in zip(rows, positions)}
+
+    def utm_to_positions(self, easting, northing, elevation):
+        """
+        Convert UTM coordinates in the HERA zone to lon/lat and ECEF.
+
+        Parameters
+        ----------
+        easting : array_like of float
+            UTM eastings in m.
+        northing : array_like of float
+            UTM northings in m.
+        elevation : array_like of float
+            Elevations in m.
+
+        Returns
+        -------
+        array of float
+            Shape (number of positions, 5), with the lon and lat in degrees and
+            the ECEF X, Y and Z in m.
+
+        """
+        import cartopy.crs as ccrs
+        from pyuvdata import utils as uvutils
+        easting = np.asarray(easting, dtype=float)
+        northing = np.asarray(northing, dtype=float)
+        elevation = np.asarray(elevation, dtype=float)
+        if not len(easting):
+            return np.zeros((0, 5))
+        lat_corr = self.lat_corr[self.hera_zone[1]]
+        lonlat = ccrs.Geodetic().transform_points(ccrs.UTM(self.hera_zone[0]), easting,
+                                                  northing - lat_corr)
+        xyz = uvutils.XYZ_from_LatLonAlt(np.radians(lonlat[:, 1]), np.radians(lonlat[:, 0]),
+                                         elevation)
+        return np.column_stack((lonlat[:, :2], np.reshape(xyz, (-1, 3))))
+
+    def _located(self, a, position):
+        """
+        Make a GeoLocation object with the description and position attributes added.
+
+        This is a new (transient) object with the column values of `a`, so the
+        row itself, which may be shared from the CM snapshot, is not changed.
+        """
+        located = geo_location.GeoLocation(
+            **{attr.key: getattr(a, attr.key)
+               for attr in inspect(geo_location.GeoLocation).column_attrs})
+        located.gps2Time()
+        located.desc = self.station_types[a.station_type_name]['Description']
+        located.lon, located.lat, located.X, located.Y, located.Z = position
+        if self.fp_out is not None and not self.testing:  # pragma: no cover
+            self.fp_out.write('{}\n'.format(self._loc_line(located)))
+        return located
+
     def _loc_line(self, loc):
         """
         Return a list or str of the given locations, depending if loc is list or not.
@@ -436,25 +523,13 @@ class Handling:
             Stations types to limit check.
 
         """
-        import cartopy.crs as ccrs
         station_types_to_check = self.parse_station_types_to_check(station_types_to_check)
         dt = query_date.gps
-        latlon_p = ccrs.Geodetic()
-        utm_p = ccrs.UTM(self.hera_zone[0])
-        lat_corr = self.lat_corr[self.hera_zone[1]]
-        found_stations = []
-        for a in self.session.query(geo_location.GeoLocation).filter(
-                geo_location.GeoLocation.created_gpstime >= dt):
-            if a.station_type_name.lower() in station_types_to_check:
-                a.gps2Time()
-                a.desc = self.station_types[a.station_type_name]['Description']
-                a.lon, a.lat = latlon_p.transform_point(a.easting, a.northing - lat_corr, utm_p)
-                a.X, a.Y, a.Z = uvutils.XYZ_from_LatLonAlt(radians(a.lat), radians(a.lon),
-                                                           a.elevation)
-                found_stations.append(copy.copy(a))
-                if self.fp_out is not None and not self.testing:  # pragma: no cover
-                    self.fp_out.write('{}\n'.format(self._loc_line(a)))
-        return found_stations
+        installed = [a for a in self.session.query(geo_location.GeoLocation).filter(
+                     geo_location.GeoLocation.created_gpstime >= dt)
+                     if a.station_type_name.lower() in station_types_to_check]
+        positions = self._station_positions(installed)
+        return [self._located(a, positions[a.station_name.upper()][1]) for a in installed]
 
     def get_antenna_label(self, label_to_show, stn, query_date):
         """
@@ -11,7 +11,8 @@ the documentation needs to be kept up to date with any changes.
 
 from math import floor
 from astropy.time import Time
-from sqlalchemy import Column, ForeignKey, Integer, BigInteger, String, Text, Float
+from sqlalchemy import (Column, ForeignKey, Integer, BigInteger, String, Text, Float,
+                        Index)
 
 from . import MCDeclarativeBase, DEFAULT_MIN_TOL
 from .server_status import ServerStatus
@@ -51,6 +52,8 @@ class LibServerStatus(ServerStatus):
     """
 
     __tablename__ = 'lib_server_status'
+    __table_args__ = (Index('ix_lib_server_status_mc_time_brin', 'mc_time',
+                            postgresql_using='brin'),)
 
 
 class LibStatus(MCDeclarativeBase):
@@ -151,6 +154,7 @@ class LibRAIDStatus(MCDeclarativeBase):
     """
 
     __tablename__ = 'lib_raid_status'
+    __table_args__ = (Index('ix_lib_raid_status_hostname_time', 'hostname', 'time'),)
     time = Column(BigInteger, primary_key=True)
     hostname = Column(String(32), primary_key=True)
     num_disks = Column(Integer, nullable=False)
@@ -204,6 +208,7 @@ class LibRAIDErrors(MCDeclarativeBase):
     """
 
     __tablename__ = 'lib_raid_errors'
+    __table_args__ = (Index('ix_lib_raid_errors_hostname_time', 'hostname', 'time'),)
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     time = Column(BigInteger, nullable=False)
     hostname = Column(String(32), nullable=False)
@@ -258,6 +263,7 @@ class LibRemoteStatus(MCDeclarativeBase):
     """
 
     __tablename__ = 'lib_remote_status'
+    __table_args__ = (Index('ix_lib_remote_status_remote_name_time', 'remote_name', 'time'),)
     time = Column(BigInteger, primary_key=True)
     remote_name = Column(String(32), primary_key=True)
     ping_time = Column(Float, primary_key=True)
@@ -317,6 +323,9 @@ class LibFiles(MCDeclarativeBase):
     """
 
     __tablename__ = 'lib_files'
+    __table_args__ = (Index('ix_lib_files_obsid_time', 'obsid', 'time'),
+                      Index('ix_lib_files_time_brin', 'time',
+                            postgresql_using='brin'),)
     filename = Column(String(256), primary_key=True)
     obsid = Column(BigInteger, ForeignKey('hera_obs.obsid'), nullable=True)
     time = Column(BigInteger, nullable=False)
@@ -11,16 +11,235 @@ your database and configure M&C to find it.
 import os
 import numpy as np
 import warnings
-from math import floor
+from math import floor, ceil
 
-from sqlalchemy import desc, asc
+from sqlalchemy import desc, asc, Integer, Float, Boolean
 from sqlalchemy.orm import Session
-from sqlalchemy.sql.expression import func
+from sqlalchemy.sql.expression import func, literal_column
 from astropy.time import Time, TimeDelta
 
 from .utils import get_iterable
 
 
+_insert_info_cache = {}
+
+
+def _get_insert_info(table_class):
+    """
+    Get the column and primary key information needed for bulk inserts.
+
+    The mapper inspection is only done once per table class, the results are
+    cached for subsequent calls.
+
+    Parameters
+    ----------
+    table_class : class
+        Class specifying a table.
+
+    Returns
+    -------
+    attr_cols : list of tuple of str
+        List of (attribute name, column name) tuples for the mapped columns.
+    pkeys : list of str
+        Names of the primary key columns.
+    non_pkeys : list of str
+        Names of the columns that are not part of the primary key.
+
+    """
+    try:
+        return _insert_info_cache[table_class]
+    except KeyError:
+        from sqlalchemy import inspect
+
+        mapper = inspect(table_class)
+        attr_cols = [(col.key, col.expression.name)
+                     for col in mapper.column_attrs]
+        pkeys = [c.name for c in mapper.primary_key]
+        non_pkeys = [col_name for _, col_name in attr_cols
+                     if col_name not in pkeys]
+        _insert_info_cache[table_class] = (attr_cols, pkeys, non_pkeys)
+
+        return _insert_info_cache[table_class]
+
+
+def _get_insert_statement(table_class, dialect_name, update):
+    """
+    Get an INSERT statement that ignores or updates duplicate rows.
+
+    Parameters
+    ----------
+    table_class : class
+        Class specifying a table to insert into.
+    dialect_name : {'postgresql', 'sqlite'}
+        Name of the database dialect.
+    update : bool
+        If true, update existing rows with the new data, otherwise ignore them.
+
+    Returns
+    -------
+    SQLAlchemy Insert object
+        Statement to execute with a list of row dicts.
+
+    """
+    key = (table_class, dialect_name, update)
+    try:
+        return _insert_info_cache[key]
+    except KeyError:
+        _, pkeys, non_pkeys = _get_insert_info(table_class)
+        table = table_class.__table__
+
+        if dialect_name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+
+            stmt = insert(table)
+            if update and len(non_pkeys) > 0:
+                # The special PostgreSQL insert statement lets us update
+                # existing rows via `ON CONFLICT ... DO UPDATE` syntax.
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=pkeys,
+                    set_={col: stmt.excluded[col] for col in non_pkeys})
+            else:
+                # The special PostgreSQL insert statement lets us ignore
+                # existing rows via `ON CONFLICT ... DO NOTHING` syntax.
+                stmt = stmt.on_conflict_do_nothing(index_elements=pkeys)
+        else:
+            # SQLite has `INSERT OR REPLACE` and `INSERT OR IGNORE`. Every
+            # column is written, so replacing a row is the same as updating it.
+            if update:
+                stmt = table.insert().prefix_with('OR REPLACE')
+            else:
+                stmt = table.insert().prefix_with('OR IGNORE')
+        _insert_info_cache[key] = stmt
+
+        return stmt
+
+
+def _get_psycopg2_insert_sql(table_class, dialect, update):
+    """
+    Get the SQL and row template for a psycopg2 `execute_values` bulk insert.
+
+    Parameters
+    ----------
+    table_class : class
+        Class specifying a table to insert into.
+    dialect : SQLAlchemy Dialect object
+        The PostgreSQL psycopg2 dialect of the current connection.
+    update : bool
+        If true, update existing rows with the new data, otherwise ignore them.
+
+    Returns
+    -------
+    sql : str
+        INSERT statement with a single `%s` placeholder for the VALUES list.
+    template : str
+        Template for a single row, with named placeholders for each column.
+
+    """
+    key = (table_class, 'psycopg2', update)
+    try:
+        return _insert_info_cache[key]
+    except KeyError:
+        attr_cols, _, _ = _get_insert_info(table_class)
+        stmt = _get_insert_statement(table_class, 'postgresql', update)
+        compiled = stmt.compile(
+            dialect=dialect,
+            column_keys=[col_name for _, col_name in attr_cols])
+        template = '(' + compiled.insert_single_values_expr + ')'
+        sql = str(compiled).replace('VALUES ' + template, 'VALUES %s', 1)
+        _insert_info_cache[key] = (sql, template)
+
+        return sql, template
+
+
+def _rows_to_columns(rows, table_class, columns, time_column=None,
+                     output='columns', dtypes=None):
+    """
+    Convert database rows into numpy arrays or a pandas DataFrame.
+
+    Parameters
+    ----------
+    rows : list of tuples
+        Rows returned by the database, with values in the order of columns.
+    table_class : class
+        Class specifying the table the rows are from.
+    columns : list of str
+        Names of the columns in each row.
+    time_column : str
+        Column name holding the time, returned as an int64 array of GPS seconds.
+    output : {'columns', 'dataframe'}
+        Return a dict of numpy arrays keyed on column name ('columns') or a
+        pandas DataFrame ('dataframe').
+    dtypes : dict
+        Numpy dtypes to use for some columns (keyed on column name), overriding
+        the ones derived from the column types.
+
+    Returns
+    -------
+    dict of numpy arrays or pandas DataFrame
+        One array or DataFrame column per table column.
+
+    """
+    table_columns = table_class.__table__.columns
+    values = list(zip(*rows)) if len(rows) > 0 else [()] * len(columns)
+    if dtypes is None:
+        dtypes = {}
+
+    col_dict = {}
+    for col, col_values in zip(columns, values):
+        col_type = table_columns[col].type
+        if col in dtypes:
+            dtype = dtypes[col]
+        elif col == time_column or isinstance(col_type, Integer):
+            dtype = np.int64
+        elif isinstance(col_type, Float):
+            dtype = np.float64
+        elif isinstance(col_type, Boolean):
+            dtype = np.bool_
+        else:
+            dtype = object
+        if dtype is not object and None in col_values:
+            # nullable column with missing values, can't use a numeric type
+            dtype = np.float64 if dtype is not np.bool_ else object
+        col_dict[col] = np.asarray(col_values, dtype=dtype)
+
+    if output == 'dataframe':
+        import pandas as pd
+
+        return pd.DataFrame(col_dict, columns=columns)
+
+    return col_dict
+
+
+def _column_gps(time_attr, time, upper):
+    """
+    Convert an astropy Time into a GPS bound for comparing with a time column.
+
+    Integer time columns hold floored GPS seconds, so the bound is rounded to
+    an int (down for upper bounds, up for lower bounds). Comparing them with a
+    float would make PostgreSQL cast the column, which prevents it from using
+    indexes or pruning table partitions.
+
+    Parameters
+    ----------
+    time_attr : SQLAlchemy column attribute
+        The time column to compare against.
+    time : astropy Time object
+        The time to convert.
+    upper : bool
+        Whether the time is an upper bound.
+
+    Returns
+    -------
+    int or float
+        GPS seconds to compare with the column.
+
+    """
+    gps = time.gps
+    if isinstance(time_attr.type, Integer):
+        return int(floor(gps)) if upper else int(ceil(gps))
+    return gps
+
+
 class MCSession(Session):
     """Primary session object that handles most DB queries."""
 
@@ -105,10 +324,103 @@ class MCSession(Session):
                 item_vals = [str(getattr(item, col)) for col in column_names]
                 the_file.write(', '.join(item_vals) + '\n')
 
+    def _column_statement(self, query, table_class, time_column=None,
+                          columns=None, entity=None):
+        """
+        Convert a query on a table class into a statement on a set of columns.
+
+        Parameters
+        ----------
+        query : query object
+            Query on table_class.
+        table_class : class
+            Class specifying the table that is queried.
+        time_column : str
+            Column name holding the time, always included in the columns.
+        columns : list of str
+            Names of the columns to select. Defaults to all columns.
+        entity : class or aliased class
+            Entity the query selects from, if it is an alias of table_class.
+            Defaults to table_class.
+
+        Returns
+        -------
+        statement : SQLAlchemy Select object
+            Statement selecting the columns with the filtering of the query.
+        columns : list of str
+            Names of the selected columns, in order.
+
+        """
+        table_columns = table_class.__table__.columns
+        if columns is None:
+            columns = table_columns.keys()
+        else:
+            columns = list(get_iterable(columns))
+            for col in columns:
+                if col not in table_columns:
+                    raise ValueError('column {col} is not in table {table}'.format(
+                        col=col, table=table_class.__tablename__))
+            if time_column is not None and time_column not in columns:
+                columns = [time_column] + columns
+
+        if entity is None:
+            entity = table_class
+        query = query.with_entities(*[getattr(entity, col) for col in columns])
+        if self.autoflush:
+            # executing the statement directly does not autoflush
+            self.flush()
+
+        return query.statement, columns
+
+    def _query_to_columns(self, query, table_class, time_column=None,
+                          columns=None, output='columns', entity=None):
+        """
+        Get the results of a query as numpy arrays or a pandas DataFrame.
+
+        Only the requested columns are selected and the rows are read straight
+        from the database cursor, so no table objects are created.
+
+        Parameters
+        ----------
+        query : query object
+            Query on table_class to get the results of.
+        table_class : class
+            Class specifying the table that is queried.
+        time_column : str
+            Column name holding the time, returned as an int64 array of GPS
+            seconds. Always included in the output.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns.
+        output : {'columns', 'dataframe'}
+            Return a dict of numpy arrays keyed on column name ('columns') or a
+            pandas DataFrame ('dataframe').
+        entity : class or aliased class
+            Entity the query selects from, if it is an alias of table_class.
+            Defaults to table_class.
+
+        Returns
+        -------
+        dict of numpy arrays or pandas DataFrame
+            Query results, with one array or DataFrame column per table column.
+
+        """
+        if output not in ['columns', 'dataframe']:
+            raise ValueError('output must be one of "objects", "columns" or '
+                             '"dataframe"')
+
+        statement, columns = self._column_statement(
+            query, table_class, time_column=time_column, columns=columns,
+            entity=entity)
+        rows = self.execute(statement).fetchall()
+
+        return _rows_to_columns(rows, table_class, columns,
+                                time_column=time_column, output=output)
+
     def _time_filter(self, table_class, time_column, most_recent=None,
                      starttime=None, stoptime=None,
                      filter_column=None, filter_value=None,
-                     write_to_file=False, filename=None):
+                     write_to_file=False, filename=None, columns=None,
+                     output='objects'):
         """
         Fiter entries by time, used by most get methods on this object.
 
@@ -149,13 +461,27 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe', the time_column is always
+            included.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame. The time
+            column is returned as int64 GPS seconds for the last two options.
+            Ignored if write_to_file is True.
 
         Returns
         -------
-        list of objects, optional
-            If write_to_file is False: List of objects that match the filtering.
+        list of objects, dict of numpy arrays or DataFrame, optional
+            If write_to_file is False: the records that match the filtering, in
+            the format specified by output.
 
         """
+        if output not in ['objects', 'columns', 'dataframe']:
+            raise ValueError('output must be one of "objects", "columns" or '
+                             '"dataframe"')
+
         if starttime is None and most_recent is None:
             most_recent = True
 
@@ -188,13 +514,13 @@ class MCSession(Session):
                 current_time = Time.now()
                 # get most recent row
                 first_query = query.filter(
-                    time_attr <= current_time.gps).order_by(desc(
-                        time_attr)).limit(1)
+                    time_attr <= _column_gps(time_attr, current_time, True)
+                ).order_by(desc(time_attr)).limit(1)
             else:
                 # get first row after starttime
                 first_query = query.filter(
-                    time_attr >= starttime.gps).order_by(asc(
-                        time_attr)).limit(1)
+                    time_attr >= _column_gps(time_attr, starttime, False)
+                ).order_by(asc(time_attr)).limit(1)
 
             # get the time of the first row
             first_result = first_query.all()
@@ -208,26 +534,335 @@ class MCSession(Session):
                     query = query.order_by(asc(filter_attr))
 
         else:
-            query = query.filter(time_attr.between(starttime.gps, stoptime.gps))
+            query = query.filter(time_attr.between(
+                _column_gps(time_attr, starttime, False),
+                _column_gps(time_attr, stoptime, True)))
             query = query.order_by(time_attr)
             if filter_value is not None:
                 query = query.order_by(asc(filter_attr))
 
         if write_to_file:
             self._write_query_to_file(query, table_class, filename=filename)
+        elif output == 'objects':
+            return query.all()
         else:
+            return self._query_to_columns(query, table_class,
+                                          time_column=time_column,
+                                          columns=columns, output=output)
+
+    def get_latest_per_key(self, table_class, time_column, key_columns,
+                           at_time=None, filter_column=None, filter_value=None,
+                           columns=None, output='objects'):
+        """
+        Get the most recent record for each distinct value of some key columns.
+
+        Unlike the `most_recent` option of the get methods, which only returns
+        records at the single latest time in the table, this returns the
+        latest record for every key (e.g. every antenna_number and
+        antenna_feed_pol, or every node) even if they reported at different
+        times. It is done in a single query, using `DISTINCT ON` on PostgreSQL
+        and a window function on other databases.
+
+        Parameters
+        ----------
+        table_class : class
+            Class specifying a table to query.
+        time_column : str
+            Column name holding the time.
+        key_columns : str or list of str
+            Column name(s) to get the latest record for each value of.
+        at_time : astropy Time object
+            Only consider records at or before this time. Defaults to now.
+        filter_column : str
+            Column name to use as an additional filter (often a part of the
+            primary key).
+        filter_value : str or int
+            Type coresponds to filter_column, usually a string value to require
+            that the filter_column is equal to.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe', the time_column is always
+            included.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
+
+        Returns
+        -------
+        list of objects, dict of numpy arrays or DataFrame
+            One record per key, ordered by the key columns.
+
+        """
+        if output not in ['objects', 'columns', 'dataframe']:
+            raise ValueError('output must be one of "objects", "columns" or '
+                             '"dataframe"')
+
+        if at_time is None:
+            at_time = Time.now()
+        elif not isinstance(at_time, Time):
+            raise ValueError('at_time must be an astropy time object. '
+                             'value was: {t}'.format(t=at_time))
+
+        time_attr = getattr(table_class, time_column)
+        key_attrs = [getattr(table_class, col)
+                     for col in get_iterable(key_columns)]
+
+        query = self.query(table_class).filter(
+            time_attr <= _column_gps(time_attr, at_time, True))
+        if filter_value is not None:
+            filter_attr = getattr(table_class, filter_column)
+            query = query.filter(filter_attr == filter_value)
+
+        if self.bind.dialect.name == 'postgresql':
+            entity = table_class
+            query = query.distinct(*key_attrs).order_by(*key_attrs,
+                                                        desc(time_attr))
+        else:
+            from sqlalchemy.orm import aliased
+
+            row_number = func.row_number().over(
+                partition_by=key_attrs, order_by=desc(time_attr))
+            subquery = query.add_columns(row_number.label('row_number')).subquery()
+            entity = aliased(table_class, subquery)
+            query = self.query(entity).filter(subquery.c.row_number == 1)
+            query = query.order_by(*[getattr(entity, attr.key)
+                                     for attr in key_attrs])
+
+        if output == 'objects':
             return query.all()
+        else:
+            return self._query_to_columns(query, table_class,
+                                          time_column=time_column,
+                                          columns=columns, output=output,
+                                          entity=entity)
+
+    def get_binned(self, table_class, time_column, value_columns, bin_seconds,
+                   starttime, stoptime, agg='mean', group_by=None,
+                   filter_column=None, filter_value=None, output='columns'):
+        """
+        Get time-binned aggregates of some columns, computed in the database.
+
+        The records between starttime and stoptime are put into bins of
+        bin_seconds based on their GPS time (using integer division in SQL) and
+        the value columns are aggregated in each bin (and in each group if
+        group_by is set). Only the aggregated values are sent back, which is
+        much smaller than the raw records for long time ranges.
+
+        Parameters
+        ----------
+        table_class : class
+            Class specifying a table to query.
+        time_column : str
+            Column name holding the time (in integer GPS seconds) to bin on.
+        value_columns : str or list of str
+            Column name(s) to aggregate.
+        bin_seconds : int
+            Bin size in seconds.
+        starttime : astropy Time object
+            Time to look for records after.
+        stoptime : astropy Time object
+            Last time to get records for.
+        agg : {'mean', 'max', 'min', 'last'}
+            Aggregation to use in each bin. 'last' gives the values from the
+            latest record in the bin.
+        group_by : str or list of str
+            Column name(s) to aggregate separately for each value of, e.g.
+            hostname or antenna_number.
+        filter_column : str
+            Column name to use as an additional filter (often a part of the
+            primary key).
+        filter_value : str or int
+            Type coresponds to filter_column, usually a string value to require
+            that the filter_column is equal to.
+        output : {'columns', 'dataframe'}
+            Return a dict of numpy arrays keyed on column name ('columns') or a
+            pandas DataFrame ('dataframe').
+
+        Returns
+        -------
+        dict of numpy arrays or DataFrame
+            Keyed on the time_column (the GPS start time of each bin, as int64),
+            the group_by columns and the value columns. Ordered by time and
+            then by the group_by columns.
+
+        """
+        agg_funcs = {'mean': func.avg, 'max': func.max, 'min': func.min}
+        if agg not in list(agg_funcs.keys()) + ['last']:
+            raise ValueError('agg must be one of "mean", "max", "min" or "last"')
+
+        if output not in ['columns', 'dataframe']:
+            raise ValueError('output must be one of "columns" or "dataframe"')
+
+        if int(bin_seconds) != bin_seconds or bin_seconds < 1:
+            raise ValueError('bin_seconds must be a positive integer')
+        bin_seconds = int(bin_seconds)
+
+        for time_val, time_name in zip([starttime, stoptime],
+                                       ['starttime', 'stoptime']):
+            if not isinstance(time_val, Time):
+                raise ValueError('{name} must be an astropy time object. '
+                                 'value was: {t}'.format(name=time_name,
+                                                         t=time_val))
+
+        value_columns = list(get_iterable(value_columns))
+        if group_by is None:
+            group_by = []
+        else:
+            group_by = list(get_iterable(group_by))
+
+        time_attr = getattr(table_class, time_column)
+        group_attrs = [getattr(table_class, col) for col in group_by]
+        value_attrs = [getattr(table_class, col) for col in value_columns]
+
+        # Use a literal for the bin size so that the expression is identical
+        # in the SELECT and GROUP BY clauses.
+        bin_size = literal_column(str(bin_seconds))
+        time_bin = time_attr / bin_size * bin_size
+
+        filters = [time_attr.between(_column_gps(time_attr, starttime, False),
+                                     _column_gps(time_attr, stoptime, True))]
+        if filter_value is not None:
+            filters.append(getattr(table_class, filter_column) == filter_value)
+
+        if agg == 'last':
+            row_number = func.row_number().over(
+                partition_by=[time_bin] + group_attrs,
+                order_by=desc(time_attr))
+            subquery = self.query(
+                time_bin.label(time_column), *group_attrs, *value_attrs,
+                row_number.label('row_number')).filter(*filters).subquery()
+            group_attrs = [subquery.c[col] for col in group_by]
+            query = self.query(
+                subquery.c[time_column], *group_attrs,
+                *[subquery.c[col] for col in value_columns]).filter(
+                    subquery.c.row_number == 1)
+            query = query.order_by(subquery.c[time_column], *group_attrs)
+        else:
+            query = self.query(
+                time_bin.label(time_column), *group_attrs,
+                *[agg_funcs[agg](attr).label(attr.key) for attr in value_attrs])
+            query = query.filter(*filters).group_by(time_bin, *group_attrs)
+            query = query.order_by(time_bin, *group_attrs)
+
+        dtypes = {time_column: np.int64}
+        if agg == 'mean':
+            dtypes.update({col: np.float64 for col in value_columns})
+
+        return _rows_to_columns(query.all(), table_class,
+                                [time_column] + group_by + value_columns,
+                                time_column=time_column, output=output,
+                                dtypes=dtypes)
+
+    def iter_records(self, table_class, time_column, starttime, stoptime,
+                     filter_column=None, filter_value=None, chunk_size=1000,
+                     columns=None, output='objects'):
+        """
+        Iterate over the records in a time range in bounded chunks.
+
+        This is intended for long time ranges on the large monitoring tables
+        (e.g. antenna_status, node_white_rabbit_status) where loading all the
+        records at once would use too much memory. The records are read with a
+        server-side cursor (on PostgreSQL) and yielded in chunks of at most
+        chunk_size records. Table objects are expunged from the session before
+        they are yielded so the session does not keep them.
+
+        Parameters
+        ----------
+        table_class : class
+            Class specifying a table to query.
+        time_column : str
+            Column name holding the time to filter on.
+        starttime : astropy Time object
+            Time to look for records after.
+        stoptime : astropy Time object
+            Last time to get records for.
+        filter_column : str
+            Column name to use as an additional filter (often a part of the
+            primary key).
+        filter_value : str or int
+            Type coresponds to filter_column, usually a string value to require
+            that the filter_column is equal to.
+        chunk_size : int
+            Maximum number of records in each chunk.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe', the time_column is always
+            included.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of each chunk: a list of table objects, a dict of numpy
+            arrays keyed on column name or a pandas DataFrame.
+
+        Yields
+        ------
+        list of objects, dict of numpy arrays or DataFrame
+            Chunk of records ordered by time, in the format specified by output.
 
-    def _insert_ignoring_duplicates(self, table_class, obj_list, update=False):
+        """
+        if output not in ['objects', 'columns', 'dataframe']:
+            raise ValueError('output must be one of "objects", "columns" or '
+                             '"dataframe"')
+
+        for time_val, time_name in zip([starttime, stoptime],
+                                       ['starttime', 'stoptime']):
+            if not isinstance(time_val, Time):
+                raise ValueError('{name} must be an astropy time object. '
+                                 'value was: {t}'.format(name=time_name,
+                                                         t=time_val))
+
+        time_attr = getattr(table_class, time_column)
+        query = self.query(table_class).filter(
+            time_attr.between(_column_gps(time_attr, starttime, False),
+                              _column_gps(time_attr, stoptime, True)))
+        query = query.order_by(time_attr)
+        if filter_value is not None:
+            filter_attr = getattr(table_class, filter_column)
+            query = query.filter(filter_attr == filter_value)
+            query = query.order_by(asc(filter_attr))
+
+        if output == 'objects':
+            chunk = []
+            for obj in query.yield_per(chunk_size):
+                self.expunge(obj)
+                chunk.append(obj)
+                if len(chunk) == chunk_size:
+                    yield chunk
+                    chunk = []
+            if len(chunk) > 0:
+                yield chunk
+        else:
+            statement, columns = self._column_statement(
+                query, table_class, time_column=time_column, columns=columns)
+            result = self.execute(
+                statement.execution_options(stream_results=True))
+            try:
+                while True:
+                    rows = result.fetchmany(chunk_size)
+                    if len(rows) == 0:
+                        break
+                    yield _rows_to_columns(rows, table_class, columns,
+                                           time_column=time_column,
+                                           output=output)
+            finally:
+                result.close()
+
+    def _insert_ignoring_duplicates(self, table_class, obj_list, update=False,
+                                    batch_size=1000):
         """
         Insert record regardless of duplication.
 
-        If the current database is PostgreSQL, this function will use a
-        special insertion method that will ignore or update records that are
+        If the current database is PostgreSQL or SQLite, this function will use
+        a special insertion method that will ignore or update records that are
         redundant with ones already in the database. This makes it convenient to
         sample certain data (especially redis data) densely on qmaster or to
         update an existing record.
 
+        The rows are sent in batches of up to `batch_size` rows rather than one
+        statement per object (on PostgreSQL with psycopg2 each batch is a single
+        multi-row INSERT). If the same primary key appears more than once in
+        obj_list, the first object is used if update is False and the last
+        object is used if update is True, matching the result of inserting the
+        objects one at a time.
+
         Parameters
         ----------
         table_class : class
@@ -238,46 +873,53 @@ class MCSession(Session):
             If true, update the existing record with the new data, otherwise do
             nothing (which is appropriate if the data is the same because of
             dense sampling).
+        batch_size : int
+            Maximum number of rows to send to the database at once.
 
         """
-        if self.bind.dialect.name == 'postgresql':
-            from sqlalchemy import inspect
-            from sqlalchemy.dialects.postgresql import insert
-
-            ies = [c.name for c in inspect(table_class).primary_key]
-            conn = self.connection()
-
-            for obj in obj_list:
-                # This appears to be the most correct way to map each row
-                # object into a dictionary:
-                values = {}
-                for col in inspect(obj).mapper.column_attrs:
-                    values[col.expression.name] = getattr(obj, col.key)
-
-                if update:
-                    # create dict of columns to update (everything other than
-                    # the primary keys)
-                    update_dict = {}
-                    for col, val in values.items():
-                        if col not in ies:
-                            update_dict[col] = val
-
-                    # The special PostgreSQL insert statement lets us update
-                    # existing rows via `ON CONFLICT ... DO UPDATE` syntax.
-                    stmt = insert(table_class).values(
-                        **values).on_conflict_do_update(
-                            index_elements=ies, set_=update_dict)
-                else:
-                    # The special PostgreSQL insert statement lets us ignore
-                    # existing rows via `ON CONFLICT ... DO NOTHING` syntax.
-                    stmt = insert(table_class).values(
-                        **values).on_conflict_do_nothing(
-                            index_elements=ies)
-                conn.execute(stmt)
-        else:  # pragma: no cover
+        dialect = self.bind.dialect
+        if dialect.name not in ['postgresql', 'sqlite']:  # pragma: no cover
             # Generic approach:
             for obj in obj_list:
                 self.add(obj)
+            return
+
+        if len(obj_list) == 0:
+            return
+
+        attr_cols, pkeys, _ = _get_insert_info(table_class)
+
+        # Map each row object into a dictionary, de-duplicating on the primary
+        # key so that a single statement never touches the same row twice
+        # (PostgreSQL errors on that for `ON CONFLICT ... DO UPDATE`).
+        rows = {}
+        for obj in obj_list:
+            values = {col_name: getattr(obj, attr)
+                      for attr, col_name in attr_cols}
+            key = tuple(values[col] for col in pkeys)
+            if update:
+                rows.pop(key, None)
+                rows[key] = values
+            elif key not in rows:
+                rows[key] = values
+        rows = list(rows.values())
+
+        conn = self.connection()
+        if dialect.name == 'postgresql' and dialect.driver == 'psycopg2':
+            from psycopg2.extras import execute_values
+
+            sql, template = _get_psycopg2_insert_sql(table_class, dialect,
+                                                     update)
+            cursor = conn.connection.cursor()
+            try:
+                execute_values(cursor, sql, rows, template=template,
+                               page_size=batch_size)
+            finally:
+                cursor.close()
+        else:
+            stmt = _get_insert_statement(table_class, dialect.name, update)
+            for start in range(0, len(rows), batch_size):
+                conn.execute(stmt, rows[start:start + batch_size])
 
     def add_obs(self, starttime, stoptime, obsid):
         """
@@ -329,7 +971,8 @@ class MCSession(Session):
         return obs_list
 
     def get_obs_by_time(self, most_recent=None, starttime=None,
-                        stoptime=None, write_to_file=False, filename=None):
+                        stoptime=None, write_to_file=False, filename=None,
+                        columns=None, output='objects'):
         """
         Get observation(s) from the M&C database.
 
@@ -357,17 +1000,25 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of Observation objects.
+        list of Observation objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .observations import Observation
 
         return self._time_filter(Observation, 'obsid', most_recent=most_recent,
                                  starttime=starttime, stoptime=stoptime,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_server_status(self, subsystem, hostname, ip_address, system_time,
                           num_cores, cpu_load_pct, uptime_days, memory_used_pct,
@@ -421,7 +1072,8 @@ class MCSession(Session):
 
     def get_server_status(self, subsystem, most_recent=None,
                           starttime=None, stoptime=None, hostname=None,
-                          write_to_file=False, filename=None):
+                          write_to_file=False, filename=None,
+                          columns=None, output='objects'):
         """
         Get subsystem server_status record(s) from the M&C database.
 
@@ -456,10 +1108,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of ServerStatus objects
+        list of ServerStatus objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         if subsystem == 'rtp':
@@ -473,11 +1132,13 @@ class MCSession(Session):
             ServerStatus, 'mc_time', most_recent=most_recent,
             starttime=starttime, stoptime=stoptime, filter_column='hostname',
             filter_value=hostname, write_to_file=write_to_file,
-            filename=filename)
+            filename=filename,
+            columns=columns, output=output)
 
     def get_rtp_server_status(self, most_recent=None, starttime=None,
                               stoptime=None, hostname=None, write_to_file=False,
-                              filename=None):
+                              filename=None,
+                              columns=None, output='objects'):
         """
         Get rtp_server_status record(s) from the M&C database.
 
@@ -510,19 +1171,28 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of RTPServerStatus objects
+        list of RTPServerStatus objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         return self.get_server_status('rtp', most_recent=None, starttime=None,
                                       stoptime=None, hostname=None,
-                                      write_to_file=False, filename=None)
+                                      write_to_file=False, filename=None,
+                                      columns=columns, output=output)
 
     def get_librarian_server_status(self, most_recent=None, starttime=None,
                                     stoptime=None, hostname=None,
-                                    write_to_file=False, filename=None):
+                                    write_to_file=False, filename=None,
+                                    columns=None, output='objects'):
         """
         Get librarian_server_status record(s) from the M&C database.
 
@@ -555,15 +1225,23 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of LibServerStatus objects
+        list of LibServerStatus objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         return self.get_server_status('lib', most_recent=None, starttime=None,
                                       stoptime=None, hostname=None,
-                                      write_to_file=False, filename=None)
+                                      write_to_file=False, filename=None,
+                                      columns=columns, output=output)
 
     def add_subsystem_error(self, time, subsystem, severity, log,
                             testing=False):
@@ -598,7 +1276,8 @@ class MCSession(Session):
 
     def get_subsystem_error(self, most_recent=None, starttime=None,
                             stoptime=None, subsystem=None,
-                            write_to_file=False, filename=None):
+                            write_to_file=False, filename=None,
+                            columns=None, output='objects'):
         """
         Get subsystem server_status record(s) from the M&C database.
 
@@ -631,10 +1310,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of SubsystemError objects
+        list of SubsystemError objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .subsystem_error import SubsystemError
@@ -643,7 +1329,8 @@ class MCSession(Session):
                                  most_recent=most_recent, starttime=starttime,
                                  stoptime=stoptime, filter_column='subsystem',
                                  filter_value=subsystem,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_daemon_status(self, name, hostname, time, status, testing=False):
         """
@@ -680,7 +1367,8 @@ class MCSession(Session):
 
     def get_daemon_status(self, most_recent=None, starttime=None,
                           stoptime=None, daemon_name=None,
-                          write_to_file=False, filename=None):
+                          write_to_file=False, filename=None,
+                          columns=None, output='objects'):
         """
         Get daemon_status record(s) from the M&C database.
 
@@ -713,10 +1401,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of DaemonStatus objects
+        list of DaemonStatus objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .daemon_status import DaemonStatus
@@ -724,7 +1419,103 @@ class MCSession(Session):
         return self._time_filter(DaemonStatus, 'time', most_recent=most_recent,
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='name', filter_value=daemon_name,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
+
+    def add_daemon_task_status(self, name, task_name, hostname, time, status,
+                               latency, testing=False):
+        """
+        Add a new daemon_task_status to the M&C database.
+
+        If the current database is PostgreSQL, this function will use a
+        special insertion method that will update records that are redundant
+        with ones already in the database.
+
+        Parameters
+        ----------
+        name : str
+            Name of the daemon.
+        task_name : str
+            Name of the task.
+        hostname : str
+            Name of server where daemon is running.
+        time : astropy Time object
+            Time the run of the task ended.
+        status : str
+            Status, one of the values in status_list.
+        latency : float
+            How long the run took in seconds.
+        testing : bool
+            Option to just return the objects rather than adding them to the DB.
+
+        """
+        from .daemon_status import DaemonTaskStatus
+
+        task_status_obj = DaemonTaskStatus.create(name, task_name, hostname, time,
+                                                  status, latency)
+
+        if testing:
+            return task_status_obj
+
+        self._insert_ignoring_duplicates(DaemonTaskStatus, [task_status_obj],
+                                         update=True)
+
+    def get_daemon_task_status(self, most_recent=None, starttime=None,
+                               stoptime=None, daemon_name=None,
+                               write_to_file=False, filename=None,
+                               columns=None, output='objects'):
+        """
+        Get daemon_task_status record(s) from the M&C database.
+
+        Default behavior is to return the most recent record(s) -- there can be
+        more than one if there are multiple records at the same time. If
+        starttime is set but stoptime is not, this method will return the first
+        record(s) after the starttime -- again there can be more than one if
+        there are multiple records at the same time. If you want a range of
+        times you need to set both startime and stoptime. If most_recent is set,
+        startime and stoptime are ignored.
+
+        Parameters
+        ----------
+        most_recent : bool
+            If True, get most recent record. Defaults to True if starttime is
+            None.
+        starttime : astropy Time object
+            Time to look for records after. Ignored if most_recent is True,
+            required if most_recent is False.
+        stoptime : astropy Time object
+            Last time to get records for, only used if starttime is not None.
+            If none, only the first record after starttime will be returned.
+            Ignored if most_recent is True.
+        daemon_name : str
+            Name of daemon to get records for. If none, all daemons will be
+            included.
+        write_to_file : bool
+            Option to write records to a CSV file.
+        filename : str
+            Name of file to write to. If not provided, defaults to a file in the
+            current directory named based on the table name.
+            Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
+
+        Returns
+        -------
+        list of DaemonTaskStatus objects, dict of numpy arrays or DataFrame
+            Format depends on output.
+
+        """
+        from .daemon_status import DaemonTaskStatus
+
+        return self._time_filter(DaemonTaskStatus, 'time', most_recent=most_recent,
+                                 starttime=starttime, stoptime=stoptime,
+                                 filter_column='name', filter_value=daemon_name,
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_lib_status(self, time, num_files, data_volume_gb, free_space_gb,
                        upload_min_elapsed, num_processes, git_version,
@@ -759,7 +1550,8 @@ class MCSession(Session):
                                   num_processes, git_version, git_hash))
 
     def get_lib_status(self, most_recent=None, starttime=None, stoptime=None,
-                       hostname=None, write_to_file=False, filename=None):
+                       hostname=None, write_to_file=False, filename=None,
+                       columns=None, output='objects'):
         """
         Get lib_status record(s) from the M&C database.
 
@@ -792,17 +1584,25 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of LibStatus objects
+        list of LibStatus objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .librarian import LibStatus
 
         return self._time_filter(LibStatus, 'time', most_recent=most_recent,
                                  starttime=starttime, stoptime=stoptime,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_lib_raid_status(self, time, hostname, num_disks, info):
         """
@@ -826,7 +1626,8 @@ class MCSession(Session):
 
     def get_lib_raid_status(self, most_recent=None, starttime=None,
                             stoptime=None, hostname=None, write_to_file=False,
-                            filename=None):
+                            filename=None,
+                            columns=None, output='objects'):
         """
         Get lib_raid_status record(s) from the M&C database.
 
@@ -859,10 +1660,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of LibRAIDStatus objects
+        list of LibRAIDStatus objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .librarian import LibRAIDStatus
@@ -871,7 +1679,8 @@ class MCSession(Session):
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='hostname',
                                  filter_value=hostname,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_lib_raid_error(self, time, hostname, disk, log):
         """
@@ -895,7 +1704,8 @@ class MCSession(Session):
 
     def get_lib_raid_error(self, most_recent=None, starttime=None,
                            stoptime=None, hostname=None, write_to_file=False,
-                           filename=None):
+                           filename=None,
+                           columns=None, output='objects'):
         """
         Get lib_raid_error record(s) from the M&C database.
 
@@ -928,10 +1738,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of LibRAIDErrors objects
+        list of LibRAIDErrors objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .librarian import LibRAIDErrors
@@ -940,7 +1757,8 @@ class MCSession(Session):
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='hostname',
                                  filter_value=hostname,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_lib_remote_status(self, time, remote_name, ping_time,
                               num_file_uploads, bandwidth_mbs):
@@ -968,7 +1786,8 @@ class MCSession(Session):
 
     def get_lib_remote_status(self, most_recent=None, starttime=None,
                               stoptime=None, remote_name=None,
-                              write_to_file=False, filename=None):
+                              write_to_file=False, filename=None,
+                              columns=None, output='objects'):
         """
         Get lib_remote_status record(s) from the M&C database.
 
@@ -1001,10 +1820,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of LibRemoteStatus objects
+        list of LibRemoteStatus objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .librarian import LibRemoteStatus
@@ -1013,7 +1839,8 @@ class MCSession(Session):
                                  most_recent=most_recent, starttime=starttime,
                                  stoptime=stoptime, filter_column='remote_name',
                                  filter_value=remote_name,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_lib_file(self, filename, obsid, time, size_gb):
         """
@@ -1037,7 +1864,8 @@ class MCSession(Session):
 
     def get_lib_files(self, filename=None, obsid=None, most_recent=None,
                       starttime=None, stoptime=None, write_to_file=False,
-                      write_filename=None):
+                      write_filename=None, columns=None,
+                      output='objects'):
         """
         Get lib_files record(s) from the M&C database.
 
@@ -1072,10 +1900,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of LibFiles objects
+        list of LibFiles objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .librarian import LibFiles
@@ -1092,7 +1927,8 @@ class MCSession(Session):
                                          filter_column='obsid',
                                          filter_value=obsid,
                                          write_to_file=write_to_file,
-                                         filename=write_filename)
+                                         filename=write_filename,
+                                         columns=columns, output=output)
             else:
                 if obsid is not None:
                     query = self.query(LibFiles).filter(
@@ -1102,8 +1938,11 @@ class MCSession(Session):
 
         if write_to_file:
             self._write_query_to_file(query, LibFiles, filename=write_filename)
-        else:
+        elif output == 'objects':
             return query.all()
+        else:
+            return self._query_to_columns(query, LibFiles, time_column='time',
+                                          columns=columns, output=output)
 
     def add_rtp_status(self, time, status, event_min_elapsed, num_processes,
                        restart_hours_elapsed):
@@ -1130,7 +1969,8 @@ class MCSession(Session):
                                   num_processes, restart_hours_elapsed))
 
     def get_rtp_status(self, most_recent=None, starttime=None, stoptime=None,
-                       write_to_file=False, filename=None):
+                       write_to_file=False, filename=None,
+                       columns=None, output='objects'):
         """
         Get rtp_status record(s) from the M&C database.
 
@@ -1158,17 +1998,25 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of RTPStatus objects
+        list of RTPStatus objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .rtp import RTPStatus
 
         return self._time_filter(RTPStatus, 'time', most_recent=most_recent,
                                  starttime=starttime, stoptime=stoptime,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_rtp_process_event(self, time, obsid, event):
         """
@@ -1190,7 +2038,8 @@ class MCSession(Session):
 
     def get_rtp_process_event(self, most_recent=None, starttime=None,
                               stoptime=None, obsid=None,
-                              write_to_file=False, filename=None):
+                              write_to_file=False, filename=None,
+                              columns=None, output='objects'):
         """
         Get rtp_process_event record(s) from the M&C database.
 
@@ -1222,10 +2071,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of RTPProcessEvent objects
+        list of RTPProcessEvent objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .rtp import RTPProcessEvent
@@ -1234,7 +2090,8 @@ class MCSession(Session):
                                  most_recent=most_recent, starttime=starttime,
                                  stoptime=stoptime, filter_column='obsid',
                                  filter_value=obsid,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_rtp_process_record(self, time, obsid, pipeline_list,
                                rtp_git_version, rtp_git_hash,
@@ -1282,7 +2139,8 @@ class MCSession(Session):
 
     def get_rtp_process_record(self, most_recent=None, starttime=None,
                                stoptime=None, obsid=None, write_to_file=False,
-                               filename=None):
+                               filename=None,
+                               columns=None, output='objects'):
         """
         Get rtp_process_record record(s) from the M&C database.
 
@@ -1314,10 +2172,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of RTPProcessEvent objects
+        list of RTPProcessEvent objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .rtp import RTPProcessRecord
@@ -1326,7 +2191,8 @@ class MCSession(Session):
                                  most_recent=most_recent,
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='obsid', filter_value=obsid,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_rtp_task_resource_record(self, obsid, task_name, start_time,
                                      stop_time, max_memory=None,
@@ -1357,7 +2223,8 @@ class MCSession(Session):
 
     def get_rtp_task_resource_record(self, most_recent=None, starttime=None,
                                      stoptime=None, obsid=None, task_name=None,
-                                     write_to_file=False, filename=None):
+                                     write_to_file=False, filename=None,
+                                     columns=None, output='objects'):
         """
         Get rtp_task_resource_record from the M&C database.
 
@@ -1396,10 +2263,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of RTPTaskResourceRecord objects
+        list of RTPTaskResourceRecord objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .rtp import RTPTaskResourceRecord
@@ -1420,10 +2294,16 @@ class MCSession(Session):
                                          filter_column='obsid',
                                          filter_value=obsid,
                                          write_to_file=write_to_file,
-                                         filename=filename)
+                                         filename=filename,
+                                         columns=columns, output=output)
             elif obsid is not None:
-                return self.query(RTPTaskResourceRecord).filter(
-                    RTPTaskResourceRecord.obsid == obsid).all()
+                query = self.query(RTPTaskResourceRecord).filter(
+                    RTPTaskResourceRecord.obsid == obsid)
+                if output == 'objects':
+                    return query.all()
+                return self._query_to_columns(
+                    query, RTPTaskResourceRecord, time_column='start_time',
+                    columns=columns, output=output)
 
         elif obsid is None:
             return self._time_filter(RTPTaskResourceRecord, 'start_time',
@@ -1433,7 +2313,8 @@ class MCSession(Session):
                                      filter_column='task_name',
                                      filter_value=task_name,
                                      write_to_file=write_to_file,
-                                     filename=filename)
+                                     filename=filename,
+                                     columns=columns, output=output)
         else:
             query = self.query(RTPTaskResourceRecord).filter(
                 RTPTaskResourceRecord.obsid == obsid,
@@ -1442,9 +2323,12 @@ class MCSession(Session):
             if write_to_file:
                 self._write_query_to_file(query, RTPTaskResourceRecord,
                                           filename=filename)
-
-            else:
+            elif output == 'objects':
                 return query.all()
+            else:
+                return self._query_to_columns(
+                    query, RTPTaskResourceRecord, time_column='start_time',
+                    columns=columns, output=output)
 
     def add_weather_data(self, time, variable, value):
         """
@@ -1502,7 +2386,8 @@ class MCSession(Session):
             self.add(obj)
 
     def get_weather_data(self, most_recent=None, starttime=None, stoptime=None,
-                         variable=None, write_to_file=False, filename=None):
+                         variable=None, write_to_file=False, filename=None,
+                         columns=None, output='objects'):
         """
         Get weather_data record(s) from the M&C database.
 
@@ -1536,10 +2421,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        if write_to_file is False: list of WeatherData objects
+        if write_to_file is False: list of WeatherData objects,
+            dict of numpy arrays or DataFrame depending on output.
 
         """
         from .weather import weather_sensor_dict, WeatherData
@@ -1552,7 +2444,8 @@ class MCSession(Session):
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='variable',
                                  filter_value=variable,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_node_sensor_readings(self, time, nodeID, top_sensor_temp,
                                  middle_sensor_temp, bottom_sensor_temp,
@@ -1584,7 +2477,8 @@ class MCSession(Session):
                                    middle_sensor_temp, bottom_sensor_temp,
                                    humidity_sensor_temp, humidity))
 
-    def add_node_sensor_readings_from_nodecontrol(self):
+    def add_node_sensor_readings_from_nodecontrol(self, node_list=None,
+                                                  sensor_dict=None):
         """
         Get and add node sensor information using a nodeControl object.
 
@@ -1596,16 +2490,27 @@ class MCSession(Session):
         with ones already in the database. This makes it convenient to sample
         the node sensor data densely on qmaster.
 
+        Parameters
+        ----------
+        node_list : list of int
+            A list of integers specifying which nodes to get data for,
+            primarily for testing purposes. If None, get_node_list() is called.
+        sensor_dict : dict
+            A dict containing info as in the return dict from _get_sensor_dict()
+            for testing purposes. If None, _get_sensor_dict() is called.
+
         """
         from .node import create_sensor_readings, NodeSensor
 
-        node_sensor_list = create_sensor_readings()
+        node_sensor_list = create_sensor_readings(node_list=node_list,
+                                                  sensor_dict=sensor_dict)
 
         self._insert_ignoring_duplicates(NodeSensor, node_sensor_list)
 
     def get_node_sensor_readings(self, most_recent=None, starttime=None,
                                  stoptime=None, nodeID=None,
-                                 write_to_file=False, filename=None):
+                                 write_to_file=False, filename=None,
+                                 columns=None, output='objects'):
         """
         Get node_sensor record(s) from the M&C database.
 
@@ -1637,10 +2542,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        if write_to_file is False: list of NodeSensor objects
+        if write_to_file is False: list of NodeSensor objects,
+            dict of numpy arrays or DataFrame depending on output.
 
         """
         from .node import NodeSensor
@@ -1648,7 +2560,8 @@ class MCSession(Session):
         return self._time_filter(NodeSensor, 'time', most_recent=most_recent,
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='node', filter_value=nodeID,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_node_power_status(self, time, nodeID, snap_relay_powered,
                               snap0_powered, snap1_powered, snap2_powered,
@@ -1685,7 +2598,8 @@ class MCSession(Session):
                                         snap2_powered, snap3_powered,
                                         fem_powered, pam_powered))
 
-    def add_node_power_status_from_nodecontrol(self):
+    def add_node_power_status_from_nodecontrol(self, node_list=None,
+                                               power_dict=None):
         """
         Get and add node power status information using a nodeControl object.
 
@@ -1697,16 +2611,27 @@ class MCSession(Session):
         with ones already in the database. This makes it convenient to sample
         the node power status data densely on qmaster.
 
+        Parameters
+        ----------
+        node_list : list of int
+            A list of integers specifying which nodes to get data for,
+            primarily for testing purposes. If None, get_node_list() is called.
+        power_dict : dict
+            A dict containing info as in the return dict from _get_power_dict()
+            for testing purposes. If None, _get_power_dict() is called.
+
         """
         from .node import create_power_status, NodePowerStatus
 
-        node_power_list = create_power_status()
+        node_power_list = create_power_status(node_list=node_list,
+                                              power_dict=power_dict)
 
         self._insert_ignoring_duplicates(NodePowerStatus, node_power_list)
 
     def get_node_power_status(self, most_recent=None, starttime=None,
                               stoptime=None, nodeID=None, write_to_file=False,
-                              filename=None):
+                              filename=None,
+                              columns=None, output='objects'):
         """
         Get node power status record(s) from the M&C database.
 
@@ -1738,10 +2663,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of NodePowerStatus objects
+        list of NodePowerStatus objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .node import NodePowerStatus
@@ -1750,7 +2682,8 @@ class MCSession(Session):
                                  most_recent=most_recent, starttime=starttime,
                                  stoptime=stoptime, filter_column='node',
                                  filter_value=nodeID,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def node_power_command(self, nodeID, part, command, nodeServerAddress=None,
                            dryrun=False, testing=False):
@@ -1888,7 +2821,8 @@ class MCSession(Session):
 
     def get_node_power_command(self, most_recent=None, starttime=None,
                                stoptime=None, nodeID=None,
-                               write_to_file=False, filename=None):
+                               write_to_file=False, filename=None,
+                               columns=None, output='objects'):
         """
         Get node power command record(s) from the M&C database.
 
@@ -1920,10 +2854,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of NodePowerCommand objects
+        list of NodePowerCommand objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .node import NodePowerCommand
@@ -1932,7 +2873,8 @@ class MCSession(Session):
                                  most_recent=most_recent,
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='node', filter_value=nodeID,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_node_white_rabbit_status(self, col_dict):
         """
@@ -2084,7 +3026,8 @@ class MCSession(Session):
 
         self.add(NodeWhiteRabbitStatus.create(col_dict))
 
-    def add_node_white_rabbit_status_from_nodecontrol(self):
+    def add_node_white_rabbit_status_from_nodecontrol(self, node_list=None,
+                                                      wr_status_dict=None):
         """
         Get and add node white rabbit information using a nodeControl object.
 
@@ -2096,16 +3039,27 @@ class MCSession(Session):
         with ones already in the database. This makes it convenient to sample
         the node white rabbit data densely on qmaster.
 
+        Parameters
+        ----------
+        node_list : list of int
+            A list of integers specifying which nodes to get data for,
+            primarily for testing purposes. If None, get_node_list() is called.
+        wr_status_dict : dict
+            A dict containing info as in the return dict from _get_wr_status_dict()
+            for testing purposes. If None, _get_wr_status_dict() is called.
+
         """
         from .node import create_wr_status, NodeWhiteRabbitStatus
 
-        node_wr_status_list = create_wr_status()
+        node_wr_status_list = create_wr_status(node_list=node_list,
+                                               wr_status_dict=wr_status_dict)
 
         self._insert_ignoring_duplicates(NodeWhiteRabbitStatus, node_wr_status_list)
 
     def get_node_white_rabbit_status(self, most_recent=None, starttime=None,
                                      stoptime=None, nodeID=None,
-                                     write_to_file=False, filename=None):
+                                     write_to_file=False, filename=None,
+                                     columns=None, output='objects'):
         """
         Get node_white_rabbit_status record(s) from the M&C database.
 
@@ -2137,10 +3091,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        if write_to_file is False: list of NodeWhiteRabbitStatus objects
+        if write_to_file is False: list of NodeWhiteRabbitStatus objects,
+            dict of numpy arrays or DataFrame depending on output.
 
         """
         from .node import NodeWhiteRabbitStatus
@@ -2149,7 +3110,8 @@ class MCSession(Session):
                                  most_recent=most_recent,
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='node', filter_value=nodeID,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_correlator_control_state(self, time, state_type, state):
         """
@@ -2172,7 +3134,8 @@ class MCSession(Session):
 
     def get_correlator_control_state(self, most_recent=None, starttime=None,
                                      stoptime=None, state_type=None,
-                                     write_to_file=False, filename=None):
+                                     write_to_file=False, filename=None,
+                                     columns=None, output='objects'):
         """
         Get correlator control state record(s) from the M&C database.
 
@@ -2205,10 +3168,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of CorrelatorControlState objects
+        list of CorrelatorControlState objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .correlator import CorrelatorControlState
@@ -2218,7 +3188,8 @@ class MCSession(Session):
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='state_type',
                                  filter_value=state_type,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_correlator_control_state_from_corrcm(self, corr_state_dict=None,
                                                  testing=False):
@@ -2346,7 +3317,8 @@ class MCSession(Session):
 
     def get_correlator_config_status(self, most_recent=None, starttime=None,
                                      config_hash=None, stoptime=None,
-                                     write_to_file=False, filename=None):
+                                     write_to_file=False, filename=None,
+                                     columns=None, output='objects'):
         """
         Get correlator config status record(s) from the M&C database.
 
@@ -2378,10 +3350,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of CorrelatorConfigStatus objects
+        list of CorrelatorConfigStatus objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .correlator import CorrelatorConfigStatus
@@ -2390,7 +3369,8 @@ class MCSession(Session):
                                  most_recent=most_recent, starttime=starttime,
                                  stoptime=stoptime, filter_column='config_hash',
                                  filter_value=config_hash,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def _add_config_file_to_librarian(self, config, config_hash,
                                       librarian_filename):  # pragma: no cover
@@ -2517,7 +3497,8 @@ class MCSession(Session):
 
     def get_correlator_control_command(self, most_recent=None, starttime=None,
                                        stoptime=None, command=None,
-                                       write_to_file=False, filename=None):
+                                       write_to_file=False, filename=None,
+                                       columns=None, output='objects'):
         """
         Get correlator control command record(s) from the M&C database.
 
@@ -2550,10 +3531,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of CorrelatorControlCommand objects
+        list of CorrelatorControlCommand objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .correlator import CorrelatorControlCommand
@@ -2562,12 +3550,14 @@ class MCSession(Session):
                                  most_recent=most_recent,
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='command', filter_value=command,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def get_correlator_take_data_arguments(self, use_command_time=False,
                                            most_recent=None, starttime=None,
                                            stoptime=None, write_to_file=False,
-                                           filename=None):
+                                           filename=None,
+                                           columns=None, output='objects'):
         """
         Get correlator take_data arguments record(s) from the M&C database.
 
@@ -2603,10 +3593,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of CorrelatorTakeDataArguments objects
+        list of CorrelatorTakeDataArguments objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .correlator import CorrelatorTakeDataArguments
@@ -2619,12 +3616,14 @@ class MCSession(Session):
         return self._time_filter(CorrelatorTakeDataArguments, time_column,
                                  most_recent=most_recent, starttime=starttime,
                                  stoptime=stoptime, write_to_file=write_to_file,
-                                 filename=filename)
+                                 filename=filename,
+                                 columns=columns, output=output)
 
     def get_correlator_config_command(self, most_recent=None, starttime=None,
                                       config_hash=None, stoptime=None,
                                       state_type=None, write_to_file=False,
-                                      filename=None):
+                                      filename=None,
+                                      columns=None, output='objects'):
         """
         Get correlator config command record(s) from the M&C database.
 
@@ -2656,10 +3655,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of CorrelatorConfigCommand objects
+        list of CorrelatorConfigCommand objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .correlator import CorrelatorConfigCommand
@@ -2669,7 +3675,8 @@ class MCSession(Session):
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='config_hash',
                                  filter_value=config_hash,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def correlator_control_command(self, command, starttime=None, duration=None,
                                    acclen_spectra=None, tag=None,
@@ -3020,7 +4027,8 @@ class MCSession(Session):
 
     def get_correlator_software_versions(self, most_recent=None, starttime=None,
                                          stoptime=None, package=None,
-                                         write_to_file=False, filename=None):
+                                         write_to_file=False, filename=None,
+                                         columns=None, output='objects'):
         """
         Get correlator software versions record(s) from the M&C database.
 
@@ -3052,10 +4060,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of CorrelatorSoftwareVersions objects
+        list of CorrelatorSoftwareVersions objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .correlator import CorrelatorSoftwareVersions
@@ -3064,7 +4079,8 @@ class MCSession(Session):
                                  most_recent=most_recent,
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='package', filter_value=package,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_snap_config_version(self, init_time, version, init_args,
                                 config_hash):
@@ -3092,7 +4108,8 @@ class MCSession(Session):
 
     def get_snap_config_version(self, most_recent=None, starttime=None,
                                 stoptime=None, write_to_file=False,
-                                filename=None):
+                                filename=None,
+                                columns=None, output='objects'):
         """
         Get SNAP configuration and version record(s) from the M&C database.
 
@@ -3122,10 +4139,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of SNAPConfigVersion objects
+        list of SNAPConfigVersion objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .correlator import SNAPConfigVersion
@@ -3133,7 +4157,8 @@ class MCSession(Session):
         return self._time_filter(SNAPConfigVersion, 'init_time',
                                  most_recent=most_recent,
                                  starttime=starttime, stoptime=stoptime,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_corr_snap_versions_from_corrcm(self, corr_snap_version_dict=None,
                                            testing=False):
@@ -3225,7 +4250,7 @@ class MCSession(Session):
             self._insert_ignoring_duplicates(SNAPConfigVersion,
                                              snap_version_list)
 
-    def _get_node_snap_from_serial(self, snap_serial, session=None):
+    def _get_node_snap_from_serial(self, snap_serial, session=None, serial_index=None):
         """
         Get SNAP connection information from SNAP serial number.
 
@@ -3234,7 +4259,10 @@ class MCSession(Session):
         snap_serial : str
             SNAP serial number.
         session : Session object
-            Session to pass to cm_handling.Handling. Defaults to self.
+            Session to get the serial index with. Defaults to self.
+        serial_index : dict or None
+            Index returned by cm_sysutils.snap_serial_index.  If None, it is
+            gotten for now with session.
 
         Returns
         -------
@@ -3244,29 +4272,30 @@ class MCSession(Session):
             SNAP location number.
 
         """
-        from hera_mc import cm_handling
-        if session is None:
-            session = self
-
-        cmh = cm_handling.Handling(session)
-        conn_dossier = cmh.get_dossier(snap_serial, rev=None, at_date='now')
+        from . import cm_sysutils
+        if serial_index is None:
+            if session is None:
+                session = self
+            serial_index = cm_sysutils.snap_serial_index(session)
 
-        if len(conn_dossier.keys()) == 0:
+        locations = serial_index.get(snap_serial.upper(), [])
+        if len(locations) == 0:
             warnings.warn('No active dossiers returned for snap serial {snn}. '
                           'Setting node and snap location numbers to None'
                           .format(snn=snap_serial))
             return None, None
 
-        if len(conn_dossier.keys()) > 1:
+        if len(locations) > 1:
             warnings.warn("Multiple {} snaps were found, which shouldn't happen. "
                           "Setting node and snap location numbers to None"
                           .format(snap_serial))
             return None, None
 
-        snap_num_rev = list(conn_dossier.keys())[0]
-        snap_node_conn = conn_dossier[snap_num_rev].connections.up['RACK']
-        nodeID = int(snap_node_conn.downstream_part[1:])
-        snap_loc_num = int(snap_node_conn.downstream_input_port[3:])
+        nodeID, snap_loc_num = locations[0]
+        if nodeID is None:
+            warnings.warn('Snap serial {snn} is not connected to a node. '
+                          'Setting node and snap location numbers to None'
+                          .format(snn=snap_serial))
 
         return nodeID, snap_loc_num
 
@@ -3336,7 +4365,8 @@ class MCSession(Session):
             pps_count, fpga_temp, uptime_cycles, last_programmed_time))
 
     def get_snap_status(self, most_recent=None, starttime=None, stoptime=None,
-                        nodeID=None, write_to_file=False, filename=None):
+                        nodeID=None, write_to_file=False, filename=None,
+                        columns=None, output='objects'):
         """
         Get snap status record(s) from the M&C database.
 
@@ -3368,10 +4398,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of SNAPStatus objects
+        list of SNAPStatus objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .correlator import SNAPStatus
@@ -3379,7 +4416,8 @@ class MCSession(Session):
         return self._time_filter(SNAPStatus, 'time', most_recent=most_recent,
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='node', filter_value=nodeID,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_snap_status_from_corrcm(self, snap_status_dict=None, testing=False,
                                     cm_session=None):
@@ -3389,7 +4427,9 @@ class MCSession(Session):
         the `_get_snap_status` function. For testing purposes, it can
         optionally accept an input dict instead of connecting to the correlator.
         It can use a different session for the cm info (this is useful for
-        testing onsite).
+        testing onsite).  The node and SNAP location numbers are looked up in
+        one index of the SNAPs in config management (see
+        cm_sysutils.snap_serial_index).
 
         If the current database is PostgreSQL, this function will use a
         special insertion method that will ignore records that are redundant
@@ -3414,11 +4454,16 @@ class MCSession(Session):
 
         """
         from .correlator import _get_snap_status, SNAPStatus
+        from . import cm_sysutils
 
         if snap_status_dict is None:
             self.add_corr_obj()
             snap_status_dict = _get_snap_status(corr_cm=self.corr_obj)
 
+        if cm_session is None:
+            cm_session = self
+        serial_index = cm_sysutils.snap_serial_index(cm_session)
+
         snap_status_list = []
         for hostname, snap_dict in snap_status_dict.items():
 
@@ -3452,7 +4497,7 @@ class MCSession(Session):
             # get nodeID & snap location number from config management
             if serial_number is not None:
                 nodeID, snap_loc_num = self._get_node_snap_from_serial(
-                    serial_number, session=cm_session)
+                    serial_number, serial_index=serial_index)
             else:
                 nodeID = None
                 snap_loc_num = None
@@ -3551,7 +4596,8 @@ class MCSession(Session):
 
     def get_antenna_status(self, most_recent=None, starttime=None,
                            stoptime=None, antenna_number=None,
-                           write_to_file=False, filename=None):
+                           write_to_file=False, filename=None,
+                           columns=None, output='objects'):
         """
         Get antenna status record(s) from the M&C database.
 
@@ -3583,10 +4629,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of AntennaStatus objects
+        list of AntennaStatus objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .correlator import AntennaStatus
@@ -3595,7 +4648,8 @@ class MCSession(Session):
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='antenna_number',
                                  filter_value=antenna_number,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
 
     def add_antenna_status_from_corrcm(self, ant_status_dict=None,
                                        testing=False):
@@ -3901,42 +4955,50 @@ class MCSession(Session):
             Feed polarization, either 'e' or 'n'.
         measurement_type : str
             The type of measurement type of the autocorrelation.
-            Currently supports: 'median'.
+            See `HeraAuto.create` for the supported types.
         value : float
-            The median autocorrelation value as a float.
+            The autocorrelation measurement value as a float.
         """
         from .autocorrelations import HeraAuto
 
         self.add(HeraAuto.create(time, antenna_number, antenna_feed_pol, measurement_type, value))
 
     def add_autocorrelations_from_redis(self, hera_autos_dict=None, testing=False,
-                                        redishost=None, measurement_type=None):
+                                        redishost=None, measurement_type=None,
+                                        spectra_archive=None):
         """Get current autocorrelations from redis and insert into M&C.
 
         hera_autos_dict : dict, optional
             A dict containing info as in the return dict from
-            `_get_autos_from_redis()` for testing purposes. If None,
-            `_get_autos_from_redis()` is called.
+            `_get_autos_from_redis()` for testing purposes. If None, the
+            spectra are read from redis with `_get_auto_spectra_from_redis()`.
         testing : bool
             If true, do not add records to database, instead return list of HeraAuto objects.
         redishost : str, optional
             The hostname of the redis server to connect to if hera_autos_dict is None.
             Defaults to DEFAULT_REDIS_ADDRESS stored in M&C session object.
-        measurement_type : str, optional
-            The type of measurement to take from the autos.
-            Available choices are: ['median']
+        measurement_type : str or list of str, optional
+            The type(s) of measurement to take from the autos, see
+            `HeraAuto.create` for the choices (e.g. ['median', 'p90', 'mean[100:200]']).
+            All of them are computed together on the stacked spectra.
             If None, defaults to median.
+        spectra_archive : AutoSpectraArchive, optional
+            If provided, the full spectra are also appended to this archive
+            (unless testing), see `auto_spectra.AutoSpectraArchive`.
         """
-        from .autocorrelations import _get_autos_from_redis, HeraAuto, measurement_func_dict
+        from .autocorrelations import (_get_auto_spectra_from_redis, _reduce_spectra,
+                                       HeraAuto)
 
         if hera_autos_dict is None:
-            hera_autos_dict = _get_autos_from_redis(redishost=redishost)
+            timestamp_jd, antpols, spectra = _get_auto_spectra_from_redis(
+                redishost=redishost)
+        else:
+            timestamp_jd = hera_autos_dict.get("timestamp", None)
+            antpols = [antpol for antpol in hera_autos_dict if antpol != "timestamp"]
+            spectra = [hera_autos_dict[antpol] for antpol in antpols]
         if measurement_type is None:
             measurement_type = "median"
-
-        hera_auto_list = []
-
-        timestamp_jd = hera_autos_dict.pop("timestamp", None)
+        measurement_types = list(dict.fromkeys(get_iterable(measurement_type)))
 
         if timestamp_jd is None:
             raise ValueError(
@@ -3945,25 +5007,26 @@ class MCSession(Session):
             )
         time = Time(timestamp_jd, format='jd')
 
-        for antpol, auto in hera_autos_dict.items():
+        measurements = _reduce_spectra(spectra, measurement_types)
+        hera_auto_list = []
+        for ind, antpol in enumerate(antpols):
             ant, pol = antpol.split(":")
-            ant = int(ant)
-            auto = np.asarray(auto)
-
-            auto = measurement_func_dict[measurement_type](auto).item()
-
-            hera_auto_list.append(
-                HeraAuto.create(time, ant, pol, measurement_type, auto)
-            )
+            for mtype in measurement_types:
+                hera_auto_list.append(
+                    HeraAuto.create(time, int(ant), pol, mtype, measurements[mtype][ind])
+                )
 
         if testing:
             return hera_auto_list
         else:
             self._insert_ignoring_duplicates(HeraAuto, hera_auto_list)
+            if spectra_archive is not None:
+                spectra_archive.append(self, timestamp_jd, antpols, spectra)
 
     def get_autocorrelation(self, most_recent=None, starttime=None,
                             stoptime=None, antenna_number=None,
-                            write_to_file=False, filename=None):
+                            write_to_file=False, filename=None,
+                            columns=None, output='objects'):
         """
         Get  autocorrelation record(s) from the M&C database.
 
@@ -3995,10 +5058,17 @@ class MCSession(Session):
             Name of file to write to. If not provided, defaults to a file in the
             current directory named based on the table name.
             Ignored if write_to_file is False.
+        columns : list of str
+            Names of the columns to get. Defaults to all columns. Only used if
+            output is 'columns' or 'dataframe'.
+        output : {'objects', 'columns', 'dataframe'}
+            Format of the returned records: a list of table objects, a dict of
+            numpy arrays keyed on column name or a pandas DataFrame.
 
         Returns
         -------
-        list of Autocorrelation objects
+        list of Autocorrelation objects, dict of numpy arrays or DataFrame
+            Format depends on output.
 
         """
         from .autocorrelations import HeraAuto
@@ -4007,4 +5077,5 @@ class MCSession(Session):
                                  starttime=starttime, stoptime=stoptime,
                                  filter_column='antenna_number',
                                  filter_value=antenna_number,
-                                 write_to_file=write_to_file, filename=filename)
+                                 write_to_file=write_to_file, filename=filename,
+                                 columns=columns, output=output)
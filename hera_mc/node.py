@@ -8,7 +8,7 @@ from math import floor
 
 from astropy.time import Time
 import numpy as np
-from sqlalchemy import Column, BigInteger, Integer, Float, Boolean, String
+from sqlalchemy import Column, BigInteger, Integer, Float, Boolean, String, Index
 
 from . import MCDeclarativeBase
 
@@ -149,6 +149,8 @@ class NodeSensor(MCDeclarativeBase):
     """
 
     __tablename__ = 'node_sensor'
+    __table_args__ = (Index('ix_node_sensor_node_time', 'node', 'time'),
+                      {'postgresql_partition_by': 'RANGE (time)'})
     time = Column(BigInteger, primary_key=True)
     node = Column(Integer, primary_key=True)
     top_sensor_temp = Column(Float)
@@ -304,6 +306,7 @@ class NodePowerStatus(MCDeclarativeBase):
     """
 
     __tablename__ = 'node_power_status'
+    __table_args__ = (Index('ix_node_power_status_node_time', 'node', 'time'),)
     time = Column(BigInteger, primary_key=True)
     node = Column(Integer, primary_key=True)
     snap_relay_powered = Column(Boolean, nullable=False)
@@ -454,6 +457,7 @@ class NodePowerCommand(MCDeclarativeBase):
     """
 
     __tablename__ = 'node_power_command'
+    __table_args__ = (Index('ix_node_power_command_node_time', 'node', 'time'),)
     time = Column(BigInteger, primary_key=True)
     node = Column(Integer, primary_key=True)
     part = Column(String, primary_key=True)
@@ -640,6 +644,8 @@ class NodeWhiteRabbitStatus(MCDeclarativeBase):
     """
 
     __tablename__ = 'node_white_rabbit_status'
+    __table_args__ = (Index('ix_node_white_rabbit_status_node_node_time', 'node', 'node_time'),
+                      {'postgresql_partition_by': 'RANGE (node_time)'})
     node_time = Column(BigInteger, primary_key=True)
     node = Column(Integer, primary_key=True)
     board_info_str = Column(String)
@@ -5,7 +5,6 @@
 """Observation table."""
 
 from astropy.time import Time
-from astropy.coordinates import EarthLocation
 from sqlalchemy import Column, BigInteger, Float
 from sqlalchemy.ext.hybrid import hybrid_property
 
@@ -75,6 +74,8 @@ class Observation(MCDeclarativeBase):
         if abs(float(obsid) - starttime.gps) > 1.5:
             raise ValueError('obsid should be close to the starttime in gps seconds')
 
+        from astropy.coordinates import EarthLocation
+
         # for jd need to ensure that we're in utc
         starttime = starttime.utc
 
@@ -0,0 +1,485 @@
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""
+Time partitioning and retention of the high-rate telemetry tables.
+
+The tables listed in `telemetry_tables` get new rows every minute or so. On
+PostgreSQL they are range partitioned on their GPS time column into calendar
+month partitions (named like ``node_sensor_y2026m10``) plus a default
+partition (``node_sensor_default``) that catches rows outside of the existing
+partitions, so time range queries only scan the months they need.
+
+`create_partitions` adds partitions ahead of time (moving any rows that landed
+in the default partition into them) and `rollup_telemetry` compacts rows older
+than a retention period into the per-hour aggregate tables defined here
+(``<table>_hourly``) before dropping them. Both are run regularly by the
+mc_manage_partitions.py script.
+
+The columns in this module are documented in docs/mc_definition.tex,
+the documentation needs to be kept up to date with any changes.
+"""
+
+import re
+from math import floor
+
+from astropy.time import Time
+from sqlalchemy import (BigInteger, Column, DDL, Float, Integer, event, select,
+                        text)
+from sqlalchemy.sql.expression import func, literal_column
+
+from . import MCDeclarativeBase
+from . import autocorrelations, correlator, node  # noqa define source tables
+from .utils import get_iterable
+
+telemetry_tables = {
+    'hera_autos': {
+        'time_column': 'time',
+        'key_columns': ['antenna_number', 'antenna_feed_pol',
+                        'measurement_type'],
+        'value_columns': ['value']},
+    'antenna_status': {
+        'time_column': 'time',
+        'key_columns': ['antenna_number', 'antenna_feed_pol'],
+        'value_columns': ['adc_mean', 'adc_rms', 'adc_power', 'pam_power',
+                          'pam_voltage', 'pam_current', 'fem_voltage',
+                          'fem_current', 'fem_temp']},
+    'snap_status': {
+        'time_column': 'time',
+        'key_columns': ['hostname'],
+        'value_columns': ['fpga_temp']},
+    'node_sensor': {
+        'time_column': 'time',
+        'key_columns': ['node'],
+        'value_columns': ['top_sensor_temp', 'middle_sensor_temp',
+                          'bottom_sensor_temp', 'humidity_sensor_temp',
+                          'humidity']},
+    'node_white_rabbit_status': {
+        'time_column': 'node_time',
+        'key_columns': ['node'],
+        'value_columns': ['temperature', 'port0_clock_offset_ps',
+                          'port0_cable_rt_delay_ps', 'port1_clock_offset_ps',
+                          'port1_cable_rt_delay_ps']},
+}
+
+ROLLUP_SECONDS = 3600
+
+_partition_name_re = re.compile(r'(?P<table>\w+?)_(y\d{4}m\d{2}|default)$')
+
+
+def _hourly_table_class(class_name, table_name):
+    """
+    Define the per-hour aggregate table for a telemetry table.
+
+    The table is named ``<table_name>_hourly``. Its primary key is the start
+    of the hour in floored GPS seconds (the `time` column) and the key columns
+    of the telemetry table. It has an `n_samples` column with the number of
+    rows that went into each hour and ``<column>_mean``, ``<column>_min`` and
+    ``<column>_max`` columns for each of the value columns.
+    """
+    spec = telemetry_tables[table_name]
+    source = MCDeclarativeBase.metadata.tables[table_name]
+
+    attrs = {'__tablename__': table_name + '_hourly',
+             '__doc__': ('Definition of the hourly rollup of the {table} table.'
+                         .format(table=table_name)),
+             'time': Column(BigInteger, primary_key=True)}
+    for col in spec['key_columns']:
+        attrs[col] = Column(type(source.columns[col].type)(), primary_key=True)
+    attrs['n_samples'] = Column(Integer, nullable=False)
+    for col in spec['value_columns']:
+        for stat in ['mean', 'min', 'max']:
+            attrs[col + '_' + stat] = Column(Float)
+
+    return type(class_name, (MCDeclarativeBase,), attrs)
+
+
+HeraAutoHourly = _hourly_table_class('HeraAutoHourly', 'hera_autos')
+AntennaStatusHourly = _hourly_table_class('AntennaStatusHourly',
+                                          'antenna_status')
+SNAPStatusHourly = _hourly_table_class('SNAPStatusHourly', 'snap_status')
+NodeSensorHourly = _hourly_table_class('NodeSensorHourly', 'node_sensor')
+NodeWhiteRabbitStatusHourly = _hourly_table_class(
+    'NodeWhiteRabbitStatusHourly', 'node_white_rabbit_status')
+
+# Partitioned tables need somewhere to put rows before their month's partition
+# has been created, so give each one a default partition when it is created.
+for _table_name in telemetry_tables:
+    event.listen(
+        MCDeclarativeBase.metadata.tables[_table_name], 'after_create',
+        DDL('CREATE TABLE %(table)s_default PARTITION OF %(table)s DEFAULT')
+        .execute_if(dialect='postgresql'))
+
+
+def _check_tables(tables):
+    """Get the list of telemetry tables to act on, checking the names."""
+    if tables is None:
+        return list(telemetry_tables.keys())
+    tables = get_iterable(tables)
+    for table_name in tables:
+        if table_name not in telemetry_tables:
+            raise ValueError('{table} is not a telemetry table, must be one of '
+                             '{tables}'.format(table=table_name,
+                                               tables=list(telemetry_tables)))
+    return list(tables)
+
+
+def _check_postgresql(session):
+    if session.get_bind().dialect.name != 'postgresql':
+        raise ValueError('Table partitioning is only supported on PostgreSQL.')
+
+
+def month_start_gps(year, month):
+    """
+    Get the GPS time of the start of a calendar month (in UTC).
+
+    Parameters
+    ----------
+    year : int
+        Year.
+    month : int
+        Month, values above 12 roll over into the following years.
+
+    Returns
+    -------
+    int
+        GPS seconds at the start of the month.
+
+    """
+    year += (month - 1) // 12
+    month = (month - 1) % 12 + 1
+    return int(round(Time('{y:04d}-{m:02d}-01'.format(y=year, m=month),
+                          scale='utc').gps))
+
+
+def partition_name(table_name, year, month):
+    """
+    Get the name of the partition of a table for a calendar month.
+
+    Parameters
+    ----------
+    table_name : str
+        Name of the partitioned table.
+    year : int
+        Year.
+    month : int
+        Month.
+
+    Returns
+    -------
+    str
+        Partition name.
+
+    """
+    return '{table}_y{y:04d}m{m:02d}'.format(table=table_name, y=year, m=month)
+
+
+def is_partition_name(name):
+    """
+    Check whether a table name is that of a partition of a telemetry table.
+
+    These are the monthly ``<table>_yYYYYmMM`` partitions and the
+    ``<table>_default`` partitions of the tables in `telemetry_tables`.
+
+    Parameters
+    ----------
+    name : str
+        Table name.
+
+    Returns
+    -------
+    bool
+        True if it is a partition name.
+
+    """
+    match = _partition_name_re.match(name)
+    return match is not None and match.group('table') in telemetry_tables
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    """
+    Leave the telemetry table partitions out of alembic autogenerate.
+
+    The partitions are made by `create_partitions` rather than being in the
+    metadata, so without this autogenerate proposes dropping all of them (and
+    their indexes). It is passed to ``context.configure`` in alembic/env.py.
+
+    Parameters
+    ----------
+    obj : SchemaItem
+        The table, index, column or constraint being compared.
+    name : str
+        Name of the object.
+    type_ : str
+        Type of the object, e.g. 'table' or 'index'.
+    reflected : bool
+        Whether the object was reflected from the database.
+    compare_to : SchemaItem or None
+        The matching object in the metadata, if there is one.
+
+    Returns
+    -------
+    bool
+        False for partitions and the objects on them, True otherwise.
+
+    """
+    if not reflected or compare_to is not None:
+        return True
+    table = obj if type_ == 'table' else getattr(obj, 'table', None)
+    return table is None or not is_partition_name(table.name)
+
+
+def is_partitioned(session, table_name):
+    """
+    Check whether a table is partitioned.
+
+    Parameters
+    ----------
+    session : MCSession object
+        Session to use, must be connected to a PostgreSQL database.
+    table_name : str
+        Name of the table.
+
+    Returns
+    -------
+    bool
+        True if the table is a partitioned table.
+
+    """
+    _check_postgresql(session)
+    relkind = session.execute(
+        text('SELECT relkind FROM pg_class '
+             'WHERE oid = to_regclass(:table_name)'),
+        {'table_name': table_name}).scalar()
+    return relkind == 'p'
+
+
+def get_partitions(session, table_name):
+    """
+    Get the time range partitions of a table.
+
+    The default partition is not included.
+
+    Parameters
+    ----------
+    session : MCSession object
+        Session to use, must be connected to a PostgreSQL database.
+    table_name : str
+        Name of the partitioned table.
+
+    Returns
+    -------
+    list of tuple
+        (name, lower bound, upper bound) for each partition, sorted by time.
+        The bounds are in GPS seconds, the lower bound is inclusive and the
+        upper bound exclusive.
+
+    """
+    _check_postgresql(session)
+    result = session.execute(
+        text('SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) '
+             'FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid '
+             'WHERE i.inhparent = to_regclass(:table_name)'),
+        {'table_name': table_name})
+
+    partitions = []
+    for name, bound in result:
+        # bounds look like "FOR VALUES FROM ('1262304000') TO ('1264982400')"
+        limits = re.findall(r'-?\d+', bound)
+        if len(limits) == 2:
+            partitions.append((name, int(limits[0]), int(limits[1])))
+    return sorted(partitions, key=lambda part: part[1])
+
+
+def create_partitions(session, starttime, stoptime, tables=None):
+    """
+    Create the monthly partitions of the telemetry tables for a time range.
+
+    Partitions that already exist are left alone. Rows for a new partition's
+    month that are in the default partition are moved into the new partition.
+
+    Parameters
+    ----------
+    session : MCSession object
+        Session to use, must be connected to a PostgreSQL database.
+    starttime : astropy Time object
+        Time in the first month to create partitions for.
+    stoptime : astropy Time object
+        Time in the last month to create partitions for.
+    tables : str or list of str
+        Telemetry tables to create partitions for, defaults to all of the
+        tables in `telemetry_tables`.
+
+    Returns
+    -------
+    list of str
+        Names of the partitions that were created.
+
+    """
+    _check_postgresql(session)
+    tables = _check_tables(tables)
+    for time_val, time_name in zip([starttime, stoptime],
+                                   ['starttime', 'stoptime']):
+        if not isinstance(time_val, Time):
+            raise ValueError('{name} must be an astropy time object. '
+                             'value was: {t}'.format(name=time_name,
+                                                     t=time_val))
+
+    start_dt = starttime.utc.datetime
+    stop_dt = stoptime.utc.datetime
+    months = []
+    year, month = start_dt.year, start_dt.month
+    while (year, month) <= (stop_dt.year, stop_dt.month):
+        months.append((year, month))
+        year, month = year + month // 12, month % 12 + 1
+
+    # rows added through the ORM need to be in the tables before moving rows
+    session.flush()
+    created = []
+    for table_name in tables:
+        if not is_partitioned(session, table_name):
+            raise ValueError('{table} is not partitioned, the database needs '
+                             'to be migrated.'.format(table=table_name))
+        time_column = telemetry_tables[table_name]['time_column']
+        default_name = table_name + '_default'
+        has_default = session.execute(
+            text('SELECT to_regclass(:name) IS NOT NULL'),
+            {'name': default_name}).scalar()
+        existing = [part[0] for part in get_partitions(session, table_name)]
+
+        for year, month in months:
+            name = partition_name(table_name, year, month)
+            if name in existing:
+                continue
+            fmt = {'table': table_name, 'name': name, 'default': default_name,
+                   'col': time_column,
+                   'lower': month_start_gps(year, month),
+                   'upper': month_start_gps(year, month + 1)}
+            if has_default:
+                # A partition can't be attached while the default partition
+                # has rows in its range, so move them over first.
+                session.execute(
+                    'CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS '
+                    'INCLUDING CONSTRAINTS)'.format(**fmt))
+                session.execute(
+                    'INSERT INTO {name} SELECT * FROM {default} WHERE {col} >= '
+                    '{lower} AND {col} < {upper}'.format(**fmt))
+                session.execute(
+                    'DELETE FROM {default} WHERE {col} >= {lower} AND {col} < '
+                    '{upper}'.format(**fmt))
+                session.execute(
+                    'ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES '
+                    'FROM ({lower}) TO ({upper})'.format(**fmt))
+            else:
+                session.execute(
+                    'CREATE TABLE {name} PARTITION OF {table} FOR VALUES '
+                    'FROM ({lower}) TO ({upper})'.format(**fmt))
+            created.append(name)
+
+    session.commit()
+    return created
+
+
+def rollup_telemetry(session, retention_days, tables=None, now=None):
+    """
+    Compact telemetry rows older than a retention period into hourly rollups.
+
+    The rows in each whole hour older than the retention period are
+    aggregated into the ``<table>_hourly`` table (sample count and the mean,
+    min and max of each value column per key) and then removed, dropping
+    whole partitions where possible. Rolling up an hour that is already in the
+    hourly table (e.g. because of late arriving data) merges the new rows into
+    the existing aggregates on PostgreSQL, with the means weighted by
+    `n_samples`.
+
+    Parameters
+    ----------
+    session : MCSession object
+        Session to use.
+    retention_days : float
+        Number of days of full resolution rows to keep.
+    tables : str or list of str
+        Telemetry tables to roll up, defaults to all of the tables in
+        `telemetry_tables`.
+    now : astropy Time object
+        Time to count the retention period back from, defaults to now.
+
+    Returns
+    -------
+    dict
+        Number of rows that were rolled up and removed, keyed on table name.
+
+    """
+    tables = _check_tables(tables)
+    if not isinstance(retention_days, (int, float)) or retention_days <= 0:
+        raise ValueError('retention_days must be a positive number.')
+    if now is None:
+        now = Time.now()
+    elif not isinstance(now, Time):
+        raise ValueError('now must be an astropy time object. '
+                         'value was: {t}'.format(t=now))
+
+    dialect_name = session.get_bind().dialect.name
+    cutoff = (int(floor((now.gps - retention_days * 86400.) / ROLLUP_SECONDS))
+              * ROLLUP_SECONDS)
+
+    session.flush()
+    n_removed = {}
+    for table_name in tables:
+        spec = telemetry_tables[table_name]
+        source = MCDeclarativeBase.metadata.tables[table_name]
+        hourly = MCDeclarativeBase.metadata.tables[table_name + '_hourly']
+        time_attr = source.columns[spec['time_column']]
+        key_attrs = [source.columns[col] for col in spec['key_columns']]
+
+        n_removed[table_name] = session.execute(
+            select([func.count()]).select_from(source)
+            .where(time_attr < cutoff)).scalar()
+        if n_removed[table_name] == 0:
+            continue
+
+        # use a literal so the expression is identical in SELECT and GROUP BY
+        rollup_size = literal_column(str(ROLLUP_SECONDS))
+        hour = time_attr / rollup_size * rollup_size
+        names = ['time'] + spec['key_columns'] + ['n_samples']
+        select_cols = [hour] + key_attrs + [func.count()]
+        for col in spec['value_columns']:
+            names.extend([col + '_mean', col + '_min', col + '_max'])
+            select_cols.extend([func.avg(source.columns[col]),
+                                func.min(source.columns[col]),
+                                func.max(source.columns[col])])
+        rollup_select = (select(select_cols).where(time_attr < cutoff)
+                         .group_by(hour, *key_attrs))
+
+        if dialect_name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+
+            statement = insert(hourly).from_select(names, rollup_select)
+            excluded = statement.excluded
+            n_old = hourly.columns.n_samples
+            n_new = excluded.n_samples
+            update = {'n_samples': n_old + n_new}
+            for col in spec['value_columns']:
+                mean, vmin, vmax = (col + '_mean', col + '_min', col + '_max')
+                update[mean] = func.coalesce(
+                    (hourly.columns[mean] * n_old + excluded[mean] * n_new)
+                    / (n_old + n_new), hourly.columns[mean], excluded[mean])
+                update[vmin] = func.least(hourly.columns[vmin], excluded[vmin])
+                update[vmax] = func.greatest(hourly.columns[vmax],
+                                             excluded[vmax])
+            statement = statement.on_conflict_do_update(
+                index_elements=[col.name for col in hourly.primary_key],
+                set_=update)
+        else:
+            statement = hourly.insert().from_select(names, rollup_select)
+        session.execute(statement)
+
+        if dialect_name == 'postgresql' and is_partitioned(session, table_name):
+            for name, lower, upper in get_partitions(session, table_name):
+                if upper <= cutoff:
+                    session.execute('DROP TABLE {name}'.format(name=name))
+        session.execute(source.delete().where(time_attr < cutoff))
+
+    session.commit()
+    return n_removed
@@ -11,7 +11,7 @@ the documentation needs to be kept up to date with any changes.
 from math import floor
 from astropy.time import Time
 from sqlalchemy import (Column, ForeignKey, Integer, BigInteger, String, Text,
-                        Float, Enum)
+                        Float, Enum, Index)
 from sqlalchemy.ext.hybrid import hybrid_property
 
 from . import MCDeclarativeBase, DEFAULT_MIN_TOL, DEFAULT_HOUR_TOL
@@ -54,6 +54,8 @@ class RTPServerStatus(ServerStatus):
     """
 
     __tablename__ = 'rtp_server_status'
+    __table_args__ = (Index('ix_rtp_server_status_mc_time_brin', 'mc_time',
+                            postgresql_using='brin'),)
 
 
 class RTPStatus(MCDeclarativeBase):
@@ -137,6 +139,7 @@ class RTPProcessEvent(MCDeclarativeBase):
     """
 
     __tablename__ = 'rtp_process_event'
+    __table_args__ = (Index('ix_rtp_process_event_obsid_time', 'obsid', 'time'),)
     time = Column(BigInteger, primary_key=True)
     obsid = Column(BigInteger, ForeignKey('hera_obs.obsid'), primary_key=True)
     event = Column(Enum(*rtp_process_enum, name='rtp_process_enum'),
@@ -201,6 +204,7 @@ class RTPProcessRecord(MCDeclarativeBase):
     """
 
     __tablename__ = 'rtp_process_record'
+    __table_args__ = (Index('ix_rtp_process_record_obsid_time', 'obsid', 'time'),)
     time = Column(BigInteger, primary_key=True)
     obsid = Column(BigInteger, ForeignKey('hera_obs.obsid'), primary_key=True)
     pipeline_list = Column(Text, nullable=False)
@@ -289,6 +293,8 @@ class RTPTaskResourceRecord(MCDeclarativeBase):
     """
 
     __tablename__ = 'rtp_task_resource_record'
+    __table_args__ = (Index('ix_rtp_task_resource_record_start_time_brin', 'start_time',
+                            postgresql_using='brin'),)
     obsid = Column(BigInteger, ForeignKey('hera_obs.obsid'), primary_key=True)
     task_name = Column(Text, primary_key=True)
     start_time = Column(BigInteger, nullable=False)
@@ -9,6 +9,7 @@ The columns in this module are documented in docs/mc_definition.tex,
 the documentation needs to be kept up to date with any changes.
 """
 from math import floor
+import numpy as np
 from astropy.time import Time
 from sqlalchemy import Column, Integer, String, Float, BigInteger
 
@@ -128,13 +129,15 @@ def plot_host_status_for_plotly(session):
         MCSession object to get data from database with.
 
     """
-    from astropy.time import Time
+    from astropy.time import Time, TimeDelta
     from plotly import graph_objects as go
 
     from chart_studio import plotly as chart_plotly
 
-    THIRTY_DAYS = 24 * 3600 * 30
-    gps_time_cutoff = Time.now().gps - THIRTY_DAYS
+    # Bin the data to the 5 minute load average cadence in the database
+    BIN_SECONDS = 300
+    stoptime = Time.now()
+    starttime = stoptime - TimeDelta(30, format='jd')
     plot_items = []
 
     # Gather data about Librarian servers
@@ -154,25 +157,19 @@ def plot_host_status_for_plotly(session):
         'pot8.still.pvt': 'pot8',
     }
 
-    for host in librarian_hosts_of_interest:
-        times = []
-        loads = []
-
-        q = (session.query(LibServerStatus)
-             .filter(LibServerStatus.mc_time > gps_time_cutoff)
-             .filter(LibServerStatus.hostname == host)
-             .order_by(LibServerStatus.mc_time)
-             .all())
+    loads = session.get_binned(LibServerStatus, 'mc_time', 'cpu_load_pct',
+                               BIN_SECONDS, starttime, stoptime,
+                               group_by='hostname')
+    times = Time(loads['mc_time'], format='gps').datetime
 
-        for item in q:
-            times.append(Time(item.mc_time, format='gps').datetime)
-            loads.append(item.cpu_load_pct)
+    for host in librarian_hosts_of_interest:
+        host_inds = np.nonzero(loads['hostname'] == host)[0]
 
         ui_hostname = internal_hostname_to_ui_hostname.get(host, host)
 
         plot_items.append(go.Scatter(
-            x=times,
-            y=loads,
+            x=times[host_inds],
+            y=loads['cpu_load_pct'][host_inds],
             name=ui_hostname,
         ))
 
@@ -10,7 +10,7 @@ the documentation needs to be kept up to date with any changes.
 """
 from math import floor
 from astropy.time import Time
-from sqlalchemy import Column, String, Integer, BigInteger, Text
+from sqlalchemy import Column, String, Integer, BigInteger, Text, Index
 
 from . import MCDeclarativeBase
 
@@ -37,6 +37,9 @@ class SubsystemError(MCDeclarativeBase):
     """
 
     __tablename__ = 'subsystem_error'
+    __table_args__ = (Index('ix_subsystem_error_subsystem_time', 'subsystem', 'time'),
+                      Index('ix_subsystem_error_time_brin', 'time',
+                            postgresql_using='brin'),)
     id = Column(BigInteger, primary_key=True, autoincrement=True)
     time = Column(BigInteger, nullable=False)
     subsystem = Column(String(32), nullable=False)
@@ -0,0 +1,374 @@
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""
+Synthetic monitoring data for load testing.
+
+`SyntheticArray` lays out antennas, SNAPs and nodes following the CM hookup in
+the database (extended with made-up parts to reach production scale if asked
+to) and generates time consistent rows for the high-rate monitoring tables:
+values drift smoothly with a diurnal cycle, counters increase with time and
+per-antenna/SNAP/node properties stay fixed. `SyntheticArray.load` bulk-loads
+them over a time range into any database M&C supports.
+"""
+
+import time as timemod
+
+import numpy as np
+from astropy.time import Time
+
+from . import cm_hookup, cm_sysdef, cm_utils, geo_handling
+from .autocorrelations import HeraAuto
+from .correlator import AntennaStatus, SNAPStatus
+from .librarian import LibServerStatus
+from .node import NodeSensor, NodePowerStatus
+from .observations import Observation
+from .rtp import RTPServerStatus, RTPTaskResourceRecord
+from .weather import WeatherData, weather_sensor_dict
+
+# tables in the order they must be loaded (hera_obs before the rtp tables)
+synthetic_tables = {
+    'antenna_status': AntennaStatus,
+    'hera_autos': HeraAuto,
+    'snap_status': SNAPStatus,
+    'node_sensor': NodeSensor,
+    'node_power_status': NodePowerStatus,
+    'weather_data': WeatherData,
+    'rtp_server_status': RTPServerStatus,
+    'lib_server_status': LibServerStatus,
+    'hera_obs': Observation,
+    'rtp_task_resource_record': RTPTaskResourceRecord,
+}
+
+ANTS_PER_SNAP = 3
+SNAPS_PER_NODE = 4
+OBSERVATION_SECONDS = 600
+SNAP_CLOCK_HZ = 250e6
+RTP_TASKS = ['ANT_METRICS', 'AUTO_METRICS', 'REDCAL', 'ABSCAL', 'XRFI',
+             'SMOOTH_CAL']
+RTP_HOSTS = ['still{}'.format(i) for i in range(1, 5)]
+LIB_HOSTS = ['qmaster', 'pot1', 'pot6', 'pot7']
+
+
+def _diurnal(gps):
+    """Get a smooth daily cycle between -1 and 1, peaking mid afternoon."""
+    return np.sin(2 * np.pi * ((gps % 86400) / 86400. - 0.375))
+
+
+class SyntheticArray(object):
+    """
+    Generate synthetic monitoring data for an array laid out like the CM hookup.
+
+    Parameters
+    ----------
+    session : MCSession object
+        Session on a database containing the CM tables to get the hookup from.
+    nants : int or None
+        Number of antennas to generate data for. If this is more than the
+        number of antennas in the hookup, more antennas are made up (3 per SNAP
+        and 4 SNAPs per node, numbered after the ones in the hookup). If None,
+        use the antennas in the hookup.
+    at_date : anything understandable by cm_utils.get_astropytime
+        Date to get the hookup for.
+    seed : int
+        Seed for the random number generator, so the data are reproducible.
+
+    Attributes
+    ----------
+    antennas : list of dict
+        One dict per antenna, with keys 'antenna_number', 'snap_hostname',
+        'snap_serial', 'e_channel', 'n_channel' and 'node'.
+    snaps : dict
+        Keyed on SNAP hostname, values are dicts with keys 'node', 'loc' and
+        'serial'.
+    nodes : list of int
+        Node numbers.
+
+    """
+
+    def __init__(self, session, nants=None, at_date='now', seed=0):
+        self.rng = np.random.default_rng(seed)
+        self.antennas = []
+        self.snaps = {}
+
+        at_date = cm_utils.get_astropytime(at_date)
+        hookup = cm_hookup.Hookup(session=session).get_hookup(
+            cm_sysdef.hera_zone_prefixes, at_date=at_date,
+            hookup_type='parts_hera')
+        for hukey in sorted(hookup):
+            entry = hookup[hukey]
+            snap_ports = entry.get_part_from_type('snap', include_ports=True)
+            if 'E<ground' not in entry.hookup or snap_ports['E<ground'] is None:
+                continue
+            node_conn = entry.hookup['E<ground'][-1]
+            if not node_conn.downstream_part.startswith('N'):
+                continue
+            node_num = int(node_conn.downstream_part[1:])
+            loc = int(node_conn.downstream_input_port[3:])
+            channels = {}
+            for pol, port_str in snap_ports.items():
+                port, serial = port_str.split('>')[:2]
+                channels[pol[0].lower()] = int(port[1:]) // 2
+            self._add_antenna(
+                int(cm_utils.peel_key(cm_utils.split_part_key(hukey)[0],
+                                      'NPR')[0]),
+                node_num, loc, serial.split('<')[0], channels['e'],
+                channels.get('n', channels['e'] - 1))
+
+        if nants is not None:
+            self.antennas = self.antennas[:nants]
+            self._extend(nants)
+        snap_hosts = set(ant['snap_hostname'] for ant in self.antennas)
+        self.snaps = {host: info for host, info in self.snaps.items()
+                      if host in snap_hosts}
+        self.nodes = sorted(set(ant['node'] for ant in self.antennas))
+
+        self.cofa = geo_handling.Handling(session).cofa()[0]
+
+        # fixed properties of each antenna/pol, SNAP and node
+        nants = len(self.antennas)
+        self.auto_level = self.rng.uniform(5e6, 2e7, size=(nants, 2))
+        self.adc_rms = self.rng.uniform(2., 6., size=(nants, 2))
+        self.pam_atten = self.rng.integers(0, 10, size=(nants, 2))
+        self.fem_temp_offset = self.rng.normal(5., 1., size=nants)
+        self.snap_temp_offset = {host: self.rng.normal(35., 2.)
+                                 for host in self.snaps}
+        self.snap_uptime = {host: self.rng.uniform(1, 30) * 86400
+                            for host in self.snaps}
+        self.node_temp_offset = {node: self.rng.normal(5., 1.)
+                                 for node in self.nodes}
+        self.snaps_powered = {node: self.rng.random(SNAPS_PER_NODE) > 0.05
+                              for node in self.nodes}
+        self.host_boot = {host: self.rng.uniform(1, 100) * 86400
+                          for host in RTP_HOSTS + LIB_HOSTS}
+
+    def _add_antenna(self, ant_num, node_num, loc, serial, e_channel,
+                     n_channel):
+        hostname = 'heraNode{}Snap{}'.format(node_num, loc)
+        self.snaps.setdefault(hostname, {'node': node_num, 'loc': loc,
+                                         'serial': serial})
+        self.antennas.append({'antenna_number': ant_num,
+                              'snap_hostname': hostname, 'snap_serial': serial,
+                              'e_channel': e_channel, 'n_channel': n_channel,
+                              'node': node_num})
+
+    def _extend(self, nants):
+        """Make up antennas, SNAPs and nodes to get to nants antennas."""
+        if len(self.antennas) >= nants:
+            return
+        next_ant = max([ant['antenna_number'] for ant in self.antennas],
+                       default=-1) + 1
+        next_node = max([ant['node'] for ant in self.antennas], default=-1) + 1
+        for ind in range(nants - len(self.antennas)):
+            snap_ind, slot = divmod(ind, ANTS_PER_SNAP)
+            node_ind, loc = divmod(snap_ind, SNAPS_PER_NODE)
+            self._add_antenna(next_ant + ind, next_node + node_ind, loc,
+                              'SNPS{:06d}'.format(snap_ind), 2 * slot + 1,
+                              2 * slot)
+
+    def rows(self, gps, cadence=60):
+        """
+        Generate the rows for one time step.
+
+        Parameters
+        ----------
+        gps : int
+            Time of the step in GPS seconds.
+        cadence : int
+            Seconds between steps. The weather data and observations, which
+            have their own cadences, are generated for the periods that end in
+            the interval from the previous step.
+
+        Returns
+        -------
+        dict
+            Lists of table objects keyed on table name (as in
+            `synthetic_tables`).
+
+        """
+        gps = int(gps)
+        rng = self.rng
+        daily = _diurnal(gps)
+        ambient = 20. + 8. * daily
+        nants = len(self.antennas)
+        rows = {table_name: [] for table_name in synthetic_tables}
+
+        autos = (self.auto_level * (1 + 0.05 * daily)
+                 * rng.normal(1, 0.01, size=(nants, 2)))
+        adc_rms = self.adc_rms * rng.normal(1, 0.02, size=(nants, 2))
+        fem_temp = ambient + self.fem_temp_offset + rng.normal(0, 0.2, nants)
+        for ind, ant in enumerate(self.antennas):
+            for pol_ind, pol in enumerate(['e', 'n']):
+                rows['hera_autos'].append(HeraAuto(
+                    time=gps, antenna_number=ant['antenna_number'],
+                    antenna_feed_pol=pol, measurement_type='median',
+                    value=float(autos[ind, pol_ind])))
+                rows['antenna_status'].append(AntennaStatus(
+                    time=gps, antenna_number=ant['antenna_number'],
+                    antenna_feed_pol=pol, snap_hostname=ant['snap_hostname'],
+                    snap_channel_number=ant[pol + '_channel'],
+                    adc_mean=float(rng.normal(0, 0.05)),
+                    adc_rms=float(adc_rms[ind, pol_ind]),
+                    adc_power=float(adc_rms[ind, pol_ind] ** 2),
+                    pam_atten=int(self.pam_atten[ind, pol_ind]),
+                    pam_power=float(rng.normal(-13., 0.1)),
+                    pam_voltage=float(rng.normal(10., 0.05)),
+                    pam_current=float(rng.normal(0.65, 0.01)),
+                    pam_id='PAM{:03d}{}'.format(ant['antenna_number'], pol),
+                    fem_voltage=float(rng.normal(6.5, 0.05)),
+                    fem_current=float(rng.normal(0.55, 0.01)),
+                    fem_id='FEM{:03d}'.format(ant['antenna_number']),
+                    fem_switch='antenna', fem_lna_power=True,
+                    fem_imu_theta=1.3, fem_imu_phi=30.7,
+                    fem_temp=float(fem_temp[ind]),
+                    fft_overflow=bool(rng.random() < 1e-4)))
+
+        for host, snap in self.snaps.items():
+            uptime = self.snap_uptime[host]
+            programmed = gps - int(uptime)
+            rows['snap_status'].append(SNAPStatus(
+                time=gps, hostname=host, node=snap['node'],
+                snap_loc_num=snap['loc'], serial_number=snap['serial'],
+                psu_alert=False, pps_count=int(uptime),
+                fpga_temp=float(ambient + self.snap_temp_offset[host]
+                                + rng.normal(0, 0.3)),
+                uptime_cycles=int(uptime * SNAP_CLOCK_HZ),
+                last_programmed_time=programmed))
+            self.snap_uptime[host] += cadence
+
+        for node_num in self.nodes:
+            temp = ambient + self.node_temp_offset[node_num]
+            rows['node_sensor'].append(NodeSensor(
+                time=gps, node=node_num,
+                top_sensor_temp=float(temp + 2 + rng.normal(0, 0.2)),
+                middle_sensor_temp=float(temp + 1 + rng.normal(0, 0.2)),
+                bottom_sensor_temp=float(temp + rng.normal(0, 0.2)),
+                humidity_sensor_temp=float(temp + 1.5 + rng.normal(0, 0.2)),
+                humidity=float(35. - 10. * daily + rng.normal(0, 1))))
+            powered = self.snaps_powered[node_num]
+            rows['node_power_status'].append(NodePowerStatus(
+                time=gps, node=node_num, snap_relay_powered=bool(powered.any()),
+                snap0_powered=bool(powered[0]), snap1_powered=bool(powered[1]),
+                snap2_powered=bool(powered[2]), snap3_powered=bool(powered[3]),
+                fem_powered=True, pam_powered=True))
+
+        weather_values = {
+            'wind_speed': abs(rng.normal(5., 2.)),
+            'wind_gust': abs(rng.normal(8., 3.)),
+            'wind_direction': (270. + 40. * daily + rng.normal(0, 10)) % 360,
+            'temperature': ambient + rng.normal(0, 0.1),
+            'humidity': 35. - 10. * daily + rng.normal(0, 1),
+            'pressure': 890. + rng.normal(0, 0.5),
+            'rain': 0.}
+        for variable, info in weather_sensor_dict.items():
+            for wx_time in range(gps - gps % info['period'], gps - cadence,
+                                 -info['period']):
+                rows['weather_data'].append(WeatherData(
+                    time=wx_time, variable=variable,
+                    value=float(weather_values.get(variable, 0.))))
+
+        for host_list, key, table_class in [
+                (RTP_HOSTS, 'rtp_server_status', RTPServerStatus),
+                (LIB_HOSTS, 'lib_server_status', LibServerStatus)]:
+            for host_ind, host in enumerate(host_list):
+                rows[key].append(table_class(
+                    hostname=host, mc_time=gps,
+                    ip_address='10.0.1.{}'.format(host_ind + 10),
+                    mc_system_timediff=float(rng.normal(0, 0.01)),
+                    num_cores=32, cpu_load_pct=float(rng.uniform(5, 95)),
+                    uptime_days=(gps % 1e7 + self.host_boot[host]) / 86400.,
+                    memory_used_pct=float(rng.uniform(20, 80)),
+                    memory_size_gb=256., disk_space_pct=50. + gps % 1e7 / 1e6,
+                    disk_size_gb=1e4,
+                    network_bandwidth_mbs=float(rng.uniform(0, 1e3))))
+
+        # observations that ended since the last step, and their RTP tasks
+        for obs_stop in range(gps - gps % OBSERVATION_SECONDS, gps - cadence,
+                              -OBSERVATION_SECONDS):
+            obsid = obs_stop - OBSERVATION_SECONDS
+            rows['hera_obs'].append(Observation.create(
+                Time(obsid, format='gps'), Time(obs_stop, format='gps'),
+                obsid, self.cofa))
+            task_start = obs_stop
+            for task in RTP_TASKS:
+                task_stop = task_start + int(rng.uniform(30, 300))
+                rows['rtp_task_resource_record'].append(RTPTaskResourceRecord(
+                    obsid=obsid, task_name=task, start_time=task_start,
+                    stop_time=task_stop,
+                    max_memory=float(rng.uniform(1e3, 2e4)),
+                    avg_cpu_load=float(rng.uniform(0.5, 8))))
+                task_start = task_stop
+
+        return rows
+
+    def load(self, session, starttime, duration, cadence=60, tables=None,
+             steps_per_commit=10, live=False):
+        """
+        Generate rows over a time range and bulk-load them into the database.
+
+        Parameters
+        ----------
+        session : MCSession object
+            Session to load the data with, can be on a different database than
+            the one used to get the hookup.
+        starttime : astropy Time object
+            Time of the first step.
+        duration : float
+            Length of the time range in seconds.
+        cadence : int
+            Seconds between steps (the per-minute tables get one row per step).
+        tables : str or list of str
+            Tables to load (keys of `synthetic_tables`), defaults to all of
+            them.
+        steps_per_commit : int
+            Number of steps to batch together into each bulk insert.
+        live : bool
+            If True, load each step when the wall clock reaches its time
+            (sleeping in between), to simulate the real ingest rate.
+
+        Returns
+        -------
+        dict
+            Number of rows loaded keyed on table name.
+
+        """
+        if not isinstance(starttime, Time):
+            raise ValueError('starttime must be an astropy time object. '
+                             'value was: {t}'.format(t=starttime))
+        if not isinstance(cadence, (int, np.integer)) or cadence < 1:
+            raise ValueError('cadence must be a positive integer.')
+        if tables is None:
+            tables = list(synthetic_tables)
+        else:
+            tables = cm_utils.listify(tables)
+            for table_name in tables:
+                if table_name not in synthetic_tables:
+                    raise ValueError('{} is not a synthetic table, must be one '
+                                     'of {}'.format(table_name,
+                                                    list(synthetic_tables)))
+        if live:
+            steps_per_commit = 1
+
+        start_gps = int(np.ceil(starttime.gps))
+        step_times = range(start_gps, start_gps + int(duration), cadence)
+        counts = {table_name: 0 for table_name in tables}
+        pending = {table_name: [] for table_name in tables}
+        for step, gps in enumerate(step_times):
+            if live:
+                wait = gps - Time.now().gps
+                if wait > 0:
+                    timemod.sleep(wait)
+            step_rows = self.rows(gps, cadence=cadence)
+            for table_name in tables:
+                pending[table_name].extend(step_rows[table_name])
+            if (step + 1) % steps_per_commit == 0 or step == len(step_times) - 1:
+                # keep the order of synthetic_tables for the foreign keys
+                for table_name in synthetic_tables:
+                    if table_name in tables and len(pending[table_name]) > 0:
+                        session._insert_ignoring_duplicates(
+                            synthetic_tables[table_name], pending[table_name])
+                        counts[table_name] += len(pending[table_name])
+                        pending[table_name] = []
+                session.commit()
+        return counts
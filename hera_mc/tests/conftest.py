@@ -3,6 +3,7 @@
 # Licensed under the 2-clause BSD License
 
 """Testing environment setup and teardown for pytest."""
+import copy
 import pytest
 import urllib
 from astropy.utils import iers
@@ -63,3 +64,62 @@ def mcsession(setup_and_teardown_package):
     from .. import cm_hookup
     hookup = cm_hookup.Hookup(session=test_session)
     hookup.delete_cache_file()
+
+
+@pytest.fixture(scope='function')
+def cm_session_factory(setup_and_teardown_package):
+    """
+    Make engine-bound sessions on new databases initialised with the CM test data.
+
+    Unlike mcsession (bound to a connection in a transaction that is rolled
+    back), engine-bound sessions use the CM snapshots of `cm_active`, so these
+    are for testing the snapshot and memo code paths. The sessions can commit,
+    so each gets its own database: SQLite in memory or a scratch PostgreSQL
+    database next to the testing one. They are closed and the databases
+    dropped after the test.
+    """
+    from sqlalchemy import create_engine
+    from .. import MCDeclarativeBase, cm_active
+
+    test_db = setup_and_teardown_package
+    made = []
+
+    def make_session(backend):
+        if backend == 'sqlite':
+            engine = create_engine('sqlite://')
+            db_name = None
+        elif backend == 'postgresql':
+            db_name = '{}_cm{}'.format(test_db.engine.url.database, len(made))
+            with test_db.engine.connect() as conn:
+                conn.execution_options(isolation_level='AUTOCOMMIT').execute(
+                    'CREATE DATABASE {}'.format(db_name))
+            url = copy.copy(test_db.engine.url)
+            url.database = db_name
+            engine = create_engine(url)
+        else:
+            raise ValueError('backend must be sqlite or postgresql')
+        MCDeclarativeBase.metadata.create_all(engine)
+        session = mc.MCSession(bind=engine)
+        made.append((session, engine, db_name))
+        cm_transfer._initialization(session=session, cm_csv_path=mc.test_data_path)
+        return session
+
+    yield make_session
+
+    for session, engine, db_name in made:
+        # delete the hookup cache file
+        from .. import cm_hookup
+        cm_hookup.Hookup(session=session).delete_cache_file()
+        session.close()
+        cm_active.clear_snapshot_cache(engine)
+        engine.dispose()
+        if db_name is not None:
+            with test_db.engine.connect() as conn:
+                conn.execution_options(isolation_level='AUTOCOMMIT').execute(
+                    'DROP DATABASE {}'.format(db_name))
+
+
+@pytest.fixture(scope='function', params=['sqlite', 'postgresql'])
+def cmsession(request, cm_session_factory):
+    """Engine-bound session with the CM test data, on SQLite and PostgreSQL."""
+    return cm_session_factory(request.param)
@@ -0,0 +1,206 @@
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""Testing for `hera_mc.auto_spectra`."""
+
+import json
+import os
+
+import numpy as np
+import pytest
+from astropy.time import Time, TimeDelta
+
+from hera_mc.auto_spectra import (AutoSpectraArchive, HeraAutoSpectra,
+                                  HeraAutoSpectraChunk)
+
+start_gps = 1274918400.5
+antpols = ["1:e", "1:n", "2:e"]
+
+
+def _spectra(ind, nchans=8, nants=3):
+    return np.arange(nants * nchans, dtype=np.float32).reshape(nants, nchans) + ind
+
+
+def _time(ind, offset=0):
+    return Time(start_gps + 10 * ind + offset, format="gps")
+
+
+def _jd(ind):
+    return _time(ind).utc.jd
+
+
+def _fill(session, archive, ntimes, nchans=8, antpols=antpols):
+    for ind in range(ntimes):
+        assert archive.append(session, _jd(ind), antpols,
+                              _spectra(ind, nchans=nchans, nants=len(antpols)))
+    session.commit()
+
+
+def test_archive_errors(tmp_path):
+    with pytest.raises(ValueError, match="dtype must be one of"):
+        AutoSpectraArchive(str(tmp_path), dtype="float64")
+    with pytest.raises(ValueError, match="chunk_size must be a positive integer"):
+        AutoSpectraArchive(str(tmp_path), chunk_size=0)
+    with pytest.raises(ValueError, match="retention_days must be positive"):
+        AutoSpectraArchive(str(tmp_path), retention_days=0)
+
+
+def test_from_config(tmp_path):
+    config_file = str(tmp_path / "mc_config.json")
+    with open(config_file, "w") as f:
+        json.dump({"default_db_name": "testing"}, f)
+    assert AutoSpectraArchive.from_config(config_file) is None
+
+    archive_path = str(tmp_path / "spectra")
+    with open(config_file, "w") as f:
+        json.dump({"auto_spectra_archive": {"path": archive_path, "dtype": "float16",
+                                            "chunk_size": 10}}, f)
+    archive = AutoSpectraArchive.from_config(config_file)
+    assert archive.path == archive_path
+    assert archive.dtype == "float16"
+    assert archive.chunk_size == 10
+    assert os.path.isdir(archive_path)
+
+
+def test_append_and_read(mcsession, tmp_path):
+    archive = AutoSpectraArchive(str(tmp_path), chunk_size=4)
+    _fill(mcsession, archive, 10)
+
+    chunks = mcsession.query(HeraAutoSpectraChunk).order_by(
+        HeraAutoSpectraChunk.start_time).all()
+    assert [chunk.n_times for chunk in chunks] == [4, 4, 2]
+    assert sorted(os.listdir(str(tmp_path))) == sorted(
+        chunk.name + ".npy" for chunk in chunks)
+    assert mcsession.query(HeraAutoSpectra).count() == 10
+
+    # the same time is not archived twice
+    assert not archive.append(mcsession, _jd(3), antpols, _spectra(3))
+
+    times, read_antpols, spectra = archive.read(mcsession, _time(0, -1), _time(9))
+    assert len(times) == 10
+    assert read_antpols == antpols
+    assert spectra.dtype == np.float32
+    for ind in range(10):
+        np.testing.assert_array_equal(spectra[ind], _spectra(ind))
+
+    # slices of times, antpols and channels
+    times, read_antpols, spectra = archive.read(
+        mcsession, _time(2, -1), _time(5),
+        antpols=["2:e", "1:e", "5:n"], channels=slice(2, 6))
+    assert len(times) == 4
+    assert read_antpols == ["2:e", "1:e", "5:n"]
+    assert spectra.shape == (4, 3, 4)
+    for ind in range(4):
+        np.testing.assert_array_equal(spectra[ind, 0], _spectra(ind + 2)[2, 2:6])
+        np.testing.assert_array_equal(spectra[ind, 1], _spectra(ind + 2)[0, 2:6])
+    assert np.all(np.isnan(spectra[:, 2]))
+
+    times, read_antpols, spectra = archive.read(
+        mcsession, _time(20), _time(30))
+    assert times.size == 0
+    assert read_antpols == []
+    assert spectra.shape == (0, 0, 0)
+
+    with pytest.raises(ValueError, match="channels must be a slice or None"):
+        archive.read(mcsession, _time(0), _time(9), channels=[1, 2])
+
+
+def test_append_errors(mcsession, tmp_path):
+    archive = AutoSpectraArchive(str(tmp_path))
+    with pytest.raises(ValueError, match="must all be the same length"):
+        archive.append(mcsession, _jd(0), antpols[:2], [np.zeros(4), np.zeros(5)])
+    with pytest.raises(ValueError, match="one spectrum per antpol"):
+        archive.append(mcsession, _jd(0), antpols, _spectra(0, nants=2))
+
+
+def test_layout_change(mcsession, tmp_path):
+    archive = AutoSpectraArchive(str(tmp_path), chunk_size=10)
+    _fill(mcsession, archive, 2)
+    # different channels, then different antpols start new chunks
+    assert archive.append(mcsession, _jd(2), antpols, _spectra(2, nchans=4))
+    assert archive.append(mcsession, _jd(3), antpols[:2], _spectra(3, nchans=4, nants=2))
+    mcsession.commit()
+    assert mcsession.query(HeraAutoSpectraChunk).count() == 3
+
+    times, read_antpols, spectra = archive.read(mcsession, _time(0, -1), _time(3))
+    assert read_antpols == antpols
+    assert spectra.shape == (4, 3, 8)
+    np.testing.assert_array_equal(spectra[1], _spectra(1))
+    np.testing.assert_array_equal(spectra[2, :, :4], _spectra(2, nchans=4))
+    assert np.all(np.isnan(spectra[2, :, 4:]))
+    np.testing.assert_array_equal(spectra[3, :2, :4], _spectra(3, nchans=4, nants=2))
+    assert np.all(np.isnan(spectra[3, 2]))
+
+
+def test_float16_compressed(mcsession, tmp_path):
+    archive = AutoSpectraArchive(str(tmp_path), dtype="float16", compress=True,
+                                 chunk_size=3)
+    _fill(mcsession, archive, 5)
+
+    chunks = mcsession.query(HeraAutoSpectraChunk).order_by(
+        HeraAutoSpectraChunk.start_time).all()
+    # the full chunk is compressed, the open one is not
+    assert [chunk.compressed for chunk in chunks] == [True, False]
+    assert sorted(os.listdir(str(tmp_path))) == [
+        chunks[0].name + ".npz", chunks[1].name + ".npy"]
+
+    times, _, spectra = archive.read(mcsession, _time(0, -1), _time(4),
+                                     antpols=["1:n"])
+    assert spectra.dtype == np.float32
+    for ind in range(5):
+        np.testing.assert_allclose(spectra[ind, 0], _spectra(ind)[1], rtol=1e-3)
+
+    # a layout change compresses the unfinished chunk too
+    assert archive.append(mcsession, _jd(5), antpols, _spectra(5, nchans=4))
+    mcsession.commit()
+    assert mcsession.query(HeraAutoSpectraChunk).filter_by(
+        compressed=False).count() == 1
+    times, _, spectra = archive.read(mcsession, _time(0, -1), _time(5))
+    np.testing.assert_allclose(spectra[4], _spectra(4), rtol=1e-3)
+
+
+def test_prune(mcsession, tmp_path):
+    archive = AutoSpectraArchive(str(tmp_path), chunk_size=2, retention_days=1)
+    _fill(mcsession, archive, 6)
+    assert mcsession.query(HeraAutoSpectraChunk).count() == 3
+    assert archive.prune(mcsession, now=_time(0) + TimeDelta(1, format="jd")) == []
+
+    # starting a new chunk a day later drops the ones outside the retention
+    later = _time(0, 86400 + 35)
+    assert archive.append(mcsession, later.utc.jd, antpols, _spectra(0))
+    mcsession.commit()
+    chunks = mcsession.query(HeraAutoSpectraChunk).order_by(
+        HeraAutoSpectraChunk.start_time).all()
+    assert len(chunks) == 2
+    assert mcsession.query(HeraAutoSpectra).count() == 3
+    assert len(os.listdir(str(tmp_path))) == 2
+
+    # chunks missing from disk come back as NaN
+    os.remove(os.path.join(str(tmp_path), chunks[0].name + ".npy"))
+    with pytest.warns(UserWarning, match="is missing from"):
+        _, _, spectra = archive.read(mcsession, _time(0, -1), later)
+    assert np.all(np.isnan(spectra[:2]))
+    np.testing.assert_array_equal(spectra[2], _spectra(0))
+
+    archive.retention_days = None
+    assert archive.prune(mcsession) == []
+
+
+def test_add_autocorrelations_archive(mcsession, tmp_path):
+    archive = AutoSpectraArchive(str(tmp_path))
+    autos_dict = {"timestamp": _jd(0)}
+    for ind, antpol in enumerate(antpols):
+        autos_dict[antpol] = _spectra(0)[ind]
+    mcsession.add_autocorrelations_from_redis(hera_autos_dict=autos_dict,
+                                              spectra_archive=archive)
+    mcsession.commit()
+    times, read_antpols, spectra = archive.read(mcsession, _time(0, -1), _time(0))
+    assert read_antpols == antpols
+    np.testing.assert_array_equal(spectra[0], _spectra(0))
+
+    # nothing is archived when testing
+    autos_dict["timestamp"] = _jd(1)
+    mcsession.add_autocorrelations_from_redis(hera_autos_dict=autos_dict, testing=True,
+                                              spectra_archive=archive)
+    assert mcsession.query(HeraAutoSpectra).count() == 1
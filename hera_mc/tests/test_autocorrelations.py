@@ -6,6 +6,7 @@
 
 import pytest
 import datetime
+import numpy as np
 from math import floor
 from astropy.time import Time, TimeDelta
 from hera_mc import autocorrelations
@@ -247,3 +248,62 @@ def test_with_redis_add_autos_from_redis_errors(mcsession):
     test_session.add_autocorrelations_from_redis()
     result = test_session.get_autocorrelation(most_recent=True)
     assert len(result) >= 1
+
+
+def test_reduce_spectra():
+    spectra = np.arange(12, dtype=np.float32).reshape(3, 4)
+    types = ["median", "mean", "rms", "p0", "p100", "p50", "mean[1:3]", "p100[0:2]"]
+    result = autocorrelations._reduce_spectra(spectra, types)
+    assert result["median"] == [1.5, 5.5, 9.5]
+    assert result["median"] == result["p50"]
+    assert result["mean"] == [1.5, 5.5, 9.5]
+    assert np.allclose(result["rms"], np.sqrt(np.mean(spectra.astype(float) ** 2, axis=1)))
+    assert result["p0"] == [0.0, 4.0, 8.0]
+    assert result["p100"] == [3.0, 7.0, 11.0]
+    assert result["mean[1:3]"] == [1.5, 5.5, 9.5]
+    assert result["p100[0:2]"] == [1.0, 5.0, 9.0]
+    assert autocorrelations._reduce_spectra(list(spectra), types) == result
+    assert autocorrelations._reduce_spectra(
+        [[1.0, 2.0, 3.0], [4.0, 5.0]], ["median", "p100[1:2]"]
+    ) == {"median": [2.0, 4.5], "p100[1:2]": [2.0, 5.0]}
+    assert autocorrelations._reduce_spectra([], ["median"]) == {"median": []}
+
+
+@pytest.mark.parametrize(
+    "measurement_type,err_msg",
+    [
+        ("bad", "Autocorrelation type bad not supported."),
+        ("p101", "The percentile of autocorrelation type p101 is over 100."),
+        ("mean[3:3]", "The channel range of autocorrelation type mean[3:3] is empty."),
+        ("mean[2:10]", "The channel range 2:10 is outside the 4 channels"),
+    ],
+)
+def test_reduce_spectra_errors(measurement_type, err_msg):
+    spectra = np.arange(12, dtype=np.float32).reshape(3, 4)
+    with pytest.raises(ValueError, match=err_msg.replace("[", r"\[")):
+        autocorrelations._reduce_spectra(spectra, [measurement_type])
+
+
+def test_add_autos_from_redis_multiple_types(mcsession, auto_dict):
+    test_session = mcsession
+    types = ["median", "p90", "mean[0:8]"]
+    test_session.add_autocorrelations_from_redis(
+        hera_autos_dict=auto_dict, measurement_type=types
+    )
+    result = test_session.get_autocorrelation(
+        starttime=standard_query_time - TimeDelta(3.0, format="sec"), antenna_number=400
+    )
+    assert len(result) == 6
+    values = {(res.antenna_feed_pol, res.measurement_type): res.value for res in result}
+    assert np.isclose(values[("e", "median")], -12.3687)
+    assert np.isclose(values[("e", "p90")], 6.4 - 12.3687)
+    assert np.isclose(values[("n", "mean[0:8]")], -4.5 - 15.5739)
+
+
+@requires_redis
+def test_get_auto_spectra_from_redis():
+    timestamp, antpols, spectra = autocorrelations._get_auto_spectra_from_redis()
+    assert timestamp is not None
+    assert len(antpols) == len(spectra)
+    autos_dict = autocorrelations._get_autos_from_redis()
+    assert set(autos_dict) == set(antpols + ["timestamp"])
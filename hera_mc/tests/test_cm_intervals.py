@@ -0,0 +1,85 @@
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""Testing for `hera_mc.cm_intervals`."""
+
+from argparse import Namespace
+
+import numpy as np
+import pytest
+from astropy.time import Time
+
+from hera_mc import cm_active, cm_intervals, cm_partconnect, cm_utils, geo_location
+
+
+def _interval_rows(nrows, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for ind in range(nrows):
+        start = int(rng.integers(0, 1000))
+        stop = None if rng.uniform() < 0.2 else start + int(rng.integers(0, 200))
+        rows.append(Namespace(ind=ind, start_gpstime=start, stop_gpstime=stop))
+    return rows
+
+
+def test_interval_index():
+    rows = _interval_rows(500)
+    index = cm_intervals.IntervalIndex(rows)
+    times = np.concatenate([[-1, 0, 1200], np.arange(0, 1100, 7.5),
+                            [row.start_gpstime for row in rows[:20]],
+                            [row.stop_gpstime for row in rows[:20]
+                             if row.stop_gpstime is not None]])
+    mask = index.active_mask(times)
+    for gps, row_mask in zip(times, mask):
+        expected = [row.ind for row in rows if row.start_gpstime <= gps
+                    and (row.stop_gpstime is None or row.stop_gpstime > gps)]
+        assert [row.ind for row in index.active_at(gps)] == expected
+        assert list(np.nonzero(row_mask)[0]) == expected
+
+    for by_time, gps in zip(index.active_at_times(times), times):
+        assert by_time == index.active_at(gps)
+
+
+def test_interval_index_edge_cases():
+    # stops are exclusive, zero length intervals are never active
+    rows = [Namespace(start_gpstime=10, stop_gpstime=20),
+            Namespace(start_gpstime=20, stop_gpstime=None),
+            Namespace(start_gpstime=15, stop_gpstime=15)]
+    index = cm_intervals.IntervalIndex(rows)
+    assert index.active_at(9) == []
+    assert index.active_at(10) == [rows[0]]
+    assert index.active_at(15) == [rows[0]]
+    assert index.active_at(20) == [rows[1]]
+    assert index.active_at_times([]) == []
+
+    index = cm_intervals.IntervalIndex(rows, start_col='start_gpstime', stop_col=None)
+    assert index.active_at(20) == rows
+
+    index = cm_intervals.IntervalIndex([])
+    assert index.active_at(20) == []
+    assert index.active_at_times([1, 2]) == [[], []]
+
+
+def test_active_at_dates(mcsession):
+    active = cm_active.ActiveData(mcsession)
+    dates = ['2017-07-01', '2019-07-01', Time('2020-07-01', scale='utc'), 'now']
+    parts = active.active_at_dates(cm_partconnect.Parts, dates)
+    connections = active.active_at_dates(cm_partconnect.Connections,
+                                         Time(['2019-07-01', '2020-07-01'],
+                                              scale='utc'))
+    assert len(parts) == 4
+    assert len(connections) == 2
+    for at_date, date_parts in zip(dates, parts):
+        active.load_parts(cm_utils.get_astropytime(at_date))
+        assert sorted(cm_utils.make_part_key(prt.hpn, prt.hpn_rev)
+                      for prt in date_parts) == sorted(active.parts)
+    active.load_connections('2020-07-01')
+    assert len(connections[1]) == sum(len(ports) for ports in
+                                      active.connections['up'].values())
+
+    rosetta = active.active_at_dates(cm_partconnect.PartRosetta, 'now')
+    assert len(rosetta) == 1
+
+    with pytest.raises(ValueError, match='is not a CM table with active intervals'):
+        active.active_at_dates(geo_location.StationType, 'now')
@@ -8,7 +8,7 @@ import os
 
 import pytest
 
-from .. import cm_transfer, mc
+from .. import cm_transfer, cm_partconnect, cm_table_info, mc
 
 
 def test_classTime():
@@ -22,6 +22,67 @@ def test_db_to_csv():
     assert len(files_written) == 7
     for fw in files_written:
         os.remove(fw)
+    os.remove(cm_table_info.checksum_manifest)
+
+
+def test_db_to_csv_streaming(cm_session_factory, tmp_path):
+    # tables written concurrently from postgres
+    pg_path = tmp_path / 'pg'
+    pg_path.mkdir()
+    pg_files = cm_transfer.package_db_to_csv(session=cm_session_factory('postgresql'),
+                                             output_path=str(pg_path))
+    assert len(pg_files) == 7
+
+    # from sqlite, with a chunked cursor
+    lite_path = tmp_path / 'lite'
+    lite_path.mkdir()
+    lite_files = cm_transfer.package_db_to_csv(session=cm_session_factory('sqlite'),
+                                               output_path=str(lite_path))
+
+    for pg_file, lite_file in zip(pg_files, lite_files):
+        assert os.path.basename(pg_file) == os.path.basename(lite_file)
+        with open(pg_file, 'rb') as fp:
+            pg_bytes = fp.read()
+        with open(lite_file, 'rb') as fp:
+            assert fp.read() == pg_bytes
+    manifest = cm_table_info.checksum_manifest
+    pg_checksums = cm_transfer.read_checksum_manifest(str(pg_path / manifest))
+    assert sorted(pg_checksums) == sorted(os.path.basename(x) for x in pg_files)
+    assert pg_checksums == cm_transfer.read_checksum_manifest(str(lite_path / manifest))
+    assert cm_transfer.changed_csv_files(str(lite_path), str(pg_path)) == []
+
+    # the test data are in the packaged format, so they are written back unchanged
+    for lite_file in lite_files:
+        with open(lite_file, 'rb') as fp:
+            lite_bytes = fp.read()
+        with open(os.path.join(mc.test_data_path, os.path.basename(lite_file)), 'rb') as fp:
+            assert fp.read() == lite_bytes
+
+    # the packaged tables load back to the same rows
+    parts_file = str(lite_path / (cm_table_info.data_prefix + 'parts.csv'))
+    parts = cm_transfer.read_cm_csv(cm_partconnect.Parts, parts_file)
+    test_parts = cm_transfer.read_cm_csv(
+        cm_partconnect.Parts,
+        os.path.join(mc.test_data_path, cm_table_info.data_prefix + 'parts.csv'))
+    assert sorted(zip(*parts.values())) == sorted(zip(*test_parts.values()))
+
+    # only the changed tables are reported, the manifest may be missing
+    with open(parts_file, 'a') as fp:
+        fp.write('NEW,A,antenna,,1230000000,\n')
+    cm_transfer.write_checksum_manifest([parts_file], str(lite_path / manifest),
+                                        checksums=pg_checksums)
+    os.remove(str(pg_path / manifest))
+    assert cm_transfer.changed_csv_files(str(lite_path), str(pg_path)) == [
+        cm_table_info.data_prefix + 'parts.csv']
+    assert cm_transfer.read_checksum_manifest(str(pg_path / manifest)) == {}
+
+
+def test_float_text():
+    values = [1.0, -0.0, 0.1, 1e-05, 6601162.28, 123456789012345.0, 1e15,
+              -1234567890123456.0, 1.5e15, 1e20, float('nan'), float('inf')]
+    expected = ['1', '-0', '0.1', '1e-05', '6601162.28', '123456789012345', '1e+15',
+                '-1.234567890123456e+15', '1.5e+15', '1e+20', 'NaN', 'Infinity']
+    assert [cm_transfer._float_text(x) for x in values] == expected
 
 
 def test_main_validation():
@@ -40,6 +101,37 @@ def test_initialization():
     assert 'test_data' in t
 
 
+def test_read_cm_csv(tmp_path):
+    data_filename = str(tmp_path / 'initialization_data_parts.csv')
+    with open(data_filename, 'w') as fp:
+        fp.write('hpn,hpn_rev,hptype,manufacturer_number,start_gpstime,stop_gpstime,extra\n'
+                 'HH1,A,station,"S/N1, x",1230372018.0,1230372118,y\n'
+                 '\n'
+                 'HH2,A,station,,1230372018\n')
+    columns = cm_transfer.read_cm_csv(cm_partconnect.Parts, data_filename)
+    assert list(columns.keys()) == ['hpn', 'hpn_rev', 'hptype', 'manufacturer_number',
+                                    'start_gpstime', 'stop_gpstime']
+    assert columns['manufacturer_number'] == ['S/N1, x', None]
+    assert columns['start_gpstime'] == [1230372018, 1230372018]
+    assert all(isinstance(x, int) for x in columns['start_gpstime'])
+    assert columns['stop_gpstime'] == [1230372118, None]
+
+
+def test_initialized_tables(mcsession):
+    # the test database is initialized from the csv files with COPY
+    for table, (table_class, _) in cm_table_info.cm_tables.items():
+        data_filename = os.path.join(mc.test_data_path,
+                                     cm_table_info.data_prefix + table + '.csv')
+        columns = cm_transfer.read_cm_csv(table_class, data_filename)
+        nrows = len(next(iter(columns.values())))
+        assert mcsession.query(table_class).count() == nrows
+    part = mcsession.query(cm_partconnect.Parts).filter_by(hpn='HH703').one()
+    assert part.stop_gpstime == 1293408018
+    assert part.manufacturer_number == 'S/N703'
+    rosetta = mcsession.query(cm_partconnect.PartRosetta).first()
+    assert rosetta.stop_gpstime is None
+
+
 def test_check_if_main(mcsession):
     result = cm_transfer.check_if_main(mcsession)
     assert not result
@@ -405,6 +405,59 @@ def test_add_correlator_control_state_from_corrcm_nonetime_priorfalse(
     assert result.isclose(expected)
 
 
+@pytest.mark.parametrize('update', [False, True])
+def test_insert_ignoring_duplicates_batches(mcsession, update):
+    test_session = mcsession
+    t1 = Time(1512770942, format='unix')
+    obj_list = []
+    for ind in range(5):
+        obj_list.append(corr.CorrelatorControlState.create(
+            t1 + TimeDelta(ind, format='sec'), 'taking_data', True))
+    # repeat the first time with a different state
+    obj_list.append(corr.CorrelatorControlState.create(
+        t1, 'taking_data', False))
+
+    test_session._insert_ignoring_duplicates(
+        corr.CorrelatorControlState, obj_list, update=update, batch_size=2)
+    # inserting again should not error
+    test_session._insert_ignoring_duplicates(
+        corr.CorrelatorControlState, obj_list, update=update, batch_size=2)
+
+    result = test_session.get_correlator_control_state(
+        starttime=t1 - TimeDelta(1, format='sec'),
+        stoptime=t1 + TimeDelta(10, format='sec'))
+    assert len(result) == 5
+
+    expected = corr.CorrelatorControlState(
+        time=int(floor(t1.gps)), state_type='taking_data', state=not update)
+    assert result[0].isclose(expected)
+
+
+@pytest.mark.parametrize('update', [False, True])
+def test_insert_ignoring_duplicates_sqlite(update):
+    from sqlalchemy import create_engine
+    from hera_mc import MCDeclarativeBase
+
+    engine = create_engine('sqlite://')
+    MCDeclarativeBase.metadata.create_all(engine)
+    t1 = Time(1512770942, format='unix')
+    obj_list = [
+        corr.CorrelatorControlState.create(t1, 'taking_data', True),
+        corr.CorrelatorControlState.create(t1, 'noise_diode', True),
+        corr.CorrelatorControlState.create(t1, 'taking_data', False),
+    ]
+    with mc.MCSession(bind=engine) as session:
+        session._insert_ignoring_duplicates(
+            corr.CorrelatorControlState, obj_list, update=update)
+        session._insert_ignoring_duplicates(
+            corr.CorrelatorControlState, obj_list, update=update)
+        result = session.get_correlator_control_state(
+            most_recent=False, starttime=t1, state_type='taking_data')
+
+        assert len(result) == 1
+        assert result[0].state is not update
+
+
 def test_control_state_errors(mcsession):
     test_session = mcsession
     pytest.raises(ValueError, test_session.add_correlator_control_state,
@@ -0,0 +1,138 @@
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""Testing for `hera_mc.daemon_runtime`."""
+
+import threading
+import time
+
+import pytest
+
+from ..daemon_runtime import DaemonRuntime, DaemonTask
+from ..daemon_status import DaemonStatus, DaemonTaskStatus
+from ..subsystem_error import SubsystemError
+
+
+@pytest.fixture(scope='function')
+def runtime_db(setup_and_teardown_package):
+    test_db = setup_and_teardown_package
+
+    yield test_db
+
+    # the runtime commits in its own sessions, so clean up after it
+    with test_db.sessionmaker() as session:
+        session.query(DaemonTaskStatus).filter_by(name='test_runtime').delete()
+        session.query(DaemonStatus).filter_by(name='test_runtime').delete()
+        session.query(SubsystemError).filter_by(subsystem='test_runtime').delete()
+        session.commit()
+
+
+def test_task_errors():
+    with pytest.raises(ValueError, match='interval must be positive'):
+        DaemonTask('add_node_sensor_readings_from_nodecontrol', interval=0)
+    with pytest.raises(ValueError, match='timeout must be positive'):
+        DaemonTask('add_node_sensor_readings_from_nodecontrol', timeout=-1)
+    with pytest.raises(ValueError, match='task names must be unique'):
+        DaemonRuntime(None, 'test_runtime', [DaemonTask(len), DaemonTask(len)])
+
+
+def test_next_due():
+    task = DaemonTask('add_node_sensor_readings_from_nodecontrol', interval=60)
+    assert task.name == 'add_node_sensor_readings_from_nodecontrol'
+    assert task.timeout == 60
+    # on the cadence, however late in the interval the run started
+    assert task.next_due(100, 100.5) == 160
+    assert task.next_due(100, 159.9) == 160
+    # ticks missed by an overrunning task are skipped
+    assert task.next_due(100, 230) == 280
+
+
+def test_run_task(runtime_db):
+    def fail(session):
+        raise RuntimeError('task failure')
+
+    def count(session, counts=None):
+        counts.append(session.get_daemon_status(daemon_name='test_runtime'))
+
+    runtime = DaemonRuntime(runtime_db, 'test_runtime', [], hostname='test_host')
+    counts = []
+    status, latency = runtime.run_task(DaemonTask(count, kwargs={'counts': counts}))
+    assert status == 'good'
+    assert latency > 0
+    assert len(counts) == 1
+
+    status, latency = runtime.run_task(DaemonTask(fail))
+    assert status == 'errored'
+
+    with runtime_db.sessionmaker() as session:
+        result = session.query(DaemonTaskStatus).filter_by(name='test_runtime').all()
+        assert {res.task_name: res.status for res in result} == {
+            'count': 'good', 'fail': 'errored'}
+        assert session.query(DaemonStatus).filter_by(name='test_runtime').one().status \
+            == 'errored'
+        errors = session.query(SubsystemError).filter_by(subsystem='test_runtime').all()
+        assert len(errors) == 1
+        assert 'task failure' in errors[0].log
+
+
+def test_run(runtime_db):
+    starts = {'fast': [], 'slow': []}
+    lock = threading.Lock()
+    active = {'slow': 0, 'max_slow': 0}
+
+    def fast(session):
+        starts['fast'].append(time.monotonic())
+
+    def slow(session):
+        starts['slow'].append(time.monotonic())
+        with lock:
+            active['slow'] += 1
+            active['max_slow'] = max(active['max_slow'], active['slow'])
+        time.sleep(0.5)
+        with lock:
+            active['slow'] -= 1
+
+    tasks = [DaemonTask(fast, interval=0.2), DaemonTask(slow, interval=0.2, timeout=0.3)]
+    runtime = DaemonRuntime(runtime_db, 'test_runtime', tasks, hostname='test_host')
+    stop_event = threading.Event()
+    timer = threading.Timer(1.5, stop_event.set)
+    timer.start()
+    runtime.run(stop_event=stop_event)
+
+    # the fast task keeps its cadence while the slow one runs, and does not
+    # drift by its own latency
+    assert 6 <= len(starts['fast']) <= 9
+    assert starts['fast'][-1] - starts['fast'][0] == pytest.approx(
+        0.2 * (len(starts['fast']) - 1), abs=0.1)
+    # the slow task is never run twice at once, ticks are skipped instead
+    assert active['max_slow'] == 1
+    assert 2 <= len(starts['slow']) <= 3
+
+    with runtime_db.sessionmaker() as session:
+        result = session.query(DaemonTaskStatus).filter_by(name='test_runtime').all()
+        assert {res.task_name for res in result} == {'fast', 'slow'}
+        errors = session.query(SubsystemError).filter_by(subsystem='test_runtime').all()
+        assert len(errors) >= 2
+        assert all('longer than its timeout of 0.3 s' in err.log for err in errors)
+
+
+def test_run_database_down(capsys):
+    class DownDB(object):
+        def sessionmaker(self):
+            raise RuntimeError('database is down')
+
+    task = DaemonTask(len, interval=0.2)
+    runtime = DaemonRuntime(DownDB(), 'test_runtime', [task], hostname='test_host')
+    # failures to log are printed rather than raised
+    runtime._report_timeout(task, 1.0)
+    captured = capsys.readouterr()
+    assert 'error logging timeout of task len' in captured.err
+
+    stop_event = threading.Event()
+    timer = threading.Timer(0.5, stop_event.set)
+    timer.start()
+    runtime.run(stop_event=stop_event)
+    captured = capsys.readouterr()
+    assert 'error running task len' in captured.err
+    assert 'database is down' in captured.err
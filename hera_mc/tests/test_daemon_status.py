@@ -8,7 +8,7 @@ from math import floor
 import pytest
 from astropy.time import Time, TimeDelta
 
-from ..daemon_status import DaemonStatus
+from ..daemon_status import DaemonStatus, DaemonTaskStatus
 
 
 @pytest.fixture(scope='function')
@@ -94,3 +94,42 @@ def test_errors_daemon_status(mcsession, daemon_data):
                   starttime='test_host')
     pytest.raises(ValueError, test_session.get_daemon_status,
                   starttime=columns['time'], stoptime='test_host')
+
+
+def test_add_daemon_task_status(mcsession):
+    test_session = mcsession
+    time = Time.now()
+    expected = DaemonTaskStatus(name='test_daemon', task_name='test_task',
+                                hostname='test_host', time=int(floor(time.gps)),
+                                status='good', latency=1.5)
+
+    result = test_session.add_daemon_task_status(
+        'test_daemon', 'test_task', 'test_host', time, 'good', 1.5, testing=True)
+    assert result.isclose(expected)
+
+    test_session.add_daemon_task_status('test_daemon', 'test_task', 'test_host',
+                                        time, 'good', 1.5)
+    test_session.add_daemon_task_status('test_daemon', 'test_task2', 'test_host',
+                                        time, 'errored', 20.)
+    result = test_session.get_daemon_task_status(
+        starttime=time - TimeDelta(2, format='sec'), daemon_name='test_daemon')
+    assert len(result) == 2
+    result = {res.task_name: res for res in result}
+    assert result['test_task'].isclose(expected)
+    assert result['test_task2'].status == 'errored'
+
+    # a second run in the same second updates the record
+    test_session.commit()
+    test_session.add_daemon_task_status('test_daemon', 'test_task', 'test_host',
+                                        time, 'errored', 3.)
+    test_session.commit()
+    result = test_session.get_daemon_task_status(
+        starttime=time - TimeDelta(2, format='sec'), daemon_name='test_daemon')
+    result = {res.task_name: res for res in result}
+    assert result['test_task'].status == 'errored'
+    assert result['test_task'].latency == 3.
+
+    pytest.raises(ValueError, test_session.add_daemon_task_status, 'test_daemon',
+                  'test_task', 'test_host', 'foo', 'good', 1.)
+    pytest.raises(ValueError, test_session.add_daemon_task_status, 'test_daemon',
+                  'test_task', 'test_host', time, 'foo', 1.)
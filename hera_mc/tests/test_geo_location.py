@@ -3,8 +3,9 @@
 # Licensed under the 2-clause BSD license.
 
 """Testing for `hera_mc.geo_location and geo_handling`."""
+import numpy as np
 import pytest
-
+from sqlalchemy import inspect
 from .. import geo_location, geo_handling, cm_partconnect, geo_sysdef, cm_active
 from astropy.time import Time
 
@@ -61,6 +62,37 @@ def test_update_update(mcsession, geo_handle):
     assert located[0].elevation == 1100.0
 
 
+def test_station_positions(geo_handle, cmsession):
+    import cartopy.crs as ccrs
+    from pyuvdata import utils as uvutils
+    located = geo_handle.get_location(['hh701', 'HH704', 'not_a_station'], 'now')
+    assert [x.station_name for x in located] == ['HH701', 'HH704']
+    for loc in located:
+        lon, lat = ccrs.Geodetic().transform_point(
+            loc.easting, loc.northing - 10000000, ccrs.UTM(34))
+        xyz = uvutils.XYZ_from_LatLonAlt(np.radians(lat), np.radians(lon), loc.elevation)
+        assert np.allclose([loc.lon, loc.lat], [lon, lat])
+        assert np.allclose([loc.X, loc.Y, loc.Z], xyz)
+    assert geo_handle.get_location(['HH701'], '2010-01-01') == []
+    assert geo_handle.utm_to_positions([], [], []).shape == (0, 5)
+
+    # positions of all stations are cached on the CM snapshot
+    session = cmsession
+    handle = geo_handling.Handling(session, testing=True)
+    positions = handle.get_station_positions(['HH701'])
+    assert len(positions) == session.query(geo_location.GeoLocation).count()
+    assert handle.get_station_positions() is positions
+    from_snapshot = handle.get_location(['HH701', 'HH704'], 'now')
+    for loc, snap_loc in zip(located, from_snapshot):
+        assert loc.isclose(snap_loc)
+        assert (loc.lon, loc.lat, loc.X) == (snap_loc.lon, snap_loc.lat, snap_loc.X)
+        # the snapshot rows are not annotated
+        row = positions[snap_loc.station_name.upper()][0]
+        assert row is not snap_loc
+        assert not hasattr(row, 'lon')
+        assert inspect(snap_loc).transient
+
+
 def test_random(geo_handle, capsys):
     geo_handle.start_file('test')
     captured = capsys.readouterr()
@@ -400,6 +400,107 @@ def test_add_node_sensor_readings(mcsession, sensor):
     assert result == []
 
 
+@pytest.mark.parametrize('db_type', ['postgresql', 'sqlite'])
+def test_get_latest_sensor_per_node(mcsession, db_type):
+    if db_type == 'sqlite':
+        from sqlalchemy import create_engine
+        from hera_mc import MCDeclarativeBase, mc
+
+        engine = create_engine('sqlite://')
+        MCDeclarativeBase.metadata.create_all(engine)
+        test_session = mc.MCSession(bind=engine)
+    else:
+        test_session = mcsession
+    t1 = Time('2016-01-10 01:15:23', scale='utc')
+    t2 = t1 + TimeDelta(60.0, format='sec')
+    t3 = t1 + TimeDelta(120.0, format='sec')
+
+    # node 1 reports at t1 and t2, node 2 only at t1, node 3 only at t3
+    test_session.add_node_sensor_readings(t1, 1, 30., 31., 32., 33., 40.)
+    test_session.add_node_sensor_readings(t2, 1, 35., 36., 37., 38., 41.)
+    test_session.add_node_sensor_readings(t1, 2, 20., 21., 22., 23., 42.)
+    test_session.add_node_sensor_readings(t3, 3, 25., 26., 27., 28., 43.)
+
+    result = test_session.get_latest_per_key(node.NodeSensor, 'time', 'node')
+    assert [(res.node, res.time) for res in result] == [
+        (1, floor(t2.gps)), (2, floor(t1.gps)), (3, floor(t3.gps))]
+    assert result[0].top_sensor_temp == 35.
+
+    result = test_session.get_latest_per_key(
+        node.NodeSensor, 'time', ['node'], at_time=t2 + TimeDelta(1.0, format='sec'),
+        columns=['node', 'top_sensor_temp'], output='columns')
+    assert list(result.keys()) == ['time', 'node', 'top_sensor_temp']
+    assert np.array_equal(result['node'], [1, 2])
+    assert np.array_equal(result['time'], [floor(t2.gps), floor(t1.gps)])
+    assert np.allclose(result['top_sensor_temp'], [35., 20.])
+
+    result = test_session.get_latest_per_key(
+        node.NodeSensor, 'time', 'node', filter_column='node', filter_value=2)
+    assert len(result) == 1
+    assert result[0].time == floor(t1.gps)
+
+    with pytest.raises(ValueError, match='at_time must be an astropy time'):
+        test_session.get_latest_per_key(node.NodeSensor, 'time', 'node',
+                                        at_time='foo')
+
+    if db_type == 'sqlite':
+        test_session.close()
+
+
+@pytest.mark.parametrize(('agg', 'expected_node1'),
+                         [('mean', [31., 40.]), ('max', [32., 40.]),
+                          ('min', [30., 40.]), ('last', [32., 40.])])
+def test_get_binned_sensor_readings(mcsession, agg, expected_node1):
+    test_session = mcsession
+    t0 = Time(1262304000, format='gps')
+
+    # node 1 has 3 readings in the first 5 minute bin and one in the second
+    for offset, temp in zip([10, 70, 130, 310], [30., 31., 32., 40.]):
+        test_session.add_node_sensor_readings(
+            t0 + TimeDelta(offset, format='sec'), 1, temp, 31., 32., 33., 40.)
+    test_session.add_node_sensor_readings(
+        t0 + TimeDelta(20, format='sec'), 2, 20., 21., 22., 23., 42.)
+
+    result = test_session.get_binned(
+        node.NodeSensor, 'time', ['top_sensor_temp', 'humidity'], 300,
+        t0, t0 + TimeDelta(600, format='sec'), agg=agg, group_by='node')
+    assert list(result.keys()) == ['time', 'node', 'top_sensor_temp',
+                                   'humidity']
+    assert result['time'].dtype == np.int64
+    assert np.array_equal(result['time'],
+                          [t0.gps, t0.gps, t0.gps + 300])
+    assert np.array_equal(result['node'], [1, 2, 1])
+    assert np.allclose(result['top_sensor_temp'],
+                       [expected_node1[0], 20., expected_node1[1]])
+
+    result = test_session.get_binned(
+        node.NodeSensor, 'time', 'top_sensor_temp', 600, t0,
+        t0 + TimeDelta(600, format='sec'), agg=agg, filter_column='node',
+        filter_value=2, output='dataframe')
+    assert len(result) == 1
+    assert result['time'][0] == t0.gps
+    assert result['top_sensor_temp'][0] == 20.
+
+
+def test_get_binned_errors(mcsession):
+    test_session = mcsession
+    t0 = Time(1262304000, format='gps')
+    t1 = t0 + TimeDelta(600, format='sec')
+
+    with pytest.raises(ValueError, match='agg must be one of'):
+        test_session.get_binned(node.NodeSensor, 'time', 'humidity', 60, t0,
+                                t1, agg='foo')
+    with pytest.raises(ValueError, match='output must be one of'):
+        test_session.get_binned(node.NodeSensor, 'time', 'humidity', 60, t0,
+                                t1, output='objects')
+    with pytest.raises(ValueError, match='bin_seconds must be a positive'):
+        test_session.get_binned(node.NodeSensor, 'time', 'humidity', 0.5, t0,
+                                t1)
+    with pytest.raises(ValueError, match='starttime must be an astropy'):
+        test_session.get_binned(node.NodeSensor, 'time', 'humidity', 60,
+                                t0.gps, t1)
+
+
 def test_create_sensor_readings(mcsession, nodelist, sensor):
     test_session = mcsession
     sensor_obj_list = node.create_sensor_readings(
@@ -453,6 +554,23 @@ def test_create_sensor_readings(mcsession, nodelist, sensor):
     assert result_most_recent == result
 
 
+def test_add_node_sensor_readings_from_nodecontrol_dict(mcsession):
+    test_session = mcsession
+    t1 = Time(1512770942.726777, format='unix')
+    sensor_dict = {'1': {'temp_top': 30., 'temp_mid': 31.98, 'temp_bot': 41,
+                         'temp_humid': 33.89, 'humid': 32.5,
+                         'timestamp': t1.to_datetime()}}
+    test_session.add_node_sensor_readings_from_nodecontrol(
+        node_list=[1], sensor_dict=sensor_dict)
+
+    result = test_session.get_node_sensor_readings(most_recent=True)
+    assert len(result) == 1
+    assert result[0].isclose(node.NodeSensor(
+        time=int(floor(t1.gps)), node=1, top_sensor_temp=30.,
+        middle_sensor_temp=31.98, bottom_sensor_temp=41.,
+        humidity_sensor_temp=33.89, humidity=32.5))
+
+
 def test_sensor_reading_errors(mcsession, sensor):
     test_session = mcsession
     top_sensor_temp = sensor['1']['temp_top']
@@ -0,0 +1,196 @@
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""Testing for `hera_mc.partitioning`."""
+
+from astropy.time import Time, TimeDelta
+import numpy as np
+import pytest
+from sqlalchemy import MetaData, Table, create_engine, event
+
+from .. import mc, node, partitioning, MCDeclarativeBase
+
+t0 = Time(1262304000, format='gps')  # early January 2020
+
+
+def _add_readings(session, offsets, node_num=1, temps=None):
+    if temps is None:
+        temps = [30.] * len(offsets)
+    for offset, temp in zip(offsets, temps):
+        session.add_node_sensor_readings(
+            t0 + TimeDelta(offset, format='sec'), node_num, temp, 31., 32.,
+            33., 40.)
+    session.commit()
+
+
+def _count(session, table_name):
+    return session.execute(
+        'SELECT count(*) FROM {table}'.format(table=table_name)).scalar()
+
+
+def test_tables_partitioned(mcsession):
+    test_session = mcsession
+    for table_name in partitioning.telemetry_tables:
+        assert partitioning.is_partitioned(test_session, table_name)
+        assert partitioning.get_partitions(test_session, table_name) == []
+    assert not partitioning.is_partitioned(test_session, 'node_power_status')
+
+    assert partitioning.month_start_gps(2019, 13) == partitioning.month_start_gps(2020, 1)
+    assert partitioning.partition_name('node_sensor', 2020, 1) == 'node_sensor_y2020m01'
+
+
+def test_create_partitions(mcsession):
+    test_session = mcsession
+    _add_readings(test_session, [0, 60, 120])
+    assert _count(test_session, 'node_sensor_default') == 3
+
+    created = partitioning.create_partitions(
+        test_session, t0 - TimeDelta(30, format='jd'),
+        t0 + TimeDelta(30, format='jd'), tables='node_sensor')
+    assert created == ['node_sensor_y2019m12', 'node_sensor_y2020m01',
+                       'node_sensor_y2020m02']
+    partitions = partitioning.get_partitions(test_session, 'node_sensor')
+    assert [part[0] for part in partitions] == created
+    assert partitions[1][1:] == (partitioning.month_start_gps(2020, 1),
+                                 partitioning.month_start_gps(2020, 2))
+
+    # the rows were moved out of the default partition
+    assert _count(test_session, 'node_sensor_default') == 0
+    assert _count(test_session, 'node_sensor_y2020m01') == 3
+
+    # existing partitions are skipped
+    assert partitioning.create_partitions(test_session, t0, t0,
+                                          tables=['node_sensor']) == []
+
+    # new rows go to the right partition
+    _add_readings(test_session, [180])
+    assert _count(test_session, 'node_sensor_y2020m01') == 4
+
+    # time range queries only scan the partitions they need
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    connection = test_session.connection()
+    event.listen(connection, 'before_cursor_execute', capture)
+    result = test_session.get_node_sensor_readings(
+        starttime=t0, stoptime=t0 + TimeDelta(300, format='sec'))
+    event.remove(connection, 'before_cursor_execute', capture)
+    assert len(result) == 4
+
+    statement, parameters = statements[-1]
+    cursor = connection.connection.cursor()
+    cursor.execute('EXPLAIN ' + statement, parameters)
+    plan = '\n'.join(row[0] for row in cursor.fetchall())
+    assert 'node_sensor_y2020m01' in plan
+    assert 'node_sensor_y2019m12' not in plan
+    assert 'node_sensor_default' not in plan
+
+
+def test_autogenerate_skips_partitions(mcsession):
+    assert partitioning.is_partition_name('node_sensor_y2020m01')
+    assert partitioning.is_partition_name('node_white_rabbit_status_default')
+    assert not partitioning.is_partition_name('node_sensor')
+    assert not partitioning.is_partition_name('node_sensor_hourly')
+    assert not partitioning.is_partition_name('node_power_status_y2020m01')
+
+    # the partitions and their indexes as reflected by autogenerate
+    test_session = mcsession
+    partitioning.create_partitions(test_session, t0, t0, tables='node_sensor')
+    metadata = MetaData()
+    partition = Table('node_sensor_y2020m01', metadata, autoload_with=test_session.connection())
+    assert not partitioning.include_object(partition, partition.name, 'table', True, None)
+    assert len(partition.indexes) > 0
+    for index in partition.indexes:
+        assert not partitioning.include_object(index, index.name, 'index', True, None)
+
+    # but not the tables in the metadata
+    node_sensor = MCDeclarativeBase.metadata.tables['node_sensor']
+    reflected = Table('node_sensor', metadata, autoload_with=test_session.connection())
+    assert partitioning.include_object(reflected, 'node_sensor', 'table', True, node_sensor)
+    assert partitioning.include_object(node_sensor, 'node_sensor', 'table', False, None)
+
+
+def test_create_partitions_errors(mcsession):
+    test_session = mcsession
+    with pytest.raises(ValueError, match='is not a telemetry table'):
+        partitioning.create_partitions(test_session, t0, t0, tables='foo')
+    with pytest.raises(ValueError, match='starttime must be an astropy'):
+        partitioning.create_partitions(test_session, t0.gps, t0)
+
+
+def test_rollup_telemetry(mcsession):
+    test_session = mcsession
+    partitioning.create_partitions(
+        test_session, t0 - TimeDelta(30, format='jd'), t0,
+        tables='node_sensor')
+    hour = int(t0.gps) // 3600 * 3600
+    # offsets relative to t0 in the hour that will be rolled up
+    old_offsets = np.array([0, 60, 120]) + hour + 3600 - int(t0.gps)
+    _add_readings(test_session, old_offsets, temps=[30., 31., 35.])
+    _add_readings(test_session, old_offsets[:1], node_num=2, temps=[20.])
+    # in the previous month's partition
+    _add_readings(test_session, [-20 * 86400])
+    # recent enough to keep
+    _add_readings(test_session, [86400])
+
+    now = t0 + TimeDelta(10, format='jd')
+    n_removed = partitioning.rollup_telemetry(
+        test_session, 9, tables='node_sensor', now=now)
+    assert n_removed == {'node_sensor': 5}
+
+    hourly = test_session.query(partitioning.NodeSensorHourly).order_by(
+        partitioning.NodeSensorHourly.time,
+        partitioning.NodeSensorHourly.node).all()
+    assert len(hourly) == 3
+    assert hourly[1].time == hour + 3600
+    assert hourly[1].node == 1
+    assert hourly[1].n_samples == 3
+    assert hourly[1].top_sensor_temp_mean == pytest.approx(32.)
+    assert hourly[1].top_sensor_temp_min == 30.
+    assert hourly[1].top_sensor_temp_max == 35.
+    assert hourly[2].node == 2
+
+    # the old partition was dropped and only the recent row is left
+    assert [part[0] for part in partitioning.get_partitions(
+        test_session, 'node_sensor')] == ['node_sensor_y2020m01']
+    result = test_session.get_node_sensor_readings(
+        starttime=t0 - TimeDelta(30, format='jd'),
+        stoptime=t0 + TimeDelta(30, format='jd'))
+    assert len(result) == 1
+
+    # late data is merged into the existing hour
+    _add_readings(test_session, old_offsets[2:] + 60, temps=[40.])
+    n_removed = partitioning.rollup_telemetry(test_session, 9, now=now)
+    assert n_removed['node_sensor'] == 1
+    assert n_removed['antenna_status'] == 0
+    test_session.expire_all()
+    merged = test_session.query(partitioning.NodeSensorHourly).filter_by(
+        time=hour + 3600, node=1).one()
+    assert merged.n_samples == 4
+    assert merged.top_sensor_temp_mean == pytest.approx(34.)
+    assert merged.top_sensor_temp_max == 40.
+    assert merged.humidity_min == 40.
+
+    with pytest.raises(ValueError, match='retention_days must be a positive'):
+        partitioning.rollup_telemetry(test_session, -1)
+    with pytest.raises(ValueError, match='now must be an astropy'):
+        partitioning.rollup_telemetry(test_session, 1, now=now.gps)
+
+
+def test_rollup_telemetry_sqlite():
+    engine = create_engine('sqlite://')
+    MCDeclarativeBase.metadata.create_all(engine)
+    with mc.MCSession(bind=engine) as test_session:
+        _add_readings(test_session, [0, 60, 86400])
+        n_removed = partitioning.rollup_telemetry(
+            test_session, 0.5, now=t0 + TimeDelta(1, format='jd'))
+        assert n_removed['node_sensor'] == 2
+        hourly = test_session.query(partitioning.NodeSensorHourly).one()
+        assert hourly.n_samples == 2
+        assert len(test_session.query(node.NodeSensor).all()) == 1
+
+        with pytest.raises(ValueError, match='only supported on PostgreSQL'):
+            partitioning.is_partitioned(test_session, 'node_sensor')
@@ -8,8 +8,10 @@ import pytest
 import numpy as np
 from astropy.time import Time
 from collections import OrderedDict
+from sqlalchemy import event
 
-from hera_mc import cm_partconnect, cm_utils, cm_handling, cm_revisions, cm_dossier, cm_active
+from hera_mc import (cm_partconnect, cm_utils, cm_handling, cm_revisions, cm_dossier, cm_active,
+                     cm_transfer)
 
 
 @pytest.fixture(scope='function')
@@ -94,12 +96,108 @@ def test_duplicate(mcsession):
     pytest.raises(ValueError, active.load_connections)
 
 
+def test_active_snapshot(cmsession):
+    session = cmsession
+    engine = session.get_bind()
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    direct = cm_active.ActiveData(session, use_snapshot=False)
+    direct.load_parts()
+    direct.load_connections()
+    direct.load_info()
+    direct.load_geo()
+
+    active = cm_active.ActiveData(session)
+    active.load_parts()
+    active.load_connections()
+    active.load_info()
+    active.load_geo()
+    assert sorted(active.parts) == sorted(direct.parts)
+    assert sorted(active.connections['up']) == sorted(direct.connections['up'])
+    assert sorted(active.info) == sorted(direct.info)
+    assert sorted(active.geo) == sorted(direct.geo)
+    by_date = active.active_at_dates(cm_partconnect.Parts, ['2019-07-01', 'now'])
+    assert (sorted(cm_utils.make_part_key(prt.hpn, prt.hpn_rev) for prt in by_date[1])
+            == sorted(direct.parts))
+
+    # later loads only check the cm version
+    event.listen(engine, 'before_cursor_execute', capture)
+    active = cm_active.ActiveData(session)
+    active.load_parts('2019-07-01')
+    active.load_connections()
+    event.remove(engine, 'before_cursor_execute', capture)
+    assert len(statements) == 2
+    assert all('cm_version' in statement for statement in statements)
+
+    # changes made in this process are seen once committed
+    part = cm_partconnect.Parts()
+    part.hpn = 'test_part'
+    part.hpn_rev = 'Q'
+    part.hptype = 'antenna'
+    part.start_gpstime = Time('2019-07-01 01:00:00', scale='utc').gps
+    session.add(part)
+    session.flush()
+    assert cm_active.get_snapshot(session) is None
+    active.load_parts('now')
+    assert 'TEST_PART:Q' in active.parts
+    session.commit()
+    active.load_parts('now')
+    assert 'TEST_PART:Q' in active.parts
+    assert cm_active.get_snapshot(session) is not None
+
+    # as are new cm versions
+    snapshot = cm_active.get_snapshot(session)
+    session.add(cm_transfer.CMVersion.create(Time('2030-01-01', scale='utc'), 'abc'))
+    session.commit()
+    assert cm_active.get_snapshot(session) is not snapshot
+
+    cm_active.clear_snapshot_cache(engine)
+    assert engine not in cm_active._snapshots
+    cm_active.clear_snapshot_cache()
+
+
+def test_active_snapshot_dates(cmsession):
+    session = cmsession
+    part = cm_partconnect.Parts()
+    part.hpn = 'SNPZ1'
+    part.hpn_rev = 'A'
+    part.hptype = 'snap'
+    part.start_gpstime = 1200000000
+    session.add(part)
+    rose = cm_partconnect.PartRosetta()
+    rose.hpn = 'SNPZ1'
+    rose.syspn = 'heraNodeXSnapY'
+    rose.start_gpstime = 1300000000
+    session.add(rose)
+    session.commit()
+
+    # two dates loaded from one snapshot don't share their annotations
+    now = cm_active.ActiveData(session)
+    now.load_parts('now')
+    now.load_rosetta('now')
+    assert now.syspn['SNPZ1:A'] == 'heraNodeXSnapY'
+    before = cm_active.ActiveData(session, at_date=1250000000)
+    before.load_parts()
+    before.load_rosetta()
+    assert before.snapshot is now.snapshot
+    assert 'SNPZ1' not in before.rosetta
+    assert 'SNPZ1:A' not in before.syspn
+    assert before.parts['SNPZ1:A'].start_gpstime == 1200000000
+    assert now.syspn['SNPZ1:A'] == 'heraNodeXSnapY'
+    snapshot_part = [prt for prt in now.snapshot.rows['parts'] if prt.hpn == 'SNPZ1'][0]
+    assert not hasattr(snapshot_part, 'syspn')
+
+
 def test_rosetta(mcsession, capsys):
     active = cm_active.ActiveData(mcsession)
     at_date = Time('2020-07-01 01:00:00', scale='utc')
     active.load_parts(at_date)
     active.load_rosetta(at_date)
     assert active.rosetta['SNPC000700'].syspn == 'heraNode700Snap700'
+    assert 'SNPC000700:A' not in active.syspn
     print(active.rosetta['SNPC000700'])
     captured = capsys.readouterr()
     assert captured.out.strip().startswith('<SNPC000700')
@@ -107,6 +205,7 @@ def test_rosetta(mcsession, capsys):
                                        at_date, session=mcsession)
     active.load_rosetta(at_date)
     assert active.rosetta['SNPC000702'].syspn == 'heraNode700Snap1'
+    assert active.syspn['SNPC000702:A'] == 'heraNode700Snap1'
     stop_at = Time('2020-08-01 01:00:00', scale='utc')
     cm_partconnect.update_part_rosetta('SNPC000701', 'heraNode700Snap2',
                                        at_date, stop_at, mcsession)
@@ -0,0 +1,122 @@
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""Testing for `hera_mc.synthetic`."""
+
+from astropy.time import Time, TimeDelta
+import numpy as np
+import pytest
+
+from .. import synthetic
+
+t0 = Time(1262304000, format='gps')
+
+
+def test_layout(mcsession):
+    test_session = mcsession
+    array = synthetic.SyntheticArray(test_session)
+    ant702 = [ant for ant in array.antennas if ant['antenna_number'] == 702][0]
+    assert ant702 == {'antenna_number': 702, 'snap_hostname': 'heraNode700Snap0',
+                      'snap_serial': 'SNPA000700', 'e_channel': 3,
+                      'n_channel': 2, 'node': 700}
+    assert array.nodes == [700, 701]
+    assert array.snaps['heraNode701Snap3'] == {'node': 701, 'loc': 3,
+                                               'serial': 'SNPD000703'}
+
+    big = synthetic.SyntheticArray(test_session, nants=50)
+    assert len(big.antennas) == 50
+    assert len(set((ant['snap_hostname'], ant['e_channel'])
+                   for ant in big.antennas)) == 50
+    assert big.antennas[-1]['antenna_number'] > 712
+    assert big.nodes[-1] > 701
+
+    small = synthetic.SyntheticArray(test_session, nants=3)
+    assert len(small.antennas) == 3
+    assert small.nodes == [700]
+
+
+def test_rows(mcsession):
+    test_session = mcsession
+    array = synthetic.SyntheticArray(test_session)
+    nants = len(array.antennas)
+    gps = int(t0.gps)
+    rows = array.rows(gps)
+    assert len(rows['hera_autos']) == 2 * nants
+    assert len(rows['antenna_status']) == 2 * nants
+    assert len(rows['snap_status']) == len(array.snaps)
+    assert len(rows['node_sensor']) == 2
+    assert len(rows['node_power_status']) == 2
+    assert len(rows['rtp_server_status']) == len(synthetic.RTP_HOSTS)
+    # gps is on a 10 minute boundary, so an observation just ended
+    assert len(rows['hera_obs']) == 1
+    assert rows['hera_obs'][0].obsid == gps - 600
+    assert len(rows['rtp_task_resource_record']) == len(synthetic.RTP_TASKS)
+    # every weather variable is due at a 60 s step
+    wx_times = {}
+    for wx in rows['weather_data']:
+        wx_times.setdefault(wx.variable, []).append(wx.time)
+    assert wx_times['wind_direction'] == [gps, gps - 30]
+    assert wx_times['pressure'] == [gps]
+
+    # counters increase with time and fixed properties stay fixed
+    later = array.rows(gps + 60)
+    assert later['hera_obs'] == []
+    assert 'wind_speed' not in [wx.variable for wx in later['weather_data']]
+    for before, after in zip(rows['snap_status'], later['snap_status']):
+        assert after.pps_count == before.pps_count + 60
+        assert after.uptime_cycles > before.uptime_cycles
+        assert after.last_programmed_time == before.last_programmed_time
+    assert ([status.pam_atten for status in rows['antenna_status']]
+            == [status.pam_atten for status in later['antenna_status']])
+    for status in rows['antenna_status']:
+        assert status.snap_channel_number in range(6)
+        assert status.adc_power == pytest.approx(status.adc_rms ** 2)
+
+    # reproducible with the same seed
+    again = synthetic.SyntheticArray(test_session).rows(gps)
+    assert ([auto.value for auto in rows['hera_autos']]
+            == [auto.value for auto in again['hera_autos']])
+
+
+def test_load(mcsession):
+    test_session = mcsession
+    array = synthetic.SyntheticArray(test_session)
+    counts = array.load(test_session, t0, 1200, cadence=60, steps_per_commit=7)
+    nants = len(array.antennas)
+    assert counts['antenna_status'] == 20 * 2 * nants
+    assert counts['node_sensor'] == 40
+    assert counts['hera_obs'] == 2
+    assert counts['weather_data'] == sum(
+        1200 // info['period'] for info in synthetic.weather_sensor_dict.values())
+
+    stoptime = t0 + TimeDelta(1200, format='sec')
+    autos = test_session.get_autocorrelation(
+        starttime=t0, stoptime=stoptime, antenna_number=702)
+    assert len(autos) == 40
+    sensors = test_session.get_node_sensor_readings(
+        starttime=t0, stoptime=stoptime, nodeID=700)
+    times = [sensor.time for sensor in sensors]
+    assert np.all(np.diff(times) == 60)
+    temps = [sensor.top_sensor_temp for sensor in sensors]
+    assert np.ptp(temps) < 5
+    tasks = test_session.query(synthetic.RTPTaskResourceRecord).filter(
+        synthetic.RTPTaskResourceRecord.obsid == int(t0.gps)).all()
+    assert len(tasks) == len(synthetic.RTP_TASKS)
+    assert all(task.start_time >= int(t0.gps) + 600 for task in tasks)
+
+    # reloading the same range does not duplicate rows
+    array.load(test_session, t0, 120, tables='node_sensor')
+    assert len(test_session.get_node_sensor_readings(
+        starttime=t0, stoptime=stoptime, nodeID=700)) == 20
+
+
+def test_load_errors(mcsession):
+    test_session = mcsession
+    array = synthetic.SyntheticArray(test_session, nants=3)
+    with pytest.raises(ValueError, match='starttime must be an astropy'):
+        array.load(test_session, t0.gps, 60)
+    with pytest.raises(ValueError, match='cadence must be a positive integer'):
+        array.load(test_session, t0, 60, cadence=0.5)
+    with pytest.raises(ValueError, match='foo is not a synthetic table'):
+        array.load(test_session, t0, 60, tables=['node_sensor', 'foo'])
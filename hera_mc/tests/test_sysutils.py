@@ -10,10 +10,9 @@ from argparse import Namespace
 
 import pytest
 import numpy as np
-
-from .. import (cm_sysutils, cm_partconnect, cm_hookup, cm_utils, utils,
-                cm_sysdef, cm_dossier, cm_active, cm_redis_corr,
-                watch_dog, node)
+from .. import (cm_sysutils, cm_partconnect, cm_hookup, cm_hookup_cache, cm_utils, utils,
+                cm_sysdef, cm_dossier, cm_active, cm_redis_corr, cm_transfer,
+                watch_dog, node, geo_handling)
 from .. tests import requires_redis
 from .. tests import TEST_DEFAULT_REDIS_HOST
 import redis
@@ -29,7 +28,15 @@ def test_set_redis_cminfo(mcsession):
     redishost = TEST_DEFAULT_REDIS_HOST
     rsession = redis.Redis(redishost)
     rsession.hmset('testing_corr:map', {'snap_host': b'{"SNPB000701":"heraNode700Snap700"}'})
-    cm_redis_corr.set_redis_cminfo(redishost=redishost, session=mcsession, testing=True)
+    assert cm_redis_corr.set_redis_cminfo(redishost=redishost, session=mcsession,
+                                          testing=True, force=True)
+    # nothing changed, so nothing is written
+    assert not cm_redis_corr.set_redis_cminfo(redishost=redishost, session=mcsession,
+                                              testing=True)
+    # the content hash is stored as the bare hex digest
+    cminfo = cm_sysutils.Handling(mcsession).get_cminfo_correlator()
+    assert rsession.hget('testing_cminfo', 'cminfo_hash').decode('utf-8') == \
+        cm_redis_corr.cminfo_hash(cminfo, rsession.hget('testing_corr:map', 'snap_host'))
     test_out = rsession.hget('testing_corr:map', 'ant_to_snap')
     assert b'{"host": "SNPA000700", "channel": 0}' in test_out
     test_out = rsession.hget('testing_cminfo', 'cofa_lat')
@@ -146,7 +153,8 @@ def test_other_hookup(sys_handle, mcsession, capsys):
     assert hookup.hookup_type, 'parts_hera'
     gptf = hookup._get_part_types_found([])
     assert len(gptf) == 0
-    x = hookup._get_port(Namespace(port=None), 'A')
+    x = cm_hookup.HookupGraph(hookup.active, 'parts_hera')._get_port('N700:A', None, 'E',
+                                                                     'node', ['A'])
     assert x is None
     hookup.hookup_list_to_cache = ['A1']
     x = hookup._requested_list_OK_for_cache(['B1'])
@@ -207,13 +215,49 @@ def test_hookup_misc(mcsession):
     hookup.col_list = ['antenna', 'front-end']
     sk_ret = hookup._sort_hookup_display('antenna,front-end', {})
     assert len(sk_ret) == 0
-    hookup.hookup_type = 'test-hookup'
-    test_current = Namespace(direction='up', key='', part=['E'], rev='', hptype='type-a',
-                             port='x', pol='E', allowed_ports=['y'], type='')
-    options = ['y']
-    hookup.sysdef.single_pol_labeled_parts['test-hookup'] = ['type-a']
-    test_ret = hookup._get_port(test_current, options)
-    assert test_ret == 'y'
+    active = cm_active.ActiveData(session=mcsession)
+    active.load_parts(at_date=None)
+    active.load_connections(at_date=None)
+    graph = cm_hookup.HookupGraph(active, 'parts_hera')
+    graph.single_pol_labeled_parts = ['type-a']
+    graph.part_types['TESTE:A'] = 'type-a'
+    graph._allowed_ports[('E', 'type-a')] = ['Y']
+    test_ret = graph._get_port('TESTE:A', 'X', 'E', 'type-a', ['Y'])
+    assert test_ret == 'Y'
+
+
+def test_hookup_graph(mcsession):
+    hookup = cm_hookup.Hookup(mcsession)
+    hu_all = hookup.get_hookup('default', at_date='2019-07-03')
+    hu_one = hookup.get_hookup(['HH701'], at_date='2019-07-03', exact_match=True)
+    assert hu_one['HH701:A'].hookup == hu_all['HH701:A'].hookup
+    hu_pam = hookup.get_hookup(['PAM701'], pol='n', at_date='2019-07-03', exact_match=True)
+    assert hu_pam['PAM701:A'].hookup['N<n'] == hu_all['HH701:A'].hookup['N<ground']
+
+    # the rest of the path from each state is memoized
+    graph = cm_hookup.HookupGraph(hookup.active, 'parts_hera')
+    path = graph.follow('HH701', 'A', 'E<ground')
+    assert graph._segments[('down', 'SNPA000700:A', 'E2', 'E', 'station')] == tuple(path[-1:])
+    graph._step = None  # so following it again must only use the memo
+    assert graph.follow('HH701', 'A', 'E<ground') == path
+
+
+def test_follow_part(mcsession):
+    hookup = cm_hookup.Hookup(mcsession)
+    pytest.raises(ValueError, hookup.follow_part, 'HH701:A', 'parts_hera')
+    hu_all = hookup.get_hookup('default', at_date='2019-07-03')
+    paths, path_parts = hookup.follow_part('HH701:A', 'parts_hera')
+    assert paths == hu_all['HH701:A'].hookup
+    assert 'PAM701:A' in path_parts
+    # the graphs of the active data are built once
+    graph = hookup._active_graphs[1]['parts_hera']
+    assert hookup.follow_part('HH701:A', 'parts_hera', pol='e')[0] == {
+        'E<ground': paths['E<ground']}
+    assert hookup._active_graphs[1]['parts_hera'] is graph
+    # or taken from (and added to) the graphs passed in
+    graphs = {}
+    assert hookup.follow_part('HH701:A', 'parts_hera', graphs=graphs)[0] == paths
+    assert graphs['parts_hera'] is not graph
 
 
 def test_which_node(capsys, mcsession):
@@ -312,6 +356,12 @@ def test_sysutil_node(capsys, mcsession):
     assert 'SNPD000703' in xni.keys()
     xni = cm_sysutils.node_info([700], mcsession)
     assert 'SNPA000700' in xni.keys()
+    assert xni['N700']['snaps'] == ['SNPA000700', 'SNPB000701', 'SNPC000702']
+    assert xni['N700']['wr'] == 'WRA000700'
+    assert xni['N700']['arduino'] == 'RD700'
+    assert xni['N700']['ncm'] == 'NCM700'
+    assert xni['SNPA000700'] == ['MAC - 123', 'IP - 456']
+    assert cm_sysutils.node_info([700], mcsession, at_date='2019-01-01')['N700']['snaps'] == []
     cm_sysutils.print_node(xni)
     captured = capsys.readouterr()
     assert '| Node   |' in captured.out.strip()
@@ -331,10 +381,185 @@ def test_sysutil_node(capsys, mcsession):
     assert captured.out.strip().startswith('<html>')
 
 
+def _hookup_summary(hookup_dict):
+    return {key: ({pol: [cm_hookup_cache.connection_tuple(conn) for conn in conns]
+                   for pol, conns in entry.hookup.items()},
+                  entry.fully_connected, entry.hookup_type, entry.columns, entry.timing)
+            for key, entry in hookup_dict.items()}
+
+
+def test_hookup_cache(mcsession, capsys):
+    hookup = cm_hookup.Hookup(session=mcsession)
+    hookup.write_hookup_cache_to_file(log_msg='For testing.')
+    from_db = hookup.get_hookup('default', at_date='now')
+    hookup.read_hookup_cache_from_file()
+    assert hookup.cache_is_current
+    cache = hookup.cached_hookup_dict
+    assert isinstance(cache, cm_hookup_cache.HookupCache)
+    assert len(cache._entries) == 0
+    assert sorted(cache.keys()) == sorted(from_db.keys())
+    assert _hookup_summary(cache) == _hookup_summary(from_db)
+    assert cache['HH702:A'] is cache['HH702:A']
+    assert cache.changed_parts(hookup.active) == set()
+    hu = hookup.get_hookup(['HH702'], exact_match=True, use_cache=True)
+    assert list(hu.keys()) == ['HH702:A']
+
+    # stop a connection and add a new station
+    now = int(cm_utils.get_astropytime('now').gps)
+    conn = mcsession.query(cm_partconnect.Connections).filter(
+        cm_partconnect.Connections.upstream_part == 'PAM702',
+        cm_partconnect.Connections.downstream_input_port == 'e6').one()
+    conn.stop_gpstime = now - 10
+    mcsession.add(cm_partconnect.Parts(hpn='HH999', hpn_rev='A', hptype='station',
+                                       start_gpstime=now - 10))
+    mcsession.add(cm_transfer.CMVersion.create(cm_utils.get_astropytime(now + 1), 'test'))
+    mcsession.flush()
+    hookup = cm_hookup.Hookup(session=mcsession)
+    hookup.at_date = cm_utils.get_astropytime('now')
+    hookup.read_hookup_cache_from_file()
+    assert not hookup.cache_is_current
+    # the hookups through both ends of the stopped connection are redone
+    redone = hookup.update_cached_hookup()
+    assert 'HH702' in redone and 'HH999' in redone
+    assert len(redone) < len(hookup.cached_hookup_dict)
+    from_db = hookup.get_hookup('default', at_date='now')
+    assert _hookup_summary(hookup.cached_hookup_dict) == _hookup_summary(from_db)
+    assert 'HH999:A' in hookup.cached_hookup_dict
+
+    # writing again updates the file
+    hookup.write_hookup_cache_to_file(log_msg='For testing.')
+    hookup.read_hookup_cache_from_file()
+    assert hookup.cache_is_current
+    assert _hookup_summary(hookup.cached_hookup_dict) == _hookup_summary(from_db)
+    e_hookup = hookup.cached_hookup_dict['HH702:A'].hookup['E<ground']
+    assert [x.downstream_input_port for x in e_hookup if x.upstream_part == 'PAM702'] == ['n4']
+
+
+def _apply_hookup_changes(routes, changes):
+    routes = {key: {pol: set(conns) for pol, conns in pols.items()}
+              for key, pols in routes.items()}
+    for key, pols in changes.items():
+        for pol, change in pols.items():
+            this_routes = routes.setdefault(key, {}).setdefault(pol, set())
+            this_routes -= {cm_hookup._connection_route(x) for x in change['removed']}
+            this_routes -= {cm_hookup._connection_route(x[0]) for x in change['rerouted']}
+            this_routes |= {cm_hookup._connection_route(x) for x in change['added']}
+            this_routes |= {cm_hookup._connection_route(x[1]) for x in change['rerouted']}
+    return {key: {pol: conns for pol, conns in pols.items() if len(conns)}
+            for key, pols in routes.items() if any(len(x) for x in pols.values())}
+
+
+def _hookup_routes(hookup_dict):
+    return {key: {pol: {cm_hookup._connection_route(x) for x in conns}
+                  for pol, conns in entry.hookup.items() if len(conns)}
+            for key, entry in hookup_dict.items()
+            if any(len(x) for x in entry.hookup.values())}
+
+
+def test_hookup_diff(mcsession):
+    hookup = cm_hookup.Hookup(mcsession)
+    assert hookup.diff('2019-07-03', '2019-07-03') == {}
+    # HH703 stops in 2021
+    changes = hookup.diff('2019-07-03', '2022-01-01')
+    assert list(changes.keys()) == ['HH703:A']
+    assert len(changes['HH703:A']['E<ground']['removed']) == 7
+    assert changes['HH703:A']['E<ground']['added'] == []
+    assert hookup.diff('2022-01-01', '2019-07-03')['HH703:A']['N<ground']['removed'] == []
+
+    # reroute PAM702 east to the SNAP port PAM703 used
+    now = int(cm_utils.get_astropytime('now').gps)
+    for pam, port in [('PAM702', 'e6'), ('PAM703', 'e10')]:
+        conn = mcsession.query(cm_partconnect.Connections).filter(
+            cm_partconnect.Connections.upstream_part == pam,
+            cm_partconnect.Connections.downstream_input_port == port).one()
+        conn.stop_gpstime = now - 100
+    new_conn = cm_partconnect.Connections(
+        upstream_part='PAM702', up_part_rev='A', upstream_output_port='e',
+        downstream_part='SNPA000700', down_part_rev='A', downstream_input_port='e10',
+        start_gpstime=now - 100)
+    mcsession.add(new_conn)
+    mcsession.flush()
+    changes = hookup.diff(now - 200, now, hpn=['HH702'], exact_match=True)
+    assert list(changes.keys()) == ['HH702:A']
+    assert list(changes['HH702:A'].keys()) == ['E<ground']
+    change = changes['HH702:A']['E<ground']
+    assert change['added'] == change['removed'] == []
+    assert [(x.downstream_input_port, y.downstream_input_port)
+            for x, y in change['rerouted']] == [('e6', 'e10')]
+    assert change['rerouted'][0][1] is new_conn
+
+    # chaining the changes gives the hookups at each date
+    start = cm_utils.get_astropytime('2019-01-01')
+    routes = _hookup_routes(hookup.get_hookup('default', at_date=start))
+    dates = []
+    for at_date, changes in hookup.hookup_changes(start, 'now'):
+        dates.append(at_date)
+        routes = _apply_hookup_changes(routes, changes)
+        assert routes == _hookup_routes(hookup.get_hookup('default', at_date=at_date))
+    assert dates[-1].gps == now - 100
+    assert len(list(hookup.hookup_changes(now - 50, 'now'))) == 0
+    with pytest.raises(ValueError, match='is before start'):
+        list(hookup.hookup_changes('now', '2019-01-01'))
+
+
 def test_hookup_cache_file_info(sys_handle, mcsession):
     hookup = cm_hookup.Hookup(session=mcsession)
     cfi = hookup.hookup_cache_file_info()
-    assert 'json does not exist' in cfi
+    assert 'hookup_cache_4.bin does not exist' in cfi
+
+
+def test_cminfo_memo(cmsession):
+    session = cmsession
+    handle = cm_sysutils.Handling(session)
+    key = handle.get_cminfo_key()
+    assert key == handle.get_cminfo_key()
+    assert key != handle.get_cminfo_key('parts_hera')
+    cminfo = handle.get_cminfo_correlator()
+    cminfo['antenna_names'].append('not_a_station')
+    # served from the memo, but as a copy
+    handle.geo = None
+    assert handle.get_cminfo_correlator() == handle.get_cminfo_correlator()
+    assert 'not_a_station' not in handle.get_cminfo_correlator()['antenna_names']
+    content_hash = cm_redis_corr.cminfo_hash(handle.get_cminfo_correlator())
+    assert content_hash == cm_redis_corr.cminfo_hash(handle.get_cminfo_correlator(), None)
+    assert content_hash != cm_redis_corr.cminfo_hash(handle.get_cminfo_correlator(),
+                                                     b'{"SNPA000700": "snap"}')
+
+    # a connection stopping changes the key
+    conn = session.query(cm_partconnect.Connections).filter(
+        cm_partconnect.Connections.upstream_part == 'PAM702',
+        cm_partconnect.Connections.downstream_input_port == 'e6').one()
+    conn.stop_gpstime = int(cm_utils.get_astropytime('now').gps) - 10
+    session.commit()
+    assert handle.get_cminfo_key() != key
+    handle.geo = geo_handling.Handling(session)
+    assert 'e6>SNPA000700' not in [x[0] for x in
+                                   handle.get_cminfo_correlator()['correlator_inputs']]
+
+
+def test_snap_serial_index(mcsession, cmsession):
+    index = cm_sysutils.snap_serial_index(mcsession)
+    assert index['SNPA000700'] == [(700, 0)]
+    assert index['SNPD000703'] == [(701, 3)]
+    assert 'N700' not in index
+    assert cm_sysutils.snap_serial_index(mcsession, at_date='2018-01-01') == {}
+
+    session = cmsession
+    index = cm_sysutils.snap_serial_index(session)
+    assert index == cm_sysutils.snap_serial_index(mcsession)
+    # memoized on the snapshot
+    assert cm_sysutils.snap_serial_index(session) is index
+
+    conn = session.query(cm_partconnect.Connections).filter(
+        cm_partconnect.Connections.upstream_part == 'SNPA000700',
+        cm_partconnect.Connections.upstream_output_port == 'rack').one()
+    conn.stop_gpstime = int(cm_utils.get_astropytime('now').gps) - 10
+    session.commit()
+    assert cm_sysutils.snap_serial_index(session)['SNPA000700'] == [(None, None)]
+    with pytest.warns(UserWarning, match='not connected to a node'):
+        node, snap_loc_num = session._get_node_snap_from_serial('snpa000700')
+    assert node is None
+    assert snap_loc_num is None
 
 
 def test_correlator_info(sys_handle):
@@ -2,7 +2,11 @@
 # Copyright 2017 the HERA Collaboration
 # Licensed under the 2-clause BSD license.
 
+import subprocess
+import sys
+
 import numpy as np
+import pytest
 import numpy.testing as npt
 
 from astropy.time import Time
@@ -40,3 +44,34 @@ def test_LSTScheduler_multiday():
     starttime2 = Time('2015-9-20T05:00:09.0', format='isot', scale='utc')
     scheduletime2, hour2 = utils.LSTScheduler(starttime2, LSTbin_size)
     assert np.isclose((hour2.hour - hour1.hour) * 3600, 0)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason='module __getattr__ needs python 3.7, the imports are eager')
+def test_import_defers_heavy_modules():
+    # run in a fresh interpreter since the test suite has imported everything
+    heavy = ['pyuvdata', 'redis', 'tornado', 'pkg_resources', 'cartopy',
+             'astropy.coordinates', 'setuptools_scm']
+    statement = ('import sys, hera_mc, hera_mc.mc; '
+                 'print(",".join(m for m in {heavy} if m in sys.modules))'
+                 .format(heavy=heavy))
+    output = subprocess.run([sys.executable, '-c', statement], check=True,
+                            stdout=subprocess.PIPE, universal_newlines=True)
+    assert output.stdout.strip() == ''
+
+    # the lazily loaded submodules are importable as attributes
+    import hera_mc
+    assert hera_mc.cm_hookup.Hookup is not None
+
+
+def test_version():
+    # the version of a git checkout is worked out, not read from _version.py
+    from pathlib import Path
+    from setuptools_scm import get_version
+    import hera_mc
+    from hera_mc.branch_scheme import branch_scheme
+
+    repo_path = Path(hera_mc.__file__).parent.parent
+    if not (repo_path / '.git').exists():  # pragma: nocover
+        pytest.skip('not running from a git checkout')
+    assert hera_mc.__version__ == get_version(repo_path, local_scheme=branch_scheme)
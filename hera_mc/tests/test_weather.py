@@ -147,6 +147,97 @@ def test_add_weather(mcsession):
     pytest.raises(ValueError, test_session.get_weather_data, variable='foo')
 
 
+def test_get_weather_columns(mcsession):
+    test_session = mcsession
+    t1 = Time('2016-01-10 01:15:23', scale='utc')
+    t2 = t1 + TimeDelta(120.0, format='sec')
+
+    wind_speeds = [2.5487029167, 2.5470608333]
+    temperatures = [11.505, 12.29]
+    for time, wind_speed, temperature in zip([t1, t2], wind_speeds, temperatures):
+        test_session.add_weather_data(time, 'wind_speed', wind_speed)
+        test_session.add_weather_data(time, 'temperature', temperature)
+
+    result = test_session.get_weather_data(
+        starttime=t1 - TimeDelta(3.0, format='sec'),
+        stoptime=t2 + TimeDelta(1.0, format='sec'), variable='wind_speed',
+        output='columns')
+    assert sorted(result.keys()) == ['time', 'value', 'variable']
+    assert result['time'].dtype == np.int64
+    assert np.array_equal(result['time'],
+                          np.array([floor(t1.gps), floor(t2.gps)]))
+    assert result['value'].dtype == np.float64
+    assert np.allclose(result['value'], wind_speeds)
+    assert result['variable'].tolist() == ['wind_speed', 'wind_speed']
+
+    # time column is always included
+    result = test_session.get_weather_data(
+        starttime=t1 - TimeDelta(3.0, format='sec'),
+        stoptime=t2 + TimeDelta(1.0, format='sec'), columns='value',
+        output='columns')
+    assert list(result.keys()) == ['time', 'value']
+    assert len(result['value']) == 4
+
+    result = test_session.get_weather_data(variable='temperature',
+                                           output='dataframe')
+    assert list(result.columns) == ['time', 'variable', 'value']
+    assert len(result) == 1
+    assert result['time'][0] == floor(t2.gps)
+    assert np.isclose(result['value'][0], temperatures[1])
+
+    result = test_session.get_weather_data(
+        starttime=t2 + TimeDelta(200.0, format='sec'), output='columns')
+    assert len(result['time']) == 0
+    assert result['time'].dtype == np.int64
+
+    with pytest.raises(ValueError, match='output must be one of'):
+        test_session.get_weather_data(output='foo')
+
+    with pytest.raises(ValueError, match='column foo is not in table'):
+        test_session.get_weather_data(columns=['foo'], output='columns')
+
+
+@pytest.mark.parametrize('output', ['objects', 'columns', 'dataframe'])
+def test_iter_weather_records(mcsession, output):
+    test_session = mcsession
+    t1 = Time('2016-01-10 01:15:23', scale='utc')
+
+    n_times = 5
+    for ind in range(n_times):
+        time = t1 + TimeDelta(60.0 * ind, format='sec')
+        test_session.add_weather_data(time, 'wind_speed', 2.5 + ind)
+        test_session.add_weather_data(time, 'temperature', 11.5 + ind)
+
+    chunks = list(test_session.iter_records(
+        weather.WeatherData, 'time', t1 - TimeDelta(3.0, format='sec'),
+        t1 + TimeDelta(60.0 * n_times, format='sec'), filter_column='variable',
+        filter_value='wind_speed', chunk_size=2, output=output))
+    assert [len(chunk) if output == 'objects' else len(chunk['time'])
+            for chunk in chunks] == [2, 2, 1]
+
+    if output == 'objects':
+        records = [obj for chunk in chunks for obj in chunk]
+        for obj in records:
+            assert obj not in test_session
+        times = [obj.time for obj in records]
+        values = [obj.value for obj in records]
+    else:
+        times = np.concatenate([chunk['time'] for chunk in chunks])
+        values = np.concatenate([chunk['value'] for chunk in chunks])
+    expected_times = [floor((t1 + TimeDelta(60.0 * ind, format='sec')).gps)
+                      for ind in range(n_times)]
+    assert np.array_equal(times, expected_times)
+    assert np.allclose(values, 2.5 + np.arange(n_times))
+
+    chunks = list(test_session.iter_records(
+        weather.WeatherData, 'time', t1 + TimeDelta(600.0, format='sec'),
+        t1 + TimeDelta(900.0, format='sec'), output=output))
+    assert chunks == []
+
+    with pytest.raises(ValueError, match='stoptime must be an astropy time'):
+        list(test_session.iter_records(weather.WeatherData, 'time', t1, 'foo'))
+
+
 @onsite
 def test_add_from_sensor(mcsession):
     test_session = mcsession
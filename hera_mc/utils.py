@@ -6,8 +6,6 @@
 from math import floor
 from astropy.time import Time
 from astropy.time import TimeDelta
-from astropy import coordinates as coord
-from astropy import units as u
 import numpy as np
 
 
@@ -44,6 +42,9 @@ def LSTScheduler(starttime, LSTbin_size, longitude=21.25):
         Sidereal time of next LST bin.
 
     """
+    from astropy import coordinates as coord
+    from astropy import units as u
+
     sidesec = u.Quantity(1, 'sday').to('day').value  # length of sidereal second in SI seconds.
     # HERA location, #XXX get the HERA location programmatically
     locate = coord.EarthLocation(lon=longitude * u.deg, lat=-30 * u.deg)
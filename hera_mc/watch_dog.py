@@ -82,10 +82,8 @@ def node_temperature(at_date=None, at_time=0.0,
         session = db.sessionmaker()
 
     if at_date is None:
-        use_last = True
         at_date = cm_utils.get_astropytime('now')
     else:
-        use_last = False
         at_date = cm_utils.get_astropytime(at_date, at_time)
     gps_time = at_date.gps
     active_parts = cm_active.ActiveData(session=session)
@@ -98,15 +96,10 @@ def node_temperature(at_date=None, at_time=0.0,
                   '\n\t----   ----    ----    ----    ----'
                   .format(float(temp_threshold), float(time_threshold)))
     msg = '{}'.format(msg_header)
+    latest_sensors = {nds.node: nds for nds in session.get_latest_per_key(
+        node.NodeSensor, 'time', 'node', at_time=at_date)}
     for node_num in active_nodes:
-        if use_last:
-            nds = (session.query(node.NodeSensor)
-                   .filter(node.NodeSensor.node == node_num)
-                   .order_by(node.NodeSensor.time.desc()).first())
-        else:
-            nds = (session.query(node.NodeSensor)
-                   .filter((node.NodeSensor.node == node_num) & (node.NodeSensor.time < gps_time))
-                   .order_by(node.NodeSensor.time.desc()).first())
+        nds = latest_sensors.get(node_num)
         if nds is None or (gps_time - nds.time) / 86400.0 > time_threshold:
             continue
         active_temps[node_num] = []
@@ -7,9 +7,7 @@
 import numpy as np
 from astropy.time import Time
 from math import floor, isnan
-from sqlalchemy import Column, BigInteger, Float, String
-
-import tornado.gen
+from sqlalchemy import Column, BigInteger, Float, String, Index
 
 from . import MCDeclarativeBase
 
@@ -120,6 +118,7 @@ class WeatherData(MCDeclarativeBase):
     """
 
     __tablename__ = 'weather_data'
+    __table_args__ = (Index('ix_weather_data_variable_time', 'variable', 'time'),)
     time = Column(BigInteger, primary_key=True)
     variable = Column(String, nullable=False, primary_key=True)
     value = Column(Float, nullable=False)
@@ -154,11 +153,13 @@ class WeatherData(MCDeclarativeBase):
         return cls(time=weather_time, variable=variable, value=value)
 
 
-@tornado.gen.coroutine
 def _helper_create_from_sensors(starttime, stoptime, variables=None):
     """
     Create a list of weather objects from sensor data using tornado server.
 
+    This is a generator to be wrapped in a `tornado.gen.coroutine` (which is
+    done in `create_from_sensors`, so tornado is only imported when needed).
+
     Parameters
     ----------
     starttime : astropy Time object
@@ -174,6 +175,7 @@ def _helper_create_from_sensors(starttime, stoptime, variables=None):
     A list of WeatherData objects (only accessible via a yield call)
 
     """
+    import tornado.gen
     from katportalclient import KATPortalClient
 
     if not isinstance(starttime, Time):
@@ -260,6 +262,9 @@ def create_from_sensors(starttime, stoptime, variables=None):
     A list of WeatherData objects
 
     """
+    import tornado.gen
+    import tornado.ioloop
+
+    helper = tornado.gen.coroutine(_helper_create_from_sensors)
     io_loop = tornado.ioloop.IOLoop.current()
-    return io_loop.run_sync(lambda: _helper_create_from_sensors(starttime, stoptime,
-                                                                variables=variables))
+    return io_loop.run_sync(lambda: helper(starttime, stoptime, variables=variables))
@@ -5,6 +5,11 @@
 
 """
 Script to generate table initialization files (package from db to csv).
+
+With --go only the tables whose files changed are moved to the hera_cm_db_updates
+repo and committed. The files are written in primary key order, with all the
+table columns and no trailing .0 on whole numbers. That differs from the files
+previously written with pandas, so the first --go after upgrading commits every file.
 """
 
 from hera_mc import mc, cm_transfer
@@ -99,4 +99,4 @@ if __name__ == '__main__':
             print(hookup.show_notes(hookup_dict=hookup_dict, state=state))
             print('-------------------------------------------------------------------------')
         if args.write_cache_file:
-            hookup.write_cache_file(args.cache_log)
+            hookup.write_hookup_cache_to_file(args.cache_log)
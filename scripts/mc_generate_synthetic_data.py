@@ -0,0 +1,86 @@
+#! /usr/bin/env python
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""
+Fill a testing database with synthetic monitoring data for load testing.
+
+The array layout follows the CM hookup in the database (the CM test data is
+loaded first if the database has no CM data), extended with made-up antennas if
+--nants is larger. Loads into a SQLite file if --sqlite is given, otherwise
+into the M&C database selected with --db (which must not be the production
+database).
+"""
+
+import time
+
+from astropy.time import Time
+from sqlalchemy import create_engine
+
+from hera_mc import mc, cm_partconnect, cm_transfer, synthetic, MCDeclarativeBase
+
+parser = mc.get_mc_argument_parser()
+parser.add_argument('--sqlite', default=None,
+                    help='Path of a SQLite file to load the data into instead '
+                    'of an M&C database.')
+parser.add_argument('--start', default=None,
+                    help='Start time (any format astropy Time can parse), '
+                    'defaults to now minus the duration (or now if --live).')
+parser.add_argument('--duration', type=float, default=3600.,
+                    help='Length of time to generate data for in seconds. [3600]')
+parser.add_argument('--cadence', type=int, default=60,
+                    help='Seconds between samples of the per-minute tables. [60]')
+parser.add_argument('--nants', type=int, default=None,
+                    help='Number of antennas, defaults to the ones in the '
+                    'CM hookup.')
+parser.add_argument('--tables', nargs='+', default=None,
+                    help='Tables to fill, defaults to all of: {}'.format(
+                        ', '.join(synthetic.synthetic_tables)))
+parser.add_argument('--live', action='store_true',
+                    help='Insert each sample when the clock reaches its time, '
+                    'to simulate the real ingest rate.')
+parser.add_argument('--seed', type=int, default=0,
+                    help='Random number generator seed. [0]')
+args = parser.parse_args()
+
+if args.sqlite is not None:
+    engine = create_engine('sqlite:///' + args.sqlite)
+    MCDeclarativeBase.metadata.create_all(engine)
+    session = mc.MCSession(bind=engine)
+    target = args.sqlite
+else:
+    db = mc.connect_to_mc_db(args)
+    if isinstance(db, mc.AutomappedDB):
+        raise SystemExit('Refusing to load synthetic data into the production '
+                         'database.')
+    db.create_tables()
+    session = db.sessionmaker()
+    target = db.engine.url.database
+
+with session:
+    if session.query(cm_partconnect.Parts).first() is None:
+        cm_transfer._initialization(session=session,
+                                    cm_csv_path=mc.test_data_path)
+
+    if args.start is not None:
+        starttime = Time(args.start)
+    elif args.live:
+        starttime = Time.now()
+    else:
+        starttime = Time(Time.now().gps - args.duration, format='gps')
+
+    array = synthetic.SyntheticArray(session, nants=args.nants, seed=args.seed)
+    print('Generating {t} s of data for {a} antennas, {s} SNAPs and {n} nodes '
+          'into {db}'.format(t=args.duration, a=len(array.antennas),
+                             s=len(array.snaps), n=len(array.nodes),
+                             db=target))
+    t0 = time.perf_counter()
+    counts = array.load(session, starttime, args.duration,
+                        cadence=args.cadence, tables=args.tables,
+                        live=args.live)
+    elapsed = time.perf_counter() - t0
+    for table_name, n_rows in counts.items():
+        print('{table:26s} {n:10d} rows'.format(table=table_name, n=n_rows))
+    print('Loaded {n} rows in {t:.1f} s ({r:.0f} rows/s)'.format(
+        n=sum(counts.values()), t=elapsed, r=sum(counts.values()) / elapsed))
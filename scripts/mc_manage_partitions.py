@@ -0,0 +1,46 @@
+#! /usr/bin/env python
+# -*- mode: python; coding: utf-8 -*-
+# Copyright 2026 the HERA Collaboration
+# Licensed under the 2-clause BSD license.
+
+"""
+Maintain the time partitions of the high-rate telemetry tables.
+
+Creates the monthly partitions for the coming months and, if a retention
+period is given, rolls rows older than it up into the hourly tables and drops
+them. Meant to be run daily (e.g. from cron).
+"""
+
+from astropy.time import Time, TimeDelta
+
+from hera_mc import mc, partitioning
+
+parser = mc.get_mc_argument_parser()
+parser.add_argument('--months-ahead', dest='months_ahead', type=int, default=2,
+                    help='Create partitions for at least this many months '
+                    'after the current one. [2]')
+parser.add_argument('--retention-days', dest='retention_days', type=float,
+                    default=None,
+                    help='Roll up rows older than this many days into the '
+                    'hourly tables and remove them. If not set, no rows are '
+                    'removed.')
+parser.add_argument('--tables', nargs='+', default=None,
+                    help='Telemetry tables to act on, defaults to all of: '
+                    '{}'.format(', '.join(partitioning.telemetry_tables)))
+args = parser.parse_args()
+
+db = mc.connect_to_mc_db(args)
+with db.sessionmaker() as session:
+    now = Time.now()
+    created = partitioning.create_partitions(
+        session, now, now + TimeDelta(31 * args.months_ahead, format='jd'),
+        tables=args.tables)
+    for name in created:
+        print('Created partition {}'.format(name))
+
+    if args.retention_days is not None:
+        n_removed = partitioning.rollup_telemetry(
+            session, args.retention_days, tables=args.tables, now=now)
+        for table_name, n_rows in n_removed.items():
+            print('Rolled up {n} rows from {table}'
+                  .format(n=n_rows, table=table_name))
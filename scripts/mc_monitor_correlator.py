@@ -7,14 +7,9 @@
 
 """
 
-import sys
-import time
-import traceback
-import socket
-
-from astropy.time import Time
-
 from hera_mc import mc
+from hera_mc.auto_spectra import AutoSpectraArchive
+from hera_mc.daemon_runtime import DaemonRuntime, DaemonTask
 
 MONITORING_INTERVAL = 60  # seconds
 
@@ -22,67 +17,17 @@ parser = mc.get_mc_argument_parser()
 args = parser.parse_args()
 db = mc.connect_to_mc_db(args)
 
-hostname = socket.gethostname()
-
-# List of commands (methods) to run on each iteration
-commands_to_run = ['add_correlator_control_state_from_corrcm',
-                   'add_correlator_config_from_corrcm',
-                   'add_snap_status_from_corrcm',
-                   'add_corr_snap_versions_from_corrcm',
-                   'add_antenna_status_from_corrcm',
-                   "add_autocorrelations_from_redis"]
-
-while True:
-    try:
-        # Use a single session unless there's an error that isn't fixed by a
-        # rollback.
-        with db.sessionmaker() as session:
-            while True:
-                time.sleep(MONITORING_INTERVAL)
-
-                for command in commands_to_run:
-                    try:
-                        getattr(session, command)()
-                        session.commit()
-                        session.add_daemon_status(
-                            'mc_monitor_correlator',
-                            hostname, Time.now(), 'good')
-                        session.commit()
-                    except Exception:
-                        print('{t} -- error calling command {c}'.format(
-                            t=time.asctime(), c=command), file=sys.stderr)
-                        traceback.print_exc(file=sys.stderr)
-                        traceback_str = traceback.format_exc()
-                        session.rollback()
-                        try:
-                            # try to update the daemon_status table and add an
-                            # error message to the subsystem_error table
-                            session.add_daemon_status('mc_monitor_correlator',
-                                                      hostname, Time.now(), 'errored')
-                            session.add_subsystem_error(Time.now(),
-                                                        'mc_correlator_monitor',
-                                                        2, traceback_str)
-                        except Exception as e:
-                            # if we can't log error messages to the session,
-                            # need a new session
-                            raise RuntimeError(
-                                'error logging to subsystem_error table after '
-                                'command' + command) from e
-                        continue
-    except Exception:
-        # Try to log an error with a new session
-        traceback.print_exc(file=sys.stderr)
-        with db.sessionmaker() as new_session:
-            try:
-                # try to update the daemon_status table and add an
-                # error message to the subsystem_error table
-                session.add_daemon_status('mc_monitor_correlator',
-                                          hostname, Time.now(), 'errored')
-                session.add_subsystem_error(
-                    Time.now(), 'mc_correlator_monitor', 2, traceback_str)
-            except Exception as e:
-                # if we can't log error messages to the new session we're in real trouble
-                raise RuntimeError('error logging to subsystem_error with a '
-                                   'new session') from e
-        # logging with a new session worked, so restart to get a new session
-        continue
+# Commands (methods) to run every interval. They are independent, so they run
+# concurrently, each in its own session. The full autocorrelation spectra are
+# archived if there is an "auto_spectra_archive" entry in the config file.
+tasks = [DaemonTask('add_correlator_control_state_from_corrcm', MONITORING_INTERVAL),
+         DaemonTask('add_correlator_config_from_corrcm', MONITORING_INTERVAL),
+         DaemonTask('add_snap_status_from_corrcm', MONITORING_INTERVAL),
+         DaemonTask('add_corr_snap_versions_from_corrcm', MONITORING_INTERVAL),
+         DaemonTask('add_antenna_status_from_corrcm', MONITORING_INTERVAL),
+         DaemonTask('add_autocorrelations_from_redis', MONITORING_INTERVAL,
+                    kwargs={'spectra_archive': AutoSpectraArchive.from_config(
+                        args.mc_config_path)})]
+
+DaemonRuntime(db, 'mc_monitor_correlator', tasks,
+              subsystem='mc_correlator_monitor').run()
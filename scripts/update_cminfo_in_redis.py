@@ -4,7 +4,7 @@
 # Licensed under the 2-clause BSD license.
 
 """
-Script to generate table initialization files (package from db to csv).
+Script to update the correlator cm info in redis (only written if it changed).
 """
 
 import argparse
@@ -14,6 +14,8 @@ from hera_mc.correlator import DEFAULT_REDIS_ADDRESS
 
 parser = argparse.ArgumentParser()
 parser.add_argument('-r', '--redishost', help='Redis host name', default=DEFAULT_REDIS_ADDRESS)
+parser.add_argument('--force', help='Write to redis even if nothing changed.',
+                    action='store_true')
 args = parser.parse_args()
 
-cm_redis_corr.set_redis_cminfo(redishost=args.redishost)
+cm_redis_corr.set_redis_cminfo(redishost=args.redishost, force=args.force)
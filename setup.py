@@ -25,7 +25,8 @@ setup_args = {
     'license': "BSD",
     'author': "HERA Team",
     'author_email': "hera-sw@lists.berkeley.edu",
-    "use_scm_version": {"local_scheme": branch_scheme},
+    "use_scm_version": {"local_scheme": branch_scheme,
+                        "write_to": "hera_mc/_version.py"},
     'packages': ['hera_mc', 'hera_mc.tests'],
     'scripts': glob.glob('scripts/*'),
     'include_package_data': True,
@@ -36,7 +37,7 @@ setup_args = {
         "all": ["cartopy", "h5py", "pandas", "psutil", "python-dateutil", "pyuvdata",
                 "tabulate", "tornado"],
         "dev": ["cartopy", "h5py", "pandas", "psutil", "python-dateutil", "pyuvdata",
-                "tabulate", "tornado", "pytest", "flake8"]
+                "tabulate", "tornado", "pytest", "pytest-benchmark", "flake8"]
     },
     'tests_require': ["pyyaml"],
     'classifiers': ["Development Status :: 4 - Beta",